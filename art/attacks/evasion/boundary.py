@@ -59,6 +59,7 @@ class BoundaryAttack(EvasionAttack):
         "sample_size",
         "init_size",
         "batch_size",
+        "vectorized",
         "verbose",
     ]
 
@@ -77,6 +78,7 @@ class BoundaryAttack(EvasionAttack):
         sample_size: int = 20,
         init_size: int = 100,
         min_epsilon: float = 0.0,
+        vectorized: bool = False,
         verbose: bool = True,
     ) -> None:
         """
@@ -93,6 +95,9 @@ class BoundaryAttack(EvasionAttack):
         :param sample_size: Number of samples per trial.
         :param init_size: Maximum number of trials for initial generation of adversarial examples.
         :param min_epsilon: Stop attack if perturbation is smaller than `min_epsilon`.
+        :param vectorized: If True, attack `batch_size` samples in lockstep with per-sample step sizes and evaluate the
+                           proposals of all samples with a single call of `estimator.predict` per trial instead of
+                           attacking one sample at a time.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=estimator)
@@ -107,6 +112,7 @@ class BoundaryAttack(EvasionAttack):
         self.init_size = init_size
         self.min_epsilon = min_epsilon
         self.batch_size = batch_size
+        self.vectorized = vectorized
         self.verbose = verbose
         self._check_params()
 
@@ -149,12 +155,10 @@ class BoundaryAttack(EvasionAttack):
 
         # Prediction from the initial adversarial examples if not None
         x_adv_init = kwargs.get("x_adv_init")
+        init_preds = None
 
         if x_adv_init is not None:
             init_preds = np.argmax(self.estimator.predict(x_adv_init, batch_size=self.batch_size), axis=1)
-        else:
-            init_preds = [None] * len(x)
-            x_adv_init = [None] * len(x)
 
         # Assert that, if attack is targeted, y is provided
         if self.targeted and y is None:  # pragma: no cover
@@ -163,28 +167,22 @@ class BoundaryAttack(EvasionAttack):
         # Some initial setups
         x_adv = x.astype(ART_NUMPY_DTYPE)
 
-        # Generate the adversarial samples
-        for ind, val in enumerate(tqdm(x_adv, desc="Boundary attack", disable=not self.verbose)):
-            if self.targeted:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=y[ind],
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
-            else:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=-1,
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
+        # Generate the adversarial samples, attacking one sample at a time as a batch of one example if not vectorized
+        attack_size = self.batch_size if self.vectorized else 1
+        y_index = y.reshape(-1)
+        nb_batches = int(np.ceil(x_adv.shape[0] / float(attack_size)))
+
+        for batch_id in tqdm(range(nb_batches), desc="Boundary attack", disable=not self.verbose):
+            batch_index_1, batch_index_2 = batch_id * attack_size, (batch_id + 1) * attack_size
+            x_adv[batch_index_1:batch_index_2] = self._perturb_batch(
+                x=x_adv[batch_index_1:batch_index_2],
+                y=y_index[batch_index_1:batch_index_2],
+                y_p=preds[batch_index_1:batch_index_2],
+                init_pred=init_preds[batch_index_1:batch_index_2] if init_preds is not None else None,
+                adv_init=x_adv_init[batch_index_1:batch_index_2] if x_adv_init is not None else None,
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
 
         y = to_categorical(y, self.estimator.nb_classes)
 
@@ -195,252 +193,292 @@ class BoundaryAttack(EvasionAttack):
 
         return x_adv
 
-    def _perturb(
+    def _perturb_batch(
         self,
         x: np.ndarray,
-        y: int,
-        y_p: int,
-        init_pred: int,
-        adv_init: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Internal attack function for one example.
+        Internal attack function for a batch of examples that are attacked in lockstep.
 
-        :param x: An array with one original input to be attacked.
-        :param y: If `self.targeted` is true, then `y` represents the target label.
-        :param y_p: The predicted label of x.
-        :param init_pred: The predicted label of the initial image.
-        :param adv_init: Initial array to act as an initial adversarial example.
+        :param x: An array with a batch of original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: An adversarial example.
+        :return: An array of adversarial examples.
         """
-        # First, create an initial adversarial sample
-        initial_sample = self._init_sample(x, y, y_p, init_pred, adv_init, clip_min, clip_max)
-
-        # If an initial adversarial example is not found, then return the original image
-        if initial_sample is None:
-            return x
-
-        # If an initial adversarial example found, then go with boundary attack
-        x_adv = self._attack(
-            initial_sample[0],
-            x,
-            y_p,
-            initial_sample[1],
-            self.delta,
-            self.epsilon,
-            clip_min,
-            clip_max,
-        )
+        x_adv = x.copy()
+
+        # First, create initial adversarial samples
+        initial_samples, targets, success = self._init_sample_batch(x, y, y_p, init_pred, adv_init, clip_min, clip_max)
+
+        # If an initial adversarial example is not found, then keep the original image
+        idx = np.where(success)[0]
+        if idx.size > 0:
+            x_adv[idx] = self._attack_batch(
+                initial_samples[idx],
+                x[idx],
+                y_p[idx],
+                targets[idx],
+                self.delta,
+                self.epsilon,
+                clip_min,
+                clip_max,
+            )
 
         return x_adv
 
-    def _attack(
+    def _attack_batch(
         self,
         initial_sample: np.ndarray,
         original_sample: np.ndarray,
-        y_p: int,
-        target: int,
+        y_p: np.ndarray,
+        target: np.ndarray,
         initial_delta: float,
         initial_epsilon: float,
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Main function for the boundary attack.
+        Main function for the boundary attack on a batch of examples. Every example keeps its own step sizes and leaves
+        the batch as soon as its attack stops.
 
-        :param initial_sample: An initial adversarial example.
-        :param original_sample: The original input.
-        :param y_p: The predicted label of the original input.
-        :param target: The target label.
+        :param initial_sample: An array of initial adversarial examples.
+        :param original_sample: The original inputs.
+        :param y_p: The predicted labels of the original inputs.
+        :param target: The target labels.
         :param initial_delta: Initial step size for the orthogonal step.
         :param initial_epsilon: Initial step size for the step towards the target.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an adversarial example.
+        :return: An array of adversarial examples.
         """
         # Get initialization for some variables
-        x_adv = initial_sample
-        self.curr_delta = initial_delta
-        self.curr_epsilon = initial_epsilon
+        x_adv = initial_sample.copy()
+        self.curr_delta = np.full(x_adv.shape[0], initial_delta)
+        self.curr_epsilon = np.full(x_adv.shape[0], initial_epsilon)
 
         self.curr_adv = x_adv
 
+        # Indices of the examples which are still attacked
+        active = np.arange(x_adv.shape[0])
+        input_shape = x_adv.shape[1:]
+
         # Main loop to wander around the boundary
         for _ in trange(self.max_iter, desc="Boundary attack - iterations", disable=not self.verbose):
+            if active.size == 0:
+                break
+
             # Trust region method to adjust delta
+            x_advs = np.zeros((active.size, self.sample_size) + input_shape, dtype=x_adv.dtype)
+            x_advs_satisfied = np.zeros((active.size, self.sample_size), dtype=bool)
+            searching = np.ones(active.size, dtype=bool)
+
             for _ in range(self.num_trial):
-                potential_advs = []
-                for _ in range(self.sample_size):
-                    potential_adv = x_adv + self._orthogonal_perturb(self.curr_delta, x_adv, original_sample)
-                    potential_adv = np.clip(potential_adv, clip_min, clip_max)
-                    potential_advs.append(potential_adv)
-
-                preds = np.argmax(
-                    self.estimator.predict(np.array(potential_advs), batch_size=self.batch_size),
-                    axis=1,
-                )
+                idx = np.where(searching)[0]
+                if idx.size == 0:
+                    break
 
-                if self.targeted:
-                    satisfied = preds == target
-                else:
-                    satisfied = preds != y_p
+                samples = np.repeat(active[idx], self.sample_size)
+                potential_advs = x_adv[samples] + self._orthogonal_perturb_batch(
+                    self.curr_delta[samples], x_adv[samples], original_sample[samples]
+                )
+                potential_advs = np.clip(potential_advs, clip_min, clip_max)
+                satisfied = self._adversarial_satisfactory(potential_advs, y_p[samples], target[samples])
+                satisfied = satisfied.reshape(idx.size, self.sample_size)
 
-                delta_ratio = np.mean(satisfied)
+                delta_ratio = np.mean(satisfied, axis=1)
+                self.curr_delta[active[idx]] = self._adapt_step(self.curr_delta[active[idx]], delta_ratio)
 
-                if delta_ratio < 0.2:
-                    self.curr_delta *= self.step_adapt
-                elif delta_ratio > 0.5:
-                    self.curr_delta /= self.step_adapt
+                found = delta_ratio > 0
+                x_advs[idx[found]] = potential_advs.reshape((idx.size, self.sample_size) + input_shape)[found]
+                x_advs_satisfied[idx[found]] = satisfied[found]
+                searching[idx[found]] = False
 
-                if delta_ratio > 0:
-                    x_advs = np.array(potential_advs)[np.where(satisfied)[0]]
-                    break
-            else:  # pragma: no cover
+            if searching.any():  # pragma: no cover
                 logger.warning("Adversarial example found but not optimal.")
-                return x_adv
 
-            # Trust region method to adjust epsilon
-            for _ in range(self.num_trial):
-                perturb = np.repeat(np.array([original_sample]), len(x_advs), axis=0) - x_advs
-                perturb *= self.curr_epsilon
-                potential_advs = x_advs + perturb
-                potential_advs = np.clip(potential_advs, clip_min, clip_max)
-                preds = np.argmax(
-                    self.estimator.predict(potential_advs, batch_size=self.batch_size),
-                    axis=1,
-                )
+            active = active[~searching]
+            x_advs = x_advs[~searching]
+            x_advs_satisfied = x_advs_satisfied[~searching]
 
-                if self.targeted:
-                    satisfied = preds == target
-                else:
-                    satisfied = preds != y_p
+            # Trust region method to adjust epsilon
+            searching = np.ones(active.size, dtype=bool)
 
-                epsilon_ratio = np.mean(satisfied)
+            for _ in range(self.num_trial):
+                idx = np.where(searching)[0]
+                if idx.size == 0:
+                    break
 
-                if epsilon_ratio < 0.2:
-                    self.curr_epsilon *= self.step_adapt
-                elif epsilon_ratio > 0.5:
-                    self.curr_epsilon /= self.step_adapt
+                candidates = x_advs_satisfied[idx]
+                samples = np.repeat(active[idx], np.sum(candidates, axis=1))
+                candidate_advs = x_advs[idx][candidates]
+                perturb = original_sample[samples] - candidate_advs
+                perturb *= self.curr_epsilon[samples].reshape((-1,) + (1,) * len(input_shape))
+                potential_advs = np.clip(candidate_advs + perturb, clip_min, clip_max)
+                satisfied = self._adversarial_satisfactory(potential_advs, y_p[samples], target[samples])
+
+                epsilon_ratio = np.zeros(candidates.shape)
+                epsilon_ratio[candidates] = satisfied
+                epsilon_ratio = np.sum(epsilon_ratio, axis=1) / np.sum(candidates, axis=1)
+                self.curr_epsilon[active[idx]] = self._adapt_step(self.curr_epsilon[active[idx]], epsilon_ratio)
+
+                # Keep the satisfied potential adversarial example with minimum L2 distance for every example
+                found = epsilon_ratio > 0
+                dist = np.full(candidates.shape, np.inf)
+                dist[candidates] = np.where(
+                    satisfied,
+                    np.linalg.norm((original_sample[samples] - potential_advs).reshape(samples.size, -1), axis=1),
+                    np.inf,
+                )
+                potential_advs_all = np.zeros(candidates.shape + input_shape, dtype=x_adv.dtype)
+                potential_advs_all[candidates] = potential_advs
+                best = np.argmin(dist, axis=1)
+                x_adv[active[idx[found]]] = potential_advs_all[found, best[found]]
+                searching[idx[found]] = False
 
-                if epsilon_ratio > 0:
-                    x_adv = self._best_adv(original_sample, potential_advs[np.where(satisfied)[0]])
-                    self.curr_adv = x_adv
-                    break
-            else:  # pragma: no cover
+            if searching.any():  # pragma: no cover
                 logger.warning("Adversarial example found but not optimal.")
-                return self._best_adv(original_sample, x_advs)
+                for i in np.where(searching)[0]:
+                    x_adv[active[i]] = self._best_adv(original_sample[active[i]], x_advs[i][x_advs_satisfied[i]])
+
+            active = active[~searching]
 
-            if self.curr_epsilon < self.min_epsilon:
-                return x_adv
+            # Examples with a perturbation smaller than `min_epsilon` leave the batch
+            active = active[self.curr_epsilon[active] >= self.min_epsilon]
 
         return x_adv
 
-    def _orthogonal_perturb(self, delta: float, current_sample: np.ndarray, original_sample: np.ndarray) -> np.ndarray:
+    def _orthogonal_perturb_batch(
+        self, delta: np.ndarray, current_sample: np.ndarray, original_sample: np.ndarray
+    ) -> np.ndarray:
         """
-        Create an orthogonal perturbation.
+        Create orthogonal perturbations for a batch of examples.
 
-        :param delta: Initial step size for the orthogonal step.
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
-        :return: a possible perturbation.
+        :param delta: Step sizes for the orthogonal step, one per example.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
+        :return: An array of possible perturbations.
         """
+        nb_samples = current_sample.shape[0]
+        shape = (-1,) + (1,) * (len(current_sample.shape) - 1)
+
         # Generate perturbation randomly
-        perturb = np.random.randn(*self.estimator.input_shape).astype(ART_NUMPY_DTYPE)
+        perturb = np.random.randn(*current_sample.shape).astype(ART_NUMPY_DTYPE)
+        perturb_flat = perturb.reshape(nb_samples, -1)
 
         # Rescale the perturbation
-        perturb /= np.linalg.norm(perturb)
-        perturb *= delta * np.linalg.norm(original_sample - current_sample)
+        direction_flat = (original_sample - current_sample).reshape(nb_samples, -1)
+        direction_norm = np.linalg.norm(direction_flat, axis=1, keepdims=True)
+        perturb_flat /= np.linalg.norm(perturb_flat, axis=1, keepdims=True)
+        perturb_flat *= delta.reshape(-1, 1) * direction_norm
 
         # Project the perturbation onto sphere
-        direction = original_sample - current_sample
+        direction_flat = direction_flat / direction_norm
+        perturb_flat -= np.sum(perturb_flat * direction_flat, axis=1, keepdims=True) * direction_flat
+        perturb = perturb_flat.reshape(current_sample.shape)
 
-        direction_flat = direction.flatten()
-        perturb_flat = perturb.flatten()
-
-        direction_flat /= np.linalg.norm(direction_flat)
-        perturb_flat -= np.dot(perturb_flat, direction_flat.T) * direction_flat
-        perturb = perturb_flat.reshape(self.estimator.input_shape)
-
-        hypotenuse = np.sqrt(1 + delta ** 2)
+        hypotenuse = np.sqrt(1 + delta ** 2).reshape(shape)
         perturb = ((1 - hypotenuse) * (current_sample - original_sample) + perturb) / hypotenuse
         return perturb
 
-    def _init_sample(
+    def _init_sample_batch(
         self,
         x: np.ndarray,
-        y: int,
-        y_p: int,
-        init_pred: int,
-        adv_init: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
         clip_min: float,
         clip_max: float,
-    ) -> Optional[Tuple[np.ndarray, int]]:
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Find initial adversarial example for the attack.
-
-        :param x: An array with one original input to be attacked.
-        :param y: If `self.targeted` is true, then `y` represents the target label.
-        :param y_p: The predicted label of x.
-        :param init_pred: The predicted label of the initial image.
-        :param adv_init: Initial array to act as an initial adversarial example.
+        Find initial adversarial examples for a batch of examples. The random images of all examples are drawn and
+        evaluated together.
+
+        :param x: An array with a batch of original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an adversarial example.
+        :return: A tuple of the initial adversarial examples, their labels and a boolean array indicating for which
+                 examples an initial adversarial example has been found.
         """
         nprd = np.random.RandomState()
-        initial_sample = None
+        initial_samples = x.astype(ART_NUMPY_DTYPE)
+        targets = y.copy() if self.targeted else y_p.copy()
+        success = np.zeros(x.shape[0], dtype=bool)
+
+        # Attack already satisfied for targeted attacks
+        done = (y == y_p) if self.targeted else np.zeros(x.shape[0], dtype=bool)
+
+        # The initial images satisfied
+        if adv_init is not None and init_pred is not None:
+            satisfied = (init_pred == y) if self.targeted else (init_pred != y_p)
+            satisfied = satisfied & ~done
+            initial_samples[satisfied] = adv_init[satisfied]
+            targets[satisfied] = init_pred[satisfied]
+            success[satisfied] = True
+            done[satisfied] = True
+
+        # The initial images unsatisfied
+        for _ in range(self.init_size):
+            idx = np.where(~done)[0]
+            if idx.size == 0:
+                break
+
+            random_img = nprd.uniform(clip_min, clip_max, size=x[idx].shape).astype(x.dtype)
+            random_class = np.argmax(self.estimator.predict(random_img, batch_size=self.batch_size), axis=1)
+            satisfied = (random_class == y[idx]) if self.targeted else (random_class != y_p[idx])
+
+            initial_samples[idx[satisfied]] = random_img[satisfied]
+            targets[idx[satisfied]] = random_class[satisfied]
+            success[idx[satisfied]] = True
+            done[idx[satisfied]] = True
+
+        if np.sum(~done) > 0:
+            logger.warning(
+                "Failed to draw a random image that is adversarial for %d samples, attack failed for these samples.",
+                np.sum(~done),
+            )
+
+        return initial_samples, targets, success
+
+    def _adversarial_satisfactory(self, samples: np.ndarray, y_p: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """
+        Check whether examples are adversarial.
+
+        :param samples: A batch of examples.
+        :param y_p: The predicted labels of the original inputs, one per example.
+        :param target: The target labels, one per example.
+        :return: A boolean array.
+        """
+        preds = np.argmax(self.estimator.predict(samples, batch_size=self.batch_size), axis=1)
 
         if self.targeted:
-            # Attack satisfied
-            if y == y_p:
-                return None
-
-            # Attack unsatisfied yet and the initial image satisfied
-            if adv_init is not None and init_pred == y:
-                return adv_init.astype(ART_NUMPY_DTYPE), init_pred
-
-            # Attack unsatisfied yet and the initial image unsatisfied
-            for _ in range(self.init_size):
-                random_img = nprd.uniform(clip_min, clip_max, size=x.shape).astype(x.dtype)
-                random_class = np.argmax(
-                    self.estimator.predict(np.array([random_img]), batch_size=self.batch_size),
-                    axis=1,
-                )[0]
-
-                if random_class == y:
-                    initial_sample = random_img, random_class
-
-                    logger.info("Found initial adversarial image for targeted attack.")
-                    break
-            else:
-                logger.warning("Failed to draw a random image that is adversarial, attack failed.")
+            return preds == target
 
-        else:
-            # The initial image satisfied
-            if adv_init is not None and init_pred != y_p:
-                return adv_init.astype(ART_NUMPY_DTYPE), init_pred
-
-            # The initial image unsatisfied
-            for _ in range(self.init_size):
-                random_img = nprd.uniform(clip_min, clip_max, size=x.shape).astype(x.dtype)
-                random_class = np.argmax(
-                    self.estimator.predict(np.array([random_img]), batch_size=self.batch_size),
-                    axis=1,
-                )[0]
-
-                if random_class != y_p:
-                    initial_sample = random_img, random_class
-
-                    logger.info("Found initial adversarial image for untargeted attack.")
-                    break
-            else:  # pragma: no cover
-                logger.warning("Failed to draw a random image that is adversarial, attack failed.")
+        return preds != y_p
 
-        return initial_sample
+    def _adapt_step(self, step: np.ndarray, ratio: np.ndarray) -> np.ndarray:
+        """
+        Adapt step sizes depending on the ratio of satisfied potential adversarial examples.
+
+        :param step: Current step sizes.
+        :param ratio: Ratios of satisfied potential adversarial examples.
+        :return: Adapted step sizes.
+        """
+        return np.where(ratio < 0.2, step * self.step_adapt, np.where(ratio > 0.5, step / self.step_adapt, step))
 
     @staticmethod
     def _best_adv(original_sample: np.ndarray, potential_advs: np.ndarray) -> np.ndarray:
@@ -480,5 +518,8 @@ class BoundaryAttack(EvasionAttack):
         if not isinstance(self.min_epsilon, (float, int)) or self.min_epsilon < 0:
             raise ValueError("The minimum epsilon must be non-negative.")
 
+        if not isinstance(self.vectorized, bool):
+            raise ValueError("The argument `vectorized` has to be of type bool.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -21,7 +21,7 @@ This module implements attacks on Decision Trees.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import List, Optional, Union
+from typing import Dict, Optional
 
 import numpy as np
 from tqdm.auto import trange
@@ -41,69 +41,123 @@ class DecisionTreeAttack(EvasionAttack):
     | Paper link: https://arxiv.org/abs/1605.07277
     """
 
-    attack_params = ["classifier", "offset", "verbose"]
+    attack_params = ["classifier", "offset", "batch_size", "verbose"]
     _estimator_requirements = (ScikitlearnDecisionTreeClassifier,)
 
     def __init__(
         self,
         classifier: ScikitlearnDecisionTreeClassifier,
         offset: float = 0.001,
+        batch_size: int = 128,
         verbose: bool = True,
     ) -> None:
         """
         :param classifier: A trained scikit-learn decision tree model.
         :param offset: How much the value is pushed away from tree's threshold.
+        :param batch_size: Number of samples attacked together.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=classifier)
         self.offset = offset
+        self.batch_size = batch_size
         self.verbose = verbose
         self._check_params()
 
-    def _df_subtree(
-        self,
-        position: int,
-        original_class: Union[int, np.ndarray],
-        target: Optional[int] = None,
-    ) -> List[int]:
+    def _get_tree_arrays(self) -> Dict[str, np.ndarray]:
         """
-        Search a decision tree for a mis-classifying instance.
+        Precompute the structure of the decision tree as arrays over its nodes, the paths from the root to every node
+        as rows of node IDs indexed by depth and the leaf nodes in depth-first order from left to right.
 
-        :param position: An array with the original inputs to be attacked.
-        :param original_class: original label for the instances we are searching mis-classification for.
-        :param target: If the provided, specifies which output the leaf has to have to be accepted.
-        :return: An array specifying the path to the leaf where the classification is either != original class or
-                 ==target class if provided.
+        :return: A dictionary of the tree arrays.
         """
-        # base case, we're at a leaf
-        if self.estimator.get_left_child(position) == self.estimator.get_right_child(position):
-            if target is None:  # untargeted case
-                if self.estimator.get_classes_at_node(position) != original_class:
-                    path = [position]
-                else:
-                    path = [-1]
-            else:  # targeted case
-                if self.estimator.get_classes_at_node(position) == target:
-                    path = [position]
-                else:
-                    path = [-1]
-        else:  # go deeper, depths first
-            res = self._df_subtree(self.estimator.get_left_child(position), original_class, target)
-            if res[0] == -1:
-                # no result, try right subtree
-                res = self._df_subtree(self.estimator.get_right_child(position), original_class, target)
-                if res[0] == -1:
-                    # no desired result
-                    path = [-1]
-                else:
-                    res.append(position)
-                    path = res
-            else:
-                # done, it is returning a path
-                res.append(position)
-                path = res
+        tree_model = self.estimator.model.tree_
+        nb_nodes = tree_model.node_count
+        nodes = np.arange(nb_nodes)
+        children_left = tree_model.children_left
+        children_right = tree_model.children_right
+        is_leaf = children_left == children_right
+
+        # Group the nodes by depth, starting from the root
+        levels = [np.array([0])]
+        while True:
+            parents = levels[-1][~is_leaf[levels[-1]]]
+            if parents.size == 0:
+                break
+            levels.append(np.stack([children_left[parents], children_right[parents]], axis=1).flatten())
+
+        depth = np.zeros(nb_nodes, dtype=int)
+        node_paths = np.full((nb_nodes, len(levels)), -1)
+        node_paths[0, 0] = 0
+        for i_level, level in enumerate(levels[:-1]):
+            parents = level[~is_leaf[level]]
+            for children in (children_left[parents], children_right[parents]):
+                depth[children] = i_level + 1
+                node_paths[children] = node_paths[parents]
+                node_paths[children, i_level + 1] = children
+
+        # The leaves of the subtree of a node have consecutive ranks in depth-first order from left to right
+        nb_leaves = is_leaf.astype(int)
+        for level in levels[-2::-1]:
+            parents = level[~is_leaf[level]]
+            nb_leaves[parents] = nb_leaves[children_left[parents]] + nb_leaves[children_right[parents]]
+
+        leaf_rank = np.zeros(nb_nodes, dtype=int)
+        for level in levels[:-1]:
+            parents = level[~is_leaf[level]]
+            leaf_rank[children_left[parents]] = leaf_rank[parents]
+            leaf_rank[children_right[parents]] = leaf_rank[parents] + nb_leaves[children_left[parents]]
+
+        leaves = nodes[is_leaf][np.argsort(leaf_rank[is_leaf])]
+        leaf_classes = np.argmax(tree_model.value[leaves].reshape(len(leaves), -1), axis=1)
+
+        # Rank of the next leaf whose class differs from the class of the leaf at each rank
+        is_change = np.append(leaf_classes[1:] != leaf_classes[:-1], True)
+        next_change = np.where(is_change, np.arange(1, len(leaves) + 1), len(leaves))
+        next_change = np.minimum.accumulate(next_change[::-1])[::-1]
+
+        # Leaf ranks sorted by class to search the next leaf of a class
+        class_keys = np.sort(leaf_classes * len(leaves) + np.arange(len(leaves)))
+
+        return {
+            "children_left": children_left,
+            "children_right": children_right,
+            "feature": tree_model.feature,
+            "threshold": tree_model.threshold,
+            "depth": depth,
+            "node_paths": node_paths,
+            "leaf_rank_start": leaf_rank,
+            "leaf_rank_end": leaf_rank + nb_leaves,
+            "leaves": leaves,
+            "leaf_classes": leaf_classes,
+            "next_change": next_change,
+            "class_keys": class_keys,
+        }
+
+    @staticmethod
+    def _search_subtrees(
+        tree: Dict[str, np.ndarray], subtrees: np.ndarray, original_class: np.ndarray, target: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """
+        Search subtrees for the first mis-classifying leaf in depth-first order from left to right.
+
+        :param tree: The tree arrays.
+        :param subtrees: The roots of the subtrees to search.
+        :param original_class: Original labels for the instances we are searching mis-classification for.
+        :param target: If provided, specifies which output the leaf has to have to be accepted.
+        :return: The ranks of the leaves where the classification is either != original class or == target class if
+                 provided, -1 if the subtree has no such leaf.
+        """
+        start = tree["leaf_rank_start"][subtrees]
+        end = tree["leaf_rank_end"][subtrees]
+        nb_leaves = len(tree["leaves"])
 
-        return path
+        if target is None:  # untargeted case
+            rank = np.where(tree["leaf_classes"][start] != original_class, start, tree["next_change"][start])
+        else:  # targeted case
+            index = np.searchsorted(tree["class_keys"], target * nb_leaves + start)
+            rank = np.append(tree["class_keys"], np.inf)[index] - target * nb_leaves
+
+        return np.where(rank < end, rank, -1).astype(int)
 
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
@@ -117,48 +171,53 @@ class DecisionTreeAttack(EvasionAttack):
         if y is not None:
             y = check_and_transform_label_format(y, self.estimator.nb_classes, return_one_hot=False)
         x_adv = x.copy()
-
-        for index in trange(x_adv.shape[0], desc="Decision tree attack", disable=not self.verbose):
-            path = self.estimator.get_decision_path(x_adv[index])
-            legitimate_class = int(np.argmax(self.estimator.predict(x_adv[index].reshape(1, -1))))
-            position = -2
-            adv_path = [-1]
-            ancestor = path[position]
-            while np.abs(position) < (len(path) - 1) or adv_path[0] == -1:
-                ancestor = path[position]
-                current_child = path[position + 1]
-                # search in right subtree
-                if current_child == self.estimator.get_left_child(ancestor):
-                    if y is None:
-                        adv_path = self._df_subtree(self.estimator.get_right_child(ancestor), legitimate_class)
-                    else:
-                        adv_path = self._df_subtree(
-                            self.estimator.get_right_child(ancestor),
-                            legitimate_class,
-                            y[index],
-                        )
-                else:  # search in left subtree
-                    if y is None:
-                        adv_path = self._df_subtree(self.estimator.get_left_child(ancestor), legitimate_class)
-                    else:
-                        adv_path = self._df_subtree(
-                            self.estimator.get_left_child(ancestor),
-                            legitimate_class,
-                            y[index],
-                        )
-                position = position - 1  # we are going the decision path upwards
-            adv_path.append(ancestor)
-            # we figured out which is the way to the target, now perturb
-            # first one is leaf-> no threshold, cannot be perturbed
-            for i in range(1, 1 + len(adv_path[1:])):
-                go_for = adv_path[i - 1]
-                threshold = self.estimator.get_threshold_at_node(adv_path[i])
-                feature = self.estimator.get_feature_at_node(adv_path[i])
+        tree = self._get_tree_arrays()
+
+        for batch_id in trange(
+            int(np.ceil(x_adv.shape[0] / float(self.batch_size))), desc="Decision tree attack", disable=not self.verbose
+        ):
+            batch_index_1, batch_index_2 = batch_id * self.batch_size, (batch_id + 1) * self.batch_size
+            x_batch = x_adv[batch_index_1:batch_index_2]
+            rows = np.arange(x_batch.shape[0])
+
+            leaves = self.estimator.model.apply(x_batch)
+            paths, depth_leaf = tree["node_paths"][leaves], tree["depth"][leaves]
+            if y is None:
+                legitimate_class = np.argmax(self.estimator.predict(x_batch), axis=1)
+                target = None
+            else:
+                legitimate_class = None
+                target = y[batch_index_1:batch_index_2].reshape(-1)
+
+            # The decision path is searched upwards from the parent of the leaf, the sibling subtree of each ancestor
+            # is searched for a mis-classifying leaf and the search continues up to the ancestor at depth 2 or to the
+            # first ancestor above it with such a leaf, which therefore determines the adversarial path
+            ancestor_depth = np.full(x_batch.shape[0], -1)
+            adv_rank = np.full(x_batch.shape[0], -1)
+            for depth in range(min(3, paths.shape[1] - 1)):
+                ancestors = paths[:, depth]
+                is_left = paths[:, depth + 1] == tree["children_left"][ancestors]
+                subtrees = np.where(is_left, tree["children_right"][ancestors], tree["children_left"][ancestors])
+                rank = self._search_subtrees(tree, subtrees, legitimate_class, target)
+                is_found = (rank != -1) & (depth < depth_leaf)
+                ancestor_depth[is_found] = depth
+                adv_rank[is_found] = rank[is_found]
+
+            # We figured out which is the way to the target, now perturb from the parent of the adversarial leaf upwards
+            adv_paths = tree["node_paths"][tree["leaves"][adv_rank]]
+            depth_adv_leaf = tree["depth"][tree["leaves"][adv_rank]]
+            for depth in range(paths.shape[1] - 2, -1, -1):
+                is_active = (ancestor_depth != -1) & (ancestor_depth <= depth) & (depth < depth_adv_leaf)
+                nodes, go_for = adv_paths[is_active, depth], adv_paths[is_active, depth + 1]
+                threshold, feature = tree["threshold"][nodes], tree["feature"][nodes]
+                values = x_batch[rows[is_active], feature]
                 # only perturb if the feature is actually wrong
-                if x_adv[index][feature] > threshold and go_for == self.estimator.get_left_child(adv_path[i]):
-                    x_adv[index][feature] = threshold - self.offset
-                elif x_adv[index][feature] <= threshold and go_for == self.estimator.get_right_child(adv_path[i]):
-                    x_adv[index][feature] = threshold + self.offset
+                is_wrong_left = (values > threshold) & (go_for == tree["children_left"][nodes])
+                is_wrong_right = (values <= threshold) & (go_for == tree["children_right"][nodes])
+                x_batch[rows[is_active][is_wrong_left], feature[is_wrong_left]] = threshold[is_wrong_left] - self.offset
+                x_batch[rows[is_active][is_wrong_right], feature[is_wrong_right]] = (
+                    threshold[is_wrong_right] + self.offset
+                )
 
         return x_adv
 
@@ -167,5 +226,8 @@ class DecisionTreeAttack(EvasionAttack):
         if self.offset <= 0:
             raise ValueError("The offset parameter must be strictly positive.")
 
+        if not isinstance(self.batch_size, int) or self.batch_size <= 0:
+            raise ValueError("The batch size `batch_size` has to be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -23,11 +23,12 @@ This module implements the Geometric Decision-based Attack (GeoDA), a black-box
 import os
 import math
 import logging
-from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 from tqdm.auto import trange
 
+from art import config
 from art.attacks.attack import EvasionAttack
 from art.config import ART_NUMPY_DTYPE
 from art.estimators.estimator import BaseEstimator
@@ -61,6 +62,9 @@ class GeoDA(EvasionAttack):
 
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
 
+    # DCT bases shared by all instances, keyed by `(sub_dim, res)`
+    _dct_basis_cache: Dict[Tuple[int, int], np.ndarray] = {}
+
     def __init__(
         self,
         estimator: "CLASSIFIER_TYPE",
@@ -123,42 +127,42 @@ class GeoDA(EvasionAttack):
 
     @staticmethod
     def _generate_2d_dct_basis(sub_dim: int, res: int) -> np.ndarray:
-        def alpha(var_a: int, num: int):
-            """
-            Get alpha.
-            """
-            if var_a == 0:
-                return math.sqrt(1.0 / num)
-
-            return math.sqrt(2.0 / num)
-
-        def dct(i_x: int, i_y: int, i_v: int, i_u: int, num: int) -> float:
-            """
-            Get 2D DCT.
-            """
-            return (
-                alpha(i_u, num)
-                * alpha(i_v, num)
-                * math.cos(((2 * i_x + 1) * (i_u * math.pi)) / (2 * num))
-                * math.cos(((2 * i_y + 1) * (i_v * math.pi)) / (2 * num))
-            )
-
         # We can get different frequencies by setting u and v
         u_max = sub_dim
         v_max = sub_dim
+        num = max(res, v_max)
+
+        # The 2D DCT basis is separable, basis (u, v) at pixel (y, x) is the product of the 1D bases u at x and v at y
+        freq = np.arange(u_max)[:, np.newaxis]
+        alpha = np.where(freq == 0, math.sqrt(1.0 / num), math.sqrt(2.0 / num))
+        dct_1d = alpha * np.cos(((2 * np.arange(res)[np.newaxis, :] + 1) * freq * math.pi) / (2 * num))
 
-        dct_basis = []
-        for i_u in range(u_max):
-            for i_v in range(v_max):
-                basis = np.zeros((res, res))
-                for i_y in range(res):
-                    for i_x in range(res):
-                        basis[i_y, i_x] = dct(i_x, i_y, i_v, i_u, max(res, v_max))
-                dct_basis.append(basis)
-        dct_basis_array = np.mat(np.reshape(dct_basis, (v_max * u_max, res * res))).transpose()
+        dct_basis = dct_1d[:, np.newaxis, np.newaxis, :] * dct_1d[np.newaxis, :, :, np.newaxis]
+        dct_basis_array = np.reshape(dct_basis, (v_max * u_max, res * res)).transpose()
 
         return dct_basis_array
 
+    @classmethod
+    def _get_2d_dct_basis(cls, sub_dim: int, res: int) -> np.ndarray:
+        """
+        Get the 2D DCT basis, reusing the basis created by previous instances from memory or from `ART_DATA_PATH`.
+
+        :param sub_dim: Dimensionality of 2D frequency space (DCT).
+        :param res: Resolution of the square input images.
+        :return: The DCT basis of shape (res * res, sub_dim * sub_dim).
+        """
+        if (sub_dim, res) not in cls._dct_basis_cache:
+            path = os.path.join(config.ART_DATA_PATH, f"2d_dct_basis_{sub_dim}_{res}.npy")
+            if os.path.exists(path):
+                sub_basis = np.load(path).astype(ART_NUMPY_DTYPE)
+            else:
+                sub_basis = cls._generate_2d_dct_basis(sub_dim=sub_dim, res=res).astype(ART_NUMPY_DTYPE)
+                if os.access(config.ART_DATA_PATH, os.W_OK):
+                    np.save(path, sub_basis)
+            cls._dct_basis_cache[(sub_dim, res)] = sub_basis
+
+        return cls._dct_basis_cache[(sub_dim, res)]
+
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
         Generate adversarial samples.
@@ -201,12 +205,7 @@ class GeoDA(EvasionAttack):
         # Create or load DCT basis
         image_size = x.shape[2]
         logger.info("Create or load DCT basis.")
-        path = f"2d_dct_basis_{self.sub_dim}_{image_size}.npy"
-        if os.path.exists(path):
-            self.sub_basis = np.load(path).astype(ART_NUMPY_DTYPE)
-        else:
-            self.sub_basis = self._generate_2d_dct_basis(sub_dim=self.sub_dim, res=image_size).astype(ART_NUMPY_DTYPE)
-            np.save(path, self.sub_basis)
+        self.sub_basis = self._get_2d_dct_basis(sub_dim=self.sub_dim, res=image_size)
 
         for i in trange(x.shape[0], desc="GeoDA - samples", disable=not self.verbose, position=0):
             x_i = x[[i]]
@@ -327,40 +326,25 @@ class GeoDA(EvasionAttack):
         Calculate gradient towards decision boundary.
         """
         self.nb_calls += q_max
-        grad_tmp: List[np.ndarray] = []  # estimated gradients in each estimate_batch
-        z_list: List[int] = []  # sign of grad_tmp
-        outs = []
+        grad = np.zeros(x_boundary.shape[1:], dtype=ART_NUMPY_DTYPE)
+        z_sum = 0
         num_batches = math.ceil(q_max / batch_size)
         last_batch = q_max - (num_batches - 1) * batch_size
-        all_noises = []
 
         for j in range(num_batches):
-            if j == num_batches - 1:
-                current_batch = self._sub_noise(last_batch, self.sub_basis)
-                noisy_boundary = [x_boundary[0, :, :, :]] * last_batch + self.sigma * current_batch
-            else:
-                current_batch = self._sub_noise(batch_size, self.sub_basis)
-                noisy_boundary = [x_boundary[0, :, :, :]] * batch_size + self.sigma * current_batch
-
-            all_noises.append(current_batch)
-            predict_labels = np.argmax(self.estimator.predict(noisy_boundary), axis=1).astype(int)
-            outs.append(predict_labels)
+            current_batch_size = last_batch if j == num_batches - 1 else batch_size
+            current_batch = self._sub_noise(current_batch_size, self.sub_basis)
+            noisy_boundary = x_boundary + self.sigma * current_batch
 
-        all_noise = np.concatenate(all_noises, axis=0)
-        outs = np.concatenate(outs, axis=0)
-
-        for i, predict_label in enumerate(outs):
-            if predict_label == np.argmax(original_label, axis=1)[0]:
-                z_list.append(1)
-                grad_tmp.append(all_noise[i])
-            else:
-                z_list.append(-1)
-                grad_tmp.append(-all_noise[i])
+            # Accumulate the noise with a positive sign if the prediction still is the original label
+            predict_labels = np.argmax(self.estimator.predict(noisy_boundary, batch_size=batch_size), axis=1)
+            z_batch = np.where(predict_labels == np.argmax(original_label, axis=1)[0], 1, -1)
+            grad += np.tensordot(z_batch.astype(ART_NUMPY_DTYPE), current_batch, axes=1)
+            z_sum += int(np.sum(z_batch))
 
-        grad: np.ndarray = -(1 / q_max) * sum(grad_tmp)  # type: ignore
-        grad_f = grad[None, :, :, :]
+        grad_f = -(1 / q_max) * grad[None, :, :, :]
 
-        return grad_f, sum(z_list)
+        return grad_f, z_sum
 
     def _go_to_boundary(self, x: np.ndarray, y: np.ndarray, grad: np.ndarray) -> np.ndarray:
         """
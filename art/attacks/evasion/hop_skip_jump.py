@@ -58,6 +58,7 @@ class HopSkipJump(EvasionAttack):
         "init_size",
         "curr_iter",
         "batch_size",
+        "vectorized",
         "verbose",
     ]
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
@@ -72,6 +73,7 @@ class HopSkipJump(EvasionAttack):
         max_eval: int = 10000,
         init_eval: int = 100,
         init_size: int = 100,
+        vectorized: bool = False,
         verbose: bool = True,
     ) -> None:
         """
@@ -85,6 +87,9 @@ class HopSkipJump(EvasionAttack):
         :param max_eval: Maximum number of evaluations for estimating gradient.
         :param init_eval: Initial number of evaluations for estimating gradient.
         :param init_size: Maximum number of trials for initial generation of adversarial examples.
+        :param vectorized: If True, attack `batch_size` samples in lockstep and evaluate the queries of all samples
+                           with a single call of `estimator.predict` per step instead of attacking one sample at a
+                           time. Memory usage grows with `batch_size * max_eval`.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=classifier)
@@ -96,6 +101,7 @@ class HopSkipJump(EvasionAttack):
         self.init_size = init_size
         self.curr_iter = 0
         self.batch_size = batch_size
+        self.vectorized = vectorized
         self.verbose = verbose
         self._check_params()
         self.curr_iter = 0
@@ -192,32 +198,53 @@ class HopSkipJump(EvasionAttack):
         y = np.argmax(y, axis=1)
 
         # Generate the adversarial samples
-        for ind, val in enumerate(tqdm(x_adv, desc="HopSkipJump", disable=not self.verbose)):
-            self.curr_iter = start
-
-            if self.targeted:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=y[ind],  # type: ignore
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    mask=mask[ind],
+        if self.vectorized:
+            has_adv_init = kwargs.get("x_adv_init") is not None
+            has_mask = kwargs.get("mask") is not None
+            nb_batches = int(np.ceil(x_adv.shape[0] / float(self.batch_size)))
+
+            for batch_id in tqdm(range(nb_batches), desc="HopSkipJump", disable=not self.verbose):
+                batch_index_1, batch_index_2 = batch_id * self.batch_size, (batch_id + 1) * self.batch_size
+                self.curr_iter = start
+
+                x_adv[batch_index_1:batch_index_2] = self._perturb_batch(
+                    x=x_adv[batch_index_1:batch_index_2],
+                    y=y[batch_index_1:batch_index_2],
+                    y_p=preds[batch_index_1:batch_index_2],
+                    init_pred=init_preds[batch_index_1:batch_index_2] if has_adv_init else None,
+                    adv_init=x_adv_init[batch_index_1:batch_index_2] if has_adv_init else None,
+                    mask=mask[batch_index_1:batch_index_2] if has_mask else None,
                     clip_min=clip_min,
                     clip_max=clip_max,
                 )
 
-            else:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=-1,
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    mask=mask[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
+        else:
+            for ind, val in enumerate(tqdm(x_adv, desc="HopSkipJump", disable=not self.verbose)):
+                self.curr_iter = start
+
+                if self.targeted:
+                    x_adv[ind] = self._perturb(
+                        x=val,
+                        y=y[ind],  # type: ignore
+                        y_p=preds[ind],
+                        init_pred=init_preds[ind],
+                        adv_init=x_adv_init[ind],
+                        mask=mask[ind],
+                        clip_min=clip_min,
+                        clip_max=clip_max,
+                    )
+
+                else:
+                    x_adv[ind] = self._perturb(
+                        x=val,
+                        y=-1,
+                        y_p=preds[ind],
+                        init_pred=init_preds[ind],
+                        adv_init=x_adv_init[ind],
+                        mask=mask[ind],
+                        clip_min=clip_min,
+                        clip_max=clip_max,
+                    )
 
         y = to_categorical(y, self.estimator.nb_classes)  # type: ignore
 
@@ -261,10 +288,17 @@ class HopSkipJump(EvasionAttack):
         if initial_sample is None:
             return x
 
-        # If an initial adversarial example found, then go with HopSkipJump attack
-        x_adv = self._attack(initial_sample[0], x, initial_sample[1], mask, clip_min, clip_max)
+        # If an initial adversarial example found, then go with HopSkipJump attack as a batch of one example
+        x_adv = self._attack_batch(
+            initial_sample[0][None],
+            x[None],
+            np.array([initial_sample[1]]),
+            mask[None] if mask is not None else None,
+            clip_min,
+            clip_max,
+        )
 
-        return x_adv
+        return x_adv[0]
 
     def _init_sample(
         self,
@@ -318,15 +352,15 @@ class HopSkipJump(EvasionAttack):
 
                 if random_class == y:
                     # Binary search to reduce the l2 distance to the original image
-                    random_img = self._binary_search(
-                        current_sample=random_img,
-                        original_sample=x,
-                        target=y,
+                    random_img = self._binary_search_batch(
+                        current_sample=random_img[None],
+                        original_sample=x[None],
+                        target=np.array([y]),
                         norm=2,
                         clip_min=clip_min,
                         clip_max=clip_max,
                         threshold=0.001,
-                    )
+                    )[0]
                     initial_sample = random_img, random_class
 
                     logger.info("Found initial adversarial image for targeted attack.")
@@ -353,15 +387,15 @@ class HopSkipJump(EvasionAttack):
 
                 if random_class != y_p:
                     # Binary search to reduce the l2 distance to the original image
-                    random_img = self._binary_search(
-                        current_sample=random_img,
-                        original_sample=x,
-                        target=y_p,
+                    random_img = self._binary_search_batch(
+                        current_sample=random_img[None],
+                        original_sample=x[None],
+                        target=np.array([y_p]),
                         norm=2,
                         clip_min=clip_min,
                         clip_max=clip_max,
                         threshold=0.001,
-                    )
+                    )[0]
                     initial_sample = random_img, y_p
 
                     logger.info("Found initial adversarial image for untargeted attack.")
@@ -371,47 +405,183 @@ class HopSkipJump(EvasionAttack):
 
         return initial_sample
 
-    def _attack(
+    def _perturb_batch(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        mask: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Internal attack function for a batch of examples that are attacked in lockstep.
+
+        :param x: An array with a batch of original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param mask: An array with masks to be applied to the adversarial perturbations. Same shape as x. Any features
+                     for which the mask is zero will not be adversarially perturbed.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: An array of adversarial examples.
+        """
+        target = y if self.targeted else y_p
+        x_adv = x.copy()
+
+        # First, create initial adversarial samples
+        initial_samples, success = self._init_sample_batch(x, y, y_p, init_pred, adv_init, mask, clip_min, clip_max)
+
+        # If an initial adversarial example is not found, then keep the original image
+        idx = np.where(success)[0]
+        if idx.size > 0:
+            x_adv[idx] = self._attack_batch(
+                initial_samples[idx],
+                x[idx],
+                target[idx],
+                mask[idx] if mask is not None else None,
+                clip_min,
+                clip_max,
+            )
+
+        return x_adv
+
+    def _init_sample_batch(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        mask: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find initial adversarial examples for a batch of examples.
+
+        :param x: An array with a batch of original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param mask: An array with masks to be applied to the adversarial perturbations. Same shape as x. Any features
+                     for which the mask is zero will not be adversarially perturbed.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: A tuple of the initial adversarial examples and a boolean array indicating for which examples an
+                 initial adversarial example has been found.
+        """
+        nprd = np.random.RandomState()
+        target = y if self.targeted else y_p
+        initial_samples = x.astype(ART_NUMPY_DTYPE)
+        success = np.zeros(x.shape[0], dtype=bool)
+
+        # Attack already satisfied for targeted attacks
+        done = (y == y_p) if self.targeted else np.zeros(x.shape[0], dtype=bool)
+
+        # The initial images satisfied
+        if adv_init is not None and init_pred is not None:
+            satisfied = (init_pred == y) if self.targeted else (init_pred != y_p)
+            satisfied = satisfied & ~done
+            initial_samples[satisfied] = adv_init[satisfied]
+            success[satisfied] = True
+            done[satisfied] = True
+
+        # The initial images unsatisfied, draw random images for all remaining samples together
+        found = np.zeros(x.shape[0], dtype=bool)
+        for _ in range(self.init_size):
+            idx = np.where(~done)[0]
+            if idx.size == 0:
+                break
+
+            random_img = nprd.uniform(clip_min, clip_max, size=x[idx].shape).astype(x.dtype)
+
+            if mask is not None:
+                random_img = random_img * mask[idx] + x[idx] * (1 - mask[idx])
+
+            satisfied = self._adversarial_satisfactory(
+                samples=random_img, target=target[idx], clip_min=clip_min, clip_max=clip_max
+            )
+            initial_samples[idx[satisfied]] = random_img[satisfied]
+            found[idx[satisfied]] = True
+            done[idx[satisfied]] = True
+
+        if np.sum(~done) > 0:
+            logger.warning(
+                "Failed to draw a random image that is adversarial for %d samples, attack failed for these samples.",
+                np.sum(~done),
+            )
+
+        # Binary search to reduce the l2 distance to the original images
+        idx = np.where(found)[0]
+        if idx.size > 0:
+            initial_samples[idx] = self._binary_search_batch(
+                current_sample=initial_samples[idx],
+                original_sample=x[idx],
+                target=target[idx],
+                norm=2,
+                clip_min=clip_min,
+                clip_max=clip_max,
+                threshold=0.001,
+            )
+            success[idx] = True
+
+        return initial_samples, success
+
+    def _attack_batch(
         self,
         initial_sample: np.ndarray,
         original_sample: np.ndarray,
-        target: int,
+        target: np.ndarray,
         mask: Optional[np.ndarray],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Main function for the boundary attack.
+        Main function for the boundary attack on a batch of examples.
 
-        :param initial_sample: An initial adversarial example.
-        :param original_sample: The original input.
-        :param target: The target label.
-        :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be
-                     broadcastable to the shape of x. Any features for which the mask is zero will not be adversarially
-                     perturbed.
+        :param initial_sample: An array of initial adversarial examples.
+        :param original_sample: The original inputs.
+        :param target: The target labels.
+        :param mask: An array with masks to be applied to the adversarial perturbations. Same shape as x. Any features
+                     for which the mask is zero will not be adversarially perturbed.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an adversarial example.
+        :return: An array of adversarial examples.
         """
-        # Set current perturbed image to the initial image
+        # Set current perturbed images to the initial images
+        result = initial_sample.copy()
+        active = np.arange(initial_sample.shape[0])
         current_sample = initial_sample
+        shape = (-1,) + (1,) * len(self.estimator.input_shape)
 
         # Main loop to wander around the boundary
         for _ in range(self.max_iter):
+            if active.size == 0:
+                break
+
+            original = original_sample[active]
+            target_active = target[active]
+
             # First compute delta
-            delta = self._compute_delta(
+            delta = self._compute_delta_batch(
                 current_sample=current_sample,
-                original_sample=original_sample,
+                original_sample=original,
                 clip_min=clip_min,
                 clip_max=clip_max,
             )
 
             # Then run binary search
-            current_sample = self._binary_search(
+            current_sample = self._binary_search_batch(
                 current_sample=current_sample,
-                original_sample=original_sample,
+                original_sample=original,
                 norm=self.norm,
-                target=target,
+                target=target_active,
                 clip_min=clip_min,
                 clip_max=clip_max,
             )
@@ -419,172 +589,198 @@ class HopSkipJump(EvasionAttack):
             # Next compute the number of evaluations and compute the update
             num_eval = min(int(self.init_eval * np.sqrt(self.curr_iter + 1)), self.max_eval)
 
-            update = self._compute_update(
+            update = self._compute_update_batch(
                 current_sample=current_sample,
                 num_eval=num_eval,
                 delta=delta,
-                target=target,
-                mask=mask,
+                target=target_active,
+                mask=mask[active] if mask is not None else None,
                 clip_min=clip_min,
                 clip_max=clip_max,
             )
 
             # Finally run step size search by first computing epsilon
             if self.norm == 2:
-                dist = np.linalg.norm(original_sample - current_sample)
+                dist = np.linalg.norm((original - current_sample).reshape(current_sample.shape[0], -1), axis=1)
             else:
-                dist = np.max(abs(original_sample - current_sample))
+                dist = np.max(abs(original - current_sample).reshape(current_sample.shape[0], -1), axis=1)
 
             epsilon = 2.0 * dist / np.sqrt(self.curr_iter + 1)
-            success = False
-
-            while not success:
-                epsilon /= 2.0
-                potential_sample = current_sample + epsilon * update
-                success = self._adversarial_satisfactory(  # type: ignore
-                    samples=potential_sample[None],
-                    target=target,
+            potential_sample = current_sample.copy()
+            searching = np.ones(current_sample.shape[0], dtype=bool)
+
+            while searching.any():
+                idx = np.where(searching)[0]
+                epsilon[idx] /= 2.0
+                potential_sample[idx] = current_sample[idx] + epsilon[idx].reshape(shape) * update[idx]
+                success = self._adversarial_satisfactory(
+                    samples=potential_sample[idx],
+                    target=target_active[idx],
                     clip_min=clip_min,
                     clip_max=clip_max,
                 )
+                searching[idx[success]] = False
 
-            # Update current sample
+            # Update current samples
             current_sample = np.clip(potential_sample, clip_min, clip_max)
 
             # Update current iteration
             self.curr_iter += 1
 
-            # If attack failed. return original sample
-            if np.isnan(current_sample).any():  # pragma: no cover
-                logger.debug("NaN detected in sample, returning original sample.")
-                return original_sample
+            # If attack failed, return original sample and drop it from the batch
+            failed = np.isnan(current_sample.reshape(current_sample.shape[0], -1)).any(axis=1)
+            if failed.any():  # pragma: no cover
+                logger.debug("NaN detected in %d samples, returning original samples.", np.sum(failed))
+                result[active[failed]] = original[failed]
+                current_sample = current_sample[~failed]
+                active = active[~failed]
+
+        result[active] = current_sample
 
-        return current_sample
+        return result
 
-    def _binary_search(
+    def _binary_search_batch(
         self,
         current_sample: np.ndarray,
         original_sample: np.ndarray,
-        target: int,
+        target: np.ndarray,
         norm: Union[int, float, str],
         clip_min: float,
         clip_max: float,
         threshold: Optional[float] = None,
     ) -> np.ndarray:
         """
-        Binary search to approach the boundary.
+        Binary search to approach the boundary for a batch of examples.
 
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
-        :param target: The target label.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
+        :param target: The target labels.
         :param norm: Order of the norm. Possible values: "inf", np.inf or 2.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
         :param threshold: The upper threshold in binary search.
-        :return: an adversarial example.
+        :return: An array of adversarial examples.
         """
-        # First set upper and lower bounds as well as the threshold for the binary search
+        nb_samples = current_sample.shape[0]
+        shape = (-1,) + (1,) * len(self.estimator.input_shape)
+
+        # First set upper and lower bounds as well as the thresholds for the binary search
         if norm == 2:
-            (upper_bound, lower_bound) = (1, 0)
+            upper_bound = np.ones(nb_samples)
+            lower_bound = np.zeros(nb_samples)
 
             if threshold is None:
                 threshold = self.theta
 
+            thresholds = np.full(nb_samples, threshold)
+
         else:
-            (upper_bound, lower_bound) = (
-                np.max(abs(original_sample - current_sample)),
-                0,
-            )
+            upper_bound = np.max(abs(original_sample - current_sample).reshape(nb_samples, -1), axis=1)
+            lower_bound = np.zeros(nb_samples)
 
             if threshold is None:
-                threshold = np.minimum(upper_bound * self.theta, self.theta)
+                thresholds = np.minimum(upper_bound * self.theta, self.theta)
+            else:
+                thresholds = np.full(nb_samples, threshold)
+
+        # Then start the binary search, samples which have converged drop out of the batch
+        active = (upper_bound - lower_bound) > thresholds
+        while active.any():
+            idx = np.where(active)[0]
 
-        # Then start the binary search
-        while (upper_bound - lower_bound) > threshold:
-            # Interpolation point
-            alpha = (upper_bound + lower_bound) / 2.0
+            # Interpolation points
+            alpha = (upper_bound[idx] + lower_bound[idx]) / 2.0
             interpolated_sample = self._interpolate(
-                current_sample=current_sample,
-                original_sample=original_sample,
-                alpha=alpha,
+                current_sample=current_sample[idx],
+                original_sample=original_sample[idx],
+                alpha=alpha.reshape(shape),
                 norm=norm,
             )
 
             # Update upper_bound and lower_bound
             satisfied = self._adversarial_satisfactory(
-                samples=interpolated_sample[None],
-                target=target,
+                samples=interpolated_sample,
+                target=target[idx],
                 clip_min=clip_min,
                 clip_max=clip_max,
-            )[0]
-            lower_bound = np.where(satisfied == 0, alpha, lower_bound)
-            upper_bound = np.where(satisfied == 1, alpha, upper_bound)
+            )
+            lower_bound[idx] = np.where(satisfied == 0, alpha, lower_bound[idx])
+            upper_bound[idx] = np.where(satisfied == 1, alpha, upper_bound[idx])
+
+            active = (upper_bound - lower_bound) > thresholds
 
         result = self._interpolate(
             current_sample=current_sample,
             original_sample=original_sample,
-            alpha=upper_bound,
+            alpha=upper_bound.reshape(shape),
             norm=norm,
         )
 
-        return result
+        return result.astype(current_sample.dtype)
 
-    def _compute_delta(
+    def _compute_delta_batch(
         self,
         current_sample: np.ndarray,
         original_sample: np.ndarray,
         clip_min: float,
         clip_max: float,
-    ) -> float:
+    ) -> np.ndarray:
         """
-        Compute the delta parameter.
+        Compute the delta parameter for a batch of examples.
 
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: Delta value.
+        :return: Delta values.
         """
+        nb_samples = current_sample.shape[0]
+
         # Note: This is a bit different from the original paper, instead we keep those that are
         # implemented in the original source code of the authors
         if self.curr_iter == 0:
-            return 0.1 * (clip_max - clip_min)
+            return np.full(nb_samples, 0.1 * (clip_max - clip_min))
 
         if self.norm == 2:
-            dist = np.linalg.norm(original_sample - current_sample)
+            dist = np.linalg.norm((original_sample - current_sample).reshape(nb_samples, -1), axis=1)
             delta = np.sqrt(np.prod(self.estimator.input_shape)) * self.theta * dist
         else:
-            dist = np.max(abs(original_sample - current_sample))
+            dist = np.max(abs(original_sample - current_sample).reshape(nb_samples, -1), axis=1)
             delta = np.prod(self.estimator.input_shape) * self.theta * dist
 
         return delta
 
-    def _compute_update(
+    def _compute_update_batch(
         self,
         current_sample: np.ndarray,
         num_eval: int,
-        delta: float,
-        target: int,
+        delta: np.ndarray,
+        target: np.ndarray,
         mask: Optional[np.ndarray],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Compute the update in Eq.(14).
+        Compute the update in Eq.(14) for a batch of examples. The evaluations of all examples are queried with a
+        single call of `estimator.predict`.
 
-        :param current_sample: Current adversarial example.
+        :param current_sample: Current adversarial examples.
         :param num_eval: The number of evaluations for estimating gradient.
-        :param delta: The size of random perturbation.
-        :param target: The target label.
-        :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be
-                     broadcastable to the shape of x. Any features for which the mask is zero will not be adversarially
-                     perturbed.
+        :param delta: The sizes of random perturbation.
+        :param target: The target labels.
+        :param mask: An array with masks to be applied to the adversarial perturbations. Same shape as x. Any features
+                     for which the mask is zero will not be adversarially perturbed.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an updated perturbation.
+        :return: An array of updated perturbations.
         """
+        nb_samples = current_sample.shape[0]
+        input_shape = list(self.estimator.input_shape)
+        sample_axes = tuple(range(2, len(input_shape) + 2))
+        shape = [nb_samples, 1] + [1] * len(input_shape)
+
         # Generate random noise
-        rnd_noise_shape = [num_eval] + list(self.estimator.input_shape)
+        rnd_noise_shape = [nb_samples, num_eval] + input_shape
         if self.norm == 2:
             rnd_noise = np.random.randn(*rnd_noise_shape).astype(ART_NUMPY_DTYPE)
         else:
@@ -592,51 +788,48 @@ class HopSkipJump(EvasionAttack):
 
         # With mask
         if mask is not None:
-            rnd_noise = rnd_noise * mask
+            rnd_noise = rnd_noise * mask[:, None]
 
         # Normalize random noise to fit into the range of input data
-        rnd_noise = rnd_noise / np.sqrt(
-            np.sum(
-                rnd_noise ** 2,
-                axis=tuple(range(len(rnd_noise_shape)))[1:],
-                keepdims=True,
-            )
-        )
-        eval_samples = np.clip(current_sample + delta * rnd_noise, clip_min, clip_max)
-        rnd_noise = (eval_samples - current_sample) / delta
+        rnd_noise = rnd_noise / np.sqrt(np.sum(rnd_noise ** 2, axis=sample_axes, keepdims=True))
+        delta = delta.reshape(shape).astype(ART_NUMPY_DTYPE)
+        eval_samples = np.clip(current_sample[:, None] + delta * rnd_noise, clip_min, clip_max)
+        rnd_noise = (eval_samples - current_sample[:, None]) / delta
 
         # Compute gradient: This is a bit different from the original paper, instead we keep those that are
         # implemented in the original source code of the authors
         satisfied = self._adversarial_satisfactory(
-            samples=eval_samples, target=target, clip_min=clip_min, clip_max=clip_max
+            samples=eval_samples.reshape([-1] + input_shape),
+            target=np.repeat(target, num_eval),
+            clip_min=clip_min,
+            clip_max=clip_max,
         )
-        f_val = 2 * satisfied.reshape([num_eval] + [1] * len(self.estimator.input_shape)) - 1.0
+        f_val = 2 * satisfied.reshape([nb_samples, num_eval] + [1] * len(input_shape)) - 1.0
         f_val = f_val.astype(ART_NUMPY_DTYPE)
+        f_mean = np.mean(f_val, axis=1, keepdims=True)
 
-        if np.mean(f_val) == 1.0:
-            grad = np.mean(rnd_noise, axis=0)
-        elif np.mean(f_val) == -1.0:
-            grad = -np.mean(rnd_noise, axis=0)
-        else:
-            f_val -= np.mean(f_val)
-            grad = np.mean(f_val * rnd_noise, axis=0)
+        grad = np.mean((f_val - f_mean) * rnd_noise, axis=1)
+        all_satisfied = f_mean.reshape(nb_samples) == 1.0
+        none_satisfied = f_mean.reshape(nb_samples) == -1.0
+        grad[all_satisfied] = np.mean(rnd_noise[all_satisfied], axis=1)
+        grad[none_satisfied] = -np.mean(rnd_noise[none_satisfied], axis=1)
 
         # Compute update
         if self.norm == 2:
-            result = grad / np.linalg.norm(grad)
+            result = grad / np.linalg.norm(grad.reshape(nb_samples, -1), axis=1).reshape(shape[:1] + shape[2:])
         else:
             result = np.sign(grad)
 
         return result
 
     def _adversarial_satisfactory(
-        self, samples: np.ndarray, target: int, clip_min: float, clip_max: float
+        self, samples: np.ndarray, target: Union[int, np.ndarray], clip_min: float, clip_max: float
     ) -> np.ndarray:
         """
         Check whether an image is adversarial.
 
         :param samples: A batch of examples.
-        :param target: The target label.
+        :param target: The target label or an array of target labels, one per example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
         :return: An array of 0/1.
@@ -653,14 +846,17 @@ class HopSkipJump(EvasionAttack):
 
     @staticmethod
     def _interpolate(
-        current_sample: np.ndarray, original_sample: np.ndarray, alpha: float, norm: Union[int, float, str]
+        current_sample: np.ndarray,
+        original_sample: np.ndarray,
+        alpha: Union[float, np.ndarray],
+        norm: Union[int, float, str],
     ) -> np.ndarray:
         """
         Interpolate a new sample based on the original and the current samples.
 
         :param current_sample: Current adversarial example.
         :param original_sample: The original input.
-        :param alpha: The coefficient of interpolation.
+        :param alpha: The coefficient of interpolation, or an array of coefficients broadcastable to the samples.
         :param norm: Order of the norm. Possible values: "inf", np.inf or 2.
         :return: An adversarial example.
         """
@@ -691,5 +887,8 @@ class HopSkipJump(EvasionAttack):
         if not isinstance(self.init_size, int) or self.init_size <= 0:
             raise ValueError("The number of initial trials must be a positive integer.")
 
+        if not isinstance(self.vectorized, bool):
+            raise ValueError("The argument `vectorized` has to be of type bool.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
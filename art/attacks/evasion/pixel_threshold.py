@@ -70,7 +70,16 @@ class PixelThreshold(EvasionAttack):
     | Pixel and Threshold Attack Paper link: https://arxiv.org/abs/1906.06026
     """
 
-    attack_params = EvasionAttack.attack_params + ["th", "es", "max_iter", "targeted", "verbose", "verbose_es"]
+    attack_params = EvasionAttack.attack_params + [
+        "th",
+        "es",
+        "max_iter",
+        "targeted",
+        "verbose",
+        "verbose_es",
+        "batch_size",
+        "vectorized",
+    ]
     _estimator_requirements = (BaseEstimator, NeuralNetworkMixin, ClassifierMixin)
 
     def __init__(
@@ -82,6 +91,8 @@ class PixelThreshold(EvasionAttack):
         targeted: bool = False,
         verbose: bool = True,
         verbose_es: bool = False,
+        batch_size: int = 32,
+        vectorized: bool = False,
     ) -> None:
         """
         Create a :class:`.PixelThreshold` instance.
@@ -92,6 +103,10 @@ class PixelThreshold(EvasionAttack):
         :param max_iter: Sets the Maximum iterations to run the Evolutionary Strategies for optimisation.
         :param targeted: Indicates whether the attack is targeted (True) or untargeted (False).
         :param verbose: Print verbose messages of ES and show progress bars.
+        :param batch_size: Number of images attacked together if `vectorized` is True.
+        :param vectorized: If True and DE is used as Evolutionary Strategy, attack `batch_size` images in lockstep and
+                           evaluate the populations of all images with a single call of `estimator.predict` per
+                           generation instead of attacking one image at a time.
         """
         super().__init__(estimator=classifier)
 
@@ -103,6 +118,8 @@ class PixelThreshold(EvasionAttack):
         self._targeted = targeted
         self.verbose = verbose
         self.verbose_es = verbose_es
+        self.batch_size = batch_size
+        self.vectorized = vectorized
         self.rescale = False
         PixelThreshold._check_params(self)
 
@@ -131,6 +148,12 @@ class PixelThreshold(EvasionAttack):
 
         if not isinstance(self.verbose_es, bool):  # pragma: no cover
             raise ValueError("The argument `verbose` has to be of type bool.")
+
+        if not isinstance(self.batch_size, int) or self.batch_size <= 0:
+            raise ValueError("The batch size `batch_size` has to be a positive integer.")
+
+        if not isinstance(self.vectorized, bool):
+            raise ValueError("The flag `vectorized` has to be of type bool.")
         if self.estimator.clip_values is None:
             raise ValueError("This attack requires estimator clip values to be defined.")
 
@@ -188,44 +211,57 @@ class PixelThreshold(EvasionAttack):
 
         x = x.astype(ART_NUMPY_DTYPE)
 
-        adv_x_best = []
         self.adv_th = []
-        for image, target_class in tqdm(zip(x, y), desc="Pixel threshold", disable=not self.verbose):  # type: ignore
+        if self.vectorized and self.es == 1:
+            y = np.atleast_1d(y)
+            adv_x_best_array = x.copy()
+            nb_batches = int(np.ceil(x.shape[0] / float(self.batch_size)))
+
+            for batch_id in tqdm(range(nb_batches), desc="Pixel threshold", disable=not self.verbose):
+                batch_index_1, batch_index_2 = batch_id * self.batch_size, (batch_id + 1) * self.batch_size
+                adv_x_best_array[batch_index_1:batch_index_2] = self._generate_batch(
+                    x[batch_index_1:batch_index_2], y[batch_index_1:batch_index_2]
+                )
+        else:
+            adv_x_best = []
+            for image, target_class in tqdm(
+                zip(x, y), desc="Pixel threshold", disable=not self.verbose  # type: ignore
+            ):
 
-            if self.th is None:
+                if self.th is None:
 
-                min_th = -1
-                start, end = 1, 127
+                    min_th = -1
+                    start, end = 1, 127
 
-                image_result = image
+                    image_result = image
 
-                while True:  # pragma: no cover
+                    while True:  # pragma: no cover
 
-                    threshold = (start + end) // 2
-                    success, trial_image_result = self._attack(image, target_class, threshold)
+                        threshold = (start + end) // 2
+                        success, trial_image_result = self._attack(image, target_class, threshold)
 
-                    if success:
-                        image_result = trial_image_result
-                        end = threshold - 1
-                        min_th = threshold
-                    else:
-                        start = threshold + 1
+                        if success:
+                            image_result = trial_image_result
+                            end = threshold - 1
+                            min_th = threshold
+                        else:
+                            start = threshold + 1
 
-                    if end < start:
-                        break
+                        if end < start:
+                            break
 
-                self.adv_th = [min_th]
+                    self.adv_th = [min_th]
 
-            else:
+                else:
 
-                success, image_result = self._attack(image, target_class, self.th)
+                    success, image_result = self._attack(image, target_class, self.th)
 
-                if not success:
-                    image_result = image
+                    if not success:
+                        image_result = image
 
-            adv_x_best += [image_result]
+                adv_x_best += [image_result]
 
-        adv_x_best_array = np.array(adv_x_best)
+            adv_x_best_array = np.array(adv_x_best)
 
         if self.rescale:
             adv_x_best_array = self.rescale_input(adv_x_best_array)
@@ -352,6 +388,111 @@ class PixelThreshold(EvasionAttack):
 
         return False, image
 
+    def _generate_batch(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Generate adversarial samples for the images `x` with the classes `y` which are true labels for untargeted attack
+        and targeted labels for targeted attack, searching the minimum thresholds of all images in lockstep if `th` is
+        None.
+        """
+        if self.th is not None:
+            _, x_adv = self._attack_batch(x, y, np.full(x.shape[0], self.th))
+            return x_adv
+
+        x_adv = x.copy()
+        min_th = np.full(x.shape[0], -1)
+        start, end = np.ones(x.shape[0], dtype=int), np.full(x.shape[0], 127)
+        active = np.arange(x.shape[0])
+
+        while active.size > 0:
+            threshold = (start[active] + end[active]) // 2
+            success, x_trial = self._attack_batch(x[active], y[active], threshold)
+
+            x_adv[active[success]] = x_trial[success]
+            end[active[success]] = threshold[success] - 1
+            min_th[active[success]] = threshold[success]
+            start[active[~success]] = threshold[~success] + 1
+
+            active = active[end[active] >= start[active]]
+
+        self.adv_th += min_th.tolist()
+
+        return x_adv
+
+    def _attack_batch(self, x: np.ndarray, y: np.ndarray, limits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Attack the images `x` with the thresholds `limits` for the classes `y` using one DE solver per image. The
+        candidates of all unfinished images are evaluated with a single call of `estimator.predict` per generation.
+        """
+        solvers = []
+        for image, limit in zip(x, limits):
+            bounds, _ = self._get_bounds(image, int(limit))
+            solvers.append(
+                DifferentialEvolutionSolver(
+                    None,
+                    bounds,
+                    maxiter=self.max_iter,
+                    popsize=max(1, 400 // len(bounds)),
+                    recombination=1,
+                    atol=-1,
+                    polish=False,
+                )
+            )
+
+        success = np.zeros(x.shape[0], dtype=bool)
+        active = np.arange(x.shape[0])
+
+        # The first round evaluates the initial populations, every further round one generation of trial vectors.
+        for _ in range(self.max_iter + 1):
+            parameters = [solvers[i].ask() for i in active]
+            energies, candidates_success = self._evaluate_batch(x[active], y[active], parameters)
+
+            converged = np.zeros(active.size, dtype=bool)
+            for j, i in enumerate(active):
+                best = solvers[i].tell(energies[j])
+                if best is not None:
+                    success[i] = candidates_success[j][best]
+
+                population_energies = solvers[i].population_energies
+                converged[j] = np.std(population_energies) <= solvers[i].atol + solvers[i].tol * np.abs(
+                    np.mean(population_energies)
+                )
+
+            active = active[~success[active] & ~converged]
+            if active.size == 0:
+                break
+
+        x_adv = x.copy()
+        for i in np.where(success)[0]:
+            x_adv[i] = self._perturb_image(solvers[i].x, x[i])[0]
+
+        return success, x_adv
+
+    def _evaluate_batch(
+        self, x: np.ndarray, y: np.ndarray, parameters: List[np.ndarray]
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Compute the energies and the attack success of the candidate perturbations `parameters` of each image in `x`
+        with a single call of `estimator.predict`.
+        """
+        adv = np.concatenate([self._perturb_image(param, image) for param, image in zip(parameters, x)])
+
+        if self.rescale:
+            adv = self.rescale_input(adv)
+
+        predictions = self.estimator.predict(adv)
+        nb_candidates = [len(param) for param in parameters]
+        target_class = np.repeat(y, nb_candidates)
+
+        energies = predictions[np.arange(len(adv)), target_class]
+        if self.targeted:
+            energies = 1 - energies
+            success = np.argmax(predictions, axis=1) == target_class
+        else:
+            success = np.argmax(predictions, axis=1) != target_class
+
+        split = np.cumsum(nb_candidates)[:-1]
+        return np.split(energies, split), np.split(success, split)
+
 
 class PixelAttack(PixelThreshold):
     """
@@ -370,6 +511,8 @@ class PixelAttack(PixelThreshold):
         max_iter: int = 100,
         targeted: bool = False,
         verbose: bool = False,
+        batch_size: int = 32,
+        vectorized: bool = False,
     ) -> None:
         """
         Create a :class:`.PixelAttack` instance.
@@ -380,8 +523,12 @@ class PixelAttack(PixelThreshold):
         :param max_iter: Sets the Maximum iterations to run the Evolutionary Strategies for optimisation.
         :param targeted: Indicates whether the attack is targeted (True) or untargeted (False).
         :param verbose: Indicates whether to print verbose messages of ES used.
+        :param batch_size: Number of images attacked together if `vectorized` is True.
+        :param vectorized: If True and DE is used as Evolutionary Strategy, attack `batch_size` images in lockstep and
+                           evaluate the populations of all images with a single call of `estimator.predict` per
+                           generation instead of attacking one image at a time.
         """
-        super().__init__(classifier, th, es, max_iter, targeted, verbose)
+        super().__init__(classifier, th, es, max_iter, targeted, verbose, batch_size=batch_size, vectorized=vectorized)
         self.type_attack = 0
 
     def _perturb_image(self, x: np.ndarray, img: np.ndarray) -> np.ndarray:
@@ -391,14 +538,14 @@ class PixelAttack(PixelThreshold):
         if x.ndim < 2:
             x = np.array([x])
         imgs = np.tile(img, [len(x)] + [1] * (x.ndim + 1))
-        x = x.astype(int)
-        for adv, image in zip(x, imgs):
-            for pixel in np.split(adv, len(adv) // (2 + self.img_channels)):
-                x_pos, y_pos, *rgb = pixel
-                if not self.estimator.channels_first:
-                    image[x_pos % self.img_rows, y_pos % self.img_cols] = rgb
-                else:
-                    image[:, x_pos % self.img_rows, y_pos % self.img_cols] = rgb
+        pixels = x.astype(int).reshape((len(x), -1, 2 + self.img_channels))
+        index = np.arange(len(x))[:, np.newaxis]
+        x_pos = pixels[:, :, 0] % self.img_rows
+        y_pos = pixels[:, :, 1] % self.img_cols
+        if not self.estimator.channels_first:
+            imgs[index, x_pos, y_pos] = pixels[:, :, 2:]
+        else:
+            imgs[index, :, x_pos, y_pos] = pixels[:, :, 2:]
         return imgs
 
     def _get_bounds(self, img: np.ndarray, limit) -> Tuple[List[list], list]:
@@ -451,6 +598,8 @@ class ThresholdAttack(PixelThreshold):
         max_iter: int = 100,
         targeted: bool = False,
         verbose: bool = False,
+        batch_size: int = 32,
+        vectorized: bool = False,
     ) -> None:
         """
         Create a :class:`.PixelThreshold` instance.
@@ -461,8 +610,12 @@ class ThresholdAttack(PixelThreshold):
         :param max_iter: Sets the Maximum iterations to run the Evolutionary Strategies for optimisation.
         :param targeted: Indicates whether the attack is targeted (True) or untargeted (False).
         :param verbose: Indicates whether to print verbose messages of ES used.
+        :param batch_size: Number of images attacked together if `vectorized` is True.
+        :param vectorized: If True and DE is used as Evolutionary Strategy, attack `batch_size` images in lockstep and
+                           evaluate the populations of all images with a single call of `estimator.predict` per
+                           generation instead of attacking one image at a time.
         """
-        super().__init__(classifier, th, es, max_iter, targeted, verbose)
+        super().__init__(classifier, th, es, max_iter, targeted, verbose, batch_size=batch_size, vectorized=vectorized)
         self.type_attack = 1
 
     def _perturb_image(self, x: np.ndarray, img: np.ndarray) -> np.ndarray:
@@ -471,18 +624,7 @@ class ThresholdAttack(PixelThreshold):
         """
         if x.ndim < 2:
             x = x[None, ...]
-        imgs = np.tile(img, [len(x)] + [1] * (x.ndim + 1))
-        x = x.astype(int)
-        for adv, image in zip(x, imgs):
-            for count, (i, j, k) in enumerate(
-                product(
-                    range(image.shape[-3]),
-                    range(image.shape[-2]),
-                    range(image.shape[-1]),
-                )
-            ):
-                image[i, j, k] = adv[count]
-        return imgs
+        return x.astype(int).reshape((len(x),) + img.shape[-3:]).astype(img.dtype)
 
 
 class CMAEarlyStoppingException(Exception):
@@ -1061,6 +1203,7 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         self.population_shape = (self.num_population_members, self.parameter_count)
 
         self._nfev = 0
+        self._trials = None
         if isinstance(init, string_types):
             if init == "latinhypercube":
                 self.init_population_lhs()
@@ -1275,34 +1418,12 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         ##############
         # CHANGES: self.func operates on the entire parameters array
         ##############
-        itersize = max(0, min(len(self.population), self.maxfun - self._nfev + 1))
-        candidates = self.population[:itersize]
-        parameters = np.array([self._scale_parameters(c) for c in candidates])  # TODO: can be vectorized
-        energies = self.func(parameters, *self.args)
-        self.population_energies = energies
-        self._nfev += itersize
-
-        # for index, candidate in enumerate(self.population):
-        #     if self._nfev > self.maxfun:
-        #         break
-
-        #     parameters = self._scale_parameters(candidate)
-        #     self.population_energies[index] = self.func(parameters,
-        #                                                 *self.args)
-        #     self._nfev += 1
+        parameters = self.ask()
+        self.tell(self.func(parameters, *self.args))
 
         ##############
         ##############
 
-        minval = np.argmin(self.population_energies)
-
-        # put the lowest energy into the best solution position.
-        lowest_energy = self.population_energies[minval]
-        self.population_energies[minval] = self.population_energies[0]
-        self.population_energies[0] = lowest_energy
-
-        self.population[[0, minval], :] = self.population[[minval, 0], :]
-
     def __iter__(self):
         return self
 
@@ -1321,62 +1442,13 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         if np.all(np.isinf(self.population_energies)):
             self._calculate_population_energies()
 
-        if self.dither is not None:
-            self.scale = self.random_number_generator.rand() * (self.dither[1] - self.dither[0]) + self.dither[0]
-
         ##############
-        # CHANGES: self.func operates on the entire parameters array
+        # CHANGES: self.func operates on the entire parameters array and the
+        # trial vectors of all candidates are created at the same time
         ##############
 
-        itersize = max(0, min(self.num_population_members, self.maxfun - self._nfev + 1))
-        trials = np.array([self._mutate(c) for c in range(itersize)])  # TODO:can be vectorized
-        for trial in trials:
-            self._ensure_constraint(trial)
-        parameters = np.array([self._scale_parameters(trial) for trial in trials])
-        energies = self.func(parameters, *self.args)
-        self._nfev += itersize
-
-        for candidate, (energy, trial) in enumerate(zip(energies, trials)):
-            # if the energy of the trial candidate is lower than the
-            # original population member then replace it
-            if energy < self.population_energies[candidate]:
-                self.population[candidate] = trial
-                self.population_energies[candidate] = energy
-
-                # if the trial candidate also has a lower energy than the
-                # best solution then replace that as well
-                if energy < self.population_energies[0]:
-                    self.population_energies[0] = energy
-                    self.population[0] = trial
-
-        # for candidate in range(self.num_population_members):
-        #     if self._nfev > self.maxfun:
-        #         raise StopIteration
-
-        #     # create a trial solution
-        #     trial = self._mutate(candidate)
-
-        #     # ensuring that it's in the range [0, 1)
-        #     self._ensure_constraint(trial)
-
-        #     # scale from [0, 1) to the actual parameter value
-        #     parameters = self._scale_parameters(trial)
-
-        #     # determine the energy of the objective function
-        #     energy = self.func(parameters, *self.args)
-        #     self._nfev += 1
-
-        #     # if the energy of the trial candidate is lower than the
-        #     # original population member then replace it
-        #     if energy < self.population_energies[candidate]:
-        #         self.population[candidate] = trial
-        #         self.population_energies[candidate] = energy
-
-        #         # if the trial candidate also has a lower energy than the
-        #         # best solution then replace that as well
-        #         if energy < self.population_energies[0]:
-        #             self.population_energies[0] = energy
-        #             self.population[0] = trial
+        parameters = self.ask()
+        self.tell(self.func(parameters, *self.args))
 
         ##############
         ##############
@@ -1396,6 +1468,83 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         # next() is required for compatibility with Python2.7.
         return self.__next__()
 
+    def ask(self):
+        """
+        Propose the next candidates to evaluate. Together with `tell` this
+        allows to evaluate the candidates of several solvers in one call of
+        the objective function.
+        Returns
+        -------
+        parameters : ndarray
+            The parameters of the candidates, one row per candidate. If the
+            population energies have not been calculated yet these are the
+            members of the population, otherwise the trial vectors of the
+            next generation.
+        """
+        if np.all(np.isinf(self.population_energies)):
+            itersize = max(0, min(len(self.population), self.maxfun - self._nfev + 1))
+            self._trials = None
+            return self._scale_parameters(self.population[:itersize])
+
+        if self.dither is not None:
+            self.scale = self.random_number_generator.rand() * (self.dither[1] - self.dither[0]) + self.dither[0]
+
+        itersize = max(0, min(self.num_population_members, self.maxfun - self._nfev + 1))
+        self._trials = self._mutate(np.arange(itersize))
+        self._ensure_constraint(self._trials)
+        return self._scale_parameters(self._trials)
+
+    def tell(self, energies):
+        """
+        Update the population with the energies of the candidates returned by
+        the last call of `ask`.
+        Parameters
+        ----------
+        energies : ndarray
+            The values of the objective function for the proposed candidates.
+        Returns
+        -------
+        index : int or None
+            The index of the candidate, in the order returned by `ask`, that
+            became the best solution or None if the best solution did not
+            change.
+        """
+        energies = np.asarray(energies)
+        self._nfev += len(energies)
+
+        if self._trials is None:
+            self.population_energies = energies
+
+            minval = int(np.argmin(self.population_energies))
+
+            # put the lowest energy into the best solution position.
+            lowest_energy = self.population_energies[minval]
+            self.population_energies[minval] = self.population_energies[0]
+            self.population_energies[0] = lowest_energy
+
+            self.population[[0, minval], :] = self.population[[minval, 0], :]
+            return minval
+
+        trials, self._trials = self._trials, None
+        best_energy = self.population_energies[0]
+
+        # if the energy of the trial candidate is lower than the
+        # original population member then replace it
+        candidates = np.where(energies < self.population_energies[: len(energies)])[0]
+        self.population[candidates] = trials[candidates]
+        self.population_energies[candidates] = energies[candidates]
+
+        # if the lowest trial energy is also lower than the energy of the
+        # best solution then replace that as well
+        if len(energies) > 0:
+            minval = int(np.argmin(energies))
+            if energies[minval] < best_energy:
+                self.population_energies[0] = energies[minval]
+                self.population[0] = trials[minval]
+                return minval
+
+        return None
+
     def _scale_parameters(self, trial):
         """
         scale from a number between 0 and 1 to parameters.
@@ -1412,63 +1561,69 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         """
         make sure the parameters lie between the limits
         """
-        for index in np.where((trial < 0) | (trial > 1))[0]:
-            trial[index] = self.random_number_generator.rand()
+        outside = (trial < 0) | (trial > 1)
+        trial[outside] = self.random_number_generator.rand(np.count_nonzero(outside))
 
-    def _mutate(self, candidate):  # pylint: disable=R1710
+    def _mutate(self, candidates):  # pylint: disable=R1710
         """
-        create a trial vector based on a mutation strategy
+        create the trial vectors of the `candidates` based on a mutation strategy
         """
-        trial = np.copy(self.population[candidate])
+        candidates = np.asarray(candidates)
+        trials = np.copy(self.population[candidates])
 
         rng = self.random_number_generator
 
-        fill_point = rng.randint(0, self.parameter_count)
+        fill_points = rng.randint(0, self.parameter_count, size=len(candidates))
+        samples = self._select_samples(candidates, 5)
 
         if self.strategy in ["currenttobest1exp", "currenttobest1bin"]:
-            bprime = self.mutation_func(candidate, self._select_samples(candidate, 5))
+            bprime = self.mutation_func(candidates, samples)
         else:
-            bprime = self.mutation_func(self._select_samples(candidate, 5))
+            bprime = self.mutation_func(samples)
 
         if self.strategy in self._binomial:
-            crossovers = rng.rand(self.parameter_count)
+            crossovers = rng.rand(len(candidates), self.parameter_count)
             crossovers = crossovers < self.cross_over_probability
             # the last one is always from the bprime vector for binomial
             # If you fill in modulo with a loop you have to set the last one to
             # true. If you don't use a loop then you can have any random entry
             # be True.
-            crossovers[fill_point] = True
-            trial = np.where(crossovers, bprime, trial)
-            return trial
+            crossovers[np.arange(len(candidates)), fill_points] = True
+            trials = np.where(crossovers, bprime, trials)
+            return trials
 
         if self.strategy in self._exponential:
-            i = 0
-            while i < self.parameter_count and rng.rand() < self.cross_over_probability:
-                trial[fill_point] = bprime[fill_point]
-                fill_point = (fill_point + 1) % self.parameter_count
-                i += 1
-
-            return trial
+            # copy a run of consecutive parameters, starting at the fill point
+            # and wrapping around, whose length is the number of successive
+            # random draws below the crossover probability
+            crossovers = rng.rand(len(candidates), self.parameter_count)
+            crossovers = crossovers < self.cross_over_probability
+            lengths = np.cumprod(crossovers, axis=1).sum(axis=1)
+            offsets = (
+                np.arange(self.parameter_count)[np.newaxis, :] - fill_points[:, np.newaxis]
+            ) % self.parameter_count
+            trials = np.where(offsets < lengths[:, np.newaxis], bprime, trials)
+            return trials
 
     def _best1(self, samples):
         """
         best1bin, best1exp
         """
-        r_0, r_1 = samples[:2]
+        r_0, r_1 = samples.T[:2]
         return self.population[0] + self.scale * (self.population[r_0] - self.population[r_1])
 
     def _rand1(self, samples):
         """
         rand1bin, rand1exp
         """
-        r_0, r_1, r_2 = samples[:3]
+        r_0, r_1, r_2 = samples.T[:3]
         return self.population[r_0] + self.scale * (self.population[r_1] - self.population[r_2])
 
     def _randtobest1(self, samples):
         """
         randtobest1bin, randtobest1exp
         """
-        r_0, r_1, r_2 = samples[:3]
+        r_0, r_1, r_2 = samples.T[:3]
         bprime = np.copy(self.population[r_0])
         bprime += self.scale * (self.population[0] - bprime)
         bprime += self.scale * (self.population[r_1] - self.population[r_2])
@@ -1478,7 +1633,7 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         """
         currenttobest1bin, currenttobest1exp
         """
-        r_0, r_1 = samples[:2]
+        r_0, r_1 = samples.T[:2]
         bprime = self.population[candidate] + self.scale * (
             self.population[0] - self.population[candidate] + self.population[r_0] - self.population[r_1]
         )
@@ -1488,7 +1643,7 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         """
         best2bin, best2exp
         """
-        r_0, r_1, r_2, r_3 = samples[:4]
+        r_0, r_1, r_2, r_3 = samples.T[:4]
         bprime = self.population[0] + self.scale * (
             self.population[r_0] + self.population[r_1] - self.population[r_2] - self.population[r_3]
         )
@@ -1499,20 +1654,31 @@ class DifferentialEvolutionSolver:  # pragma: no cover
         """
         rand2bin, rand2exp
         """
-        r_0, r_1, r_2, r_3, r_4 = samples
+        r_0, r_1, r_2, r_3, r_4 = samples.T
         bprime = self.population[r_0] + self.scale * (
             self.population[r_1] + self.population[r_2] - self.population[r_3] - self.population[r_4]
         )
 
         return bprime
 
-    def _select_samples(self, candidate, number_samples):
+    def _select_samples(self, candidates, number_samples):
         """
         obtain random integers from range(self.num_population_members),
-        without replacement.  You can't have the original candidate either.
+        without replacement, for each of the `candidates`.  You can't have
+        the original candidate either.
         """
-        idxs = list(range(self.num_population_members))
-        idxs.remove(candidate)
-        self.random_number_generator.shuffle(idxs)
-        idxs = idxs[:number_samples]
-        return idxs
+        rng = self.random_number_generator
+        number_samples = min(number_samples, self.num_population_members - 1)
+        samples = np.empty((len(candidates), number_samples), dtype=int)
+
+        # draw the j-th sample uniformly among the indices that have not been
+        # drawn yet by mapping a random rank onto the remaining indices
+        for j in range(number_samples):
+            rank = rng.randint(0, self.num_population_members - 1 - j, size=len(candidates))
+            for previous in np.sort(samples[:, :j], axis=1).T:
+                rank += rank >= previous
+            samples[:, j] = rank
+
+        # skip the original candidate
+        samples += samples >= np.asarray(candidates)[:, np.newaxis]
+        return samples
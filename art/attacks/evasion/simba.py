@@ -23,7 +23,7 @@ This module implements the black-box attack `SimBA`.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 from scipy.fftpack import idct
@@ -86,7 +86,8 @@ class SimBA(EvasionAttack):
         :param freq_dim: dimensionality of 2D frequency space (DCT).
         :param stride: stride for block order (DCT).
         :param targeted: perform targeted attack
-        :param batch_size: Batch size (but, batch process unavailable in this implementation)
+        :param batch_size: Number of samples attacked together. The left and right candidates of all samples of a batch
+                           are evaluated with a single call of `predict` per iteration.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=classifier)
@@ -102,6 +103,8 @@ class SimBA(EvasionAttack):
         self.verbose = verbose
         self._check_params()
 
+        self._cache: Dict[tuple, np.ndarray] = {}
+
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
         Generate adversarial samples and return them in an array.
@@ -145,185 +148,166 @@ class SimBA(EvasionAttack):
         else:
             y_i = np.argmax(y, axis=1)
 
-        for i_sample in trange(x.shape[0], desc="SimBA - sample", disable=not self.verbose):
+        nb_batches = int(np.ceil(x.shape[0] / float(self.batch_size)))
+        for batch_id in trange(nb_batches, desc="SimBA - sample", disable=not self.verbose):
+            batch_index_1, batch_index_2 = batch_id * self.batch_size, (batch_id + 1) * self.batch_size
+            x_adv[batch_index_1:batch_index_2] = self._generate_batch(
+                x[batch_index_1:batch_index_2],
+                y_i[batch_index_1:batch_index_2],
+                y_prob_pred[batch_index_1:batch_index_2],
+            )
+
+        return x_adv
+
+    def _generate_batch(self, x: np.ndarray, desired_label: np.ndarray, y_prob_pred: np.ndarray) -> np.ndarray:
+        """
+        Attack a batch of samples in lockstep. In every iteration the left and right candidates of all samples that are
+        not yet adversarial are evaluated with a single call of `predict`.
 
-            desired_label = y_i[i_sample]
+        :param x: A batch of original inputs.
+        :param desired_label: The true labels for untargeted and the target labels for targeted attacks.
+        :param y_prob_pred: The predicted probabilities of the original inputs.
+        :return: A batch of adversarial examples.
+        """
+        x = x.copy()
+        nb_samples = x.shape[0]
 
-            current_label = np.argmax(y_prob_pred, axis=1)[i_sample]
-            last_prob = y_prob_pred[i_sample].reshape(-1)[desired_label]
+        current_label = np.argmax(y_prob_pred, axis=1)
+        last_prob = y_prob_pred[np.arange(nb_samples), desired_label]
 
-            if self.estimator.channels_first:
-                nb_channels = x.shape[1]
+        if self.estimator.channels_first:
+            nb_channels = x.shape[1]
+        else:
+            nb_channels = x.shape[3]
+
+        indices = np.stack([self._get_indices(x.shape[1:], nb_channels) for _ in range(nb_samples)])
+
+        clip_min = -np.inf
+        clip_max = np.inf
+        if self.estimator.clip_values is not None:
+            clip_min, clip_max = self.estimator.clip_values
+
+        if self.targeted:
+            term_flag = desired_label == current_label
+        else:
+            term_flag = desired_label != current_label
+
+        nb_iter = 0
+        while not term_flag.all() and nb_iter < self.max_iter:
+            active = np.where(~term_flag)[0]
+            diff = self._get_perturbation(indices[active, nb_iter], x.shape[1:])
+
+            # Evaluate the left and right candidates of all active samples at once
+            candidates = np.concatenate(
+                [np.clip(x[active] - diff, clip_min, clip_max), np.clip(x[active] + diff, clip_min, clip_max)]
+            )
+            preds = self.estimator.predict(candidates, batch_size=candidates.shape[0])
+            left_preds, right_preds = preds[: active.size], preds[active.size :]
+            left_prob = left_preds[np.arange(active.size), desired_label[active]]
+            right_prob = right_preds[np.arange(active.size), desired_label[active]]
+
+            if self.targeted:
+                use_left = (left_prob > last_prob[active]) & (left_prob > right_prob)
+                use_right = ~use_left & (right_prob > last_prob[active])
             else:
-                nb_channels = x.shape[3]
-
-            n_dims = np.prod(x[[0]].shape)
-
-            if self.attack == "px":
-                if self.order == "diag":
-                    indices = self.diagonal_order(x.shape[2], nb_channels)[: self.max_iter]
-                elif self.order == "random":
-                    indices = np.random.permutation(n_dims)[: self.max_iter]
-                indices_size = len(indices)
-                while indices_size < self.max_iter:
-                    if self.order == "diag":
-                        tmp_indices = self.diagonal_order(x.shape[2], nb_channels)
-                    elif self.order == "random":
-                        tmp_indices = np.random.permutation(n_dims)
-                    indices = np.hstack((indices, tmp_indices))[: self.max_iter]
-                    indices_size = len(indices)
-            elif self.attack == "dct":
-                indices = self._block_order(x.shape[2], nb_channels, initial_size=self.freq_dim, stride=self.stride)[
-                    : self.max_iter
-                ]
-                indices_size = len(indices)
-                while indices_size < self.max_iter:
-                    tmp_indices = self._block_order(
-                        x.shape[2], nb_channels, initial_size=self.freq_dim, stride=self.stride
-                    )
-                    indices = np.hstack((indices, tmp_indices))[: self.max_iter]
-                    indices_size = len(indices)
-
-                def trans(var_z):
-                    return self._block_idct(var_z, block_size=x.shape[2])
-
-            clip_min = -np.inf
-            clip_max = np.inf
-            if self.estimator.clip_values is not None:
-                clip_min, clip_max = self.estimator.clip_values
-
-            term_flag = 1
+                use_left = (left_prob < last_prob[active]) & (left_prob < right_prob)
+                use_right = ~use_left & (right_prob < last_prob[active])
+
+            for use, offset, prob, preds_side in [
+                (use_left, 0, left_prob, left_preds),
+                (use_right, active.size, right_prob, right_preds),
+            ]:
+                x[active[use]] = candidates[offset + np.where(use)[0]]
+                last_prob[active[use]] = prob[use]
+                current_label[active[use]] = np.argmax(preds_side[use], axis=1)
+
             if self.targeted:
-                if desired_label != current_label:
-                    term_flag = 0
+                term_flag[active] = desired_label[active] == current_label[active]
             else:
-                if desired_label == current_label:
-                    term_flag = 0
-
-            nb_iter = 0
-            while term_flag == 0 and nb_iter < self.max_iter:
-                diff = np.zeros(n_dims).astype(ART_NUMPY_DTYPE)
-                diff[indices[nb_iter]] = self.epsilon
-
-                if self.attack == "dct":
-                    left_preds = self.estimator.predict(
-                        np.clip(x[[i_sample]] - trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max),
-                        batch_size=self.batch_size,
-                    )
-                elif self.attack == "px":
-                    left_preds = self.estimator.predict(
-                        np.clip(x[[i_sample]] - diff.reshape(x[[i_sample]].shape), clip_min, clip_max),
-                        batch_size=self.batch_size,
-                    )
-                left_prob = left_preds.reshape(-1)[desired_label]
-
-                if self.attack == "dct":
-                    right_preds = self.estimator.predict(
-                        np.clip(x[[i_sample]] + trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max),
-                        batch_size=self.batch_size,
-                    )
-                elif self.attack == "px":
-                    right_preds = self.estimator.predict(
-                        np.clip(x[[i_sample]] + diff.reshape(x[[i_sample]].shape), clip_min, clip_max),
-                        batch_size=self.batch_size,
-                    )
-                right_prob = right_preds.reshape(-1)[desired_label]
-
-                # Use (2 * int(self.targeted) - 1) to shorten code?
-                if self.targeted:
-                    if left_prob > last_prob:
-                        if left_prob > right_prob:
-                            if self.attack == "dct":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] - trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max
-                                )
-                            elif self.attack == "px":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] - diff.reshape(x[[i_sample]].shape), clip_min, clip_max
-                                )
-                            last_prob = left_prob
-                            current_label = np.argmax(left_preds, axis=1)[0]
-                        else:
-                            if self.attack == "dct":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max
-                                )
-                            elif self.attack == "px":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + diff.reshape(x[[i_sample]].shape), clip_min, clip_max
-                                )
-                            last_prob = right_prob
-                            current_label = np.argmax(right_preds, axis=1)[0]
-                    else:
-                        if right_prob > last_prob:
-                            if self.attack == "dct":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max
-                                )
-                            elif self.attack == "px":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + diff.reshape(x[[i_sample]].shape), clip_min, clip_max
-                                )
-                            last_prob = right_prob
-                            current_label = np.argmax(right_preds, axis=1)[0]
-                else:
-                    if left_prob < last_prob:
-                        if left_prob < right_prob:
-                            if self.attack == "dct":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] - trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max
-                                )
-                            elif self.attack == "px":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] - diff.reshape(x[[i_sample]].shape), clip_min, clip_max
-                                )
-                            last_prob = left_prob
-                            current_label = np.argmax(left_preds, axis=1)[0]
-                        else:
-                            if self.attack == "dct":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max
-                                )
-                            elif self.attack == "px":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + diff.reshape(x[[i_sample]].shape), clip_min, clip_max
-                                )
-                            last_prob = right_prob
-                            current_label = np.argmax(right_preds, axis=1)[0]
-                    else:
-                        if right_prob < last_prob:
-                            if self.attack == "dct":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + trans(diff.reshape(x[[i_sample]].shape)), clip_min, clip_max
-                                )
-                            elif self.attack == "px":
-                                x[[i_sample]] = np.clip(
-                                    x[[i_sample]] + diff.reshape(x[[i_sample]].shape), clip_min, clip_max
-                                )
-                            last_prob = right_prob
-                            current_label = np.argmax(right_preds, axis=1)[0]
-
-                if self.targeted:
-                    if desired_label == current_label:
-                        term_flag = 1
-                else:
-                    if desired_label != current_label:
-                        term_flag = 1
-
-                nb_iter = nb_iter + 1
-
-            if nb_iter < self.max_iter:
-                logger.info(
-                    "SimBA (%s) %s attack succeed", self.attack, ["non-targeted", "targeted"][int(self.targeted)]
-                )
+                term_flag[active] = desired_label[active] != current_label[active]
+
+            nb_iter = nb_iter + 1
+
+        for success in term_flag:
+            logger.info(
+                "SimBA (%s) %s attack %s",
+                self.attack,
+                ["non-targeted", "targeted"][int(self.targeted)],
+                "succeed" if success else "failed",
+            )
+
+        return x
+
+    def _get_indices(self, shape: Tuple[int, ...], nb_channels: int) -> np.ndarray:
+        """
+        Draw the order in which the coordinates of one sample are attacked, repeating orders until `max_iter` indices
+        are available.
+
+        :param shape: Shape of a single sample.
+        :param nb_channels: The number of channels.
+        :return: An array holding `max_iter` flat indices.
+        """
+        n_dims = int(np.prod(shape))
+        orders = []
+        nb_indices = 0
+        while nb_indices < self.max_iter:
+            if self.attack == "dct":
+                order = self._block_order(shape[1], nb_channels, initial_size=self.freq_dim, stride=self.stride)
+            elif self.order == "diag":
+                order = self.diagonal_order(shape[1], nb_channels)
             else:
-                logger.info(
-                    "SimBA (%s) %s attack failed", self.attack, ["non-targeted", "targeted"][int(self.targeted)]
-                )
+                order = np.random.permutation(n_dims)
+            orders.append(order)
+            nb_indices += len(order)
 
-            x_adv[i_sample] = x[i_sample]
+        return np.hstack(orders)[: self.max_iter]
 
-        return x_adv
+    def _get_perturbation(self, indices: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Create the perturbations of step size `epsilon` along the flat coordinates `indices`, one per sample. For DCT
+        attacks the inverse DCT of the single perturbed frequency is the outer product of two columns of the inverse
+        DCT matrix, which avoids transforming the full image for every query.
+
+        :param indices: Flat index of the perturbed coordinate of each sample.
+        :param shape: Shape of a single sample.
+        :return: An array holding the perturbations.
+        """
+        if self.attack == "px":
+            diff = np.zeros((indices.size, int(np.prod(shape))), dtype=ART_NUMPY_DTYPE)
+            diff[np.arange(indices.size), indices] = self.epsilon
+            return diff.reshape((indices.size,) + tuple(shape))
+
+        if self.estimator.channels_first:
+            channel, row, col = np.unravel_index(indices, shape)
+            nb_channels, nb_rows, nb_cols = shape
+        else:
+            row, col, channel = np.unravel_index(indices, shape)
+            nb_rows, nb_cols, nb_channels = shape
+
+        # The whole image is transformed as a single block of size `shape[1]`
+        basis = self._get_idct_basis(shape[1])
+        diff = np.zeros((indices.size, nb_channels, nb_rows, nb_cols), dtype=ART_NUMPY_DTYPE)
+        diff[np.arange(indices.size), channel] = (
+            self.epsilon * basis[:, row].T[:, :, np.newaxis] * basis[:, col].T[:, np.newaxis, :]
+        )
+
+        if self.estimator.channels_first:
+            return diff
+
+        return diff.transpose((0, 2, 3, 1))
+
+    def _get_idct_basis(self, size: int) -> np.ndarray:
+        """
+        Return the orthonormal inverse DCT matrix of size `size` whose columns are the inverse DCT of the unit vectors.
+        The matrix is computed once per size.
+
+        :param size: The size of the transform.
+        :return: An array of shape `(size, size)`.
+        """
+        key = ("idct", size)
+        if key not in self._cache:
+            self._cache[key] = idct(np.eye(size), axis=0, norm="ortho")
+        return self._cache[key]
 
     def _check_params(self) -> None:
 
@@ -333,8 +317,8 @@ class SimBA(EvasionAttack):
         if self.epsilon < 0:
             raise ValueError("The overshoot parameter must not be negative.")
 
-        if self.batch_size != 1:
-            raise ValueError("The batch size `batch_size` has to be 1 in this implementation.")
+        if not isinstance(self.batch_size, int) or self.batch_size <= 0:
+            raise ValueError("The batch size `batch_size` has to be a positive integer.")
 
         if not isinstance(self.stride, int) or self.stride <= 0:
             raise ValueError("The `stride` value must be a positive integer.")
@@ -371,58 +355,19 @@ class SimBA(EvasionAttack):
 
         :return order: An array holding the block order of DCT attacks.
         """
-        order = np.zeros((channels, img_size, img_size)).astype(ART_NUMPY_DTYPE)
-        total_elems = channels * initial_size * initial_size
-        perm = np.random.permutation(total_elems)
-        order[:, :initial_size, :initial_size] = perm.reshape((channels, initial_size, initial_size))
-        for i in range(initial_size, img_size, stride):
-            num_elems = channels * (2 * stride * i + stride * stride)
-            perm = np.random.permutation(num_elems) + total_elems
-            num_first = channels * stride * (stride + i)
-            order[:, : (i + stride), i : (i + stride)] = perm[:num_first].reshape((channels, -1, stride))
-            order[:, i : (i + stride), :i] = perm[num_first:].reshape((channels, stride, -1))
-            total_elems += num_elems
-
-        if self.estimator.channels_first:
-            return order.reshape(1, -1).squeeze().argsort()
-
-        return order.transpose((1, 2, 0)).reshape(1, -1).squeeze().argsort()
-
-    def _block_idct(self, x, block_size=8, masked=False, ratio=0.5):
-        """
-        Applies IDCT to each block of size block_size.
-
-        :param x: An array with the inputs to be attacked.
-        :param block_size: block size for DCT attacks.
-        :param masked: use the mask.
-        :param ratio: Ratio of the lowest frequency directions in order to make the adversarial perturbation in the low
-                      frequency space.
-
-        :return var_z: An array holding the order of DCT attacks.
-        """
-        if not self.estimator.channels_first:
-            x = x.transpose(0, 3, 1, 2)
-        var_z = np.zeros(x.shape).astype(ART_NUMPY_DTYPE)
-        num_blocks = int(x.shape[2] / block_size)
-        mask = np.zeros((x.shape[0], x.shape[1], block_size, block_size))
-        if not isinstance(ratio, float):
-            for i in range(x.shape[0]):
-                mask[i, :, : int(block_size * ratio[i]), : int(block_size * ratio[i])] = 1
-        else:
-            mask[:, :, : int(block_size * ratio), : int(block_size * ratio)] = 1
-        for i in range(num_blocks):
-            for j in range(num_blocks):
-                submat = x[:, :, (i * block_size) : ((i + 1) * block_size), (j * block_size) : ((j + 1) * block_size)]
-                if masked:
-                    submat = submat * mask
-                var_z[
-                    :, :, (i * block_size) : ((i + 1) * block_size), (j * block_size) : ((j + 1) * block_size)
-                ] = idct(idct(submat, axis=3, norm="ortho"), axis=2, norm="ortho")
-
-        if self.estimator.channels_first:
-            return var_z
-
-        return var_z.transpose((0, 2, 3, 1))
+        # The assignment of coordinates to blocks only depends on the image size and is computed once, only the order
+        # within each block is drawn at random
+        key = ("block", img_size, channels, initial_size, stride, self.estimator.channels_first)
+        if key not in self._cache:
+            position = np.maximum(np.arange(img_size)[:, np.newaxis], np.arange(img_size)[np.newaxis, :])
+            block = np.where(position < initial_size, 0, (position - initial_size) // stride + 1)
+            block = np.broadcast_to(block, (channels, img_size, img_size))
+            if not self.estimator.channels_first:
+                block = block.transpose((1, 2, 0))
+            self._cache[key] = block.reshape(-1)
+
+        block = self._cache[key]
+        return np.lexsort((np.random.random(block.size), block))
 
     def diagonal_order(self, image_size, channels):
         """
@@ -438,22 +383,16 @@ class SimBA(EvasionAttack):
 
         :return order: An array holding the diagonal order of pixel attacks.
         """
-        x = np.arange(0, image_size).cumsum()
-        order = np.zeros((image_size, image_size)).astype(ART_NUMPY_DTYPE)
-        for i in range(image_size):
-            order[i, : (image_size - i)] = i + x[i:]
-        for i in range(1, image_size):
-            reverse = order[image_size - i - 1].take([i for i in range(i - 1, -1, -1)])  # pylint: disable=R1721
-            order[i, (image_size - i) :] = image_size * image_size - 1 - reverse
-        if channels > 1:
-            order_2d = order
-            order = np.zeros((channels, image_size, image_size))
-            for i in range(channels):
-                order[i, :, :] = 3 * order_2d + i
-        elif channels == 1:
-            order = np.expand_dims(order, axis=0)
+        key = ("diag", image_size, channels, self.estimator.channels_first)
+        if key not in self._cache:
+            row, col = np.indices((image_size, image_size))
+            upper = row + (row + col) * (row + col + 1) // 2
+            order = np.where(row + col < image_size, upper, image_size * image_size - 1 - upper[::-1, ::-1])
+            order = channels * order[np.newaxis, :, :] + np.arange(channels)[:, np.newaxis, np.newaxis]
 
-        if self.estimator.channels_first:
-            return order.reshape(1, -1).squeeze().argsort()
+            if self.estimator.channels_first:
+                self._cache[key] = order.reshape(-1).argsort()
+            else:
+                self._cache[key] = order.transpose((1, 2, 0)).reshape(-1).argsort()
 
-        return order.transpose((1, 2, 0)).reshape(1, -1).squeeze().argsort()
+        return self._cache[key].copy()
@@ -20,14 +20,11 @@ This module implements the `SquareAttack` attack.
 
 | Paper link: https://arxiv.org/abs/1912.00049
 """
-import bisect
 import logging
-import math
-import random
-from typing import Optional, Union, Callable, TYPE_CHECKING
+from typing import Dict, Optional, Tuple, Union, Callable, TYPE_CHECKING
 
 import numpy as np
-from tqdm.auto import trange
+from tqdm.auto import tqdm, trange
 
 from art.config import ART_NUMPY_DTYPE
 from art.attacks.attack import EvasionAttack
@@ -57,6 +54,7 @@ class SquareAttack(EvasionAttack):
         "p_init",
         "nb_restarts",
         "batch_size",
+        "refill_batch",
         "verbose",
     ]
 
@@ -73,6 +71,7 @@ class SquareAttack(EvasionAttack):
         p_init: float = 0.8,
         nb_restarts: int = 1,
         batch_size: int = 128,
+        refill_batch: bool = False,
         verbose: bool = True,
     ):
         """
@@ -87,6 +86,11 @@ class SquareAttack(EvasionAttack):
         :param p_init: Initial fraction of elements.
         :param nb_restarts: Number of restarts.
         :param batch_size: Batch size for estimator evaluations.
+        :param refill_batch: If `True`, optimize a working set of `batch_size` samples in lockstep and replace samples
+                             that are adversarial or have exhausted their iterations and restarts with the next
+                             remaining samples, such that every evaluation of the loss covers a full batch. If `False`,
+                             all samples run through the restarts and iterations together and every evaluation covers
+                             the subset of samples that are still robust.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=estimator)
@@ -112,12 +116,18 @@ class SquareAttack(EvasionAttack):
         self.p_init = p_init
         self.nb_restarts = nb_restarts
         self.batch_size = batch_size
+        self.refill_batch = refill_batch
         self.verbose = verbose
+        self._perturbation_cache: Dict[int, np.ndarray] = {}
         self._check_params()
 
     def _get_logits_diff(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
         y_pred = self.estimator.predict(x, batch_size=self.batch_size)
 
+        return self._logits_diff(y_pred, y)
+
+    @staticmethod
+    def _logits_diff(y_pred: np.ndarray, y: np.ndarray) -> np.ndarray:
         logit_correct = np.take_along_axis(y_pred, np.expand_dims(np.argmax(y, axis=1), axis=1), axis=1)
         logit_highest_incorrect = np.take_along_axis(
             y_pred, np.expand_dims(np.argsort(y_pred, axis=1)[:, -2], axis=1), axis=1
@@ -125,11 +135,11 @@ class SquareAttack(EvasionAttack):
 
         return (logit_correct - logit_highest_incorrect)[:, 0]
 
-    def _get_percentage_of_elements(self, i_iter: int) -> float:
-        i_p = i_iter / self.max_iter
+    def _get_percentage_of_elements(self, i_iter: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+        i_p = np.asarray(i_iter) / self.max_iter
         intervals = [0.001, 0.005, 0.02, 0.05, 0.1, 0.2, 0.4, 0.6, 0.8]
-        p_ratio = [1, 1 / 2, 1 / 4, 1 / 8, 1 / 16, 1 / 32, 1 / 64, 1 / 128, 1 / 256, 1 / 512]
-        i_ratio = bisect.bisect_left(intervals, i_p)
+        p_ratio = np.array([1, 1 / 2, 1 / 4, 1 / 8, 1 / 16, 1 / 32, 1 / 64, 1 / 128, 1 / 256, 1 / 512])
+        i_ratio = np.searchsorted(intervals, i_p, side="left")
 
         return self.p_init * p_ratio[i_ratio]
 
@@ -166,14 +176,11 @@ class SquareAttack(EvasionAttack):
                     "This attack has not yet been tested for binary classification with a single output classifier."
                 )
 
-        if self.estimator.channels_first:
-            channels = x.shape[1]
-            height = x.shape[2]
-            width = x.shape[3]
-        else:
-            height = x.shape[1]
-            width = x.shape[2]
-            channels = x.shape[3]
+        if self.norm not in [np.inf, "inf", 2]:  # pragma: no cover
+            return x_adv
+
+        if self.refill_batch:
+            return self._generate_refill(x, x_adv, y)
 
         for _ in trange(self.nb_restarts, desc="SquareAttack - restarts", disable=not self.verbose):
 
@@ -184,24 +191,39 @@ class SquareAttack(EvasionAttack):
             if np.sum(sample_is_robust) == 0:  # pragma: no cover
                 break
 
-            # x_robust = x_adv[sample_is_robust]
             x_robust = x[sample_is_robust]
             y_robust = y[sample_is_robust]
             sample_loss_init = self.loss(x_robust, y_robust)
 
-            if self.norm in [np.inf, "inf"]:
+            x_robust_new = self._get_init_perturbation(x_robust)
 
-                if self.estimator.channels_first:
-                    size = (x_robust.shape[0], channels, 1, width)
-                else:
-                    size = (x_robust.shape[0], 1, width, channels)
+            sample_loss_new = self.loss(x_robust_new, y_robust)
+            loss_improved = (sample_loss_new - sample_loss_init) < 0.0
+
+            x_robust[loss_improved] = x_robust_new[loss_improved]
+
+            x_adv[sample_is_robust] = x_robust
+
+            for i_iter in trange(
+                self.max_iter, desc="SquareAttack - iterations", leave=False, disable=not self.verbose
+            ):
+
+                percentage_of_elements = self._get_percentage_of_elements(i_iter)
 
-                # Add vertical stripe perturbations
-                x_robust_new = np.clip(
-                    x_robust + self.eps * np.random.choice([-1, 1], size=size),
-                    a_min=self.estimator.clip_values[0],
-                    a_max=self.estimator.clip_values[1],
-                ).astype(ART_NUMPY_DTYPE)
+                # Determine correctly predicted samples
+                y_pred = self.estimator.predict(x_adv, batch_size=self.batch_size)
+                sample_is_robust = np.logical_not(self.adv_criterion(y_pred, y))
+
+                if np.sum(sample_is_robust) == 0:  # pragma: no cover
+                    break
+
+                x_robust = x_adv[sample_is_robust]
+                x_init = x[sample_is_robust]
+                y_robust = y[sample_is_robust]
+
+                sample_loss_init = self.loss(x_robust, y_robust)
+
+                x_robust_new = self._get_square_perturbation(x_robust, x_init, percentage_of_elements)
 
                 sample_loss_new = self.loss(x_robust_new, y_robust)
                 loss_improved = (sample_loss_new - sample_loss_init) < 0.0
@@ -210,298 +232,324 @@ class SquareAttack(EvasionAttack):
 
                 x_adv[sample_is_robust] = x_robust
 
-                for i_iter in trange(
-                    self.max_iter, desc="SquareAttack - iterations", leave=False, disable=not self.verbose
-                ):
+        return x_adv
 
-                    percentage_of_elements = self._get_percentage_of_elements(i_iter)
+    def _generate_refill(self, x: np.ndarray, x_adv: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Generate adversarial samples with a working set of `batch_size` samples that are optimized in lockstep. Every
+        sample keeps its own iteration and restart counter. Samples that become adversarial or exhaust all iterations
+        and restarts are replaced with the next remaining samples of `x`, such that every evaluation of the loss covers
+        a full batch until the input is exhausted.
 
-                    # Determine correctly predicted samples
-                    y_pred = self.estimator.predict(x_adv, batch_size=self.batch_size)
-                    sample_is_robust = np.logical_not(self.adv_criterion(y_pred, y))
+        :param x: An array with the original inputs.
+        :param x_adv: The original inputs of type `ART_NUMPY_DTYPE`, updated in place with the adversarial examples.
+        :param y: Labels of the original inputs.
+        :return: An array holding the adversarial examples.
+        """
+        # With the default loss the adversarial criterion is evaluated on the predictions used for the loss
+        use_logits_diff = getattr(self.loss, "__func__", None) is SquareAttack._get_logits_diff
 
-                    if np.sum(sample_is_robust) == 0:  # pragma: no cover
-                        break
+        y_pred = self.estimator.predict(x_adv, batch_size=self.batch_size)
+        queue = np.where(np.logical_not(self.adv_criterion(y_pred, y)))[0]
+        if queue.size == 0:  # pragma: no cover
+            return x_adv
 
-                    x_robust = x_adv[sample_is_robust]
-                    x_init = x[sample_is_robust]
-                    y_robust = y[sample_is_robust]
+        sample_loss_clean = np.zeros(x.shape[0])
+        if use_logits_diff:
+            sample_loss_clean[queue] = self._logits_diff(y_pred[queue], y[queue])
+        else:
+            sample_loss_clean[queue] = self.loss(x_adv[queue], y[queue])
+
+        # Working set of samples, their current adversarial candidates, losses, iterations and restarts
+        nb_next = min(self.batch_size, queue.size)
+        index = queue[:nb_next]
+        x_robust = x_adv[index]
+        sample_loss = sample_loss_clean[index]
+        i_iter = np.full(nb_next, -1)
+        i_restart = np.zeros(nb_next, dtype=int)
+
+        with tqdm(total=queue.size, desc="SquareAttack - samples", disable=not self.verbose) as pbar:
+            while index.size > 0:
+
+                # Initial perturbation for new and restarted samples, square perturbation for all others
+                is_init = i_iter < 0
+                x_robust_new = np.empty_like(x_robust)
+                if np.any(is_init):
+                    x_robust_new[is_init] = self._get_init_perturbation(x_robust[is_init])
+                if not np.all(is_init):
+                    is_iter = np.logical_not(is_init)
+                    x_robust_new[is_iter] = self._get_square_perturbation(
+                        x_robust[is_iter], x[index[is_iter]], self._get_percentage_of_elements(i_iter[is_iter])
+                    )
 
-                    sample_loss_init = self.loss(x_robust, y_robust)
+                if use_logits_diff:
+                    y_pred = self.estimator.predict(x_robust_new, batch_size=self.batch_size)
+                    sample_loss_new = self._logits_diff(y_pred, y[index])
+                else:
+                    sample_loss_new = self.loss(x_robust_new, y[index])
+                loss_improved = (sample_loss_new - sample_loss) < 0.0
 
-                    height_tile = max(int(round(math.sqrt(percentage_of_elements * height * width))), 1)
+                x_robust[loss_improved] = x_robust_new[loss_improved]
+                sample_loss[loss_improved] = sample_loss_new[loss_improved]
 
-                    height_mid = np.random.randint(0, height - height_tile)
-                    width_start = np.random.randint(0, width - height_tile)
+                # Only samples with an accepted perturbation can have become adversarial
+                sample_is_adv = np.zeros(index.size, dtype=bool)
+                if np.any(loss_improved):
+                    if use_logits_diff:
+                        y_pred_improved = y_pred[loss_improved]
+                    else:
+                        y_pred_improved = self.estimator.predict(x_robust[loss_improved], batch_size=self.batch_size)
+                    sample_is_adv[loss_improved] = self.adv_criterion(y_pred_improved, y[index[loss_improved]])
+
+                i_iter += 1
+
+                # Restart samples that exhausted their iterations from the original inputs
+                restart = np.logical_not(sample_is_adv) & (i_iter >= self.max_iter) & (i_restart < self.nb_restarts - 1)
+                i_iter[restart] = -1
+                i_restart[restart] += 1
+                x_robust[restart] = x_adv[index[restart]]
+                sample_loss[restart] = sample_loss_clean[index[restart]]
+
+                # Store finished samples and refill their slots with the next samples
+                done = sample_is_adv | (i_iter >= self.max_iter)
+                if np.any(done):
+                    x_adv[index[done]] = x_robust[done]
+                    pbar.update(int(np.sum(done)))
+
+                    keep = np.logical_not(done)
+                    index_new = queue[nb_next : nb_next + int(np.sum(done))]
+                    nb_next += index_new.size
+
+                    index = np.concatenate([index[keep], index_new])
+                    x_robust = np.concatenate([x_robust[keep], x_adv[index_new]])
+                    sample_loss = np.concatenate([sample_loss[keep], sample_loss_clean[index_new]])
+                    i_iter = np.concatenate([i_iter[keep], np.full(index_new.size, -1)])
+                    i_restart = np.concatenate([i_restart[keep], np.zeros(index_new.size, dtype=int)])
 
-                    delta_new = np.zeros(self.estimator.input_shape)
+        return x_adv
 
-                    if self.estimator.channels_first:
-                        delta_new[
-                            :, height_mid : height_mid + height_tile, width_start : width_start + height_tile
-                        ] = np.random.choice([-2 * self.eps, 2 * self.eps], size=[channels, 1, 1])
-                    else:
-                        delta_new[
-                            height_mid : height_mid + height_tile, width_start : width_start + height_tile, :
-                        ] = np.random.choice([-2 * self.eps, 2 * self.eps], size=[1, 1, channels])
+    def _get_init_perturbation(self, x_robust: np.ndarray) -> np.ndarray:
+        """
+        Perturb samples with the initial perturbation of the attack: vertical stripes of size `eps` for the Linf-norm
+        and a grid of tiles with random orientation and sign of total norm `eps` for the L2-norm.
 
-                    x_robust_new = x_robust + delta_new
+        :param x_robust: Samples to perturb.
+        :return: Perturbed samples.
+        """
+        nb_samples = x_robust.shape[0]
+        channels, height, width = self._get_image_size(x_robust)
+
+        if self.norm in [np.inf, "inf"]:
+
+            if self.estimator.channels_first:
+                size = (nb_samples, channels, 1, width)
+            else:
+                size = (nb_samples, 1, width, channels)
+
+            # Add vertical stripe perturbations
+            return np.clip(
+                x_robust + self.eps * np.random.choice([-1, 1], size=size),
+                a_min=self.estimator.clip_values[0],
+                a_max=self.estimator.clip_values[1],
+            ).astype(ART_NUMPY_DTYPE)
+
+        n_tiles = 5
+        height_tile = height // n_tiles
+        height_grid = n_tiles * height_tile
+
+        # Tiles of shape (nb_samples, tile row, pixel row, tile column, pixel column, channels)
+        perturbation = self._get_perturbation(height_tile)
+        transpose = np.random.random_sample((nb_samples, n_tiles, 1, n_tiles, 1)) > 0.5
+        sign = np.where(np.random.random_sample((nb_samples, n_tiles, 1, n_tiles, 1)) > 0.5, -1.0, 1.0)
+        tiles = np.where(
+            transpose,
+            perturbation.T[np.newaxis, np.newaxis, :, np.newaxis, :],
+            perturbation[np.newaxis, np.newaxis, :, np.newaxis, :],
+        )
+        tiles = (tiles * sign)[..., np.newaxis] * np.random.choice(
+            [-1, 1], size=(nb_samples, n_tiles, 1, n_tiles, 1, channels)
+        )
 
-                    x_robust_new = np.minimum(np.maximum(x_robust_new, x_init - self.eps), x_init + self.eps)
+        delta_init = np.zeros((nb_samples, height, width, channels), dtype=ART_NUMPY_DTYPE)
+        delta_init[:, :height_grid, :height_grid, :] = tiles.reshape((nb_samples, height_grid, height_grid, channels))
+        if self.estimator.channels_first:
+            delta_init = np.transpose(delta_init, (0, 3, 1, 2))
 
-                    x_robust_new = np.clip(
-                        x_robust_new, a_min=self.estimator.clip_values[0], a_max=self.estimator.clip_values[1]
-                    ).astype(ART_NUMPY_DTYPE)
+        return np.clip(
+            x_robust + delta_init / np.sqrt(np.sum(delta_init ** 2, axis=(1, 2, 3), keepdims=True)) * self.eps,
+            self.estimator.clip_values[0],
+            self.estimator.clip_values[1],
+        ).astype(ART_NUMPY_DTYPE)
 
-                    sample_loss_new = self.loss(x_robust_new, y_robust)
-                    loss_improved = (sample_loss_new - sample_loss_init) < 0.0
+    def _get_square_perturbation(
+        self, x_robust: np.ndarray, x_init: np.ndarray, percentage_of_elements: Union[float, np.ndarray]
+    ) -> np.ndarray:
+        """
+        Perturb samples with the square perturbation of an iteration. Every sample draws its own square, the size of
+        which is determined by its percentage of elements.
 
-                    x_robust[loss_improved] = x_robust_new[loss_improved]
+        :param x_robust: Current adversarial samples.
+        :param x_init: Original samples.
+        :param percentage_of_elements: Fraction of elements to perturb, for all or for every sample.
+        :return: Perturbed samples.
+        """
+        _, height, width = self._get_image_size(x_robust)
 
-                    x_adv[sample_is_robust] = x_robust
+        height_tile = np.round(np.sqrt(np.asarray(percentage_of_elements) * height * width)).astype(int)
+        if self.norm in [np.inf, "inf"]:
+            height_tile = np.maximum(height_tile, 1)
+        else:
+            height_tile = np.maximum(height_tile, 3)
+            height_tile = height_tile + (height_tile % 2 == 0)
 
-            elif self.norm == 2:
+        if height_tile.ndim == 0:
+            return self._get_square_perturbation_batch(x_robust, x_init, int(height_tile))
 
-                n_tiles = 5
+        # Perturb the samples in groups of equal square size
+        x_robust_new = np.empty(x_robust.shape, dtype=ART_NUMPY_DTYPE)
+        for height_tile_group in np.unique(height_tile):
+            group = height_tile == height_tile_group
+            x_robust_new[group] = self._get_square_perturbation_batch(
+                x_robust[group], x_init[group], int(height_tile_group)
+            )
 
-                height_tile = height // n_tiles
+        return x_robust_new
 
-                def _get_perturbation(height):
-                    delta = np.zeros([height, height])
-                    gaussian_perturbation = np.zeros([height // 2, height])
+    def _get_square_perturbation_batch(self, x_robust: np.ndarray, x_init: np.ndarray, height_tile: int) -> np.ndarray:
+        """
+        Perturb samples with squares of equal size at random positions.
 
-                    x_c = height // 4
-                    y_c = height // 2
+        :param x_robust: Current adversarial samples.
+        :param x_init: Original samples.
+        :param height_tile: Size of the squares.
+        :return: Perturbed samples.
+        """
+        nb_samples = x_robust.shape[0]
+        channels, height, width = self._get_image_size(x_robust)
 
-                    for i_y in range(y_c):
-                        gaussian_perturbation[
-                            max(x_c, 0) : min(x_c + (2 * i_y + 1), height // 2),
-                            max(0, y_c) : min(y_c + (2 * i_y + 1), height),
-                        ] += 1.0 / ((i_y + 1) ** 2)
-                        x_c -= 1
-                        y_c -= 1
+        # Squares are indexed as arrays of shape (nb_samples, height_tile, height_tile, channels) for both layouts
+        square_index, rows, columns = self._get_square_index(nb_samples, height_tile, height, width)
 
-                    gaussian_perturbation /= np.sqrt(np.sum(gaussian_perturbation ** 2))
+        if self.norm in [np.inf, "inf"]:
 
-                    delta[: height // 2] = gaussian_perturbation
-                    delta[height // 2 : height // 2 + gaussian_perturbation.shape[0]] = -gaussian_perturbation
+            x_robust_new = x_robust.copy()
+            x_robust_new[square_index] += np.random.choice(
+                [-2 * self.eps, 2 * self.eps], size=[nb_samples, 1, 1, channels]
+            )
 
-                    delta /= np.sqrt(np.sum(delta ** 2))
+            x_robust_new = np.minimum(np.maximum(x_robust_new, x_init - self.eps), x_init + self.eps)
 
-                    if random.random() > 0.5:
-                        delta = np.transpose(delta)
+            return np.clip(
+                x_robust_new, a_min=self.estimator.clip_values[0], a_max=self.estimator.clip_values[1]
+            ).astype(ART_NUMPY_DTYPE)
 
-                    if random.random() > 0.5:
-                        delta = -delta
+        delta_x_robust_init = x_robust - x_init
 
-                    return delta
+        square_index_2, rows_2, columns_2 = self._get_square_index(nb_samples, height_tile, height, width)
 
-                delta_init = np.zeros(x_robust.shape, dtype=ART_NUMPY_DTYPE)
+        delta_square = delta_x_robust_init[square_index]
+        w_1_norm = np.sqrt(np.sum(delta_square ** 2, axis=(1, 2), keepdims=True))
 
-                height_start = 0
-                for _ in range(n_tiles):
-                    width_start = 0
-                    for _ in range(n_tiles):
-                        if self.estimator.channels_first:
-                            perturbation_size = (1, 1, height_tile, height_tile)
-                            random_size = (x_robust.shape[0], channels, 1, 1)
-                        else:
-                            perturbation_size = (1, height_tile, height_tile, 1)
-                            random_size = (x_robust.shape[0], 1, 1, channels)
+        # Squared norm of the union of both squares from the overlap of the first square with the second square
+        overlap_rows = (rows >= rows_2[:, :1]) & (rows < rows_2[:, :1] + height_tile)
+        overlap_columns = (columns >= columns_2[:, :1]) & (columns < columns_2[:, :1] + height_tile)
+        overlap = overlap_rows[:, :, np.newaxis, np.newaxis] & overlap_columns[:, np.newaxis, :, np.newaxis]
+        w_norm = np.sqrt(
+            np.sum(delta_square ** 2, axis=(1, 2, 3))
+            + np.sum(delta_x_robust_init[square_index_2] ** 2, axis=(1, 2, 3))
+            - np.sum((delta_square * overlap) ** 2, axis=(1, 2, 3))
+        ).reshape((nb_samples, 1, 1, 1))
+        norms_x_robust = np.sqrt(np.sum(delta_x_robust_init ** 2, axis=(1, 2, 3))).reshape((nb_samples, 1, 1, 1))
 
-                        perturbation = _get_perturbation(height_tile).reshape(perturbation_size) * np.random.choice(
-                            [-1, 1], size=random_size
-                        )
+        # Perturbation pattern with random orientation and sign for every sample and random sign for every channel
+        perturbation = self._get_perturbation(height_tile)
+        transpose = (np.random.random_sample(nb_samples) > 0.5)[:, np.newaxis, np.newaxis]
+        sign = np.where(np.random.random_sample(nb_samples) > 0.5, -1.0, 1.0)[:, np.newaxis, np.newaxis]
+        perturbation = np.where(transpose, perturbation.T, perturbation) * sign
 
-                        if self.estimator.channels_first:
-                            delta_init[
-                                :, :, height_start : height_start + height_tile, width_start : width_start + height_tile
-                            ] += perturbation
-                        else:
-                            delta_init[
-                                :, height_start : height_start + height_tile, width_start : width_start + height_tile, :
-                            ] += perturbation
-                        width_start += height_tile
-                    height_start += height_tile
+        delta_new = perturbation[..., np.newaxis] * np.random.choice(
+            [-1, 1], size=[nb_samples, 1, 1, channels]
+        ) + delta_square / np.maximum(1e-9, w_1_norm)
 
-                x_robust_new = np.clip(
-                    x_robust + delta_init / np.sqrt(np.sum(delta_init ** 2, axis=(1, 2, 3), keepdims=True)) * self.eps,
-                    self.estimator.clip_values[0],
-                    self.estimator.clip_values[1],
-                )
+        diff_norm = np.maximum(self.eps ** 2 - norms_x_robust ** 2, 0.0)
 
-                sample_loss_new = self.loss(x_robust_new, y_robust)
-                loss_improved = (sample_loss_new - sample_loss_init) < 0.0
+        delta_new /= np.sqrt(np.sum(delta_new ** 2, axis=(1, 2), keepdims=True)) * np.sqrt(
+            diff_norm / channels + w_norm ** 2
+        )
 
-                x_robust[loss_improved] = x_robust_new[loss_improved]
+        delta_x_robust_init[square_index_2] = 0.0
+        delta_x_robust_init[square_index] = delta_new
 
-                x_adv[sample_is_robust] = x_robust
+        return np.clip(
+            x_init
+            + self.eps * delta_x_robust_init / np.sqrt(np.sum(delta_x_robust_init ** 2, axis=(1, 2, 3), keepdims=True)),
+            self.estimator.clip_values[0],
+            self.estimator.clip_values[1],
+        ).astype(ART_NUMPY_DTYPE)
 
-                for i_iter in trange(
-                    self.max_iter, desc="SquareAttack - iterations", leave=False, disable=not self.verbose
-                ):
-
-                    percentage_of_elements = self._get_percentage_of_elements(i_iter)
-
-                    # Determine correctly predicted samples
-                    y_pred = self.estimator.predict(x_adv, batch_size=self.batch_size)
-                    sample_is_robust = np.logical_not(self.adv_criterion(y_pred, y))
-
-                    if np.sum(sample_is_robust) == 0:  # pragma: no cover
-                        break
-
-                    x_robust = x_adv[sample_is_robust]
-                    x_init = x[sample_is_robust]
-                    y_robust = y[sample_is_robust]
-
-                    sample_loss_init = self.loss(x_robust, y_robust)
-
-                    delta_x_robust_init = x_robust - x_init
-
-                    height_tile = max(int(round(math.sqrt(percentage_of_elements * height * width))), 3)
-
-                    if height_tile % 2 == 0:
-                        height_tile += 1
-                    height_tile_2 = height_tile
-
-                    height_start = np.random.randint(0, height - height_tile)
-                    width_start = np.random.randint(0, width - height_tile)
-
-                    new_deltas_mask = np.zeros(x_init.shape)
-                    if self.estimator.channels_first:
-                        new_deltas_mask[
-                            :, :, height_start : height_start + height_tile, width_start : width_start + height_tile
-                        ] = 1.0
-                        w_1_norm = np.sqrt(
-                            np.sum(
-                                delta_x_robust_init[
-                                    :,
-                                    :,
-                                    height_start : height_start + height_tile,
-                                    width_start : width_start + height_tile,
-                                ]
-                                ** 2,
-                                axis=(2, 3),
-                                keepdims=True,
-                            )
-                        )
-                    else:
-                        new_deltas_mask[
-                            :, height_start : height_start + height_tile, width_start : width_start + height_tile, :
-                        ] = 1.0
-                        w_1_norm = np.sqrt(
-                            np.sum(
-                                delta_x_robust_init[
-                                    :,
-                                    height_start : height_start + height_tile,
-                                    width_start : width_start + height_tile,
-                                    :,
-                                ]
-                                ** 2,
-                                axis=(1, 2),
-                                keepdims=True,
-                            )
-                        )
-
-                    height_2_start = np.random.randint(0, height - height_tile_2)
-                    width_2_start = np.random.randint(0, width - height_tile_2)
-
-                    new_deltas_mask_2 = np.zeros(x_init.shape)
-                    if self.estimator.channels_first:
-                        new_deltas_mask_2[
-                            :,
-                            :,
-                            height_2_start : height_2_start + height_tile_2,
-                            width_2_start : width_2_start + height_tile_2,
-                        ] = 1.0
-                    else:
-                        new_deltas_mask_2[
-                            :,
-                            height_2_start : height_2_start + height_tile_2,
-                            width_2_start : width_2_start + height_tile_2,
-                            :,
-                        ] = 1.0
-
-                    norms_x_robust = np.sqrt(np.sum((x_robust - x_init) ** 2, axis=(1, 2, 3), keepdims=True))
-                    w_norm = np.sqrt(
-                        np.sum(
-                            (delta_x_robust_init * np.maximum(new_deltas_mask, new_deltas_mask_2)) ** 2,
-                            axis=(1, 2, 3),
-                            keepdims=True,
-                        )
-                    )
+    def _get_image_size(self, x: np.ndarray) -> Tuple[int, int, int]:
+        if self.estimator.channels_first:
+            return x.shape[1], x.shape[2], x.shape[3]
+        return x.shape[3], x.shape[1], x.shape[2]
 
-                    if self.estimator.channels_first:
-                        new_deltas_size = [x_init.shape[0], channels, height_tile, height_tile]
-                        random_choice_size = [x_init.shape[0], channels, 1, 1]
-                        perturbation_size = (1, 1, height_tile, height_tile)
-                    else:
-                        new_deltas_size = [x_init.shape[0], height_tile, height_tile, channels]
-                        random_choice_size = [x_init.shape[0], 1, 1, channels]
-                        perturbation_size = (1, height_tile, height_tile, 1)
-
-                    delta_new = (
-                        np.ones(new_deltas_size)
-                        * _get_perturbation(height_tile).reshape(perturbation_size)
-                        * np.random.choice([-1, 1], size=random_choice_size)
-                    )
+    def _get_square_index(
+        self, nb_samples: int, height_tile: int, height: int, width: int
+    ) -> Tuple[tuple, np.ndarray, np.ndarray]:
+        """
+        Draw a random square for every sample.
+
+        :param nb_samples: Number of samples.
+        :param height_tile: Size of the squares.
+        :param height: Height of the images.
+        :param width: Width of the images.
+        :return: Tuple of the index of the squares, which selects an array of shape `(nb_samples, height_tile,
+                 height_tile, channels)`, and the rows and columns of the squares.
+        """
+        height_start = np.random.randint(0, height - height_tile, size=nb_samples)
+        width_start = np.random.randint(0, width - height_tile, size=nb_samples)
 
-                    if self.estimator.channels_first:
-                        delta_new += delta_x_robust_init[
-                            :, :, height_start : height_start + height_tile, width_start : width_start + height_tile
-                        ] / (np.maximum(1e-9, w_1_norm))
-                    else:
-                        delta_new += delta_x_robust_init[
-                            :, height_start : height_start + height_tile, width_start : width_start + height_tile, :
-                        ] / (np.maximum(1e-9, w_1_norm))
-
-                    diff_norm = (self.eps * np.ones(delta_new.shape)) ** 2 - norms_x_robust ** 2
-                    diff_norm[diff_norm < 0.0] = 0.0
-
-                    if self.estimator.channels_first:
-                        delta_new /= np.sqrt(np.sum(delta_new ** 2, axis=(2, 3), keepdims=True)) * np.sqrt(
-                            diff_norm / channels + w_norm ** 2
-                        )
-                        delta_x_robust_init[
-                            :,
-                            :,
-                            height_2_start : height_2_start + height_tile_2,
-                            width_2_start : width_2_start + height_tile_2,
-                        ] = 0.0
-                        delta_x_robust_init[
-                            :, :, height_start : height_start + height_tile, width_start : width_start + height_tile
-                        ] = delta_new
-                    else:
-                        delta_new /= np.sqrt(np.sum(delta_new ** 2, axis=(1, 2), keepdims=True)) * np.sqrt(
-                            diff_norm / channels + w_norm ** 2
-                        )
-                        delta_x_robust_init[
-                            :,
-                            height_2_start : height_2_start + height_tile_2,
-                            width_2_start : width_2_start + height_tile_2,
-                            :,
-                        ] = 0.0
-                        delta_x_robust_init[
-                            :, height_start : height_start + height_tile, width_start : width_start + height_tile, :
-                        ] = delta_new
-
-                    x_robust_new = np.clip(
-                        x_init
-                        + self.eps
-                        * delta_x_robust_init
-                        / np.sqrt(np.sum(delta_x_robust_init ** 2, axis=(1, 2, 3), keepdims=True)),
-                        self.estimator.clip_values[0],
-                        self.estimator.clip_values[1],
-                    )
+        rows = height_start[:, np.newaxis] + np.arange(height_tile)
+        columns = width_start[:, np.newaxis] + np.arange(height_tile)
 
-                    sample_loss_new = self.loss(x_robust_new, y_robust)
-                    loss_improved = (sample_loss_new - sample_loss_init) < 0.0
+        sample_index = np.arange(nb_samples)[:, np.newaxis, np.newaxis]
+        if self.estimator.channels_first:
+            square_index = (sample_index, slice(None), rows[:, :, np.newaxis], columns[:, np.newaxis, :])
+        else:
+            square_index = (sample_index, rows[:, :, np.newaxis], columns[:, np.newaxis, :])
 
-                    x_robust[loss_improved] = x_robust_new[loss_improved]
+        return square_index, rows, columns
 
-                    x_adv[sample_is_robust] = x_robust
+    def _get_perturbation(self, height: int) -> np.ndarray:
+        """
+        Get the perturbation pattern of a square of size `height` with unit L2-norm: two centred, concentric bumps of
+        opposite sign in the upper and lower half of the square. The pattern is cached for every size.
 
-        return x_adv
+        :param height: Size of the square.
+        :return: Perturbation pattern of shape `(height, height)`.
+        """
+        if height not in self._perturbation_cache:
+            delta = np.zeros([height, height])
+
+            x_c = height // 4
+            y_c = height // 2
+
+            # Every pixel at Chebyshev distance d from the centre receives sum_{i >= d} 1 / (i + 1) ** 2 for i < y_c
+            weights = np.append(np.cumsum((1.0 / np.arange(1, y_c + 1) ** 2)[::-1])[::-1], 0.0)
+            distance = np.maximum(
+                np.abs(np.arange(height // 2)[:, np.newaxis] - x_c), np.abs(np.arange(height)[np.newaxis, :] - y_c)
+            )
+            gaussian_perturbation = weights[np.minimum(distance, y_c)]
+
+            gaussian_perturbation /= np.sqrt(np.sum(gaussian_perturbation ** 2))
+
+            delta[: height // 2] = gaussian_perturbation
+            delta[height // 2 : height // 2 + gaussian_perturbation.shape[0]] = -gaussian_perturbation
+
+            delta /= np.sqrt(np.sum(delta ** 2))
+
+            self._perturbation_cache[height] = delta
+
+        return self._perturbation_cache[height]
 
     def _check_params(self) -> None:
         if self.norm not in [1, 2, np.inf, "inf"]:
@@ -522,5 +570,8 @@ class SquareAttack(EvasionAttack):
         if not isinstance(self.batch_size, int) or self.batch_size <= 0:
             raise ValueError("The argument batch_size has to be of type int and larger than zero.")
 
+        if not isinstance(self.refill_batch, bool):
+            raise ValueError("The argument `refill_batch` has to be of type bool.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
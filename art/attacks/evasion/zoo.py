@@ -68,6 +68,7 @@ class ZooAttack(EvasionAttack):
         "nb_parallel",
         "batch_size",
         "variable_h",
+        "query_batch_size",
         "verbose",
     ]
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
@@ -87,6 +88,7 @@ class ZooAttack(EvasionAttack):
         nb_parallel: int = 128,
         batch_size: int = 1,
         variable_h: float = 1e-4,
+        query_batch_size: Optional[int] = None,
         verbose: bool = True,
     ):
         """
@@ -113,6 +115,10 @@ class ZooAttack(EvasionAttack):
                encouraged for ZOO, as the algorithm already runs `nb_parallel` coordinate updates in parallel for each
                sample. The batch size is a multiplier of `nb_parallel` in terms of memory consumption.
         :param variable_h: Step size for numerical estimation of derivatives.
+        :param query_batch_size: Maximum number of perturbed inputs created and evaluated by the classifier at once
+               when estimating the coordinate derivatives. If `None`, all `2 * nb_parallel * batch_size` perturbed
+               inputs of an iteration are evaluated with a single call of `predict`. Smaller values bound the memory
+               consumption of large `nb_parallel` values.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=classifier)
@@ -139,6 +145,7 @@ class ZooAttack(EvasionAttack):
         self.nb_parallel = nb_parallel
         self.batch_size = batch_size
         self.variable_h = variable_h
+        self.query_batch_size = query_batch_size
         self.verbose = verbose
         self._check_params()
 
@@ -170,7 +177,12 @@ class ZooAttack(EvasionAttack):
         self.adam_epochs: Optional[np.ndarray] = None
 
     def _loss(
-        self, x: np.ndarray, x_adv: np.ndarray, target: np.ndarray, c_weight: np.ndarray
+        self,
+        x: np.ndarray,
+        x_adv: np.ndarray,
+        target: np.ndarray,
+        c_weight: np.ndarray,
+        batch_size: Optional[int] = None,
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Compute the loss function values.
@@ -179,13 +191,16 @@ class ZooAttack(EvasionAttack):
         :param x_adv: An array with the adversarial input.
         :param target: An array with the target class (one-hot encoded).
         :param c_weight: Weight of the loss term aiming for classification as target.
+        :param batch_size: Batch size used for the predictions of the classifier. Defaults to the attack batch size.
         :return: A tuple holding the current logits, `L_2` distortion and overall loss.
         """
         l2dist = np.sum(np.square(x - x_adv).reshape(x_adv.shape[0], -1), axis=1)
         ratios = [1.0] + [
             int(new_size) / int(old_size) for new_size, old_size in zip(self.estimator.input_shape, x.shape[1:])
         ]
-        preds = self.estimator.predict(np.array(zoom(x_adv, zoom=ratios)), batch_size=self.batch_size)
+        if batch_size is None:
+            batch_size = self.batch_size
+        preds = self.estimator.predict(np.array(zoom(x_adv, zoom=ratios)), batch_size=batch_size)
         z_target = np.sum(preds * target, axis=1)
         z_other = np.max(
             preds * (1 - target) + (np.min(preds, axis=1) - 1)[:, np.newaxis] * target,
@@ -448,29 +463,30 @@ class ZooAttack(EvasionAttack):
 
     def _optimizer(self, x: np.ndarray, targets: np.ndarray, c_batch: np.ndarray) -> np.ndarray:
         # Variation of input for computing loss, same as in original implementation
-        coord_batch = np.repeat(self._current_noise, 2 * self.nb_parallel, axis=0)
-        coord_batch = coord_batch.reshape(2 * self.nb_parallel * self._current_noise.shape[0], -1)
+        nb_samples = self._current_noise.shape[0]
+        nb_queries = 2 * self.nb_parallel * nb_samples
+        noise = self._current_noise.reshape(nb_samples, -1)
 
         # Sample indices to prioritize for optimization
         if self.use_importance and np.unique(self._sample_prob).size != 1:
             indices = (
                 np.random.choice(
-                    coord_batch.shape[-1] * x.shape[0],
-                    self.nb_parallel * self._current_noise.shape[0],
+                    noise.shape[-1] * x.shape[0],
+                    self.nb_parallel * nb_samples,
                     replace=False,
                     p=self._sample_prob.flatten(),
                 )
-                % coord_batch.shape[-1]
+                % noise.shape[-1]
             )
         else:
             try:
                 indices = (
                     np.random.choice(
-                        coord_batch.shape[-1] * x.shape[0],
-                        self.nb_parallel * self._current_noise.shape[0],
+                        noise.shape[-1] * x.shape[0],
+                        self.nb_parallel * nb_samples,
                         replace=False,
                     )
-                    % coord_batch.shape[-1]
+                    % noise.shape[-1]
                 )
             except ValueError as error:  # pragma: no cover
                 if "Cannot take a larger sample than population when 'replace=False'" in str(error):
@@ -481,21 +497,32 @@ class ZooAttack(EvasionAttack):
 
                 raise error
 
-        # Create the batch of modifications to run
-        for i in range(self.nb_parallel * self._current_noise.shape[0]):
-            coord_batch[2 * i, indices[i]] += self.variable_h
-            coord_batch[2 * i + 1, indices[i]] -= self.variable_h
-
-        # Compute loss for all samples and coordinates, then optimize
-        expanded_x = np.repeat(x, 2 * self.nb_parallel, axis=0).reshape((-1,) + x.shape[1:])
-        expanded_targets = np.repeat(targets, 2 * self.nb_parallel, axis=0).reshape((-1,) + targets.shape[1:])
-        expanded_c = np.repeat(c_batch, 2 * self.nb_parallel)
-        _, _, loss = self._loss(
-            expanded_x,
-            expanded_x + coord_batch.reshape(expanded_x.shape),
-            expanded_targets,
-            expanded_c,
-        )
+        # Every coordinate is evaluated with a pair of consecutive queries, shifted by `+h` and `-h` respectively
+        sample_index = np.repeat(np.arange(nb_samples), 2 * self.nb_parallel)
+        coord_index = np.repeat(indices, 2)
+        shift = np.tile(np.array([self.variable_h, -self.variable_h], dtype=noise.dtype), self.nb_parallel * nb_samples)
+
+        # Compute loss for all samples and coordinates in chunks of at most `query_batch_size` queries, then optimize
+        query_batch_size = nb_queries if self.query_batch_size is None else self.query_batch_size
+        loss = np.empty(nb_queries)
+        for query_index_1 in range(0, nb_queries, query_batch_size):
+            query_index_2 = min(query_index_1 + query_batch_size, nb_queries)
+            rows = sample_index[query_index_1:query_index_2]
+
+            coord_batch = noise[rows]
+            coord_batch[np.arange(len(rows)), coord_index[query_index_1:query_index_2]] += shift[
+                query_index_1:query_index_2
+            ]
+
+            expanded_x = x[rows]
+            _, _, loss[query_index_1:query_index_2] = self._loss(
+                expanded_x,
+                expanded_x + coord_batch.reshape(expanded_x.shape),
+                targets[rows],
+                c_batch[rows],
+                batch_size=len(rows),
+            )
+
         if self.adam_mean is not None and self.adam_var is not None and self.adam_epochs is not None:
             self._current_noise = self._optimizer_adam_coordinate(
                 loss,
@@ -532,7 +559,7 @@ class ZooAttack(EvasionAttack):
         beta1, beta2 = 0.9, 0.999
 
         # Estimate grads from loss variation (constant `h` from the paper is fixed to .0001)
-        grads = np.array([(losses[i] - losses[i + 1]) / (2 * self.variable_h) for i in range(0, len(losses), 2)])
+        grads = (losses[0::2] - losses[1::2]) / (2 * self.variable_h)
 
         # ADAM update
         mean[index] = beta1 * mean[index] + (1 - beta1) * grads
@@ -613,22 +640,20 @@ class ZooAttack(EvasionAttack):
         if double:
             dims = [2 * size if i not in [0, channel_index] else size for i, size in enumerate(dims)]
 
-        prob = np.empty(shape=dims, dtype=np.float32)
+        # Pool all channels of all samples at once by stacking them along the first axis
         image = np.abs(prev_noise)
+        if not self.estimator.channels_first:
+            image = np.moveaxis(image, 3, 1)
+        image = image.reshape((-1,) + image.shape[2:])
 
-        for channel in range(prev_noise.shape[channel_index]):
-            if not self.estimator.channels_first:
-                image_pool = self._max_pooling(image[:, :, :, channel], dims[1] // 8)
-                if double:
-                    prob[:, :, :, channel] = np.abs(zoom(image_pool, [1, 2, 2]))
-                else:
-                    prob[:, :, :, channel] = image_pool
-            elif self.estimator.channels_first:
-                image_pool = self._max_pooling(image[:, channel, :, :], dims[2] // 8)
-                if double:
-                    prob[:, channel, :, :] = np.abs(zoom(image_pool, [1, 2, 2]))
-                else:
-                    prob[:, channel, :, :] = image_pool
+        prob = self._max_pooling(image, dims[2] // 8 if self.estimator.channels_first else dims[1] // 8)
+        if double:
+            prob = np.abs(zoom(prob, [1, 2, 2]))
+
+        prob = prob.reshape((prev_noise.shape[0], prev_noise.shape[channel_index]) + prob.shape[1:])
+        if not self.estimator.channels_first:
+            prob = np.moveaxis(prob, 1, 3)
+        prob = prob.astype(np.float32)
 
         prob /= np.sum(prob)
 
@@ -636,16 +661,16 @@ class ZooAttack(EvasionAttack):
 
     @staticmethod
     def _max_pooling(image: np.ndarray, kernel_size: int) -> np.ndarray:
-        img_pool = np.copy(image)
-        for i in range(0, image.shape[1], kernel_size):
-            for j in range(0, image.shape[2], kernel_size):
-                img_pool[:, i : i + kernel_size, j : j + kernel_size] = np.max(
-                    image[:, i : i + kernel_size, j : j + kernel_size],
-                    axis=(1, 2),
-                    keepdims=True,
-                )
+        # Pad to a multiple of the kernel size by repeating the last row and column, which leaves the maximum of every
+        # window unchanged, and take the maximum of all windows at once
+        nb_rows = -(-image.shape[1] // kernel_size)
+        nb_cols = -(-image.shape[2] // kernel_size)
+        padding = ((0, 0), (0, nb_rows * kernel_size - image.shape[1]), (0, nb_cols * kernel_size - image.shape[2]))
+        img_pool = np.pad(image, padding, mode="edge")
+        img_pool = img_pool.reshape((image.shape[0], nb_rows, kernel_size, nb_cols, kernel_size)).max(axis=(2, 4))
+        img_pool = np.repeat(np.repeat(img_pool, kernel_size, axis=1), kernel_size, axis=2)
 
-        return img_pool
+        return img_pool[:, : image.shape[1], : image.shape[2]]
 
     def _check_params(self) -> None:
         if not isinstance(self.binary_search_steps, int) or self.binary_search_steps < 0:
@@ -660,5 +685,10 @@ class ZooAttack(EvasionAttack):
         if not isinstance(self.batch_size, int) or self.batch_size < 1:
             raise ValueError("The batch size must be an integer greater than zero.")
 
+        if self.query_batch_size is not None and (
+            not isinstance(self.query_batch_size, int) or self.query_batch_size < 1
+        ):
+            raise ValueError("The query batch size must be `None` or an integer greater than zero.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
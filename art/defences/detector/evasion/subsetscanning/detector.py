@@ -22,7 +22,7 @@ This module implements the fast generalized subset scan based detector.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
 # pylint: disable=E0001
 import numpy as np
@@ -40,6 +40,38 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _searchsorted_columns(sorted_x: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the insertion indices of values into each column of a sorted array, equivalent to calling `np.searchsorted`
+    with `side="right"` and `side="left"` for every column, with a binary search vectorized across all columns.
+
+    :param sorted_x: Array of shape `(nb_records, nb_columns)` sorted along the first axis.
+    :param values: Array of shape `(nb_values, nb_columns)` of values to insert into the columns.
+    :return: Tuple of the insertion indices for `side="right"` and `side="left"`.
+    """
+    nb_records, nb_columns = sorted_x.shape
+    sorted_x_flat = sorted_x.reshape(-1)
+    columns = np.arange(nb_columns)
+
+    index_right = np.zeros(values.shape, dtype=np.intp)
+    index_left = np.zeros(values.shape, dtype=np.intp)
+    step = 1 << (int(nb_records).bit_length() - 1) if nb_records > 0 else 0
+
+    while step > 0:
+        for index, side_right in ((index_right, True), (index_left, False)):
+            candidate = index + step
+            valid = candidate <= nb_records
+            x_candidate = sorted_x_flat[(np.minimum(candidate, nb_records) - 1) * nb_columns + columns]
+            if side_right:
+                valid &= x_candidate <= values
+            else:
+                valid &= x_candidate < values
+            index += step * valid
+        step >>= 1
+
+    return index_right, index_left
+
+
 class SubsetScanningDetector(ClassifierNeuralNetwork):
     """
     Fast generalized subset scan based detector by McFowland, E., Speakman, S., and Neill, D. B. (2013).
@@ -47,10 +79,21 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
     | Paper link: https://www.cs.cmu.edu/~neill/papers/mcfowland13a.pdf
     """
 
-    estimator_params = ClassifierNeuralNetwork.estimator_params + ["classifier", "bgd_data", "layer", "verbose"]
+    estimator_params = ClassifierNeuralNetwork.estimator_params + [
+        "classifier",
+        "bgd_data",
+        "layer",
+        "batch_size",
+        "verbose",
+    ]
 
     def __init__(
-        self, classifier: ClassifierNeuralNetwork, bgd_data: np.ndarray, layer: Union[int, str], verbose: bool = True
+        self,
+        classifier: ClassifierNeuralNetwork,
+        bgd_data: np.ndarray,
+        layer: Union[int, str],
+        batch_size: int = 128,
+        verbose: bool = True,
     ) -> None:
         """
         Create a `SubsetScanningDetector` instance which is used to the detect the presence of adversarial samples.
@@ -58,6 +101,7 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
         :param classifier: The model being evaluated for its robustness to anomalies (e.g. adversarial samples).
         :param bgd_data: The background data used to learn a null model. Typically dataset used to train the classifier.
         :param layer: The layer from which to extract activations to perform scan.
+        :param batch_size: Number of samples for which activations and p-value ranges are computed at a time.
         :param verbose: Show progress bars.
         """
         super().__init__(
@@ -70,9 +114,13 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
         self.detector = classifier
         self.nb_classes = self.detector.nb_classes
         self.bgd_data = bgd_data
+        self.batch_size = batch_size
         self.verbose = verbose
         self.layer = layer
 
+        if self.batch_size <= 0:
+            raise ValueError("The batch size `batch_size` has to be positive.")
+
         # Ensure that layer is well-defined
         if classifier.layer_names is None:
             raise ValueError("No layer names identified.")
@@ -88,41 +136,62 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
                 raise ValueError(f"Layer name {layer} is not part of the graph.")
             self._layer_name = layer
 
-        bgd_activations = classifier.get_activations(bgd_data, self._layer_name, batch_size=128)
-        if len(bgd_activations.shape) == 4:
-            dim2 = bgd_activations.shape[1] * bgd_activations.shape[2] * bgd_activations.shape[3]
-            bgd_activations = np.reshape(bgd_activations, (bgd_activations.shape[0], dim2))
-
+        bgd_activations = self._get_activations(bgd_data)
         self.sorted_bgd_activations = np.sort(bgd_activations, axis=0)
 
-    def calculate_pvalue_ranges(self, eval_x: np.ndarray) -> np.ndarray:
+    def _get_activations(self, x: np.ndarray) -> np.ndarray:
+        """
+        Returns the activations of the scanned layer flattened to shape `(nb_samples, nb_units)`.
+
+        :param x: Input samples.
+        :return: Flattened activations.
+        """
+        activations = self.detector.get_activations(x, self._layer_name, batch_size=self.batch_size)
+        return np.reshape(activations, (activations.shape[0], -1))
+
+    def _generate_pvalue_ranges(self, eval_x: np.ndarray) -> Iterator[np.ndarray]:
         """
-        Returns computed p-value ranges.
+        Yields the p-value ranges for consecutive batches of `batch_size` samples, so that the activations of all
+        samples are never held in memory at once.
 
         :param eval_x: Data being evaluated for anomalies.
-        :return: P-value ranges.
+        :return: Iterator over float32 p-value ranges of shape `(batch_size, nb_units, 2)`.
         """
-        bgd_activations = self.sorted_bgd_activations
-        eval_activations = self.detector.get_activations(eval_x, self._layer_name, batch_size=128)
+        bgrecords_n = self.sorted_bgd_activations.shape[0]
+        nb_batches = int(np.ceil(len(eval_x) / float(self.batch_size)))
 
-        if len(eval_activations.shape) == 4:
-            dim2 = eval_activations.shape[1] * eval_activations.shape[2] * eval_activations.shape[3]
-            eval_activations = np.reshape(eval_activations, (eval_activations.shape[0], dim2))
+        for batch_index in range(nb_batches):
+            batch_index_1, batch_index_2 = batch_index * self.batch_size, (batch_index + 1) * self.batch_size
+            eval_activations = self._get_activations(eval_x[batch_index_1:batch_index_2])
 
-        bgrecords_n = bgd_activations.shape[0]
-        records_n = eval_activations.shape[0]
-        atrr_n = eval_activations.shape[1]
+            index_right, index_left = _searchsorted_columns(self.sorted_bgd_activations, eval_activations)
 
-        pvalue_ranges = np.empty((records_n, atrr_n, 2))
+            pvalue_ranges = np.empty(eval_activations.shape + (2,), dtype=np.float32)
+            pvalue_ranges[:, :, 0] = np.divide(bgrecords_n - index_right, bgrecords_n + 1)
+            pvalue_ranges[:, :, 1] = np.divide(bgrecords_n - index_left + 1, bgrecords_n + 1)
 
-        for j in range(atrr_n):
-            pvalue_ranges[:, j, 0] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="right")
-            pvalue_ranges[:, j, 1] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="left")
+            yield pvalue_ranges
 
-        pvalue_ranges = bgrecords_n - pvalue_ranges
+    def calculate_pvalue_ranges(self, eval_x: np.ndarray) -> np.ndarray:
+        """
+        Returns computed p-value ranges. The p-value ranges are computed in batches of `batch_size` samples and stored
+        as float32.
 
-        pvalue_ranges[:, :, 0] = np.divide(pvalue_ranges[:, :, 0], bgrecords_n + 1)
-        pvalue_ranges[:, :, 1] = np.divide(pvalue_ranges[:, :, 1] + 1, bgrecords_n + 1)
+        :param eval_x: Data being evaluated for anomalies.
+        :return: P-value ranges.
+        """
+        pvalue_ranges = None
+        batch_index_1 = 0
+
+        for pvalue_ranges_batch in self._generate_pvalue_ranges(eval_x):
+            if pvalue_ranges is None:
+                pvalue_ranges = np.empty((len(eval_x),) + pvalue_ranges_batch.shape[1:], dtype=np.float32)
+            batch_index_2 = batch_index_1 + len(pvalue_ranges_batch)
+            pvalue_ranges[batch_index_1:batch_index_2] = pvalue_ranges_batch
+            batch_index_1 = batch_index_2
+
+        if pvalue_ranges is None:
+            pvalue_ranges = np.empty((0, self.sorted_bgd_activations.shape[1], 2), dtype=np.float32)
 
         return pvalue_ranges
 
@@ -144,27 +213,23 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
         :param run:
         :return: (clean_scores, adv_scores, detectionpower).
         """
-        clean_pvalranges = self.calculate_pvalue_ranges(clean_x)
-        adv_pvalranges = self.calculate_pvalue_ranges(adv_x)
-
         clean_scores = []
         adv_scores = []
 
         if clean_size is None and advs_size is None:
-            # Individual scan
-            with tqdm(
-                total=len(clean_pvalranges) + len(adv_pvalranges), desc="Subset scanning", disable=not self.verbose
-            ) as pbar:
-                for _, c_p in enumerate(clean_pvalranges):
-                    best_score, _, _, _ = Scanner.fgss_individ_for_nets(c_p)
-                    clean_scores.append(best_score)
-                    pbar.update(1)
-                for _, a_p in enumerate(adv_pvalranges):
-                    best_score, _, _, _ = Scanner.fgss_individ_for_nets(a_p)
-                    adv_scores.append(best_score)
-                    pbar.update(1)
+            # Individual scan, streaming over batches of p-value ranges
+            with tqdm(total=len(clean_x) + len(adv_x), desc="Subset scanning", disable=not self.verbose) as pbar:
+                for eval_x, scores in ((clean_x, clean_scores), (adv_x, adv_scores)):
+                    for pvalue_ranges in self._generate_pvalue_ranges(eval_x):
+                        for p_v in pvalue_ranges:
+                            best_score, _, _, _ = Scanner.fgss_individ_for_nets(p_v)
+                            scores.append(best_score)
+                            pbar.update(1)
 
         else:
+            clean_pvalranges = self.calculate_pvalue_ranges(clean_x)
+            adv_pvalranges = self.calculate_pvalue_ranges(adv_x)
+
             len_adv_x = len(adv_x)
             len_clean_x = len(clean_x)
 
@@ -61,75 +61,46 @@ class ScanningOps:
         # alpha_thresholds = np.arange(a_max/50, a_max, a_max/50)
 
         if image_to_node:
-            number_of_elements = pvalues.shape[1]  # searching over j columns
-            size_of_given = pvalues.shape[0]  # for fixed this many images
-            unsort_priority = np.zeros((pvalues.shape[1], alpha_thresholds.shape[0]))  # number of columns
+            # searching over j columns for fixed this many images
+            pmaxes = pvalues[:, :, 1].T
         else:
-            number_of_elements = pvalues.shape[0]  # searching over i rows
-            size_of_given = pvalues.shape[1]  # for this many fixed nodes
-            unsort_priority = np.zeros((pvalues.shape[0], alpha_thresholds.shape[0]))  # number of rows
-
-        for elem_indx in range(0, number_of_elements):
-            # sort all the range maxes
-            if image_to_node:
-                # collect ranges over images(rows)
-                arg_sort_max = np.argsort(pvalues[:, elem_indx, 1])
-                # arg_sort_min = np.argsort(pvalues[:,e,0]) #collect ranges over images(rows)
-                completely_included = np.searchsorted(
-                    pvalues[:, elem_indx, 1][arg_sort_max],
-                    alpha_thresholds,
-                    side="right",
-                )
-            else:
-                # collect ranges over nodes(columns)
-                arg_sort_max = np.argsort(pvalues[elem_indx, :, 1])
-                # arg_sort_min = np.argsort(pvalues[elem_indx,:,0])
-
-                completely_included = np.searchsorted(
-                    pvalues[elem_indx, :, 1][arg_sort_max],
-                    alpha_thresholds,
-                    side="right",
-                )
-
-            # should be num elements by num thresh
-            unsort_priority[elem_indx, :] = completely_included
+            # searching over i rows for this many fixed nodes
+            pmaxes = pvalues[:, :, 1]
+        number_of_elements, size_of_given = pmaxes.shape
+
+        # count the ranges of each element completely included below each alpha threshold, the bin of a range max is
+        # the index of the smallest threshold that is at least as large
+        nb_alphas = alpha_thresholds.shape[0]
+        alpha_bins = np.searchsorted(alpha_thresholds, pmaxes, side="left")
+        alpha_bins += (np.arange(number_of_elements) * (nb_alphas + 1))[:, np.newaxis]
+        bin_counts = np.bincount(alpha_bins.reshape(-1), minlength=number_of_elements * (nb_alphas + 1))
+        # should be num elements by num thresh
+        unsort_priority = np.cumsum(bin_counts.reshape(number_of_elements, nb_alphas + 1)[:, :nb_alphas], axis=1)
+        unsort_priority = unsort_priority.astype(np.float64)
 
         # want to sort for a fixed thresh (across?)
         arg_sort_priority = np.argsort(-unsort_priority, axis=0)
 
-        best_score_so_far = -10000
-        best_alpha = -2
-
-        alpha_count = 0
-        for alpha_threshold in alpha_thresholds:
-
-            # score each threshold by itself, cumulating priority,
-            # cumulating count, alpha stays same.
-            alpha_v = np.ones(number_of_elements) * alpha_threshold
-
-            n_alpha_v = np.cumsum(unsort_priority[:, alpha_count][arg_sort_priority][:, alpha_count])
-            count_increments_this = np.ones(number_of_elements) * size_of_given
-            n_v = np.cumsum(count_increments_this)
-
-            vector_of_scores = score_function(n_alpha_v, n_v, alpha_v)
+        # score each threshold by itself, cumulating priority, cumulating count, alpha stays same.
+        n_alpha_v = np.cumsum(np.take_along_axis(unsort_priority, arg_sort_priority, axis=0), axis=0)
+        n_v = np.cumsum(np.ones(number_of_elements) * size_of_given)
+        n_v = np.broadcast_to(n_v[:, np.newaxis], n_alpha_v.shape)
+        alpha_v = np.broadcast_to(alpha_thresholds, n_alpha_v.shape)
 
-            best_score_for_this_alpha_idx = np.argmax(vector_of_scores)
-            best_score_for_this_alpha = vector_of_scores[best_score_for_this_alpha_idx]
+        vector_of_scores = score_function(n_alpha_v.reshape(-1), n_v.reshape(-1), alpha_v.reshape(-1))
+        vector_of_scores = vector_of_scores.reshape(number_of_elements, nb_alphas)
 
-            if best_score_for_this_alpha > best_score_so_far:
-                best_score_so_far = best_score_for_this_alpha
-                best_size = best_score_for_this_alpha_idx + 1  # not sure 1 is needed?
-                best_alpha = alpha_threshold
-                best_alpha_count = alpha_count
-            alpha_count = alpha_count + 1
+        # the best score of each alpha is at the smallest size, the best alpha is the smallest among equal scores
+        best_score_for_alpha_idx = np.argmax(vector_of_scores, axis=0)
+        best_score_for_alpha = vector_of_scores[best_score_for_alpha_idx, np.arange(nb_alphas)]
+        best_alpha_count = int(np.argmax(best_score_for_alpha))
 
-        # after the alpha for loop we now have best score, best alpha, size of best subset,
-        # and alpha counter use these with the priority argsort to reconstruct the best subset
-        unsort = arg_sort_priority[:, best_alpha_count]
+        best_score_so_far = best_score_for_alpha[best_alpha_count]
+        best_size = best_score_for_alpha_idx[best_alpha_count] + 1
+        best_alpha = alpha_thresholds[best_alpha_count]
 
-        subset = np.zeros(best_size).astype(int)
-        for loc in range(0, best_size):
-            subset[loc] = unsort[loc]
+        # use the best alpha counter with the priority argsort to reconstruct the best subset
+        subset = arg_sort_priority[:best_size, best_alpha_count].astype(int)
 
         return best_score_so_far, subset, best_alpha
 
@@ -29,11 +29,13 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import logging
 import os
 import pickle
+import tempfile
 import time
 from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 
+from sklearn.base import clone
 from sklearn.cluster import KMeans, MiniBatchKMeans
 
 from art import config
@@ -235,42 +237,17 @@ class ActivationDefence(PoisonFilteringDefence):
         self.set_params(**kwargs)
 
         if self.generator is not None:
-            batch_size = self.generator.batch_size
-            num_samples = self.generator.size
-            num_classes = self.classifier.nb_classes
-            for batch_idx in range(num_samples // batch_size):  # type: ignore
-                x_batch, y_batch = self.generator.get_batch()
-
-                batch_activations = self._get_activations(x_batch)
-                activation_dim = batch_activations.shape[-1]
-
-                # initialize values list of lists on first run
-                if batch_idx == 0:
-                    self.activations_by_class = [np.empty((0, activation_dim)) for _ in range(num_classes)]
-                    self.clusters_by_class = [np.empty(0, dtype=int) for _ in range(num_classes)]
-                    self.red_activations_by_class = [np.empty((0, self.nb_dims)) for _ in range(num_classes)]
-
-                activations_by_class = self._segment_by_class(batch_activations, y_batch)
-                clusters_by_class, red_activations_by_class = cluster_activations(
-                    activations_by_class,
-                    nb_clusters=self.nb_clusters,
-                    nb_dims=self.nb_dims,
-                    reduce=self.reduce,
-                    clustering_method=self.clustering_method,
-                    generator=self.generator,
-                    clusterer_new=self.clusterer,
-                )
-
-                for class_idx in range(num_classes):
-                    self.activations_by_class[class_idx] = np.vstack(
-                        [self.activations_by_class[class_idx], activations_by_class[class_idx]]
-                    )
-                    self.clusters_by_class[class_idx] = np.append(
-                        self.clusters_by_class[class_idx], clusters_by_class[class_idx]
-                    )
-                    self.red_activations_by_class[class_idx] = np.vstack(
-                        [self.red_activations_by_class[class_idx], red_activations_by_class[class_idx]]
-                    )
+            # Activations are streamed to memory-mapped stores and reduced and clustered incrementally
+            self.activations_by_class = self._get_activations_by_class_generator()
+            [self.clusters_by_class, self.red_activations_by_class] = cluster_activations(
+                self.activations_by_class,
+                nb_clusters=self.nb_clusters,
+                nb_dims=self.nb_dims,
+                reduce=self.reduce,
+                clustering_method=self.clustering_method,
+                generator=self.generator,
+                clusterer_new=self.clusterer,
+            )
             return self.clusters_by_class, self.red_activations_by_class
 
         if not self.activations_by_class:
@@ -572,6 +549,8 @@ class ActivationDefence(PoisonFilteringDefence):
             raise ValueError("Unsupported method for cluster analysis method: " + self.cluster_analysis)
         if self.generator and not isinstance(self.generator, DataGenerator):
             raise TypeError("Generator must a an instance of DataGenerator")
+        if self.generator and self.reduce != "PCA":
+            raise ValueError("Only `PCA` reduction is supported with a generator, provided: " + self.reduce)
 
     def _get_activations(self, x_train: Optional[np.ndarray] = None) -> np.ndarray:
         """
@@ -605,6 +584,36 @@ class ActivationDefence(PoisonFilteringDefence):
             )
         return activations
 
+    def _get_activations_by_class_generator(self) -> List[np.ndarray]:
+        """
+        Find activations for all batches of the generator and store them by class in memory-mapped arrays backed by
+        temporary files, so that the activations of the whole dataset are never held in memory.
+
+        :return: Activations by class.
+        """
+        batch_size = self.generator.batch_size
+        num_samples = self.generator.size
+        num_classes = self.classifier.nb_classes
+        stores: List[Optional[np.ndarray]] = [None] * num_classes
+        nb_rows = [0] * num_classes
+        activation_shape: Tuple[int, ...] = (0,)
+
+        for _ in range(num_samples // batch_size):  # type: ignore
+            x_batch, y_batch = self.generator.get_batch()
+
+            batch_activations = self._get_activations(x_batch)
+            activation_shape = batch_activations.shape[1:]
+
+            for class_idx, activations in enumerate(self._segment_by_class(batch_activations, y_batch)):
+                if len(activations) > 0:
+                    stores[class_idx] = _append_to_memmap(stores[class_idx], nb_rows[class_idx], activations)
+                    nb_rows[class_idx] += len(activations)
+
+        return [
+            np.empty((0,) + activation_shape) if store is None else store[:nb_rows_class]
+            for store, nb_rows_class in zip(stores, nb_rows)
+        ]
+
     def _segment_by_class(self, data: np.ndarray, features: np.ndarray) -> List[np.ndarray]:
         """
         Returns segmented data according to specified features.
@@ -692,9 +701,10 @@ def cluster_activations(
     :param nb_dims: number of dimensions to reduce activation to via PCA.
     :param reduce: Method to perform dimensionality reduction, default is FastICA.
     :param clustering_method: Clustering method to use, default is KMeans.
-    :param generator: whether or not a the activations are a batch or full activations
-    :return: (separated_clusters, separated_reduced_activations).
-    :param clusterer_new: whether or not a the activations are a batch or full activations
+    :param generator: If provided, the activations are reduced with incremental PCA and clustered with
+                      `partial_fit` of a copy of `clusterer_new` for each class, in chunks of the generator batch size,
+                      which allows the activations to be memory-mapped arrays.
+    :param clusterer_new: Clusterer used with a generator.
     :return: (separated_clusters, separated_reduced_activations)
     """
     separated_clusters = []
@@ -706,32 +716,112 @@ def cluster_activations(
         raise ValueError(clustering_method + " clustering method not supported.")
 
     for activation in separated_activations:
+        if generator is not None and clusterer_new is not None:
+            reduced_activations, clusters = _reduce_and_cluster_incremental(
+                activation, nb_dims, reduce, clone(clusterer_new), generator.batch_size
+            )
+            separated_reduced_activations.append(reduced_activations)
+            separated_clusters.append(clusters)
+            continue
+
         # Apply dimensionality reduction
-        nb_activations = np.shape(activation)[1]
-        if nb_activations > nb_dims:
+        if _is_reducible(activation, nb_dims):
             # TODO: address issue where if fewer samples than nb_dims this fails
             reduced_activations = reduce_dimensionality(activation, nb_dims=nb_dims, reduce=reduce)
         else:
-            logger.info(
-                "Dimensionality of activations = %i less than nb_dims = %i. Not applying dimensionality " "reduction.",
-                nb_activations,
-                nb_dims,
-            )
             reduced_activations = activation
         separated_reduced_activations.append(reduced_activations)
 
         # Get cluster assignments
-        if generator is not None and clusterer_new is not None:
-            clusterer_new = clusterer_new.partial_fit(reduced_activations)
-            # NOTE: this may cause earlier predictions to be less accurate
-            clusters = clusterer_new.predict(reduced_activations)
-        else:
-            clusters = clusterer.fit_predict(reduced_activations)
+        clusters = clusterer.fit_predict(reduced_activations)
         separated_clusters.append(clusters)
 
     return separated_clusters, separated_reduced_activations
 
 
+def _is_reducible(activations: np.ndarray, nb_dims: int) -> bool:
+    """
+    Checks whether the dimensionality of the activations is larger than the number of dimensions to reduce to and
+    logs that no dimensionality reduction is applied otherwise.
+
+    :param activations: Activations where each row corresponds to activations for a given data point.
+    :param nb_dims: number of dimensions to reduce activation to.
+    :return: True if the dimensionality of the activations should be reduced.
+    """
+    nb_activations = np.shape(activations)[1]
+    if nb_activations > nb_dims:
+        return True
+
+    logger.info(
+        "Dimensionality of activations = %i less than nb_dims = %i. Not applying dimensionality reduction.",
+        nb_activations,
+        nb_dims,
+    )
+    return False
+
+
+def _reduce_and_cluster_incremental(
+    activations: np.ndarray, nb_dims: int, reduce: str, clusterer: MiniBatchKMeans, batch_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces dimensionality of the activations with incremental PCA and clusters the reduced activations with
+    `partial_fit`, reading the activations chunk by chunk.
+
+    :param activations: Activations of one class, e.g. a memory-mapped array.
+    :param nb_dims: number of dimensions to reduce activation to via PCA.
+    :param reduce: Method to perform dimensionality reduction, only `PCA` is supported.
+    :param clusterer: Clusterer supporting `partial_fit`.
+    :param batch_size: Minimum number of activations per chunk.
+    :return: (reduced_activations, clusters).
+    """
+    # pylint: disable=E0001
+    from sklearn.decomposition import IncrementalPCA
+
+    if reduce != "PCA":
+        raise ValueError(reduce + " dimensionality reduction method not supported with a generator.")
+
+    # Chunks need at least as many samples as components and clusters, the remainder is spread over the chunks
+    nb_samples = len(activations)
+    nb_chunks = max(1, nb_samples // max(batch_size, nb_dims, clusterer.n_clusters))
+    bounds = [nb_samples * i // nb_chunks for i in range(nb_chunks + 1)]
+    chunks = [slice(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+
+    if _is_reducible(activations, nb_dims):
+        projector = IncrementalPCA(n_components=nb_dims)
+        for chunk in chunks:
+            projector.partial_fit(activations[chunk])
+        reduced_activations = np.concatenate([projector.transform(activations[chunk]) for chunk in chunks])
+    else:
+        reduced_activations = np.asarray(activations)
+
+    for chunk in chunks:
+        clusterer.partial_fit(reduced_activations[chunk])
+    clusters = clusterer.predict(reduced_activations)
+
+    return reduced_activations, clusters
+
+
+def _append_to_memmap(store: Optional[np.ndarray], nb_rows: int, rows: np.ndarray) -> np.ndarray:
+    """
+    Appends rows to a memory-mapped array backed by a temporary file. The capacity is doubled if required.
+
+    :param store: Memory-mapped array or None to create a new one.
+    :param nb_rows: Number of rows already stored.
+    :param rows: Rows to append.
+    :return: The memory-mapped array with the rows appended.
+    """
+    if store is None or nb_rows + len(rows) > len(store):
+        capacity = max(2 * nb_rows, nb_rows + len(rows))
+        with tempfile.TemporaryFile() as file:
+            new_store = np.memmap(file, dtype=rows.dtype, mode="w+", shape=(capacity,) + rows.shape[1:])
+        if store is not None:
+            new_store[:nb_rows] = store[:nb_rows]
+        store = new_store
+
+    store[nb_rows : nb_rows + len(rows)] = rows
+    return store
+
+
 def reduce_dimensionality(activations: np.ndarray, nb_dims: int = 10, reduce: str = "FastICA") -> np.ndarray:
     """
     Reduces dimensionality of the activations provided using the specified number of dimensions and reduction technique.
@@ -23,9 +23,10 @@ This module implements the Reject on Negative Impact (RONI) defense by Nelson et
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from copy import deepcopy
-from typing import Callable, List, Tuple, Union, TYPE_CHECKING
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -40,6 +41,55 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _get_performance_shift(
+    before_classifier: "CLASSIFIER_TYPE",
+    x: np.ndarray,
+    y: np.ndarray,
+    x_quiz: np.ndarray,
+    y_quiz: np.ndarray,
+    perf_func: Union[str, Callable],
+    incremental: bool,
+) -> Tuple[float, "CLASSIFIER_TYPE"]:
+    """
+    Train a copy of a classifier and calculate the resulting performance shift on the quiz set. This function is
+    defined on module level to be usable by worker processes.
+
+    :param before_classifier: The classifier before training.
+    :param x: Training data, the trusted data followed by the new data point, or only the new data point if
+              `incremental` is True.
+    :param y: Training labels.
+    :param x_quiz: Quiz data.
+    :param y_quiz: Quiz labels.
+    :param perf_func: Performance function to use.
+    :param incremental: True if the copy is updated with `partial_fit` of the underlying model instead of `fit`.
+    :return: A tuple of the performance shift and the trained classifier.
+    """
+    after_classifier = deepcopy(before_classifier)
+    if incremental:
+        # The estimators have no public incremental update, so the preprocessing of `fit` is applied before calling
+        # `partial_fit` of the underlying model directly
+        x_preprocessed, y_preprocessed = after_classifier._apply_preprocessing(  # pylint: disable=protected-access
+            x, y, fit=True
+        )
+        after_classifier.model.partial_fit(x_preprocessed, np.argmax(y_preprocessed, axis=1))
+    else:
+        after_classifier.fit(x=x, y=y)
+
+    perf_shift = performance_diff(before_classifier, after_classifier, x_quiz, y_quiz, perf_function=perf_func)
+    return perf_shift, after_classifier
+
+
+def _get_calibration_shift(*args) -> float:
+    """
+    Calculate the performance shift of a calibration point, discarding the trained classifier to keep the results
+    returned by worker processes small.
+
+    :param args: Arguments of `_get_performance_shift`.
+    :return: The performance shift.
+    """
+    return _get_performance_shift(*args)[0]
+
+
 class RONIDefense(PoisonFilteringDefence):
     """
     Close implementation based on description in Nelson
@@ -57,6 +107,8 @@ class RONIDefense(PoisonFilteringDefence):
         "perf_func",
         "calibrated",
         "eps",
+        "nb_workers",
+        "incremental",
     ]
 
     def __init__(
@@ -71,6 +123,8 @@ class RONIDefense(PoisonFilteringDefence):
         pp_quiz: float = 0.2,
         calibrated: bool = True,
         eps: float = 0.1,
+        nb_workers: int = 1,
+        incremental: bool = False,
     ):
         """
         Create an :class:`.RONIDefense` object with the provided classifier.
@@ -85,6 +139,12 @@ class RONIDefense(PoisonFilteringDefence):
         :param pp_quiz: Percent of training data used for quiz set.
         :param calibrated: True if using the calibrated form of RONI.
         :param eps: performance threshold if using uncalibrated RONI.
+        :param nb_workers: Number of worker processes training classifiers in parallel. The calibration points and,
+                           speculatively, the next suspect points are evaluated concurrently. If larger than 1, the
+                           classifier and `perf_func` have to be picklable.
+        :param incremental: If True, update the classifier with each new data point with `partial_fit` of the
+                            underlying model instead of retraining it on the trusted data, e.g. for scikit-learn models
+                            with incremental learning.
         """
         super().__init__(classifier, x_train, y_train)
         n_points = len(x_train)
@@ -99,7 +159,11 @@ class RONIDefense(PoisonFilteringDefence):
         self.x_val = x_val
         self.y_val = y_val
         self.perf_func = perf_func
+        self.nb_workers = nb_workers
+        self.incremental = incremental
         self.is_clean_lst: List[int] = []
+        self._calibration_cache: Optional[Tuple["CLASSIFIER_TYPE", np.ndarray, np.ndarray]] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
         self._check_params()
 
     def evaluate_defence(self, is_clean: np.ndarray, **kwargs) -> str:
@@ -135,8 +199,6 @@ class RONIDefense(PoisonFilteringDefence):
 
         x_suspect = self.x_train
         y_suspect = self.y_train
-        x_trusted = self.x_val
-        y_trusted = self.y_val
 
         self.is_clean_lst = [1 for _ in range(len(x_suspect))]
         report = {}
@@ -144,27 +206,50 @@ class RONIDefense(PoisonFilteringDefence):
         before_classifier = deepcopy(self.classifier)
         before_classifier.fit(x_suspect, y_suspect)
 
-        for idx in np.random.permutation(len(x_suspect)):
-            x_i = x_suspect[idx]
-            y_i = y_suspect[idx]
-
-            after_classifier = deepcopy(before_classifier)
-            after_classifier.fit(x=np.vstack([x_trusted, x_i]), y=np.vstack([y_trusted, y_i]))
-            acc_shift = performance_diff(
-                before_classifier,
-                after_classifier,
-                self.x_quiz,
-                self.y_quiz,
-                perf_function=self.perf_func,
-            )
-            # print(acc_shift, median, std_dev)
-            if self.is_suspicious(before_classifier, acc_shift):
-                self.is_clean_lst[idx] = 0
-                report[idx] = acc_shift
-            else:
-                before_classifier = after_classifier
-                x_trusted = np.vstack([x_trusted, x_i])
-                y_trusted = np.vstack([y_trusted, y_i])
+        # Trusted data grows in preallocated buffers, followed by one slot for the data point under evaluation
+        x_trusted = np.empty((len(self.x_val) + len(x_suspect) + 1,) + self.x_val.shape[1:], dtype=self.x_val.dtype)
+        y_trusted = np.empty((len(self.y_val) + len(y_suspect) + 1,) + self.y_val.shape[1:], dtype=self.y_val.dtype)
+        x_trusted[: len(self.x_val)] = self.x_val
+        y_trusted[: len(self.y_val)] = self.y_val
+        nb_trusted = len(self.x_val)
+
+        permutation = np.random.permutation(len(x_suspect))
+        i_permutation = 0
+
+        try:
+            if self.nb_workers > 1:
+                self._executor = ProcessPoolExecutor(max_workers=self.nb_workers)
+
+            while i_permutation < len(permutation):
+                # Evaluate the next data points in parallel, assuming that they are rejected and the classifier
+                # therefore stays the same
+                indices = permutation[i_permutation : i_permutation + self.nb_workers]
+                results = self._map(
+                    _get_performance_shift,
+                    (
+                        (before_classifier,)
+                        + self._get_training_data(x_trusted, y_trusted, nb_trusted, x_suspect[idx], y_suspect[idx])
+                        + (self.x_quiz, self.y_quiz, self.perf_func, self.incremental)
+                        for idx in indices
+                    ),
+                )
+
+                for idx, (acc_shift, after_classifier) in zip(indices, results):
+                    i_permutation += 1
+                    if self.is_suspicious(before_classifier, acc_shift):
+                        self.is_clean_lst[idx] = 0
+                        report[idx] = acc_shift
+                    else:
+                        before_classifier = after_classifier
+                        x_trusted[nb_trusted] = x_suspect[idx]
+                        y_trusted[nb_trusted] = y_suspect[idx]
+                        nb_trusted += 1
+                        # The remaining data points have been evaluated with the previous classifier
+                        break
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
 
         return report, self.is_clean_lst
 
@@ -185,27 +270,70 @@ class RONIDefense(PoisonFilteringDefence):
     def get_calibration_info(self, before_classifier: "CLASSIFIER_TYPE") -> Tuple[np.ndarray, np.ndarray]:
         """
         Calculate the median and standard deviation of the accuracy shifts caused
-        by the calibration set.
+        by the calibration set. The result is cached for the most recent classifier.
 
         :param before_classifier: The classifier trained without suspicious point.
         :return: A tuple consisting of `(median, std_dev)`.
         """
-        accs = []
-
-        for x_c, y_c in zip(self.x_cal, self.y_cal):
-            after_classifier = deepcopy(before_classifier)
-            after_classifier.fit(x=np.vstack([self.x_val, x_c]), y=np.vstack([self.y_val, y_c]))
-            accs.append(
-                performance_diff(
-                    before_classifier,
-                    after_classifier,
-                    self.x_quiz,
-                    self.y_quiz,
-                    perf_function=self.perf_func,
-                )
+        if self._calibration_cache is not None and self._calibration_cache[0] is before_classifier:
+            return self._calibration_cache[1], self._calibration_cache[2]
+
+        x_val = np.concatenate([self.x_val, self.x_val[:1]])
+        y_val = np.concatenate([self.y_val, self.y_val[:1]])
+        accs = list(
+            self._map(
+                _get_calibration_shift,
+                (
+                    (before_classifier,)
+                    + self._get_training_data(x_val, y_val, len(self.x_val), x_c, y_c)
+                    + (self.x_quiz, self.y_quiz, self.perf_func, self.incremental)
+                    for x_c, y_c in zip(self.x_cal, self.y_cal)
+                ),
             )
+        )
 
-        return np.median(accs), np.std(accs)
+        median, std_dev = np.median(accs), np.std(accs)
+        self._calibration_cache = (before_classifier, median, std_dev)
+
+        return median, std_dev
+
+    def _get_training_data(
+        self, x_trusted: np.ndarray, y_trusted: np.ndarray, nb_trusted: int, x_i: np.ndarray, y_i: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the training data for evaluating a data point: the trusted data followed by the data point, or only the
+        data point if the classifier is updated incrementally.
+
+        :param x_trusted: Buffer with the trusted data in the first `nb_trusted` rows and at least one free row.
+        :param y_trusted: Buffer with the trusted labels in the first `nb_trusted` rows and at least one free row.
+        :param nb_trusted: Number of trusted data points.
+        :param x_i: The data point.
+        :param y_i: The label of the data point.
+        :return: A tuple of the training data and labels.
+        """
+        if self.incremental:
+            return x_i[np.newaxis], y_i[np.newaxis]
+
+        if self._executor is not None:
+            # Every task is sent to a worker with its own copy of the data
+            return (
+                np.concatenate([x_trusted[:nb_trusted], x_i[np.newaxis]]),
+                np.concatenate([y_trusted[:nb_trusted], y_i[np.newaxis]]),
+            )
+
+        # Training happens before the next data point is written to the free row of the buffers
+        x_trusted[nb_trusted] = x_i
+        y_trusted[nb_trusted] = y_i
+        return x_trusted[: nb_trusted + 1], y_trusted[: nb_trusted + 1]
+
+    def _map(self, func: Callable, args: Iterable[tuple]) -> Iterator:
+        """
+        Apply a function to every tuple of arguments, in the worker processes if available. Without workers, the
+        arguments are consumed lazily, one tuple per result, which allows them to share the trusted data buffers.
+        """
+        if self._executor is not None:
+            return self._executor.map(func, *zip(*args))
+        return (func(*arg) for arg in args)
 
     def _check_params(self) -> None:
         if len(self.x_train) != len(self.y_train):
@@ -213,3 +341,9 @@ class RONIDefense(PoisonFilteringDefence):
 
         if self.eps < 0:
             raise ValueError("Value of `eps` must be at least 0.")
+
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
+
+        if self.incremental and not hasattr(getattr(self.classifier, "model", None), "partial_fit"):
+            raise ValueError("Incremental RONI requires a classifier with a model that implements `partial_fit`.")
@@ -25,7 +25,7 @@ This module implements methods performing backdoor poisoning detection based on
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from typing import List, Tuple, TYPE_CHECKING
+from typing import Dict, List, Tuple, TYPE_CHECKING
 
 import numpy as np
 
@@ -49,6 +49,8 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
         "batch_size",
         "eps_multiplier",
         "expected_pp_poison",
+        "streaming",
+        "sketch_size",
     ]
 
     def __init__(
@@ -59,6 +61,8 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
         expected_pp_poison: float = 0.33,
         batch_size: int = 128,
         eps_multiplier: float = 1.5,
+        streaming: bool = False,
+        sketch_size: int = 32,
     ) -> None:
         """
         Create an :class:`.SpectralSignatureDefense` object with the provided classifier.
@@ -70,12 +74,19 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
         :param batch_size: The batch size for predictions
         :param eps_multiplier: The multiplier to add to the previous expectation. Numbers higher than one represent
                                a potentially higher false positive rate, but may detect more poison samples
+        :param streaming: If True, compute activations batch by batch in two passes over `x_train` instead of for the
+                          whole dataset at once. The top singular vector of each class is estimated from a running mean
+                          and a Frequent Directions sketch of the activations, which bounds memory by the number of
+                          classes, `sketch_size` and the number of features.
+        :param sketch_size: Number of rows of the Frequent Directions sketch of each class if `streaming` is True.
         """
         super().__init__(classifier, x_train, y_train)
         self.classifier: "CLASSIFIER_NEURALNETWORK_TYPE" = classifier
         self.batch_size = batch_size
         self.eps_multiplier = eps_multiplier
         self.expected_pp_poison = expected_pp_poison
+        self.streaming = streaming
+        self.sketch_size = sketch_size
         self.y_train = y_train
         self.evaluator = GroundTruthEvaluator()
         self._check_params()
@@ -114,46 +125,148 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
             nb_layers = len(self.classifier.layer_names)
         else:
             raise ValueError("No layer names identified.")
-        features_x_poisoned = self.classifier.get_activations(
-            self.x_train, layer=nb_layers - 1, batch_size=self.batch_size
+
+        if len(self.y_train.shape) == 2 and self.y_train.shape[1] > 1:
+            labels = np.argmax(self.y_train, axis=1)
+        else:
+            labels = self.y_train.reshape(-1).astype(int)
+        nb_classes = self.classifier.nb_classes
+        indices_by_class = np.split(
+            np.argsort(labels, kind="stable"), np.cumsum(np.bincount(labels, minlength=nb_classes))[:-1]
         )
-        if not isinstance(features_x_poisoned, np.ndarray):
-            raise ValueError("Wrong type detected.")
 
-        if features_x_poisoned is not None:
-            features_split = segment_by_class(features_x_poisoned, self.y_train, self.classifier.nb_classes)
+        if self.streaming:
+            scores = self._get_streaming_scores(labels, layer=nb_layers - 1)
         else:
-            raise ValueError("Activation are `None`.")
-        score_by_class = []
-        keep_by_class = []
-
-        for idx, feature in enumerate(features_split):
-            # Check for empty list
-            if len(feature):  # pylint: disable=C1801
-                score = SpectralSignatureDefense.spectral_signature_scores(np.vstack(feature))  # type: ignore
+            features_x_poisoned = self.classifier.get_activations(
+                self.x_train, layer=nb_layers - 1, batch_size=self.batch_size
+            )
+            if not isinstance(features_x_poisoned, np.ndarray):
+                raise ValueError("Wrong type detected.")
+
+            scores = np.zeros(len(labels))
+            for indices in indices_by_class:
+                # Check for empty list
+                if len(indices) > 0:
+                    score = SpectralSignatureDefense.spectral_signature_scores(features_x_poisoned[indices])
+                    scores[indices] = score[:, 0]
+
+        is_clean = np.ones(len(labels), dtype=int)
+        report: Dict[int, float] = {}
+
+        for indices in indices_by_class:
+            if len(indices) > 0:
+                score = scores[indices]
                 score_cutoff = np.quantile(score, max(1 - self.eps_multiplier * self.expected_pp_poison, 0.0))
-                score_by_class.append(score)
-                keep_by_class.append(score < score_cutoff)
-            else:
-                score_by_class.append([0])  # type: ignore
-                keep_by_class.append([True])
-
-        base_indices_by_class = segment_by_class(
-            np.arange(self.y_train.shape[0]),
-            self.y_train,
-            self.classifier.nb_classes,
+                is_poison = np.logical_not(score < score_cutoff)
+                is_clean[indices[is_poison]] = 0
+                report.update(zip(indices[is_poison].tolist(), score[is_poison]))
+
+        return report, is_clean.tolist()
+
+    def _get_streaming_scores(self, labels: np.ndarray, layer: int) -> np.ndarray:
+        """
+        Compute the outlier scores based on spectral signatures with two passes over batches of `x_train`. The first
+        pass collects the mean and a Frequent Directions sketch of the activations of each class, the second pass
+        scores the activations with the top singular vector of the centered activations estimated from the sketch.
+
+        | Paper link: https://arxiv.org/abs/1501.01711
+
+        :param labels: Class indices of `x_train`.
+        :param layer: Layer of the activations.
+        :return: Outlier score of each sample of `x_train`.
+        """
+        nb_classes = self.classifier.nb_classes
+        nb_samples = len(labels)
+        nb_batches = int(np.ceil(nb_samples / float(self.batch_size)))
+        sketch_size = self.sketch_size
+
+        sketches = np.empty(0)
+        shifts = np.empty(0)
+        sums = np.empty(0)
+        nb_rows = np.zeros(nb_classes, dtype=int)
+        counts = np.zeros(nb_classes, dtype=int)
+
+        for batch_index in range(nb_batches):
+            batch_index_1, batch_index_2 = batch_index * self.batch_size, (batch_index + 1) * self.batch_size
+            features = self._get_features(batch_index_1, batch_index_2, layer)
+            labels_batch = labels[batch_index_1:batch_index_2]
+
+            if batch_index == 0:
+                sketches = np.zeros((nb_classes, 2 * sketch_size, features.shape[1]))
+                shifts = np.zeros((nb_classes, features.shape[1]))
+                sums = np.zeros((nb_classes, features.shape[1]))
+
+            for class_idx in np.unique(labels_batch):
+                features_class = features[labels_batch == class_idx]
+                if counts[class_idx] == 0:
+                    # Shift by the mean of the first batch to keep the sketch close to the centered activations
+                    shifts[class_idx] = np.mean(features_class, axis=0)
+                sums[class_idx] += np.sum(features_class, axis=0)
+                counts[class_idx] += len(features_class)
+                nb_rows[class_idx] = self._update_sketch(
+                    sketches[class_idx], nb_rows[class_idx], features_class - shifts[class_idx]
+                )
+
+        # Top eigenvector of the covariance B^T B - n (mean - shift) (mean - shift)^T of the shifted sketch B
+        eigs = np.zeros_like(sums)
+        for class_idx in np.flatnonzero(counts):
+            mean_shift = sums[class_idx] / counts[class_idx] - shifts[class_idx]
+            matrix_w = np.vstack([sketches[class_idx, : nb_rows[class_idx]], np.sqrt(counts[class_idx]) * mean_shift])
+            signs = np.ones(len(matrix_w))
+            signs[-1] = -1
+            matrix_q, matrix_r = np.linalg.qr(matrix_w.T)
+            _, eigenvectors = np.linalg.eigh(np.matmul(matrix_r * signs, matrix_r.T))
+            eigs[class_idx] = np.matmul(matrix_q, eigenvectors[:, -1])
+
+        scores = np.empty(nb_samples)
+        for batch_index in range(nb_batches):
+            batch_index_1, batch_index_2 = batch_index * self.batch_size, (batch_index + 1) * self.batch_size
+            features = self._get_features(batch_index_1, batch_index_2, layer)
+            scores[batch_index_1:batch_index_2] = np.abs(
+                np.sum(features * eigs[labels[batch_index_1:batch_index_2]], axis=1)
+            )
+
+        return scores
+
+    def _get_features(self, batch_index_1: int, batch_index_2: int, layer: int) -> np.ndarray:
+        """
+        Get the flattened activations of a batch of `x_train`.
+        """
+        features = self.classifier.get_activations(
+            self.x_train[batch_index_1:batch_index_2], layer=layer, batch_size=self.batch_size
         )
-        is_clean_lst = [0] * self.y_train.shape[0]
-        report = {}
+        if not isinstance(features, np.ndarray):
+            raise ValueError("Wrong type detected.")
+        return features.reshape((features.shape[0], -1))
+
+    @staticmethod
+    def _update_sketch(sketch: np.ndarray, nb_rows: int, rows: np.ndarray) -> int:
+        """
+        Add rows to a Frequent Directions sketch in place. The sketch buffer has twice the number of rows of the sketch
+        and is shrunk whenever it is full.
+
+        :param sketch: Sketch buffer of shape `(2 * sketch_size, nb_features)`.
+        :param nb_rows: Number of rows used in the sketch buffer.
+        :param rows: Rows to add.
+        :return: Number of rows used in the sketch buffer after the update.
+        """
+        sketch_size = sketch.shape[0] // 2
+        while len(rows) > 0:
+            nb_new_rows = min(len(rows), sketch.shape[0] - nb_rows)
+            sketch[nb_rows : nb_rows + nb_new_rows] = rows[:nb_new_rows]
+            nb_rows += nb_new_rows
+            rows = rows[nb_new_rows:]
 
-        for keep_booleans, all_scores, indices in zip(keep_by_class, score_by_class, base_indices_by_class):
-            for keep_boolean, all_score, idx in zip(keep_booleans, all_scores, indices):
-                if keep_boolean:
-                    is_clean_lst[idx] = 1
-                else:
-                    report[idx] = all_score[0]
+            if nb_rows == sketch.shape[0]:
+                _, singular_values, matrix_v = np.linalg.svd(sketch, full_matrices=False)
+                if len(singular_values) > sketch_size:
+                    singular_values = np.sqrt(singular_values[:sketch_size] ** 2 - singular_values[sketch_size] ** 2)
+                nb_rows = len(singular_values)
+                sketch[:nb_rows] = singular_values[:, np.newaxis] * matrix_v[:nb_rows]
+                sketch[nb_rows:] = 0
 
-        return report, is_clean_lst
+        return nb_rows
 
     def _check_params(self) -> None:
         if self.batch_size < 0:
@@ -164,6 +277,10 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
             raise ValueError(
                 "expected_pp_poison must be between 0 and 1. Unsupported value: " + str(self.expected_pp_poison)
             )
+        if not isinstance(self.sketch_size, int) or self.sketch_size <= 0:
+            raise ValueError("sketch_size must be a positive integer. Unsupported value: " + str(self.sketch_size))
+        if not isinstance(self.streaming, bool):
+            raise ValueError("streaming must be a boolean. Unsupported value: " + str(self.streaming))
 
     @staticmethod
     def spectral_signature_scores(matrix_r: np.ndarray) -> np.ndarray:
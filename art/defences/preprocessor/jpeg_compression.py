@@ -26,9 +26,14 @@ This module implements the JPEG compression defence `JpegCompression`.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from functools import partial
+import importlib
 from io import BytesIO
 import logging
-from typing import Optional, Tuple, TYPE_CHECKING
+from multiprocessing import Pool
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+import weakref
 
 import numpy as np
 from tqdm.auto import tqdm
@@ -37,11 +42,56 @@ from art.config import ART_NUMPY_DTYPE
 from art.defences.preprocessor.preprocessor import Preprocessor
 
 if TYPE_CHECKING:
+    # pylint: disable=C0412
+    import multiprocessing.pool
+
     from art.utils import CLIP_VALUES_TYPE
 
 logger = logging.getLogger(__name__)
 
 
+def _compress_images(x: np.ndarray, quality: int, backend: str) -> np.ndarray:
+    """
+    Apply JPEG compression to a batch of images of shape `(nb_images, height, width, 3)` in mode `RGB` or of shape
+    `(nb_images, height, width)` in mode `L`. A single in-memory buffer is reused for all images of the batch. This
+    function is defined on module level to be usable by worker processes.
+
+    :param x: Batch of images of type uint8.
+    :param quality: The image quality.
+    :param backend: The JPEG codec, either `pil` or `simplejpeg`.
+    :return: Compressed batch of images.
+    """
+    x_jpeg = np.empty_like(x)
+
+    if backend == "simplejpeg":
+        import simplejpeg
+
+        colorspace = "RGB" if x.ndim == 4 else "GRAY"
+        for i_image, x_image in enumerate(x):
+            if x.ndim == 3:
+                x_image = x_image[..., np.newaxis]
+            # The encoder requires C-contiguous rows, which transposed channels-first input does not have
+            x_image = np.ascontiguousarray(x_image)
+            x_bytes = simplejpeg.encode_jpeg(x_image, quality=quality, colorspace=colorspace)
+            x_jpeg[i_image] = simplejpeg.decode_jpeg(x_bytes, colorspace=colorspace).reshape(x_jpeg.shape[1:])
+
+    else:
+        from PIL import Image
+
+        mode = "RGB" if x.ndim == 4 else "L"
+        tmp_jpeg = BytesIO()
+        for i_image, x_image in enumerate(x):
+            tmp_jpeg.seek(0)
+            tmp_jpeg.truncate()
+            Image.fromarray(x_image, mode=mode).save(tmp_jpeg, format="jpeg", quality=quality)
+            tmp_jpeg.seek(0)
+            with Image.open(tmp_jpeg) as x_image_jpeg:
+                x_jpeg[i_image] = np.asarray(x_image_jpeg)
+        tmp_jpeg.close()
+
+    return x_jpeg
+
+
 class JpegCompression(Preprocessor):
     """
     Implement the JPEG compression defence approach.
@@ -58,7 +108,7 @@ class JpegCompression(Preprocessor):
         https://arxiv.org/abs/1902.06705
     """
 
-    params = ["quality", "channels_first", "clip_values", "verbose"]
+    params = ["quality", "channels_first", "clip_values", "nb_workers", "backend", "verbose"]
 
     def __init__(
         self,
@@ -67,6 +117,8 @@ class JpegCompression(Preprocessor):
         channels_first: bool = False,
         apply_fit: bool = True,
         apply_predict: bool = True,
+        nb_workers: int = 1,
+        backend: str = "pil",
         verbose: bool = False,
     ):
         """
@@ -78,6 +130,10 @@ class JpegCompression(Preprocessor):
         :param channels_first: Set channels first or last.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param nb_workers: Number of worker processes compressing the images in parallel. If 1, all images are
+               compressed in the calling process.
+        :param backend: The JPEG codec, either `pil` for Pillow or `simplejpeg` for the libjpeg-turbo bindings of the
+               optional package `simplejpeg`. The decoded images of both codecs can differ slightly.
         :param verbose: Show progress bars.
         """
 
@@ -85,22 +141,99 @@ class JpegCompression(Preprocessor):
         self.quality = quality
         self.channels_first = channels_first
         self.clip_values = clip_values
+        self.nb_workers = nb_workers
+        self.backend = backend
         self.verbose = verbose
+        self._pool: Optional["multiprocessing.pool.Pool"] = None
+        self._pool_nb_workers = 0
+        self._pool_finalizer: Optional[weakref.finalize] = None
         self._check_params()
 
-    def _compress(self, x: np.ndarray, mode: str) -> np.ndarray:
+    def __getstate__(self) -> Dict[str, Any]:
         """
-        Apply JPEG compression to image input.
+        Use to ensure `JpegCompression` can be pickled and copied without its pool of worker processes.
+
+        :return: State dictionary with instance parameters.
         """
-        from PIL import Image
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_pool_nb_workers"] = 0
+        state["_pool_finalizer"] = None
+        return state
+
+    def close(self) -> None:
+        """
+        Terminate the worker processes. A new pool of worker processes is created by the next call with
+        `nb_workers > 1`.
+        """
+        if self._pool_finalizer is not None:
+            self._pool_finalizer()
+        self._pool = None
+        self._pool_nb_workers = 0
+        self._pool_finalizer = None
+
+    def _get_pool(self) -> "multiprocessing.pool.Pool":
+        """
+        Get the pool of worker processes, which is created on first use and reused by all later calls.
+
+        :return: The pool of `nb_workers` worker processes.
+        """
+        if self._pool is None or self._pool_nb_workers != self.nb_workers:
+            self.close()
+            self._pool = Pool(processes=self.nb_workers)
+            self._pool_nb_workers = self.nb_workers
+            # Terminate the worker processes when this defence is garbage collected or at interpreter exit
+            self._pool_finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+    def _compress(self, x: np.ndarray) -> np.ndarray:
+        """
+        Apply JPEG compression to image input, in mode `RGB` for images of shape `(height, width, 3)` and in mode `L`
+        for images of shape `(height, width)`.
+        """
+        return _compress_images(x[np.newaxis, ...], quality=self.quality, backend=self.backend)[0]
+
+    def _compress_batch(self, x: np.ndarray) -> np.ndarray:
+        """
+        Apply JPEG compression to a batch of images, split into chunks which are distributed over the worker processes.
+
+        :param x: Batch of images of type uint8 of shape `(nb_images, height, width, 3)` or
+                  `(nb_images, height, width)`.
+        :return: Compressed batch of images.
+        """
+        nb_chunks = max(1, min(x.shape[0], 4 * self.nb_workers))
+        x_chunks = np.array_split(x, nb_chunks)
+        compress = partial(_compress_images, quality=self.quality, backend=self.backend)
+
+        time_start = time.time()
+        x_jpeg = np.empty_like(x)
+        with tqdm(total=x.shape[0], desc="JPEG compression", disable=not self.verbose) as pbar:
+            if self.nb_workers == 1:
+                x_chunks_jpeg = map(compress, x_chunks)
+                self._collect_chunks(x_jpeg, x_chunks_jpeg, pbar)
+            else:
+                x_chunks_jpeg = self._get_pool().imap(compress, x_chunks)
+                self._collect_chunks(x_jpeg, x_chunks_jpeg, pbar)
+
+        time_elapsed = time.time() - time_start
+        logger.info(
+            "JPEG compression of %d images with %d worker(s) in %.3fs (%.1f images/s).",
+            x.shape[0],
+            self.nb_workers,
+            time_elapsed,
+            x.shape[0] / max(time_elapsed, 1e-9),
+        )
 
-        tmp_jpeg = BytesIO()
-        x_image = Image.fromarray(x, mode=mode)
-        x_image.save(tmp_jpeg, format="jpeg", quality=self.quality)
-        x_jpeg = np.array(Image.open(tmp_jpeg))
-        tmp_jpeg.close()
         return x_jpeg
 
+    @staticmethod
+    def _collect_chunks(x_jpeg: np.ndarray, x_chunks_jpeg: Iterable[np.ndarray], pbar: tqdm) -> None:
+        index = 0
+        for x_chunk_jpeg in x_chunks_jpeg:
+            x_jpeg[index : index + x_chunk_jpeg.shape[0]] = x_chunk_jpeg
+            index += x_chunk_jpeg.shape[0]
+            pbar.update(x_chunk_jpeg.shape[0])
+
     def __call__(self, x: np.ndarray, y: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
         """
         Apply JPEG compression to sample `x`.
@@ -142,16 +275,13 @@ class JpegCompression(Preprocessor):
             x = x * 255
         x = x.astype("uint8")
 
-        # Compress one image at a time
-        x_jpeg = x.copy()
-        for idx in tqdm(np.ndindex(x.shape[:2]), desc="JPEG compression", disable=not self.verbose):  # type: ignore
-            if x.shape[-1] == 3:
-                x_jpeg[idx] = self._compress(x[idx], mode="RGB")
-            else:
-                for i_channel in range(x.shape[-1]):
-                    x_channel = x[idx[0], idx[1], ..., i_channel]
-                    x_channel = self._compress(x_channel, mode="L")
-                    x_jpeg[idx[0], idx[1], :, :, i_channel] = x_channel
+        # Compress all images and frames as one batch, in mode `L` for each channel separately if not in mode `RGB`
+        if x.shape[-1] == 3:
+            x_jpeg = self._compress_batch(x.reshape((-1,) + x.shape[2:])).reshape(x.shape)
+        else:
+            x_channels = np.ascontiguousarray(np.moveaxis(x, -1, 2))
+            x_jpeg = self._compress_batch(x_channels.reshape((-1,) + x.shape[2:4]))
+            x_jpeg = np.moveaxis(x_jpeg.reshape(x_channels.shape), 2, -1)
 
         # Convert to ART dtype
         if self.clip_values[1] == 1.0:
@@ -187,5 +317,14 @@ class JpegCompression(Preprocessor):
         if self.clip_values[1] != 1.0 and self.clip_values[1] != 255:
             raise ValueError("'clip_values' max value must be either 1 or 255.")
 
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
+
+        if self.backend not in ["pil", "simplejpeg"]:
+            raise ValueError("The argument `backend` has to be either `pil` or `simplejpeg`.")
+
+        if self.backend == "simplejpeg" and importlib.util.find_spec("simplejpeg") is None:
+            raise ValueError("The backend `simplejpeg` requires the package `simplejpeg` to be installed.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -25,8 +25,9 @@ This module implements the MP3 compression defence `Mp3Compression`.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from io import BytesIO
+import subprocess
 from typing import Optional, Tuple
 
 import numpy as np
@@ -36,13 +37,63 @@ from art.defences.preprocessor.preprocessor import Preprocessor
 
 logger = logging.getLogger(__name__)
 
+# Samples of delay added by the MP3 encoder (576) and decoder (529). The delay is not removed by the decoder because
+# the LAME header holding it cannot be written to a pipe.
+_MP3_DELAY = 1105
+
+
+def _wav_to_mp3(x: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Apply MP3 compression to audio input of shape (samples, channel). The audio is encoded and decoded by two FFmpeg
+    processes through pipes without writing to disk.
+    """
+    from pydub import AudioSegment
+
+    x_dtype = x.dtype
+    normalized = bool(x.min() >= -1.0 and x.max() <= 1.0)
+    if x_dtype != np.int16 and not normalized:
+        # input is not of type np.int16 and seems to be unnormalized. Therefore casting to np.int16.
+        x = x.astype(np.int16)
+    elif x_dtype != np.int16 and normalized:
+        # x is not of type np.int16 and seems to be normalized. Therefore undoing normalization and
+        # casting to np.int16.
+        x = (x * 2 ** 15).astype(np.int16)
+
+    # raw audio to MP3 and back, with the FFmpeg executable configured for pydub
+    pcm_args = ["-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-ac", str(x.shape[1])]
+    process = subprocess.run(
+        [AudioSegment.converter, "-y"] + pcm_args + ["-i", "pipe:0", "-f", "mp3", "pipe:1"],
+        input=np.ascontiguousarray(x).tobytes(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    process = subprocess.run(
+        [AudioSegment.converter, "-y", "-f", "mp3", "-i", "pipe:0"] + pcm_args + ["pipe:1"],
+        input=process.stdout,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    x_mp3 = np.frombuffer(process.stdout, dtype=np.int16).reshape((-1, x.shape[1]))[_MP3_DELAY:]
+
+    # WARNING: The encoder pads the last frame, therefore x_mp3 is truncated to the original length.
+    if x.shape[0] > x_mp3.shape[0]:  # pragma: no cover
+        logger.warning("Lengths original input and compressed output don't match. Truncating compressed result.")
+    x_mp3 = x_mp3[: x.shape[0]]
+
+    if normalized:
+        # x was normalized. Therefore normalizing x_mp3.
+        x_mp3 = x_mp3 * 2 ** -15
+    return x_mp3.astype(x_dtype)
+
 
 class Mp3Compression(Preprocessor):
     """
     Implement the MP3 compression defense approach.
     """
 
-    params = ["channels_first", "sample_rate", "verbose"]
+    params = ["channels_first", "sample_rate", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -50,6 +101,7 @@ class Mp3Compression(Preprocessor):
         channels_first: bool = False,
         apply_fit: bool = False,
         apply_predict: bool = True,
+        nb_workers: int = 1,
         verbose: bool = False,
     ) -> None:
         """
@@ -59,11 +111,13 @@ class Mp3Compression(Preprocessor):
         :param channels_first: Set channels first or last.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param nb_workers: Number of audio samples compressed concurrently, each by its own pair of FFmpeg processes.
         :param verbose: Show progress bars.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
         self.channels_first = channels_first
         self.sample_rate = sample_rate
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
@@ -76,54 +130,13 @@ class Mp3Compression(Preprocessor):
         :param y: Labels of the sample `x`. This function does not affect them in any way.
         :return: Compressed sample.
         """
-
-        def wav_to_mp3(x, sample_rate):
-            """
-            Apply MP3 compression to audio input of shape (samples, channel).
-            """
-            from pydub import AudioSegment
-            from scipy.io.wavfile import write
-
-            x_dtype = x.dtype
-            normalized = bool(x.min() >= -1.0 and x.max() <= 1.0)
-            if x_dtype != np.int16 and not normalized:
-                # input is not of type np.int16 and seems to be unnormalized. Therefore casting to np.int16.
-                x = x.astype(np.int16)
-            elif x_dtype != np.int16 and normalized:
-                # x is not of type np.int16 and seems to be normalized. Therefore undoing normalization and
-                # casting to np.int16.
-                x = (x * 2 ** 15).astype(np.int16)
-
-            tmp_wav, tmp_mp3 = BytesIO(), BytesIO()
-            write(tmp_wav, sample_rate, x)
-            AudioSegment.from_wav(tmp_wav).export(tmp_mp3)
-            audio_segment = AudioSegment.from_mp3(tmp_mp3)
-            tmp_wav.close()
-            tmp_mp3.close()
-            x_mp3 = np.array(audio_segment.get_array_of_samples()).reshape((-1, audio_segment.channels))
-
-            # WARNING: Sometimes we *still* need to manually resize x_mp3 to original length.
-            # This should not be the case, e.g. see https://github.com/jiaaro/pydub/issues/474
-            if x.shape[0] != x_mp3.shape[0]:  # pragma: no cover
-                logger.warning(
-                    "Lengths original input and compressed output don't match. Truncating compressed result."
-                )
-                x_mp3 = x_mp3[: x.shape[0]]
-
-            if normalized:
-                # x was normalized. Therefore normalizing x_mp3.
-                x_mp3 = x_mp3 * 2 ** -15
-            return x_mp3.astype(x_dtype)
-
         if x.dtype != object and x.ndim != 3:
             raise ValueError("Mp3 compression can only be applied to temporal data across at least one channel.")
 
         if x.dtype != object and self.channels_first:
             x = np.swapaxes(x, 1, 2)
 
-        # apply mp3 compression per audio item
-        x_mp3 = x.copy()
-        for i, x_i in enumerate(tqdm(x, desc="MP3 compression", disable=not self.verbose)):
+        def compress(x_i: np.ndarray) -> np.ndarray:
             x_i_ndim_0 = x_i.ndim
             if x.dtype == object:
                 if x_i.ndim == 1:
@@ -132,7 +145,7 @@ class Mp3Compression(Preprocessor):
                 if x_i_ndim_0 == 2 and self.channels_first:
                     x_i = np.swapaxes(x_i, 0, 1)
 
-            x_i = wav_to_mp3(x_i, self.sample_rate)
+            x_i = _wav_to_mp3(x_i, self.sample_rate)
 
             if x.dtype == object:
                 if x_i_ndim_0 == 2 and self.channels_first:
@@ -141,7 +154,15 @@ class Mp3Compression(Preprocessor):
                 if x_i_ndim_0 == 1:
                     x_i = np.squeeze(x_i)
 
-            x_mp3[i] = x_i
+            return x_i
+
+        # apply mp3 compression per audio item
+        x_mp3 = x.copy()
+        with ThreadPoolExecutor(max_workers=self.nb_workers) as executor:
+            for i, x_i in enumerate(
+                tqdm(executor.map(compress, x), total=len(x), desc="MP3 compression", disable=not self.verbose)
+            ):
+                x_mp3[i] = x_i
 
         if x.dtype != object and self.channels_first:
             x_mp3 = np.swapaxes(x_mp3, 1, 2)
@@ -152,5 +173,8 @@ class Mp3Compression(Preprocessor):
         if not (isinstance(self.sample_rate, int) and self.sample_rate > 0):
             raise ValueError("Sample rate be must a positive integer.")
 
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -41,7 +41,7 @@ class Mp3CompressionPyTorch(PreprocessorPyTorch):
     Implement the MP3 compression defense approach.
     """
 
-    params = ["channels_first", "sample_rate", "verbose"]
+    params = ["channels_first", "sample_rate", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -50,6 +50,7 @@ class Mp3CompressionPyTorch(PreprocessorPyTorch):
         apply_fit: bool = False,
         apply_predict: bool = True,
         device_type: str = "gpu",
+        nb_workers: int = 1,
         verbose: bool = False,
     ):
         """
@@ -60,6 +61,7 @@ class Mp3CompressionPyTorch(PreprocessorPyTorch):
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
         :param device_type: Type of device on which the classifier is run, either `gpu` or `cpu`.
+        :param nb_workers: Number of audio samples compressed concurrently, each by its own pair of FFmpeg processes.
         :param verbose: Show progress bars.
         """
         from torch.autograd import Function
@@ -72,6 +74,7 @@ class Mp3CompressionPyTorch(PreprocessorPyTorch):
         )
         self.channels_first = channels_first
         self.sample_rate = sample_rate
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
@@ -80,6 +83,7 @@ class Mp3CompressionPyTorch(PreprocessorPyTorch):
             channels_first=channels_first,
             apply_fit=apply_fit,
             apply_predict=apply_predict,
+            nb_workers=nb_workers,
             verbose=verbose,
         )
 
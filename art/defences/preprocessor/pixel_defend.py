@@ -73,6 +73,9 @@ class PixelDefend(Preprocessor):
                for features.
         :param eps: Defense parameter 0-255.
         :param pixel_cnn: Pre-trained PixelCNN model.
+        :param batch_size: Number of images for which the activations of `pixel_cnn` are computed and purified at once.
+        :param apply_fit: True if applied during fitting/training.
+        :param apply_predict: True if applied during predicting.
         :param verbose: Show progress bars.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
@@ -92,47 +95,39 @@ class PixelDefend(Preprocessor):
         :param y: Labels of the sample `x`. This function does not affect them in any way.
         :return: Purified sample.
         """
+        if self.pixel_cnn is None:
+            raise ValueError("No model received for `pixel_cnn`.")
+
         # Convert into `uint8`
         original_shape = x.shape
-        if self.pixel_cnn is not None:
-            activations = self.pixel_cnn.get_activations(x, layer=-1, batch_size=self.batch_size)
+        x_uint8 = (x * 255).astype("uint8").reshape((x.shape[0], -1))
+
+        pixel_values = np.arange(256, dtype=np.int16)
+
+        # Start defence one batch of images at a time
+        nb_batches = int(np.ceil(x.shape[0] / float(self.batch_size)))
+        for batch_index in tqdm(range(nb_batches), desc="PixelDefend", disable=not self.verbose):
+            batch_index_1, batch_index_2 = batch_index * self.batch_size, (batch_index + 1) * self.batch_size
+            x_batch = x_uint8[batch_index_1:batch_index_2]
+
+            activations = self.pixel_cnn.get_activations(
+                x[batch_index_1:batch_index_2], layer=-1, batch_size=self.batch_size
+            )
             if isinstance(activations, np.ndarray):
-                probs = activations.reshape((x.shape[0], -1, 256))
+                probs = activations.reshape((x_batch.shape[0], -1, 256))
             else:
                 raise ValueError("Activations are None.")
-        else:
-            raise ValueError("No model received for `pixel_cnn`.")
 
-        x = x * 255
-        x = x.astype("uint8")
-        x = x.reshape((x.shape[0], -1))
-
-        # Start defence one image at a time
-        for i, x_i in enumerate(tqdm(x, desc="PixelDefend", disable=not self.verbose)):
-            for feat_index in range(x.shape[1]):
-                # Setup the search space
-                f_probs = probs[i, feat_index, :]
-                f_range = range(
-                    int(max(x_i[feat_index] - self.eps, 0)),
-                    int(min(x_i[feat_index] + self.eps, 255) + 1),
-                )
-
-                # Look in the search space
-                best_prob = -1
-                best_idx = -1
-                for idx in f_range:
-                    if f_probs[idx] > best_prob:
-                        best_prob = f_probs[idx]
-                        best_idx = idx
-
-                # Update result
-                x_i[feat_index] = best_idx
-
-            # Update in batch
-            x[i] = x_i
+            # Setup the search space of every feature
+            x_min = np.maximum(x_batch.astype(np.int16) - self.eps, 0)[..., np.newaxis]
+            x_max = np.minimum(x_batch.astype(np.int16) + self.eps, 255)[..., np.newaxis]
+            in_range = (pixel_values >= x_min) & (pixel_values <= x_max)
+
+            # Look for the most probable value in the search space of every feature
+            x_uint8[batch_index_1:batch_index_2] = np.argmax(np.where(in_range, probs, -np.inf), axis=2)
 
         # Convert to old dtype
-        x = x / 255.0
+        x = x_uint8 / 255.0
         x = x.astype(ART_NUMPY_DTYPE).reshape(original_shape)
 
         # Clip to clip_values
@@ -26,6 +26,7 @@ This module implements the total variance minimization defence `TotalVarMin`.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from typing import Optional, Tuple, TYPE_CHECKING
 
@@ -53,7 +54,7 @@ class TotalVarMin(Preprocessor):
         see https://arxiv.org/abs/1902.06705
     """
 
-    params = ["prob", "norm", "lamb", "solver", "max_iter", "clip_values", "verbose"]
+    params = ["prob", "norm", "lamb", "solver", "max_iter", "clip_values", "verbose", "nb_workers"]
 
     def __init__(
         self,
@@ -66,6 +67,7 @@ class TotalVarMin(Preprocessor):
         apply_fit: bool = False,
         apply_predict: bool = True,
         verbose: bool = False,
+        nb_workers: int = 1,
     ):
         """
         Create an instance of total variance minimization.
@@ -80,6 +82,7 @@ class TotalVarMin(Preprocessor):
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
         :param verbose: Show progress bars.
+        :param nb_workers: Number of worker processes minimizing the inputs in parallel.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
         self.prob = prob
@@ -89,6 +92,7 @@ class TotalVarMin(Preprocessor):
         self.max_iter = max_iter
         self.clip_values = clip_values
         self.verbose = verbose
+        self.nb_workers = nb_workers
         self._check_params()
 
     def __call__(self, x: np.ndarray, y: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
@@ -105,10 +109,20 @@ class TotalVarMin(Preprocessor):
             )
         x_preproc = x.copy()
 
-        # Minimize one input at a time
-        for i, x_i in enumerate(tqdm(x_preproc, desc="Variance minimization", disable=not self.verbose)):
-            mask = (np.random.rand(*x_i.shape) < self.prob).astype("int")
-            x_preproc[i] = self._minimize(x_i, mask)
+        # Sample all masks upfront to obtain the same results for any number of workers
+        masks = [(np.random.rand(*x_i.shape) < self.prob).astype("int") for x_i in x]
+
+        # Minimize one input at a time, in parallel processes if requested
+        if self.nb_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.nb_workers) as executor:
+                results = executor.map(self._minimize, x, masks)
+                for i, x_i in enumerate(
+                    tqdm(results, total=len(x), desc="Variance minimization", disable=not self.verbose)
+                ):
+                    x_preproc[i] = x_i
+        else:
+            for i, x_i in enumerate(tqdm(x, desc="Variance minimization", disable=not self.verbose)):
+                x_preproc[i] = self._minimize(x_i, masks[i])
 
         if self.clip_values is not None:
             np.clip(x_preproc, self.clip_values[0], self.clip_values[1], out=x_preproc)
@@ -185,10 +199,8 @@ class TotalVarMin(Preprocessor):
             z_d2_norm = np.power(np.linalg.norm(z_init[:, 1:] - z_init[:, :-1], norm, axis=0), norm - 1)
             z_d1_norm[z_d1_norm < 1e-6] = 1e-6
             z_d2_norm[z_d2_norm < 1e-6] = 1e-6
-            z_d1_norm = np.repeat(z_d1_norm[:, np.newaxis], z_init.shape[1], axis=1)
-            z_d2_norm = np.repeat(z_d2_norm[np.newaxis, :], z_init.shape[0], axis=0)
-            z_d1 = norm * np.power(z_init[1:, :] - z_init[:-1, :], norm - 1) / z_d1_norm
-            z_d2 = norm * np.power(z_init[:, 1:] - z_init[:, :-1], norm - 1) / z_d2_norm
+            z_d1 = norm * np.power(z_init[1:, :] - z_init[:-1, :], norm - 1) / z_d1_norm[:, np.newaxis]
+            z_d2 = norm * np.power(z_init[:, 1:] - z_init[:, :-1], norm - 1) / z_d2_norm[np.newaxis, :]
 
         der2 = np.zeros(z_init.shape)
         der2[:-1, :] -= z_d1
@@ -227,3 +239,6 @@ class TotalVarMin(Preprocessor):
 
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
+
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
@@ -23,21 +23,58 @@ This module implements a wrapper for video compression defence with FFmpeg.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import os
-from tempfile import TemporaryDirectory
 from typing import Optional, Tuple
 import warnings
 
 import numpy as np
 from tqdm.auto import tqdm
 
-from art import config
 from art.defences.preprocessor.preprocessor import Preprocessor
 
 logger = logging.getLogger(__name__)
 
 
+def _compress_video(x: np.ndarray, video_format: str, constant_rate_factor: int) -> np.ndarray:
+    """
+    Apply video compression to video input of shape (frames, height, width, channel) and type uint8. The video is
+    encoded and decoded by two FFmpeg processes through pipes without writing to disk.
+    """
+    import ffmpeg
+
+    _, height, width, _ = x.shape
+
+    if (height % 2) != 0 or (width % 2) != 0:
+        warnings.warn("Codec might require even number of pixels in height and width.")
+
+    # Name of the FFmpeg muxer of the video file extension, MP4 and MOV require fragments to be streamable
+    video_muxer = {"mkv": "matroska"}.get(video_format, video_format)
+    output_kwargs = {"movflags": "frag_keyframe+empty_moov"} if video_format in ["mp4", "mov"] else {}
+
+    # numpy to encoded video
+    video, _ = (
+        ffmpeg.input("pipe:", format="rawvideo", pix_fmt="rgb24", s=f"{width}x{height}")
+        .output(
+            "pipe:",
+            format=video_muxer,
+            pix_fmt="yuv420p",
+            vcodec="libx264",
+            crf=constant_rate_factor,
+            **output_kwargs,
+        )
+        .run(input=x.tobytes(), capture_stdout=True, quiet=True)
+    )
+
+    # encoded video to numpy
+    stdout, _ = (
+        ffmpeg.input("pipe:")
+        .output("pipe:", format="rawvideo", pix_fmt="rgb24")
+        .run(input=video, capture_stdout=True, quiet=True)
+    )
+    return np.frombuffer(stdout, np.uint8).reshape(x.shape)
+
+
 class VideoCompression(Preprocessor):
     """
     Implement FFmpeg wrapper for video compression defence based on H.264/MPEG-4 AVC.
@@ -46,7 +83,7 @@ class VideoCompression(Preprocessor):
     parameter. More information on the constant rate factor: https://trac.ffmpeg.org/wiki/Encode/H.264.
     """
 
-    params = ["video_format", "constant_rate_factor", "channels_first", "verbose"]
+    params = ["video_format", "constant_rate_factor", "channels_first", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -56,6 +93,7 @@ class VideoCompression(Preprocessor):
         channels_first: bool = False,
         apply_fit: bool = False,
         apply_predict: bool = True,
+        nb_workers: int = 1,
         verbose: bool = False,
     ):
         """
@@ -66,12 +104,14 @@ class VideoCompression(Preprocessor):
         :param channels_first: Set channels first or last.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param nb_workers: Number of videos compressed concurrently, each by its own pair of FFmpeg processes.
         :param verbose: Show progress bars.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
         self.video_format = video_format
         self.constant_rate_factor = constant_rate_factor
         self.channels_first = channels_first
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
@@ -84,38 +124,6 @@ class VideoCompression(Preprocessor):
         :param y: Labels of the sample `x`. This function does not affect them in any way.
         :return: Compressed sample.
         """
-
-        def compress_video(x: np.ndarray, video_format: str, constant_rate_factor: int, dir_: str = ""):
-            """
-            Apply video compression to video input of shape (frames, height, width, channel).
-            """
-            import ffmpeg
-
-            video_path = os.path.join(dir_, f"tmp_video.{video_format}")
-            _, height, width, _ = x.shape
-
-            if (height % 2) != 0 or (width % 2) != 0:
-                warnings.warn("Codec might require even number of pixels in height and width.")
-
-            # numpy to local video file
-            process = (
-                ffmpeg.input("pipe:", format="rawvideo", pix_fmt="rgb24", s=f"{width}x{height}")
-                .output(video_path, pix_fmt="yuv420p", vcodec="libx264", crf=constant_rate_factor)
-                .overwrite_output()
-                .run_async(pipe_stdin=True, quiet=True)
-            )
-            process.stdin.write(x.flatten().astype(np.uint8).tobytes())
-            process.stdin.close()
-            process.wait()
-
-            # local video file to numpy
-            stdout, _ = (
-                ffmpeg.input(video_path)
-                .output("pipe:", format="rawvideo", pix_fmt="rgb24")
-                .run(capture_stdout=True, quiet=True)
-            )
-            return np.frombuffer(stdout, np.uint8).reshape(x.shape)
-
         if x.ndim != 5:
             raise ValueError("Video compression can only be applied to spatio-temporal data.")
 
@@ -127,14 +135,15 @@ class VideoCompression(Preprocessor):
         if x.min() >= 0 and x.max() <= 1.0:
             scale = 255
 
-        x_compressed = x.copy()
-        with TemporaryDirectory(dir=config.ART_DATA_PATH) as tmp_dir:
-            for i, x_i in enumerate(tqdm(x, desc="Video compression", disable=not self.verbose)):
-                x_i *= scale
-                x_compressed[i] = compress_video(x_i, self.video_format, self.constant_rate_factor, dir_=tmp_dir)
+        def compress(x_i: np.ndarray) -> np.ndarray:
+            return _compress_video((x_i * scale).astype(np.uint8), self.video_format, self.constant_rate_factor)
 
-        x_compressed = x_compressed / scale
-        x_compressed = x_compressed.astype(x.dtype)
+        x_compressed = np.empty(x.shape, dtype=x.dtype)
+        with ThreadPoolExecutor(max_workers=self.nb_workers) as executor:
+            for i, x_i_compressed in enumerate(
+                tqdm(executor.map(compress, x), total=x.shape[0], desc="Video compression", disable=not self.verbose)
+            ):
+                x_compressed[i] = x_i_compressed / scale
 
         if self.channels_first:
             x_compressed = np.transpose(x_compressed, (0, 4, 1, 2, 3))
@@ -145,5 +154,8 @@ class VideoCompression(Preprocessor):
         if not (isinstance(self.constant_rate_factor, int) and 0 <= self.constant_rate_factor < 52):
             raise ValueError("Constant rate factor must be an integer in the range [0, 51].")
 
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -44,7 +44,7 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
     parameter. More information on the constant rate factor: https://trac.ffmpeg.org/wiki/Encode/H.264.
     """
 
-    params = ["video_format", "constant_rate_factor", "channels_first", "verbose"]
+    params = ["video_format", "constant_rate_factor", "channels_first", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -55,6 +55,7 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         apply_fit: bool = False,
         apply_predict: bool = True,
         device_type: str = "gpu",
+        nb_workers: int = 1,
         verbose: bool = False,
     ):
         """
@@ -66,6 +67,7 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
         :param device_type: Type of device on which the classifier is run, either `gpu` or `cpu`.
+        :param nb_workers: Number of videos compressed concurrently, each by its own pair of FFmpeg processes.
         :param verbose: Show progress bars.
         """
         from torch.autograd import Function
@@ -79,6 +81,7 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         self.video_format = video_format
         self.constant_rate_factor = constant_rate_factor
         self.channels_first = channels_first
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
@@ -88,6 +91,7 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
             channels_first=channels_first,
             apply_fit=apply_fit,
             apply_predict=apply_predict,
+            nb_workers=nb_workers,
             verbose=verbose,
         )
 
@@ -133,5 +137,8 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         if not (isinstance(self.constant_rate_factor, int) and 0 <= self.constant_rate_factor < 52):
             raise ValueError("Constant rate factor must be an integer in the range [0, 51].")
 
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
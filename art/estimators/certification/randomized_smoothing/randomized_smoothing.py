@@ -24,7 +24,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from abc import ABC
 import logging
-from typing import Optional, Tuple
+from typing import Tuple, Union
 
 import numpy as np
 from scipy.stats import norm
@@ -96,9 +96,8 @@ class RandomizedSmoothingMixin(ABC):
         logger.info("Applying randomized smoothing.")
         n_abstained = 0
         prediction = []
-        for x_i in tqdm(x, desc="Randomized smoothing"):
-            # get class counts
-            counts_pred = self._prediction_counts(x_i, batch_size=batch_size)
+        counts = self._prediction_counts(x, sizes=(self.sample_size,), batch_size=batch_size)
+        for counts_pred in counts[:, 0]:
             top = counts_pred.argsort()[::-1]
             count1 = np.max(counts_pred)
             count2 = counts_pred[top[1]]
@@ -154,79 +153,68 @@ class RandomizedSmoothingMixin(ABC):
         :param batch_size: Batch size.
         :return: Tuple of length 2 of the selected class and certified radius.
         """
-        prediction = []
-        radius = []
-
-        for x_i in x:
-
-            # get sample prediction for classification
-            counts_pred = self._prediction_counts(x_i, n=self.sample_size, batch_size=batch_size)
-            class_select = int(np.argmax(counts_pred))
+        # get sample predictions for classification and for certification
+        counts = self._prediction_counts(x, sizes=(self.sample_size, n), batch_size=batch_size)
+        class_select = np.argmax(counts[:, 0], axis=1)
+        count_class = counts[np.arange(x.shape[0]), 1, class_select]
 
-            # get sample prediction for certification
-            counts_est = self._prediction_counts(x_i, n=n, batch_size=batch_size)
-            count_class = counts_est[class_select]
+        prob_class = np.asarray(self._lower_confidence_bound(count_class, n))
 
-            prob_class = self._lower_confidence_bound(count_class, n)
+        is_certified = prob_class >= 0.5
+        prediction = np.where(is_certified, class_select, -1)
+        radius = np.zeros(x.shape[0])
+        radius[is_certified] = self.scale * norm.ppf(prob_class[is_certified])
 
-            if prob_class < 0.5:
-                prediction.append(-1)
-                radius.append(0.0)
-            else:
-                prediction.append(class_select)
-                radius.append(self.scale * norm.ppf(prob_class))
+        return prediction, radius
 
-        return np.array(prediction), np.array(radius)
-
-    def _noisy_samples(self, x: np.ndarray, n: Optional[int] = None) -> np.ndarray:
+    def _prediction_counts(self, x: np.ndarray, sizes: Tuple[int, ...], batch_size: int = 128) -> np.ndarray:
         """
-        Adds Gaussian noise to `x` to generate samples. Optionally augments `y` similarly.
+        Makes predictions on Gaussian noisy samples of all inputs and counts the predicted classes. For each input, the
+        numbers of samples in `sizes` are drawn one after the other and counted separately. The noisy samples of
+        consecutive inputs are streamed through a buffer of `batch_size` samples to bound memory.
 
-        :param x: Sample input with shape as expected by the model.
-        :param n: Number of noisy samples to create.
-        :return: Array of samples of the same shape as `x`.
+        :param x: Sample inputs with shape as expected by the model.
+        :param sizes: Numbers of noisy samples to create per input.
+        :param batch_size: Size of batches.
+        :return: Array of counts of shape `(nb_inputs, len(sizes), nb_classes)`.
         """
-        # set default value to sample_size
-        if n is None:
-            n = self.sample_size
+        nb_classes = self.nb_classes  # type: ignore
+        nb_sizes = len(sizes)
+        nb_segments = x.shape[0] * nb_sizes
+        segment_ends = np.cumsum(np.tile(sizes, x.shape[0]))
+        nb_samples = int(segment_ends[-1]) if nb_segments > 0 else 0
 
-        # augment x
-        x = np.expand_dims(x, axis=0)
-        x = np.repeat(x, n, axis=0)
-        x = x + np.random.normal(scale=self.scale, size=x.shape).astype(ART_NUMPY_DTYPE)
+        x_buffer = np.empty((min(batch_size, nb_samples),) + x.shape[1:], dtype=np.result_type(x, ART_NUMPY_DTYPE))
+        counts = np.zeros((nb_segments, nb_classes), dtype=int)
 
-        return x
-
-    def _prediction_counts(self, x: np.ndarray, n: Optional[int] = None, batch_size: int = 128) -> np.ndarray:
-        """
-        Makes predictions and then converts probability distribution to counts.
-
-        :param x: Sample input with shape as expected by the model.
-        :param n: Number of noisy samples to create.
-        :param batch_size: Size of batches.
-        :return: Array of counts with length equal to number of columns of `x`.
-        """
-        # sample and predict
-        x_new = self._noisy_samples(x, n=n)
-        predictions = self._predict_classifier(x=x_new, batch_size=batch_size, training_mode=False)
+        for batch_index_1 in tqdm(range(0, nb_samples, batch_size), desc="Randomized smoothing", leave=False):
+            batch_index_2 = min(batch_index_1 + batch_size, nb_samples)
+            segments = np.searchsorted(segment_ends, np.arange(batch_index_1, batch_index_2), side="right")
 
-        # convert to binary predictions
-        idx = np.argmax(predictions, axis=-1)
-        pred = np.zeros(predictions.shape)
-        pred[np.arange(pred.shape[0]), idx] = 1
+            # sample and predict
+            x_batch = x_buffer[: batch_index_2 - batch_index_1]
+            x_batch[...] = x[segments // nb_sizes]
+            x_batch += np.random.normal(scale=self.scale, size=x_batch.shape).astype(ART_NUMPY_DTYPE)
+            predictions = self._predict_classifier(x=x_batch, batch_size=batch_size, training_mode=False)
 
-        # get class counts
-        counts = np.sum(pred, axis=0)
+            # count predicted classes of the segments in this batch
+            segment_min, segment_max = segments[0], segments[-1] + 1
+            counts[segment_min:segment_max] += np.bincount(
+                (segments - segment_min) * nb_classes + np.argmax(predictions, axis=-1),
+                minlength=(segment_max - segment_min) * nb_classes,
+            ).reshape(segment_max - segment_min, -1)
 
-        return counts
+        return counts.reshape(x.shape[0], nb_sizes, nb_classes)
 
-    def _lower_confidence_bound(self, n_class_samples: int, n_total_samples: int) -> float:
+    def _lower_confidence_bound(
+        self, n_class_samples: Union[int, np.ndarray], n_total_samples: int
+    ) -> Union[float, np.ndarray]:
         """
         Uses Clopper-Pearson method to return a (1-alpha) lower confidence bound on bernoulli proportion
 
-        :param n_class_samples: Number of samples of a specific class.
+        :param n_class_samples: Number(s) of samples of a specific class.
         :param n_total_samples: Number of samples for certification.
-        :return: Lower bound on the binomial proportion w.p. (1-alpha) over samples.
+        :return: Lower bound(s) on the binomial proportion w.p. (1-alpha) over samples.
         """
         from statsmodels.stats.proportion import proportion_confint
 
@@ -7,7 +7,7 @@ from art.estimators.classification.classifier import (
     ClassGradientsMixin,
 )
 
-from art.estimators.classification.blackbox import BlackBoxClassifier, BlackBoxClassifierNeuralNetwork
+from art.estimators.classification.blackbox import BlackBoxClassifier, BlackBoxClassifierNeuralNetwork, QueryCache
 from art.estimators.classification.catboost import CatBoostARTClassifier
 from art.estimators.classification.deep_partition_ensemble import DeepPartitionEnsemble
 from art.estimators.classification.detector_classifier import DetectorClassifier
@@ -20,9 +20,13 @@ This module implements the classifier `BlackBoxClassifier` for black-box classif
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from functools import total_ordering
+from collections import OrderedDict
+import hashlib
 import logging
-from typing import Callable, List, Optional, Union, Tuple, TYPE_CHECKING
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union, Tuple, TYPE_CHECKING
+import uuid
 
 import numpy as np
 
@@ -42,7 +46,7 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
     Class for black-box classifiers.
     """
 
-    estimator_params = Classifier.estimator_params + ["nb_classes", "input_shape", "predict_fn"]
+    estimator_params = Classifier.estimator_params + ["nb_classes", "input_shape", "predict_fn", "query_cache"]
 
     def __init__(
         self,
@@ -54,6 +58,7 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         postprocessing_defences: Union["Postprocessor", List["Postprocessor"], None] = None,
         preprocessing: "PREPROCESSING_TYPE" = (0.0, 1.0),
         fuzzy_float_compare: bool = False,
+        query_cache: Optional["QueryCache"] = None,
     ):
         """
         Create a `Classifier` instance for a black-box model.
@@ -73,8 +78,10 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
                used for data preprocessing. The first value will be subtracted from the input. The input will then
                be divided by the second one.
         :param fuzzy_float_compare: If `predict_fn` is a tuple mapping inputs to labels, and this is True, looking up
-               inputs in the table will be done using `numpy.isclose`. Only set to True if really needed, since this
-               severely affects performance.
+               inputs in the table will be done using `numpy.isclose` on the nearest sample found in a KD-tree. Only
+               set to True if really needed, since this affects performance.
+        :param query_cache: Optional cache of predictions keyed by the content of the queried inputs. Inputs found in
+               the cache and duplicated inputs within a batch are not forwarded to `predict_fn`.
         """
         super().__init__(
             model=None,
@@ -87,6 +94,7 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
             self._predict_fn = predict_fn
         else:
             self._predict_fn = _make_lookup_predict_fn(predict_fn, fuzzy_float_compare)
+        self._query_cache = query_cache
         self._input_shape = input_shape
         self.nb_classes = nb_classes
 
@@ -108,6 +116,15 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         """
         return self._predict_fn  # type: ignore
 
+    @property
+    def query_cache(self) -> Optional["QueryCache"]:
+        """
+        Return the cache of predictions.
+
+        :return: The cache of predictions or `None` if predictions are not cached.
+        """
+        return self._query_cache
+
     # pylint: disable=W0221
     def predict(self, x: np.ndarray, batch_size: int = 128, **kwargs) -> np.ndarray:
         """
@@ -123,13 +140,16 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         x_preprocessed, _ = self._apply_preprocessing(x, y=None, fit=False)
 
         # Run predictions with batching
-        predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
-        for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
-            begin, end = (
-                batch_index * batch_size,
-                min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
-            )
-            predictions[begin:end] = self.predict_fn(x_preprocessed[begin:end])
+        if self._query_cache is not None:
+            predictions = self._query_cache.predict(x_preprocessed, self.predict_fn, self.nb_classes, batch_size)
+        else:
+            predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
+            for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
+                begin, end = (
+                    batch_index * batch_size,
+                    min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
+                )
+                predictions[begin:end] = self.predict_fn(x_preprocessed[begin:end])
 
         # Apply postprocessing
         predictions = self._apply_postprocessing(preds=predictions, fit=False)
@@ -170,7 +190,7 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         NeuralNetworkMixin.estimator_params
         + ClassifierMixin.estimator_params
         + BaseEstimator.estimator_params
-        + ["nb_classes", "input_shape", "predict_fn"]
+        + ["nb_classes", "input_shape", "predict_fn", "query_cache"]
     )
 
     def __init__(
@@ -184,6 +204,7 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         postprocessing_defences: Union["Postprocessor", List["Postprocessor"], None] = None,
         preprocessing: "PREPROCESSING_TYPE" = (0, 1),
         fuzzy_float_compare: bool = False,
+        query_cache: Optional["QueryCache"] = None,
     ):
         """
         Create a `Classifier` instance for a black-box model.
@@ -204,8 +225,10 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
                used for data preprocessing. The first value will be subtracted from the input. The input will then
                be divided by the second one.
         :param fuzzy_float_compare: If `predict_fn` is a tuple mapping inputs to labels, and this is True, looking up
-               inputs in the table will be done using `numpy.isclose`. Only set to True if really needed, since this
-               severely affects performance.
+               inputs in the table will be done using `numpy.isclose` on the nearest sample found in a KD-tree. Only
+               set to True if really needed, since this affects performance.
+        :param query_cache: Optional cache of predictions keyed by the content of the queried inputs. Inputs found in
+               the cache and duplicated inputs within a batch are not forwarded to `predict_fn`.
         """
         super().__init__(
             model=None,
@@ -220,6 +243,7 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
             self._predict_fn = predict_fn
         else:
             self._predict_fn = _make_lookup_predict_fn(predict_fn, fuzzy_float_compare)
+        self._query_cache = query_cache
         self._input_shape = input_shape
         self.nb_classes = nb_classes
         self._learning_phase = None
@@ -234,6 +258,15 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         """
         return self._input_shape  # type: ignore
 
+    @property
+    def query_cache(self) -> Optional["QueryCache"]:
+        """
+        Return the cache of predictions.
+
+        :return: The cache of predictions or `None` if predictions are not cached.
+        """
+        return self._query_cache
+
     def predict(self, x: np.ndarray, batch_size: int = 128, **kwargs):
         """
         Perform prediction for a batch of inputs.
@@ -248,13 +281,16 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         x_preprocessed, _ = self._apply_preprocessing(x, y=None, fit=False)
 
         # Run predictions with batching
-        predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
-        for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
-            begin, end = (
-                batch_index * batch_size,
-                min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
-            )
-            predictions[begin:end] = self._predict_fn(x_preprocessed[begin:end])
+        if self._query_cache is not None:
+            predictions = self._query_cache.predict(x_preprocessed, self._predict_fn, self.nb_classes, batch_size)
+        else:
+            predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
+            for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
+                begin, end = (
+                    batch_index * batch_size,
+                    min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
+                )
+                predictions[begin:end] = self._predict_fn(x_preprocessed[begin:end])
 
         # Apply postprocessing
         predictions = self._apply_postprocessing(preds=predictions, fit=False)
@@ -307,87 +343,300 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         raise NotImplementedError
 
 
-@total_ordering
-class FuzzyMapping:
+class QueryCache:
     """
-    Class for a sample/label pair to be used in a `SortedList`.
+    Cache of predictions for black-box classifiers keyed by the identity of the model and a hash of the content of the
+    queried inputs. Recently used predictions are kept in memory with least-recently-used eviction and can optionally
+    be persisted to an SQLite database to be reused across sessions. The cache can be shared between threads.
     """
 
-    def __init__(self, key: np.ndarray, value=None):
+    def __init__(
+        self, max_size: Optional[int] = 100000, path: Optional[str] = None, model_id: Optional[str] = None
+    ) -> None:
         """
-        Create an instance of a key/value to pair to be used in a `SortedList`.
+        Create a cache of predictions.
 
-        :param key: The sample to be matched against.
-        :param value: The mapped value.
+        :param max_size: Maximum number of predictions kept in memory. If `None`, the in-memory cache is unbounded.
+        :param path: Path of an SQLite database file to persist predictions. The database is created if it does not
+                     exist and all predictions stored in it are reused. If `None`, predictions are only kept in memory.
+        :param model_id: Name identifying the queried model. If `None`, every prediction function object is treated as
+                         a different model, and predictions persisted to `path` are only reused within the session.
         """
-        self.key = key
-        self.value = value
+        self.max_size = max_size
+        self.path = path
+        self.model_id = model_id
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._predict_fn_ids: Dict[int, Tuple[Callable, str]] = {}
+        self._check_params()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Use to ensure `QueryCache` can be pickled and copied without its database connection and lock.
 
-    def __eq__(self, other):
-        return np.all(np.isclose(self.key, other.key))
+        :return: State dictionary with instance parameters.
+        """
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_lock"] = None
+        # The identities of prediction function objects are not preserved by copies
+        state["_predict_fn_ids"] = {}
+        if self.model_id is None:
+            state["_memory"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Use to ensure `QueryCache` can be unpickled.
 
-    def __ge__(self, other):
-        # This implements >= comparison so we can use this class in a `SortedList`. The `total_ordering` decorator
-        # automatically generates the rest of the comparison magic functions based on this one
+        :param state: State dictionary with instance parameters to restore.
+        """
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
 
-        close_cells = np.isclose(self.key, other.key)
-        if np.all(close_cells):
-            return True
+    @staticmethod
+    def keys(x: np.ndarray, model_id: str = "") -> List[bytes]:
+        """
+        Compute the content hashes of a batch of inputs.
+
+        :param x: Input samples.
+        :param model_id: Identity of the queried model.
+        :return: List of hashes, one per sample.
+        """
+        x_flat = np.ascontiguousarray(x).reshape(x.shape[0], -1)
+        prefix = (model_id + "\0" + x_flat.dtype.str + str(x.shape[1:])).encode()
+        return [hashlib.blake2b(prefix + row.tobytes(), digest_size=16).digest() for row in x_flat]
+
+    def predict(self, x: np.ndarray, predict_fn: Callable, nb_classes: int, batch_size: int = 128) -> np.ndarray:
+        """
+        Perform prediction for a batch of inputs, only forwarding inputs to `predict_fn` which are neither cached nor
+        duplicates of other inputs in the batch.
+
+        :param x: Input samples.
+        :param predict_fn: Prediction function of the black-box classifier.
+        :param nb_classes: Number of prediction classes.
+        :param batch_size: Size of batches forwarded to `predict_fn`.
+        :return: Array of predictions of shape `(nb_inputs, nb_classes)`.
+        """
+        from art.config import ART_NUMPY_DTYPE
+
+        keys = self.keys(x, self._get_model_id(predict_fn))
+
+        # Deduplicate the inputs within the batch
+        unique_index: Dict[bytes, int] = {}
+        for i, key in enumerate(keys):
+            if key not in unique_index:
+                unique_index[key] = i
 
-        # If the keys are not exactly the same (up to floating-point inaccuracies), we compare the value of the first
-        # index which is not the same to decide on an ordering
+        with self._lock:
+            cached = self._get(list(unique_index.keys()))
+            missing = [i for key, i in unique_index.items() if key not in cached]
+            self.hits += x.shape[0] - len(missing)
+            self.misses += len(missing)
 
-        compare_idx = np.unravel_index(np.argmin(close_cells), shape=self.key.shape)
-        return self.key[compare_idx] >= other.key[compare_idx]
+        # Run predictions with batching for the missing inputs only
+        if missing:
+            x_missing = x[missing]
+            predictions_missing = np.zeros((len(missing), nb_classes), dtype=ART_NUMPY_DTYPE)
+            for batch_index in range(int(np.ceil(len(missing) / float(batch_size)))):
+                begin, end = batch_index * batch_size, min((batch_index + 1) * batch_size, len(missing))
+                predictions_missing[begin:end] = predict_fn(x_missing[begin:end])
+
+            missing_keys = [keys[i] for i in missing]
+            with self._lock:
+                self._put(missing_keys, predictions_missing)
+            cached.update(zip(missing_keys, predictions_missing))
+
+        return np.array([cached[key] for key in keys], dtype=ART_NUMPY_DTYPE).reshape(x.shape[0], nb_classes)
+
+    def clear(self) -> None:
+        """
+        Remove all predictions from the in-memory cache and the database, and reset the counters.
+        """
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+
+            connection = self._get_connection()
+            if connection is not None:
+                connection.execute("DELETE FROM predictions")
+                connection.commit()
+
+    def close(self) -> None:
+        """
+        Close the connection to the database. A new connection is opened by the next access to the database.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _get_model_id(self, predict_fn: Callable) -> str:
+        """
+        Return the identity of the model queried by `predict_fn`, used as prefix of the keys of its predictions.
+
+        :param predict_fn: Prediction function of the black-box classifier.
+        :return: The name of the model if provided, otherwise a token unique to the prediction function object.
+        """
+        if self.model_id is not None:
+            return self.model_id
+
+        with self._lock:
+            # The prediction function is referenced to prevent its `id` from being reused by another object
+            if id(predict_fn) not in self._predict_fn_ids:
+                self._predict_fn_ids[id(predict_fn)] = (predict_fn, uuid.uuid4().hex)
+            return self._predict_fn_ids[id(predict_fn)][1]
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """
+        Return the connection to the database, opening it on first use. Accesses are serialised by the lock of the
+        cache, which allows the connection to be shared between threads.
+
+        :return: The connection, or `None` if predictions are not persisted.
+        """
+        if self.path is not None and self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS predictions (key BLOB PRIMARY KEY, value BLOB)")
+            self._connection.commit()
+        return self._connection
+
+    def _get(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up cached predictions, first in memory and then in the database.
+
+        :param keys: Hashes of the inputs.
+        :return: Dictionary of the found predictions.
+        """
+        from art.config import ART_NUMPY_DTYPE
+
+        found = {}
+        not_in_memory = []
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+            else:
+                not_in_memory.append(key)
+
+        connection = self._get_connection()
+        if connection is not None and not_in_memory:
+            from_database = {}
+            # SQLite limits the number of parameters per query
+            for i in range(0, len(not_in_memory), 500):
+                chunk = not_in_memory[i : i + 500]
+                rows = connection.execute(
+                    f"SELECT key, value FROM predictions WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, value in rows:
+                    from_database[bytes(key)] = np.frombuffer(value, dtype=ART_NUMPY_DTYPE)
+
+            self._remember(list(from_database.keys()), list(from_database.values()))
+            found.update(from_database)
+
+        return found
+
+    def _put(self, keys: List[bytes], values: np.ndarray) -> None:
+        """
+        Store new predictions in memory and in the database.
+
+        :param keys: Hashes of the inputs.
+        :param values: Predictions of the inputs.
+        """
+        self._remember(keys, list(values))
+
+        connection = self._get_connection()
+        if connection is not None:
+            connection.executemany(
+                "INSERT OR REPLACE INTO predictions (key, value) VALUES (?, ?)",
+                [(key, value.tobytes()) for key, value in zip(keys, values)],
+            )
+            connection.commit()
+
+    def _remember(self, keys: List[bytes], values: List[np.ndarray]) -> None:
+        """
+        Store predictions in memory and evict the least recently used ones.
+
+        :param keys: Hashes of the inputs.
+        :param values: Predictions of the inputs.
+        """
+        for key, value in zip(keys, values):
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+
+        if self.max_size is not None:
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _check_params(self) -> None:
+        if self.max_size is not None and (not isinstance(self.max_size, int) or self.max_size < 0):
+            raise ValueError("The maximum size of the cache must be a non-negative integer or `None`.")
+
+        if self.model_id is not None and not isinstance(self.model_id, str):
+            raise ValueError("The model identity `model_id` must be a string or `None`.")
 
 
 def _make_lookup_predict_fn(existing_predictions: Tuple[np.ndarray, np.ndarray], fuzzy_float_compare: bool) -> Callable:
     """
-    Makes a predict_fn callback based on a table of existing predictions.
+    Makes a predict_fn callback based on a table of existing predictions. Both lookups answer a whole batch at once:
+    exact lookups run a binary search over the sorted bytes of the samples, fuzzy lookups query the nearest sample in
+    a KD-tree and verify the match with `numpy.isclose`.
 
     :param existing_predictions: Tuple of (samples, labels).
     :param fuzzy_float_compare: Look up predictions using `np.isclose`, only set to True if really needed, since this
-                                severely affects performance.
+                                affects performance.
     :return: Prediction function.
     """
 
     samples, labels = existing_predictions
+    samples = np.asarray(samples)
+    labels = np.asarray(labels)
+    samples_flat = np.ascontiguousarray(samples.reshape(samples.shape[0], -1))
 
     if fuzzy_float_compare:
-        from sortedcontainers import SortedList
+        from scipy.spatial import cKDTree
 
-        # Construct a search-tree of the predictions, using fuzzy float comparison
-        sorted_predictions = SortedList([FuzzyMapping(key, value) for key, value in zip(samples, labels)])
+        # Construct a KD-tree of the samples to find the closest sample of each query in the maximum norm
+        tree = cKDTree(samples_flat)
 
         def fuzzy_predict_fn(batch):
-            predictions = []
-            for row in batch:
-                try:
-                    match_idx = sorted_predictions.index(FuzzyMapping(row))
-                except ValueError as err:  # pragma: no cover
-                    raise ValueError("No existing prediction for queried input") from err
+            batch_flat = np.asarray(batch).reshape(batch.shape[0], -1)
+            if batch_flat.shape[1] != samples_flat.shape[1]:
+                raise ValueError("No existing prediction for queried input")
 
-                predictions.append(sorted_predictions[match_idx].value)
+            _, match_idx = tree.query(batch_flat, k=1, p=np.inf)
+            if not np.all(np.isclose(batch_flat, samples_flat[match_idx])):
+                raise ValueError("No existing prediction for queried input")
 
-            return np.array(predictions)
+            return labels[match_idx]
 
         return fuzzy_predict_fn
 
-    # Construct a dictionary to map from samples to predictions. We use the bytes of the `ndarray` as the key,
-    # because the `ndarray` itself is not hashable
-    mapping = {}
-    for x, y in zip(samples, labels):
-        mapping[x.tobytes()] = y
+    # Sort the samples by their bytes, viewing every row as a single `np.void` element. For duplicated samples, the
+    # prediction of the last occurrence is used
+    def _as_void(array: np.ndarray) -> np.ndarray:
+        return array.view(np.dtype((np.void, array.dtype.itemsize * array.shape[1]))).ravel()
+
+    samples_void = _as_void(samples_flat)
+    order = np.argsort(samples_void, kind="stable")
+    sorted_void = samples_void[order]
 
     def predict_fn(batch):
-        predictions = []
-        for row in batch:
-            row_bytes = row.tobytes()
-            if row.tobytes() not in mapping:
-                raise ValueError("No existing prediction for queried input")
+        batch_flat = np.ascontiguousarray(batch).reshape(batch.shape[0], -1)
+        if batch_flat.dtype != samples_flat.dtype or batch_flat.shape[1] != samples_flat.shape[1]:
+            raise ValueError("No existing prediction for queried input")
 
-            predictions.append(mapping[row_bytes])
+        batch_void = _as_void(batch_flat)
+        match_idx = np.searchsorted(sorted_void, batch_void, side="right") - 1
+        if np.any(match_idx < 0) or np.any(sorted_void[np.maximum(match_idx, 0)] != batch_void):
+            raise ValueError("No existing prediction for queried input")
 
-        return np.array(predictions)
+        return labels[order[match_idx]]
 
     return predict_fn
@@ -38,7 +38,7 @@ if TYPE_CHECKING:
     from art.utils import CLIP_VALUES_TYPE, PREPROCESSING_TYPE
     from art.defences.preprocessor import Preprocessor
     from art.defences.postprocessor import Postprocessor
-    from art.metrics.verification_decisions_trees import LeafNode
+    from art.metrics.verification_decisions_trees import CompiledTrees, LeafNode
 
 logger = logging.getLogger(__name__)
 
@@ -180,6 +180,83 @@ class LightGBMClassifier(ClassifierDecisionTree):
 
         return trees
 
+    def _compile_trees(self) -> "CompiledTrees":
+        """
+        Compile the decision trees directly from the model dump of the booster.
+
+        :return: Compiled decision trees.
+        """
+        from art.metrics.verification_decisions_trees import CompiledTrees
+
+        booster_dump = self._model.dump_model()["tree_info"]
+        node_arrays = [self._get_node_arrays(tree_dump["tree_structure"]) for tree_dump in booster_dump]
+        features = np.unique(
+            np.concatenate(
+                [feature[children_left != -1] for children_left, _, feature, _, _, _ in node_arrays]
+                + [np.empty(0, dtype=int)]
+            )
+        )
+        trees = []
+
+        for i_tree, (children_left, children_right, feature, threshold, value, node_id) in enumerate(node_arrays):
+            # pylint: disable=W0212
+            if self._model._Booster__num_class == 2:
+                class_label = -1
+            else:
+                class_label = i_tree % self._model._Booster__num_class
+
+            leaves, (box_size, box_feature, box_lower, box_upper) = CompiledTrees.get_leaf_boxes(
+                children_left=children_left,
+                children_right=children_right,
+                feature=np.searchsorted(features, feature),
+                threshold=threshold,
+            )
+            # Leaf nodes without index, e.g. of single-leaf trees, are not part of `get_trees` either
+            is_indexed = node_id[leaves] != -1
+            is_interval_indexed = np.repeat(is_indexed, box_size)
+            boxes = (
+                box_size[is_indexed],
+                box_feature[is_interval_indexed],
+                box_lower[is_interval_indexed],
+                box_upper[is_interval_indexed],
+            )
+            trees.append((class_label, node_id[leaves[is_indexed]], boxes, value[leaves[is_indexed]]))
+
+        return CompiledTrees.from_leaves(features, trees)
+
+    @staticmethod
+    def _get_node_arrays(
+        tree_structure: dict,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert the structure of a tree into node arrays with the root at index 0.
+
+        :param tree_structure: Structure of a tree from the model dump.
+        :return: A tuple of the left children, right children, split features, split thresholds, leaf values and leaf
+                 indices of the nodes, -1 for the leaf indices of split nodes.
+        """
+        nodes = [tree_structure]
+        children_left = []
+        children_right = []
+
+        for node in nodes:
+            if "split_index" in node:
+                children_left.append(len(nodes))
+                children_right.append(len(nodes) + 1)
+                nodes += [node["left_child"], node["right_child"]]
+            else:
+                children_left.append(-1)
+                children_right.append(-1)
+
+        return (
+            np.array(children_left, dtype=int),
+            np.array(children_right, dtype=int),
+            np.array([node.get("split_feature", -1) for node in nodes], dtype=int),
+            np.array([node.get("threshold", np.nan) for node in nodes], dtype=float),
+            np.array([node.get("leaf_value", np.nan) for node in nodes], dtype=float),
+            np.array([node.get("leaf_index", -1) for node in nodes], dtype=int),
+        )
+
     def _get_leaf_nodes(self, node, i_tree, class_label, box) -> List["LeafNode"]:
         from art.metrics.verification_decisions_trees import Box, Interval, LeafNode
 
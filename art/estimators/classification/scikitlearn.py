@@ -47,7 +47,7 @@ if TYPE_CHECKING:
     from art.utils import CLIP_VALUES_TYPE, PREPROCESSING_TYPE
     from art.defences.preprocessor import Preprocessor
     from art.defences.postprocessor import Postprocessor
-    from art.metrics.verification_decisions_trees import LeafNode, Tree
+    from art.metrics.verification_decisions_trees import CompiledTrees, LeafNode, Tree
 
 logger = logging.getLogger(__name__)
 
@@ -177,6 +177,10 @@ class ScikitlearnClassifier(ClassifierMixin, ScikitlearnEstimator):  # lgtm [py/
         self._input_shape = self._get_input_shape(self.model)
         self.nb_classes = self._get_nb_classes()
 
+        if isinstance(self, DecisionTreeMixin):
+            # Discard the trees compiled from the previous model
+            self._compiled_trees = None
+
     def predict(self, x: np.ndarray, **kwargs) -> np.ndarray:
         """
         Perform prediction for a batch of inputs.
@@ -599,6 +603,14 @@ class ScikitlearnExtraTreesClassifier(ScikitlearnClassifier, DecisionTreeMixin):
 
         return trees
 
+    def _compile_trees(self) -> "CompiledTrees":
+        """
+        Compile the decision trees directly from the node arrays of the scikit-learn trees.
+
+        :return: Compiled decision trees.
+        """
+        return _compile_forest(self.model)
+
 
 class ScikitlearnGradientBoostingClassifier(ScikitlearnClassifier, DecisionTreeMixin):
     """
@@ -673,8 +685,28 @@ class ScikitlearnGradientBoostingClassifier(ScikitlearnClassifier, DecisionTreeM
 
         return trees
 
+    def _compile_trees(self) -> "CompiledTrees":
+        """
+        Compile the decision trees directly from the node arrays of the scikit-learn trees.
+
+        :return: Compiled decision trees.
+        """
+        from art.metrics.verification_decisions_trees import CompiledTrees
+
+        num_classes = self.model.estimators_.shape[1]
+        tree_models = [decision_tree_model.tree_ for decision_tree_model in self.model.estimators_.flatten()]
+        features, leaf_boxes = _get_leaf_boxes(tree_models)
+        trees = []
+
+        for i_estimator, (tree_model, (leaves, boxes)) in enumerate(zip(tree_models, leaf_boxes)):
+            i_class = i_estimator % num_classes
+            class_label = -1 if num_classes == 2 else i_class
+            trees.append((class_label, leaves, boxes, tree_model.value[leaves, 0, 0]))
+
+        return CompiledTrees.from_leaves(features, trees)
 
-class ScikitlearnRandomForestClassifier(ScikitlearnClassifier):
+
+class ScikitlearnRandomForestClassifier(ScikitlearnClassifier, DecisionTreeMixin):
     """
     Class for scikit-learn Random Forest Classifier models.
     """
@@ -746,6 +778,14 @@ class ScikitlearnRandomForestClassifier(ScikitlearnClassifier):
 
         return trees
 
+    def _compile_trees(self) -> "CompiledTrees":
+        """
+        Compile the decision trees directly from the node arrays of the scikit-learn trees.
+
+        :return: Compiled decision trees.
+        """
+        return _compile_forest(self.model)
+
 
 class ScikitlearnLogisticRegression(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassifier):
     """
@@ -1044,170 +1084,41 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
 
         num_samples, _ = x_preprocessed.shape
 
+        if label is None:
+            labels = None
+        elif isinstance(label, int):
+            labels = np.full(num_samples, label)
+        elif (
+            (isinstance(label, list) and len(label) == num_samples)
+            or isinstance(label, np.ndarray)
+            and label.shape == (num_samples,)
+        ):
+            labels = np.asarray(label)
+        else:
+            raise TypeError("Unrecognized type for argument `label` with type " + str(type(label)))
+
         if isinstance(self.model, sklearn.svm.SVC):
             if self.model.fit_status_:  # pragma: no cover
                 raise AssertionError("Model has not been fitted correctly.")
 
-            support_indices = [0] + list(np.cumsum(self.model.n_support_))
-
             if self.nb_classes == 2:
                 sign_multiplier = -1
             else:
                 sign_multiplier = 1
 
-            if label is None:
-                gradients = np.zeros(
-                    (
-                        x_preprocessed.shape[0],
-                        self.nb_classes,
-                        x_preprocessed.shape[1],
-                    )
-                )
-
-                for i_label in range(self.nb_classes):  # type: ignore
-                    for i_sample in range(num_samples):
-                        for not_label in range(self.nb_classes):  # type: ignore
-                            if i_label != not_label:
-                                if not_label < i_label:
-                                    label_multiplier = -1
-                                else:
-                                    label_multiplier = 1
-
-                                for label_sv in range(
-                                    support_indices[i_label],
-                                    support_indices[i_label + 1],
-                                ):
-                                    alpha_i_k_y_i = self.model.dual_coef_[
-                                        not_label if not_label < i_label else not_label - 1,
-                                        label_sv,
-                                    ]
-                                    grad_kernel = self._get_kernel_gradient_sv(label_sv, x_preprocessed[i_sample])
-                                    gradients[i_sample, i_label] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-                                for not_label_sv in range(
-                                    support_indices[not_label],
-                                    support_indices[not_label + 1],
-                                ):
-                                    alpha_i_k_y_i = self.model.dual_coef_[
-                                        i_label if i_label < not_label else i_label - 1,
-                                        not_label_sv,
-                                    ]
-                                    grad_kernel = self._get_kernel_gradient_sv(not_label_sv, x_preprocessed[i_sample])
-                                    gradients[i_sample, i_label] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-            elif isinstance(label, int):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    for not_label in range(self.nb_classes):  # type: ignore
-                        if label != not_label:
-                            if not_label < label:
-                                label_multiplier = -1
-                            else:
-                                label_multiplier = 1
-
-                            for label_sv in range(support_indices[label], support_indices[label + 1]):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    not_label if not_label < label else not_label - 1,
-                                    label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-                            for not_label_sv in range(
-                                support_indices[not_label],
-                                support_indices[not_label + 1],
-                            ):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    label if label < not_label else label - 1,
-                                    not_label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(not_label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-            elif (
-                (isinstance(label, list) and len(label) == num_samples)
-                or isinstance(label, np.ndarray)
-                and label.shape == (num_samples,)
-            ):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    for not_label in range(self.nb_classes):  # type: ignore
-                        if label[i_sample] != not_label:
-                            if not_label < label[i_sample]:
-                                label_multiplier = -1
-                            else:
-                                label_multiplier = 1
-
-                            for label_sv in range(
-                                support_indices[label[i_sample]],
-                                support_indices[label[i_sample] + 1],
-                            ):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    not_label if not_label < label[i_sample] else not_label - 1,
-                                    label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-                            for not_label_sv in range(
-                                support_indices[not_label],
-                                support_indices[not_label + 1],
-                            ):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    label[i_sample] if label[i_sample] < not_label else label[i_sample] - 1,
-                                    not_label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(not_label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-            else:
-                raise TypeError("Unrecognized type for argument `label` with type " + str(type(label)))
-
+            gradients = self._get_kernel_gradient_sum(x_preprocessed, self._get_class_dual_coef(), labels)
             gradients = self._apply_preprocessing_gradient(x, gradients * sign_multiplier)
 
         elif isinstance(self.model, sklearn.svm.LinearSVC):
-            if label is None:
-                gradients = np.zeros(
-                    (
-                        x_preprocessed.shape[0],
-                        self.nb_classes,
-                        x_preprocessed.shape[1],
-                    )
-                )
-
-                for i in range(self.nb_classes):  # type: ignore
-                    for i_sample in range(num_samples):
-                        if self.nb_classes == 2:
-                            gradients[i_sample, i] = self.model.coef_[0] * (2 * i - 1)
-                        else:
-                            gradients[i_sample, i] = self.model.coef_[i]
-
-            elif isinstance(label, int):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    if self.nb_classes == 2:
-                        gradients[i_sample, 0] = self.model.coef_[0] * (2 * label - 1)
-                    else:
-                        gradients[i_sample, 0] = self.model.coef_[label]
-
-            elif (
-                (isinstance(label, list) and len(label) == num_samples)
-                or isinstance(label, np.ndarray)
-                and label.shape == (num_samples,)
-            ):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    if self.nb_classes == 2:
-                        gradients[i_sample, 0] = self.model.coef_[0] * (2 * label[i_sample] - 1)
-                    else:
-                        gradients[i_sample, 0] = self.model.coef_[label[i_sample]]
+            if self.nb_classes == 2:
+                weights = self.model.coef_[0] * np.array([[-1], [1]])
+            else:
+                weights = self.model.coef_
 
+            if labels is None:
+                gradients = np.repeat(weights[np.newaxis], num_samples, axis=0)
             else:
-                raise TypeError("Unrecognized type for argument `label` with type " + str(type(label)))
+                gradients = weights[labels][:, np.newaxis]
 
             gradients = self._apply_preprocessing_gradient(x, gradients)
 
@@ -1215,9 +1126,9 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
 
     def _kernel_grad(self, sv: np.ndarray, x_sample: np.ndarray) -> np.ndarray:
         """
-        Applies the kernel gradient to a support vector.
+        Applies the kernel gradient to a support vector or to each row of an array of support vectors.
 
-        :param sv: A support vector.
+        :param sv: A support vector or an array of support vectors.
         :param x_sample: The sample the gradient is taken with respect to.
         :return: the kernel gradient.
         """
@@ -1227,7 +1138,8 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         elif self.model.kernel == "poly":
             grad = (
                 self.model.degree
-                * (self.model._gamma * np.sum(x_sample * sv) + self.model.coef0) ** (self.model.degree - 1)
+                * (self.model._gamma * np.sum(x_sample * sv, axis=-1, keepdims=True) + self.model.coef0)
+                ** (self.model.degree - 1)
                 * sv
             )
         elif self.model.kernel == "rbf":
@@ -1235,7 +1147,7 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
                 2
                 * self.model._gamma
                 * (-1)
-                * np.exp(-self.model._gamma * np.linalg.norm(x_sample - sv, ord=2) ** 2)
+                * np.exp(-self.model._gamma * np.linalg.norm(x_sample - sv, ord=2, axis=-1, keepdims=True) ** 2)
                 * (x_sample - sv)
             )
         elif self.model.kernel == "sigmoid":
@@ -1255,6 +1167,100 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         x_i = self.model.support_vectors_[i_sv, :]
         return self._kernel_grad(x_i, x_sample)
 
+    def _get_kernel_gradient_sum(
+        self, x: np.ndarray, coefficients: np.ndarray, labels: Optional[np.ndarray] = None, max_size: int = 2 ** 22
+    ) -> np.ndarray:
+        """
+        Compute the sums of the kernel gradients of all support vectors weighted by coefficients for a batch of samples.
+        The samples are processed in chunks to bound the memory of the intermediate arrays.
+
+        :param x: Samples of shape `(nb_samples, nb_features)`.
+        :param coefficients: Weights of the support vectors per output of shape `(nb_outputs, nb_support_vectors)`.
+        :param labels: Index of the output for each sample of shape `(nb_samples,)`. If `None`, the gradients of all
+                       outputs are computed for each sample.
+        :param max_size: Maximum number of elements of the weights of a chunk.
+        :return: Array of gradients of shape `(nb_samples, nb_outputs, nb_features)`, or `(nb_samples, 1, nb_features)`
+                 if `labels` is provided.
+        """
+        # pylint: disable=W0212
+        if self.model.kernel not in ["linear", "poly", "rbf"]:
+            raise NotImplementedError(f"Loss gradients for kernel '{self.model.kernel}' are not implemented.")
+
+        support_vectors = self.model.support_vectors_
+        nb_outputs = coefficients.shape[0] if labels is None else 1
+        gradients = np.zeros((x.shape[0], nb_outputs, x.shape[1]))
+        chunk_size = max(1, max_size // (nb_outputs * support_vectors.shape[0]))
+
+        for chunk_index_1 in range(0, x.shape[0], chunk_size):
+            chunk_index_2 = chunk_index_1 + chunk_size
+            x_chunk = x[chunk_index_1:chunk_index_2]
+            if labels is None:
+                weights = coefficients[np.newaxis]
+            else:
+                weights = coefficients[labels[chunk_index_1:chunk_index_2]][:, np.newaxis]
+
+            if self.model.kernel == "linear":
+                gradients[chunk_index_1:chunk_index_2] = np.matmul(weights, support_vectors)
+            elif self.model.kernel == "poly":
+                scale = self.model.degree * (
+                    self.model._gamma * np.matmul(x_chunk, support_vectors.T) + self.model.coef0
+                ) ** (self.model.degree - 1)
+                gradients[chunk_index_1:chunk_index_2] = np.matmul(weights * scale[:, np.newaxis], support_vectors)
+            else:
+                squared_distances = (
+                    np.sum(x_chunk ** 2, axis=1, keepdims=True)
+                    - 2 * np.matmul(x_chunk, support_vectors.T)
+                    + np.sum(support_vectors ** 2, axis=1)
+                )
+                kernel = np.exp(-self.model._gamma * np.maximum(squared_distances, 0))
+                weights = weights * kernel[:, np.newaxis]
+                gradients[chunk_index_1:chunk_index_2] = (
+                    2
+                    * self.model._gamma
+                    * (
+                        np.matmul(weights, support_vectors)
+                        - np.sum(weights, axis=2, keepdims=True) * x_chunk[:, np.newaxis]
+                    )
+                )
+
+        return gradients
+
+    def _get_class_dual_coef(self, loss: bool = False) -> np.ndarray:
+        """
+        Combine the dual coefficients of the one-vs-one classifiers into weights of the support vectors per class. The
+        gradient of the output of a class is the sum of the kernel gradients of all support vectors weighted by the
+        dual coefficients of the classifiers between this class and each other class.
+
+        :param loss: If `True`, the support vectors of the other class are weighted by the coefficients of the row of
+                     the other class, as used by `loss_gradient`.
+        :return: Array of weights of shape `(nb_classes, nb_support_vectors)`.
+        """
+        support_indices = [0] + list(np.cumsum(self.model.n_support_))
+        coefficients = np.zeros((self.nb_classes, support_indices[-1]))
+
+        for i_label in range(self.nb_classes):  # type: ignore
+            label_svs = slice(support_indices[i_label], support_indices[i_label + 1])
+            for not_label in range(self.nb_classes):  # type: ignore
+                if i_label != not_label:
+                    not_label_svs = slice(support_indices[not_label], support_indices[not_label + 1])
+                    if not_label < i_label:
+                        label_multiplier = -1
+                        i_not_label_i = not_label
+                        i_label_i = i_label - 1
+                    else:
+                        label_multiplier = 1
+                        i_not_label_i = not_label - 1
+                        i_label_i = i_label
+
+                    coefficients[i_label, label_svs] += (
+                        label_multiplier * self.model.dual_coef_[i_not_label_i, label_svs]
+                    )
+                    coefficients[i_label, not_label_svs] += (
+                        label_multiplier * self.model.dual_coef_[i_not_label_i if loss else i_label_i, not_label_svs]
+                    )
+
+        return coefficients
+
     def loss_gradient(self, x: np.ndarray, y: np.ndarray, **kwargs) -> np.ndarray:
         """
         Compute the gradient of the loss function w.r.t. `x`.
@@ -1273,7 +1279,6 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         # Apply preprocessing
         x_preprocessed, y_preprocessed = self._apply_preprocessing(x, y, fit=False)
 
-        num_samples, _ = x_preprocessed.shape
         gradients = np.zeros_like(x_preprocessed)
         y_index = np.argmax(y_preprocessed, axis=1)
 
@@ -1287,51 +1292,16 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
             else:
                 sign_multiplier = -1
 
-            i_not_label_i = None
-            label_multiplier = None
-            support_indices = [0] + list(np.cumsum(self.model.n_support_))
-
-            for i_sample in range(num_samples):
-                i_label = y_index[i_sample]
-
-                for i_not_label in range(self.nb_classes):  # type: ignore
-                    if i_label != i_not_label:
-                        if i_not_label < i_label:
-                            i_not_label_i = i_not_label
-                            label_multiplier = -1
-                        elif i_not_label > i_label:
-                            i_not_label_i = i_not_label - 1
-                            label_multiplier = 1
-
-                        for i_label_sv in range(support_indices[i_label], support_indices[i_label + 1]):
-                            alpha_i_k_y_i = self.model.dual_coef_[i_not_label_i, i_label_sv] * label_multiplier
-                            grad_kernel = self._get_kernel_gradient_sv(i_label_sv, x_preprocessed[i_sample])
-                            gradients[i_sample, :] += sign_multiplier * alpha_i_k_y_i * grad_kernel
-
-                        for i_not_label_sv in range(
-                            support_indices[i_not_label],
-                            support_indices[i_not_label + 1],
-                        ):
-                            alpha_i_k_y_i = self.model.dual_coef_[i_not_label_i, i_not_label_sv] * label_multiplier
-                            grad_kernel = self._get_kernel_gradient_sv(i_not_label_sv, x_preprocessed[i_sample])
-                            gradients[i_sample, :] += sign_multiplier * alpha_i_k_y_i * grad_kernel
+            coefficients = self._get_class_dual_coef(loss=True)
+            gradients[:] = sign_multiplier * self._get_kernel_gradient_sum(x_preprocessed, coefficients, y_index)[:, 0]
 
         elif isinstance(self.model, sklearn.svm.LinearSVC):
-            for i_sample in range(num_samples):
-                i_label = y_index[i_sample]
-                if self.nb_classes == 2:
-                    i_label_i = 0
-                    if i_label == 0:
-                        label_multiplier = 1
-                    elif i_label == 1:
-                        label_multiplier = -1
-                    else:
-                        raise ValueError("Label index not recognized because it is not 0 or 1.")
-                else:
-                    i_label_i = i_label
-                    label_multiplier = -1
-
-                gradients[i_sample] = label_multiplier * self.model.coef_[i_label_i]
+            if self.nb_classes == 2:
+                if np.any(y_index > 1):
+                    raise ValueError("Label index not recognized because it is not 0 or 1.")
+                gradients[:] = (1 - 2 * y_index)[:, np.newaxis] * self.model.coef_[0]
+            else:
+                gradients[:] = -self.model.coef_[y_index]
         else:
             raise TypeError("Model not recognized.")
 
@@ -1385,10 +1355,7 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         y_col = self.model.predict(cols)
         y_row[y_row == 0] = -1
         y_col[y_col == 0] = -1
-        q_rc = np.zeros(submatrix_shape)
-        for row in range(q_rc.shape[0]):
-            for col in range(q_rc.shape[1]):
-                q_rc[row][col] = self._kernel([rows[row]], [cols[col]])[0][0] * y_row[row] * y_col[col]
+        q_rc = np.asarray(self._kernel(rows, cols)).reshape(submatrix_shape) * y_row[:, np.newaxis] * y_col
 
         return q_rc
 
@@ -1417,3 +1384,58 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
 
 
 ScikitlearnLinearSVC = ScikitlearnSVC
+
+
+def _compile_forest(
+    model: Union["sklearn.ensemble.RandomForestClassifier", "sklearn.ensemble.ExtraTreesClassifier"]
+) -> "CompiledTrees":
+    """
+    Compile the decision trees of a scikit-learn forest, which contribute their normalized leaf values to every class.
+
+    :param model: A fitted scikit-learn Random Forest or Extra Trees Classifier model.
+    :return: Compiled decision trees.
+    """
+    from art.metrics.verification_decisions_trees import CompiledTrees
+
+    tree_models = [decision_tree_model.tree_ for decision_tree_model in model.estimators_]
+    features, leaf_boxes = _get_leaf_boxes(tree_models)
+    trees = []
+
+    for tree_model, (leaves, boxes) in zip(tree_models, leaf_boxes):
+        values = np.array([tree_model.value[leaf] / np.linalg.norm(tree_model.value[leaf]) for leaf in leaves])
+
+        # The trees of all classes share the boxes of the estimator
+        for i_class in range(model.n_classes_):
+            trees.append((i_class, leaves, boxes, values[:, 0, i_class]))
+
+    return CompiledTrees.from_leaves(features, trees)
+
+
+def _get_leaf_boxes(
+    tree_models: list,
+) -> Tuple[np.ndarray, List[Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]]]:
+    """
+    Determine the bounding boxes of the leaf nodes of scikit-learn trees over the features used by any of the trees.
+
+    :param tree_models: A list of the `tree_` attributes of scikit-learn decision trees.
+    :return: A tuple of the used features and a list of tuples of the node IDs and boxes of the leaf nodes of each tree
+             as returned by `CompiledTrees.get_leaf_boxes`.
+    """
+    from art.metrics.verification_decisions_trees import CompiledTrees
+
+    features = np.unique(
+        np.concatenate(
+            [tree_model.feature[tree_model.children_left != -1] for tree_model in tree_models]
+            + [np.empty(0, dtype=int)]
+        )
+    )
+    leaf_boxes = [
+        CompiledTrees.get_leaf_boxes(
+            children_left=tree_model.children_left,
+            children_right=tree_model.children_right,
+            feature=np.searchsorted(features, tree_model.feature),
+            threshold=tree_model.threshold,
+        )
+        for tree_model in tree_models
+    ]
+    return features, leaf_boxes
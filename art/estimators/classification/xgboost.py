@@ -40,7 +40,7 @@ if TYPE_CHECKING:
     from art.utils import CLIP_VALUES_TYPE, PREPROCESSING_TYPE
     from art.defences.preprocessor import Preprocessor
     from art.defences.postprocessor import Postprocessor
-    from art.metrics.verification_decisions_trees import LeafNode, Tree
+    from art.metrics.verification_decisions_trees import CompiledTrees, LeafNode, Tree
 
 logger = logging.getLogger(__name__)
 
@@ -222,6 +222,79 @@ class XGBoostClassifier(ClassifierDecisionTree):
 
         return trees
 
+    def _compile_trees(self) -> "CompiledTrees":
+        """
+        Compile the decision trees directly from the JSON dump of the booster.
+
+        :return: Compiled decision trees.
+        """
+        from art.metrics.verification_decisions_trees import CompiledTrees
+
+        booster_dump = self._model.get_booster().get_dump(dump_format="json")
+        node_arrays = [self._get_node_arrays(json.loads(tree_dump)) for tree_dump in booster_dump]
+        features = np.unique(
+            np.concatenate(
+                [feature[children_left != -1] for children_left, _, feature, _, _, _ in node_arrays]
+                + [np.empty(0, dtype=int)]
+            )
+        )
+        trees = []
+
+        for i_tree, (children_left, children_right, feature, threshold, value, node_id) in enumerate(node_arrays):
+            if self._model.n_classes_ == 2:
+                class_label = -1
+            else:
+                class_label = i_tree % self._model.n_classes_
+
+            leaves, boxes = CompiledTrees.get_leaf_boxes(
+                children_left=children_left,
+                children_right=children_right,
+                feature=np.searchsorted(features, feature),
+                threshold=threshold,
+            )
+            trees.append((class_label, node_id[leaves], boxes, value[leaves]))
+
+        return CompiledTrees.from_leaves(features, trees)
+
+    @staticmethod
+    def _get_node_arrays(
+        tree_json: dict,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert the JSON dump of a tree into node arrays with the root at index 0.
+
+        :param tree_json: JSON dump of a tree.
+        :return: A tuple of the left children, right children, split features, split thresholds, leaf values and node
+                 IDs of the nodes.
+        """
+        nodes = [tree_json]
+        children_left = []
+        children_right = []
+
+        for node in nodes:
+            if "children" in node:
+                if node["children"][0]["nodeid"] == node["yes"] and node["children"][1]["nodeid"] == node["no"]:
+                    node_left, node_right = node["children"]
+                elif node["children"][1]["nodeid"] == node["yes"] and node["children"][0]["nodeid"] == node["no"]:
+                    node_right, node_left = node["children"]
+                else:
+                    raise ValueError
+                children_left.append(len(nodes))
+                children_right.append(len(nodes) + 1)
+                nodes += [node_left, node_right]
+            else:
+                children_left.append(-1)
+                children_right.append(-1)
+
+        return (
+            np.array(children_left, dtype=int),
+            np.array(children_right, dtype=int),
+            np.array([int(node["split"][1:]) if "children" in node else -1 for node in nodes], dtype=int),
+            np.array([node.get("split_condition", np.nan) for node in nodes], dtype=float),
+            np.array([node.get("leaf", np.nan) for node in nodes], dtype=float),
+            np.array([node["nodeid"] for node in nodes], dtype=int),
+        )
+
     def _get_leaf_nodes(self, node, i_tree, class_label, box) -> List["LeafNode"]:
         from art.metrics.verification_decisions_trees import LeafNode, Box, Interval
 
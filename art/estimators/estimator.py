@@ -30,7 +30,7 @@ if TYPE_CHECKING:
     # pylint: disable=R0401
     from art.utils import CLIP_VALUES_TYPE, PREPROCESSING_TYPE
     from art.data_generators import DataGenerator
-    from art.metrics.verification_decisions_trees import Tree
+    from art.metrics.verification_decisions_trees import CompiledTrees, Tree
     from art.defences.postprocessor.postprocessor import Postprocessor
     from art.defences.preprocessor.preprocessor import Preprocessor
 
@@ -527,3 +527,24 @@ class DecisionTreeMixin(ABC):
         :return: A list of decision trees.
         """
         raise NotImplementedError
+
+    def get_compiled_trees(self) -> "CompiledTrees":
+        """
+        Get the decision trees compiled into arrays of the bounding boxes and values of their leaf nodes. The compiled
+        trees are built at the first call and cached on the estimator.
+
+        :return: Compiled decision trees.
+        """
+        if getattr(self, "_compiled_trees", None) is None:
+            self._compiled_trees = self._compile_trees()
+        return self._compiled_trees
+
+    def _compile_trees(self) -> "CompiledTrees":
+        """
+        Compile the decision trees, by default from the trees returned by `get_trees`.
+
+        :return: Compiled decision trees.
+        """
+        from art.metrics.verification_decisions_trees import CompiledTrees
+
+        return CompiledTrees.from_trees(self.get_trees())
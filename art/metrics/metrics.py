@@ -374,6 +374,110 @@ def clever_t(
     return score
 
 
+def clever_batch(
+    classifier: "CLASSIFIER_CLASS_LOSS_GRADIENTS_TYPE",
+    x: np.ndarray,
+    nb_batches: int,
+    batch_size: int,
+    radius: float,
+    norm: int,
+    target: Union[int, List[int], None] = None,
+    c_init: float = 1.0,
+    pool_factor: int = 10,
+    verbose: bool = True,
+) -> np.ndarray:
+    """
+    Compute CLEVER scores for a batch of input samples and multiple target classes. For every sample a single pool of
+    random examples is drawn and the gradients of all classes are computed once on this pool, the Weibull distribution
+    of every target class is then fitted from the shared pool of gradient norms.
+
+    | Paper link: https://arxiv.org/abs/1801.10578
+
+    :param classifier: A trained model.
+    :param x: Input samples of shape `(nb_samples, ...)`.
+    :param nb_batches: Number of repetitions of the estimate.
+    :param batch_size: Number of random examples to sample per batch.
+    :param radius: Radius of the maximum perturbation.
+    :param norm: Current support: 1, 2, np.inf.
+    :param target: Class or classes to target. If `None`, targets all classes.
+    :param c_init: Initialization of Weibull distribution.
+    :param pool_factor: The factor to create a pool of random samples with size pool_factor x n_s.
+    :param verbose: Show progress bars.
+    :return: CLEVER scores of shape `(nb_samples, nb_targets)`. The score of a target class equal to the predicted
+             class of a sample is `np.nan`.
+    """
+    # Check if pool_factor is smaller than 1
+    if pool_factor < 1:  # pragma: no cover
+        raise ValueError("The `pool_factor` must be larger than 1.")
+
+    # Change norm since q = p / (p-1)
+    if norm == 1:
+        norm_grad = np.inf
+    elif norm == np.inf:
+        norm_grad = 1
+    elif norm == 2:
+        norm_grad = 2
+    else:  # pragma: no cover
+        raise ValueError(f"Norm {norm} not supported")
+
+    if target is None:
+        target_classes = np.arange(classifier.nb_classes)
+    elif isinstance(target, (int, np.integer)):
+        target_classes = np.array([target])
+    else:
+        # Assume it's iterable
+        target_classes = np.array(target)
+
+    # Find the predicted classes and function values of all samples first
+    y_pred = classifier.predict(x, batch_size=batch_size)
+    pred_classes = np.argmax(y_pred, axis=1)
+
+    dim = reduce(lambda x_, y: x_ * y, x.shape[1:], 1)
+    nb_pool = pool_factor * batch_size
+    scores = np.full((x.shape[0], target_classes.shape[0]), np.nan)
+
+    for i in tqdm(range(x.shape[0]), desc="CLEVER", disable=not verbose):
+        pred_class = pred_classes[i]
+
+        # Generate a pool of samples shared by all target classes
+        rand_pool = np.reshape(
+            random_sphere(nb_points=nb_pool, nb_dims=dim, radius=radius, norm=norm), (nb_pool,) + x.shape[1:]
+        )
+        rand_pool += x[i]
+        rand_pool = rand_pool.astype(ART_NUMPY_DTYPE)
+        if hasattr(classifier, "clip_values") and classifier.clip_values is not None:
+            np.clip(rand_pool, classifier.clip_values[0], classifier.clip_values[1], out=rand_pool)
+
+        # Compute the gradients of all classes for all samples in rand_pool
+        rand_pool_grads = np.zeros((nb_pool, target_classes.shape[0]))
+        for j in range(int(np.ceil(nb_pool / batch_size))):
+            rand_pool_batch = rand_pool[j * batch_size : (j + 1) * batch_size]
+            grads = classifier.class_gradient(rand_pool_batch, label=None)
+
+            if np.isnan(grads).any():  # pragma: no cover
+                raise Exception("The classifier results NaN gradients.")
+
+            grads = np.reshape(grads, (grads.shape[0], grads.shape[1], -1))
+            grad = grads[:, [pred_class]] - grads[:, target_classes]
+            rand_pool_grads[j * batch_size : (j + 1) * batch_size] = np.linalg.norm(grad, ord=norm_grad, axis=2)
+
+        # Random selection of gradients for all batches
+        grad_norm_set = np.max(rand_pool_grads[np.random.choice(nb_pool, (nb_batches, batch_size))], axis=1)
+
+        # Compute scores for every target class
+        for k, target_class in enumerate(target_classes):
+            if target_class == pred_class:
+                continue
+
+            # Maximum likelihood estimation for max gradient norms
+            [_, loc, _] = weibull_min.fit(-grad_norm_set[:, k], c_init, optimizer=scipy_optimizer)
+
+            value = y_pred[i, pred_class] - y_pred[i, target_class]
+            scores[i, k] = np.min([-value / loc, radius])
+
+    return scores
+
+
 def wasserstein_distance(
     u_values: np.ndarray,
     v_values: np.ndarray,
@@ -20,11 +20,13 @@ This module implements robustness verifications for decision-tree-based models.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import logging
-from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
-from tqdm.auto import trange
+from tqdm.auto import tqdm
 
 if TYPE_CHECKING:
     from art.estimators.classification.classifier import ClassifierDecisionTree
@@ -37,6 +39,8 @@ class Interval:
     Representation of an intervals bound.
     """
 
+    __slots__ = ("lower_bound", "upper_bound")
+
     def __init__(self, lower_bound: float, upper_bound: float) -> None:
         """
         An interval of a feature.
@@ -53,6 +57,8 @@ class Box:
     Representation of a box of intervals bounds.
     """
 
+    __slots__ = ("intervals",)
+
     def __init__(self, intervals: Optional[Dict[int, Interval]] = None) -> None:
         """
         A box of intervals.
@@ -115,6 +121,8 @@ class LeafNode:
     Representation of a leaf node of a decision tree.
     """
 
+    __slots__ = ("tree_id", "class_label", "node_id", "box", "value")
+
     def __init__(
         self,
         tree_id: Optional[int],
@@ -148,6 +156,8 @@ class Tree:
     Representation of a decision tree.
     """
 
+    __slots__ = ("class_id", "leaf_nodes")
+
     def __init__(self, class_id: Optional[int], leaf_nodes: List[LeafNode]) -> None:
         """
         Create a decision tree representation.
@@ -159,6 +169,274 @@ class Tree:
         self.leaf_nodes = leaf_nodes
 
 
+class CompiledTrees:
+    """
+    Representation of decision trees as arrays of the bounding boxes and values of their leaf nodes. The leaf nodes of
+    all trees are stored one tree after the other. Each box stores only the intervals of the features on the path to
+    its leaf nodes and trees with the same leaf boxes, e.g. the trees of a forest contributing to different classes,
+    share their boxes.
+    """
+
+    __slots__ = (
+        "features",
+        "box_offset",
+        "box_feature",
+        "box_lower",
+        "box_upper",
+        "leaf_box",
+        "leaf_value",
+        "leaf_node",
+        "tree_class",
+        "tree_size",
+    )
+
+    def __init__(
+        self,
+        features: np.ndarray,
+        box_offset: np.ndarray,
+        box_feature: np.ndarray,
+        box_lower: np.ndarray,
+        box_upper: np.ndarray,
+        leaf_box: np.ndarray,
+        leaf_value: np.ndarray,
+        leaf_node: np.ndarray,
+        tree_class: np.ndarray,
+        tree_size: np.ndarray,
+    ) -> None:
+        """
+        Create a compiled representation of decision trees.
+
+        :param features: Indices of the features used by the trees of shape `(nb_features,)`.
+        :param box_offset: Offsets of the intervals of the boxes of shape `(nb_boxes + 1,)`, the intervals of box `i`
+                           are stored from `box_offset[i]` to `box_offset[i + 1]`.
+        :param box_feature: Indices of the bounded features of the intervals in `features` of shape `(nb_intervals,)`,
+                            in ascending order within each box.
+        :param box_lower: Lower bounds of the intervals of shape `(nb_intervals,)`, `-np.inf` if unbounded.
+        :param box_upper: Upper bounds of the intervals of shape `(nb_intervals,)`, `np.inf` if unbounded.
+        :param leaf_box: Indices of the boxes of the leaf nodes of shape `(nb_leaves,)`.
+        :param leaf_value: Prediction values at the leaf nodes of shape `(nb_leaves,)`.
+        :param leaf_node: IDs of the leaf nodes in their trees of shape `(nb_leaves,)`.
+        :param tree_class: IDs of the classes to which the trees contribute of shape `(nb_trees,)`, -1 for no class.
+        :param tree_size: Numbers of leaf nodes of the trees of shape `(nb_trees,)`.
+        """
+        self.features = features
+        self.box_offset = box_offset
+        self.box_feature = box_feature
+        self.box_lower = box_lower
+        self.box_upper = box_upper
+        self.leaf_box = leaf_box
+        self.leaf_value = leaf_value
+        self.leaf_node = leaf_node
+        self.tree_class = tree_class
+        self.tree_size = tree_size
+
+    @property
+    def leaf_class(self) -> np.ndarray:
+        """
+        Return the IDs of the classes to which the leaf nodes contribute, -1 for no class.
+        """
+        return np.repeat(self.tree_class, self.tree_size)
+
+    @property
+    def tree_leaves(self) -> List[np.ndarray]:
+        """
+        Return the indices of the leaf nodes of each tree.
+        """
+        tree_ends = np.cumsum(self.tree_size)
+        return [np.arange(end - size, end) for size, end in zip(self.tree_size, tree_ends)]
+
+    def get_boxes(self, leaves: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the boxes of leaf nodes.
+
+        :param leaves: Indices of the leaf nodes.
+        :return: The boxes of the leaf nodes as a tuple of the numbers of intervals of each box and the features, lower
+                 bounds and upper bounds of the intervals.
+        """
+        boxes = self.leaf_box[leaves]
+        box_start = self.box_offset[boxes]
+        box_size = self.box_offset[boxes + 1] - box_start
+        intervals = np.repeat(box_start - np.cumsum(box_size) + box_size, box_size) + np.arange(np.sum(box_size))
+
+        return box_size, self.box_feature[intervals], self.box_lower[intervals], self.box_upper[intervals]
+
+    @staticmethod
+    def get_dense_bounds(
+        boxes: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], features: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Determine the dense bounds of boxes over a set of features.
+
+        :param boxes: Boxes as a tuple of the numbers of intervals of each box and the features, lower bounds and upper
+                      bounds of the intervals.
+        :param features: Sorted features including all features of the intervals of the boxes.
+        :return: A tuple of the lower and upper bounds of the boxes of shape `(nb_boxes, len(features))`.
+        """
+        box_size, box_feature, box_lower, box_upper = boxes
+        rows = np.repeat(np.arange(len(box_size)), box_size)
+        columns = np.searchsorted(features, box_feature)
+
+        lower = np.full((len(box_size), len(features)), -np.inf)
+        upper = np.full((len(box_size), len(features)), np.inf)
+        lower[rows, columns] = box_lower
+        upper[rows, columns] = box_upper
+
+        return lower, upper
+
+    @classmethod
+    def from_leaves(
+        cls,
+        features: np.ndarray,
+        trees: List[Tuple[int, np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]],
+    ) -> "CompiledTrees":
+        """
+        Create a compiled representation from the leaf nodes of each tree. Trees with equal leaf boxes share them.
+
+        :param features: Indices of the features used by the trees.
+        :param trees: List of tuples of the class ID, the leaf node IDs, the leaf boxes as returned by
+                      `get_leaf_boxes` and the values of the leaf nodes of each tree.
+        :return: Compiled trees.
+        """
+        box_groups: Dict[Tuple[bytes, ...], int] = {}
+        boxes: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        leaf_box = []
+        nb_boxes = 0
+
+        for _, _, tree_boxes, _ in trees:
+            key = tuple(np.asarray(array).tobytes() for array in tree_boxes)
+            if key not in box_groups:
+                box_groups[key] = nb_boxes
+                boxes.append(tree_boxes)
+                nb_boxes += len(tree_boxes[0])
+            leaf_box.append(np.arange(box_groups[key], box_groups[key] + len(tree_boxes[0])))
+
+        box_size = np.concatenate([tree_boxes[0] for tree_boxes in boxes] + [np.empty(0, dtype=int)])
+        return cls(
+            features=np.asarray(features, dtype=int),
+            box_offset=np.concatenate([[0], np.cumsum(box_size)]).astype(int),
+            box_feature=np.concatenate([tree_boxes[1] for tree_boxes in boxes] + [np.empty(0, dtype=int)]).astype(int),
+            box_lower=np.concatenate([tree_boxes[2] for tree_boxes in boxes] + [np.empty(0)]).astype(float),
+            box_upper=np.concatenate([tree_boxes[3] for tree_boxes in boxes] + [np.empty(0)]).astype(float),
+            leaf_box=np.concatenate(leaf_box + [np.empty(0, dtype=int)]).astype(int),
+            leaf_value=np.concatenate([tree[3] for tree in trees] + [np.empty(0)]).astype(float),
+            leaf_node=np.concatenate([tree[1] for tree in trees] + [np.empty(0, dtype=int)]).astype(int),
+            tree_class=np.array([tree[0] for tree in trees], dtype=int),
+            tree_size=np.array([len(tree[1]) for tree in trees], dtype=int),
+        )
+
+    @classmethod
+    def from_trees(cls, trees: List[Tree]) -> "CompiledTrees":
+        """
+        Create a compiled representation from decision trees.
+
+        :param trees: A list of decision trees.
+        :return: Compiled trees.
+        """
+        features = np.array(
+            sorted({feature for tree in trees for leaf_node in tree.leaf_nodes for feature in leaf_node.box.intervals}),
+            dtype=int,
+        )
+        feature_index = {feature: i for i, feature in enumerate(features)}
+
+        compiled_trees = []
+        for tree in trees:
+            box_size, box_feature, box_lower, box_upper = [], [], [], []
+            for leaf_node in tree.leaf_nodes:
+                intervals = sorted(leaf_node.box.intervals.items())
+                box_size.append(len(intervals))
+                for feature, interval in intervals:
+                    box_feature.append(feature_index[feature])
+                    box_lower.append(interval.lower_bound)
+                    box_upper.append(interval.upper_bound)
+
+            compiled_trees.append(
+                (
+                    -1 if tree.class_id is None else tree.class_id,
+                    np.array([-1 if leaf_node.node_id is None else leaf_node.node_id for leaf_node in tree.leaf_nodes]),
+                    (
+                        np.array(box_size, dtype=int),
+                        np.array(box_feature, dtype=int),
+                        np.array(box_lower, dtype=float),
+                        np.array(box_upper, dtype=float),
+                    ),
+                    np.array([leaf_node.value for leaf_node in tree.leaf_nodes]),
+                )
+            )
+
+        return cls.from_leaves(features, compiled_trees)
+
+    @staticmethod
+    def get_leaf_boxes(
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+    ) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Determine the bounding boxes of the leaf nodes of a binary decision tree stored as node arrays with the root at
+        index 0. The samples with feature values below the threshold of a node follow the left child.
+
+        :param children_left: Indices of the left children of the nodes, -1 for leaf nodes.
+        :param children_right: Indices of the right children of the nodes, -1 for leaf nodes.
+        :param feature: Indices of the split features of the nodes in the compiled features.
+        :param threshold: Split thresholds of the nodes.
+        :return: A tuple of the indices of the leaf nodes, ordered depth first from left to right, and their boxes as a
+                 tuple of the numbers of intervals of each box and the features, lower bounds and upper bounds of the
+                 intervals.
+        """
+        leaves: List[int] = []
+        box_size: List[int] = []
+        box_feature: List[int] = []
+        box_lower: List[float] = []
+        box_upper: List[float] = []
+
+        stack: List[Tuple[int, Dict[int, Tuple[float, float]]]] = [(0, {})]
+        while stack:
+            node, intervals = stack.pop()
+            node_left, node_right = children_left[node], children_right[node]
+            if node_left == -1:
+                leaves.append(node)
+                box_size.append(len(intervals))
+                for node_feature in sorted(intervals):
+                    box_feature.append(node_feature)
+                    box_lower.append(intervals[node_feature][0])
+                    box_upper.append(intervals[node_feature][1])
+                continue
+
+            node_feature = int(feature[node])
+            lower, upper = intervals.get(node_feature, (-np.inf, np.inf))
+            intervals_left = {**intervals, node_feature: (lower, min(upper, threshold[node]))}
+            intervals_right = {**intervals, node_feature: (max(lower, threshold[node]), upper)}
+
+            stack.extend(((node_right, intervals_right), (node_left, intervals_left)))
+
+        return np.array(leaves, dtype=int), (
+            np.array(box_size, dtype=int),
+            np.array(box_feature, dtype=int),
+            np.array(box_lower, dtype=float),
+            np.array(box_upper, dtype=float),
+        )
+
+    def save(self, filename: str) -> None:
+        """
+        Save the compiled trees to a `.npz` file.
+
+        :param filename: Name of the file, the extension `.npz` is appended if missing.
+        """
+        np.savez(filename, **{name: getattr(self, name) for name in self.__slots__})
+
+    @classmethod
+    def load(cls, filename: str) -> "CompiledTrees":
+        """
+        Load compiled trees from a `.npz` file.
+
+        :param filename: Name of the file.
+        :return: Compiled trees.
+        """
+        with np.load(filename) as data:
+            return cls(**{name: data[name] for name in cls.__slots__})
+
+
 class RobustnessVerificationTreeModelsCliqueMethod:
     """
     Robustness verification for decision-tree-based models.
@@ -167,16 +445,31 @@ class RobustnessVerificationTreeModelsCliqueMethod:
     | Paper link: https://arxiv.org/abs/1906.03849
     """
 
-    def __init__(self, classifier: "ClassifierDecisionTree", verbose: bool = True) -> None:
+    def __init__(self, classifier: "ClassifierDecisionTree", verbose: bool = True, nb_workers: int = 1) -> None:
         """
         Create robustness verification for a decision-tree-based classifier.
 
         :param classifier: A trained decision-tree-based classifier.
         :param verbose: Show progress bars.
+        :param nb_workers: Number of worker processes verifying samples in parallel.
         """
         self._classifier = classifier
         self.verbose = verbose
-        self._trees = self._classifier.get_trees()
+        self.nb_workers = nb_workers
+        self._nb_classes = self._classifier.nb_classes
+
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers `nb_workers` has to be a positive integer.")
+
+        self._compiled_trees = self._classifier.get_compiled_trees()
+        self._leaf_class = self._compiled_trees.leaf_class
+        self._tree_leaves = self._compiled_trees.tree_leaves
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes only need the compiled trees
+        state = self.__dict__.copy()
+        del state["_classifier"]
+        return state
 
     def verify(
         self,
@@ -200,193 +493,236 @@ class RobustnessVerificationTreeModelsCliqueMethod:
         :param max_level: The maximum number of clique search levels.
         :return: A tuple of the average robustness bound and the verification error at `eps`.
         """
-        self.x: np.ndarray = x
-        self.y: np.ndarray = np.argmax(y, axis=1)
         self.max_clique: int = max_clique
         self.max_level: int = max_level
 
-        average_bound: float = 0.0
-        num_initial_successes: int = 0
         num_samples: int = x.shape[0]
+        args = (range(num_samples), x, np.argmax(y, axis=1), repeat(eps_init), repeat(norm), repeat(nb_search_steps))
+
+        if self.nb_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.nb_workers) as executor:
+                chunksize = max(1, num_samples // (4 * self.nb_workers))
+                results = list(
+                    tqdm(
+                        executor.map(self._verify_sample, *args, chunksize=chunksize),
+                        total=num_samples,
+                        desc="Decision tree verification",
+                        disable=not self.verbose,
+                    )
+                )
+        else:
+            results = list(
+                tqdm(
+                    map(self._verify_sample, *args),
+                    total=num_samples,
+                    desc="Decision tree verification",
+                    disable=not self.verbose,
+                )
+            )
 
-        # pylint: disable=R1702
-        pbar = trange(num_samples, desc="Decision tree verification", disable=not self.verbose)
-        for i_sample in pbar:
+        average_bound: float = 0.0
+        num_initial_successes: int = 0
+        for is_initial_success, clique_bound in results:
+            num_initial_successes += is_initial_success
+            if clique_bound is not None:
+                average_bound += clique_bound
 
-            eps: float = eps_init
-            robust_log: List[bool] = []
-            i_robust = None
-            i_not_robust = None
-            eps_robust: float = 0.0
-            eps_not_robust: float = 0.0
-            best_score: Optional[float]
+        verified_error = 1.0 - num_initial_successes / num_samples
+        average_bound = average_bound / num_samples
 
-            for i_step in range(nb_search_steps):
-                logger.info("Search step %d: eps = %.4g", i_step, eps)
+        logger.info("The average interval bound is: %.4g", average_bound)
+        logger.info("The verified error at eps = %.4g is: %.4g", eps_init, verified_error)
 
-                is_robust = True
+        return average_bound, verified_error
 
-                if self._classifier.nb_classes <= 2:
-                    best_score = self._get_best_score(i_sample, eps, norm, target_label=None)
-                    is_robust = (self.y[i_sample] < 0.5 and best_score < 0) or (
-                        self.y[i_sample] > 0.5 and best_score > 0.0
-                    )
-                else:
-                    for i_class in range(self._classifier.nb_classes):
-                        if i_class != self.y[i_sample]:
-                            best_score = self._get_best_score(i_sample, eps, norm, target_label=i_class)
-                            is_robust = is_robust and (best_score > 0.0)
-                            if not is_robust:
-                                break
-
-                robust_log.append(is_robust)
-
-                if is_robust:
-                    if i_step == 0:
-                        num_initial_successes += 1
-                    logger.info("Model is robust at eps = %.4g", eps)
-                    i_robust = i_step
-                    eps_robust = eps
-                else:
-                    logger.info("Model is not robust at eps = %.4g", eps)
-                    i_not_robust = i_step
-                    eps_not_robust = eps
+    def _verify_sample(
+        self, i_sample: int, x_i: np.ndarray, label: int, eps_init: float, norm: float, nb_search_steps: int
+    ) -> Tuple[bool, Optional[float]]:
+        """
+        Binary search for the largest attack budget at which the classifier is verified to be robust on a sample.
 
-                if i_robust is None:
-                    eps /= 2.0
-                else:
-                    if i_not_robust is None:
-                        if eps >= 1.0:  # pragma: no cover
-                            logger.info("Abort binary search because eps increased above 1.0")
+        :param i_sample: Index of the sample.
+        :param x_i: Feature data of the sample.
+        :param label: The true label of the sample.
+        :param eps_init: Attack budget for the first search step.
+        :param norm: The norm to apply epsilon.
+        :param nb_search_steps: The number of search steps.
+        :return: A tuple of whether the classifier is robust at `eps_init` and the robustness bound, `None` if no
+                 robust epsilon was found.
+        """
+        distances = self._get_distances(x_i, norm)
+
+        # Steps of the binary search reaching the same leaves have the same best scores
+        best_scores: Dict[Tuple[Optional[int], bytes], float] = {}
+
+        def get_best_score(accessible_leaves: np.ndarray, target_label: Optional[int]) -> float:
+            key = (target_label, np.packbits(accessible_leaves).tobytes())
+            if key not in best_scores:
+                best_scores[key] = self._get_best_score(accessible_leaves, label, target_label)
+            return best_scores[key]
+
+        eps: float = eps_init
+        i_robust = None
+        i_not_robust = None
+        eps_robust: float = 0.0
+        eps_not_robust: float = 0.0
+        is_initial_success = False
+        best_score: float
+
+        for i_step in range(nb_search_steps):
+            logger.info("Search step %d: eps = %.4g", i_step, eps)
+
+            accessible_leaves = distances <= eps
+            is_robust = True
+
+            if self._nb_classes <= 2:
+                best_score = get_best_score(accessible_leaves, target_label=None)
+                is_robust = (label < 0.5 and best_score < 0) or (label > 0.5 and best_score > 0.0)
+            else:
+                for i_class in range(self._nb_classes):
+                    if i_class != label:
+                        best_score = get_best_score(accessible_leaves, target_label=i_class)
+                        is_robust = is_robust and (best_score > 0.0)
+                        if not is_robust:
                             break
-                        eps = min(eps * 2.0, 1.0)
-                    else:
-                        eps = (eps_robust + eps_not_robust) / 2.0
 
-            if i_robust is not None:
-                clique_bound = eps_robust
-                average_bound += clique_bound
+            if is_robust:
+                if i_step == 0:
+                    is_initial_success = True
+                logger.info("Model is robust at eps = %.4g", eps)
+                i_robust = i_step
+                eps_robust = eps
             else:
-                logger.info(
-                    "point %s: WARNING! no robust eps found, verification bound is set as 0 !",
-                    i_sample,
-                )
+                logger.info("Model is not robust at eps = %.4g", eps)
+                i_not_robust = i_step
+                eps_not_robust = eps
 
-        verified_error = 1.0 - num_initial_successes / num_samples
-        average_bound = average_bound / num_samples
+            if i_robust is None:
+                eps /= 2.0
+            else:
+                if i_not_robust is None:
+                    if eps >= 1.0:  # pragma: no cover
+                        logger.info("Abort binary search because eps increased above 1.0")
+                        break
+                    eps = min(eps * 2.0, 1.0)
+                else:
+                    eps = (eps_robust + eps_not_robust) / 2.0
 
-        logger.info("The average interval bound is: %.4g", average_bound)
-        logger.info("The verified error at eps = %.4g is: %.4g", eps_init, verified_error)
+        if i_robust is None:
+            logger.info(
+                "point %s: WARNING! no robust eps found, verification bound is set as 0 !",
+                i_sample,
+            )
+            return is_initial_success, None
 
-        return average_bound, verified_error
+        return is_initial_success, eps_robust
 
     def _get_k_partite_clique(
         self,
-        accessible_leaves: List[List[LeafNode]],
+        accessible_leaves: List[Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]],
         label: int,
-        target_label: Optional[int],
-    ) -> Tuple[float, List]:
+    ) -> Tuple[float, List[Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]]]:
         """
         Find the K partite cliques among the accessible leaf nodes.
 
-        :param accessible_leaves: List of lists of accessible leaf nodes.
-        :param label: The try label of the current sample.
-        :param target_label: The target label.
-        :return: The best score and a list of new cliques.
+        :param accessible_leaves: List of tuples of the boxes, as returned by `CompiledTrees.get_boxes`, and values of
+                                  the accessible leaf nodes of each tree or clique group.
+        :param label: The true label of the current sample.
+        :return: The best score and a list of new cliques in the same format as `accessible_leaves`.
         """
         new_nodes_list = []
         best_scores_sum = 0.0
 
-        # pylint: disable=R1702
         for start_tree in range(0, len(accessible_leaves), self.max_clique):
-            cliques_old: List[Dict[str, Union[Box, float]]] = []
-            cliques_new: List[Dict[str, Union[Box, float]]] = []
-
-            # Start searching for cliques
-            for accessible_leaf in accessible_leaves[start_tree]:
-                if (
-                    self._classifier.nb_classes > 2
-                    and target_label is not None
-                    and target_label == accessible_leaf.class_label
-                ):
-                    new_leaf_value = -accessible_leaf.value
-                else:
-                    new_leaf_value = accessible_leaf.value
-                cliques_old.append({"box": accessible_leaf.box, "value": new_leaf_value})
-
-            # Loop over all all trees
-            for i_tree in range(
-                start_tree + 1,
-                min(len(accessible_leaves), start_tree + self.max_clique),
-            ):
-                cliques_new.clear()
-                # Loop over all existing cliques
-                for clique in cliques_old:
-                    # Loop over leaf nodes in tree
-                    for accessible_leaf in accessible_leaves[i_tree]:
-                        leaf_box = accessible_leaf.box.get_intersection(clique["box"])  # type: ignore
-                        if leaf_box.intervals:
-                            if (
-                                self._classifier.nb_classes > 2
-                                and target_label is not None
-                                and target_label == accessible_leaf.class_label
-                            ):
-                                new_leaf_value = -accessible_leaf.value
-                            else:
-                                new_leaf_value = accessible_leaf.value
-                            cliques_new.append(
-                                {
-                                    "box": leaf_box,
-                                    "value": new_leaf_value + clique["value"],  # type: ignore
-                                }
-                            )
-
-                cliques_old = cliques_new.copy()
-
-            new_nodes = []
-            best_score = 0.0
-            for i, clique in enumerate(cliques_old):
-                # Create a new node without tree_id and node_id to represent clique
-                new_nodes.append(
-                    LeafNode(
-                        tree_id=None,
-                        class_label=label,
-                        node_id=None,
-                        box=clique["box"],  # type: ignore
-                        value=clique["value"],  # type: ignore
-                    )
-                )
+            boxes, value = accessible_leaves[start_tree]
+
+            # Loop over all trees of this clique group
+            for i_tree in range(start_tree + 1, min(len(accessible_leaves), start_tree + self.max_clique)):
+                boxes, value = self._intersect_boxes(boxes, value, *accessible_leaves[i_tree])
 
-                if i == 0:
-                    best_score = clique["value"]  # type: ignore
+            best_score = 0.0
+            if value.size > 0:
+                if label < 0.5 and self._nb_classes <= 2:
+                    best_score = value.max()
                 else:
-                    if label < 0.5 and self._classifier.nb_classes <= 2:
-                        best_score = max(best_score, clique["value"])  # type: ignore
-                    else:
-                        best_score = min(best_score, clique["value"])  # type: ignore
+                    best_score = value.min()
 
-            new_nodes_list.append(new_nodes)
+            new_nodes_list.append((boxes, value))
             best_scores_sum += best_score
 
         return best_scores_sum, new_nodes_list
 
-    def _get_best_score(self, i_sample: int, eps: float, norm: float, target_label: Optional[int]) -> float:
+    @staticmethod
+    def _intersect_boxes(
+        boxes_1: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        value_1: np.ndarray,
+        boxes_2: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        value_2: np.ndarray,
+        max_size: int = 2 ** 22,
+    ) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+        """
+        Intersect every box of the first set with every box of the second set and keep the non-empty intersections.
+        The boxes are intersected in batches of dense bounds over the features bounding any of the boxes.
+
+        :param boxes_1: First set of boxes, as returned by `CompiledTrees.get_boxes`.
+        :param value_1: Values of the first set of boxes.
+        :param boxes_2: Second set of boxes, as returned by `CompiledTrees.get_boxes`.
+        :param value_2: Values of the second set of boxes.
+        :param max_size: Maximum number of bounds intersected at once.
+        :return: The non-empty intersections in the same format as the boxes and their summed values, ordered by the
+                 first and then the second set.
+        """
+        features = np.union1d(boxes_1[1], boxes_2[1])
+        lower_2, upper_2 = CompiledTrees.get_dense_bounds(boxes_2, features)
+        batch_size = max(1, max_size // max(1, lower_2.size))
+        offset_1 = np.concatenate([[0], np.cumsum(boxes_1[0])])
+        size_list, feature_list, lower_list, upper_list, value_list = [], [], [], [], []
+
+        for batch_index_1 in range(0, len(value_1), batch_size):
+            batch_index_2 = min(batch_index_1 + batch_size, len(value_1))
+            intervals = slice(offset_1[batch_index_1], offset_1[batch_index_2])
+            lower_1, upper_1 = CompiledTrees.get_dense_bounds(
+                (boxes_1[0][batch_index_1:batch_index_2],) + tuple(array[intervals] for array in boxes_1[1:]), features
+            )
+
+            lower = np.maximum(lower_1[:, np.newaxis], lower_2[np.newaxis])
+            upper = np.minimum(upper_1[:, np.newaxis], upper_2[np.newaxis])
+            index_1, index_2 = np.nonzero(np.all(lower < upper, axis=-1))
+            lower, upper = lower[index_1, index_2], upper[index_1, index_2]
+
+            # Keep only the bounded intervals of the intersections
+            is_bounded = (lower > -np.inf) | (upper < np.inf)
+            size_list.append(np.sum(is_bounded, axis=1))
+            feature_list.append(np.broadcast_to(features, lower.shape)[is_bounded])
+            lower_list.append(lower[is_bounded])
+            upper_list.append(upper[is_bounded])
+            value_list.append(value_2[index_2] + value_1[batch_index_1 + index_1])
+
+        if not value_list:
+            return boxes_1, value_1
+
+        boxes = (
+            np.concatenate(size_list),
+            np.concatenate(feature_list),
+            np.concatenate(lower_list),
+            np.concatenate(upper_list),
+        )
+        return boxes, np.concatenate(value_list)
+
+    def _get_best_score(self, accessible_leaves: np.ndarray, label: int, target_label: Optional[int]) -> float:
         """
         Get the list of best scores.
 
-        :param i_sample: Index of training sample in `x`.
-        :param eps: Attack budget epsilon.
-        :param norm: The norm to apply epsilon.
+        :param accessible_leaves: Boolean mask of the leaf nodes accessible within the attack budget.
+        :param label: The true label of the sample.
         :param target_label: The target label.
         :return: The best scores.
         """
-        nodes = self._get_accessible_leaves(i_sample, eps, norm, target_label)
+        nodes = self._get_accessible_leaves(accessible_leaves, label, target_label)
         best_score: float = 0.0
 
-        for i_level in range(self.max_level):
-            if self._classifier.nb_classes > 2 and i_level > 0:
-                target_label = None
-            best_score, nodes = self._get_k_partite_clique(nodes, label=self.y[i_sample], target_label=target_label)
+        for _ in range(self.max_level):
+            best_score, nodes = self._get_k_partite_clique(nodes, label=label)
 
             # Stop if the root node has been reached
             if len(nodes) <= 1:
@@ -394,75 +730,66 @@ class RobustnessVerificationTreeModelsCliqueMethod:
 
         return best_score
 
-    def _get_distance(self, box: Box, i_sample: int, norm: float) -> float:
+    def _get_distances(self, x_i: np.ndarray, norm: float) -> np.ndarray:
         """
-        Determine the distance between sample and interval box.
+        Determine the distances between a sample and the boxes of all leaf nodes.
 
-        :param box: Interval box.
-        :param i_sample: Index of training sample in `x`.
+        :param x_i: Feature data of the sample.
         :param norm: The norm to apply epsilon.
-        :return: The distance.
+        :return: The distances.
         """
-        resulting_distance = 0.0
-
-        for feature, interval in box.intervals.items():
-            feature_value = self.x[i_sample, feature]
+        compiled_trees = self._compiled_trees
+        feature_values = x_i[compiled_trees.features][compiled_trees.box_feature]
+        is_inside = (compiled_trees.box_lower < feature_values) & (feature_values < compiled_trees.box_upper)
 
-            if interval.lower_bound < feature_value < interval.upper_bound:
-                distance = 0.0
-            else:
-                difference = max(
-                    feature_value - interval.upper_bound,
-                    interval.lower_bound - feature_value,
-                )
-                if norm == 0:
-                    distance = 1.0
-                elif norm == np.inf:
-                    distance = difference
-                else:
-                    distance = pow(difference, norm)
-
-            if norm == np.inf:
-                resulting_distance = max(resulting_distance, distance)
-            else:
-                resulting_distance += distance
+        if norm == 0:
+            difference = (~is_inside).astype(float)
+        else:
+            difference = np.maximum(
+                feature_values - compiled_trees.box_upper, compiled_trees.box_lower - feature_values
+            )
+            difference[is_inside] = 0.0
+            if norm != np.inf:
+                difference = np.power(difference, norm)
+
+        # Unbounded features do not contribute to the distances, boxes without intervals have distance zero
+        box_distances = np.zeros(len(compiled_trees.box_offset) - 1)
+        is_bounded = compiled_trees.box_offset[1:] > compiled_trees.box_offset[:-1]
+        if np.any(is_bounded):
+            reduce = np.maximum if norm == np.inf else np.add
+            box_distances[is_bounded] = reduce.reduceat(difference, compiled_trees.box_offset[:-1][is_bounded])
 
         if norm not in [0, np.inf]:
-            resulting_distance = pow(resulting_distance, 1.0 / norm)
+            box_distances = np.power(box_distances, 1.0 / norm)
 
-        return resulting_distance
+        return box_distances[compiled_trees.leaf_box]
 
     def _get_accessible_leaves(
-        self, i_sample: int, eps: float, norm: float, target_label: Optional[int]
-    ) -> List[List[LeafNode]]:
+        self, accessible_leaves: np.ndarray, label: int, target_label: Optional[int]
+    ) -> List[Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]]:
         """
-        Determine the leaf nodes accessible within the attack budget.
+        Collect the leaf nodes accessible within the attack budget per tree.
 
-        :param i_sample: Index of training sample in `x`.
-        :param eps: Attack budget epsilon.
-        :param norm: The norm to apply epsilon.
+        :param accessible_leaves: Boolean mask of the leaf nodes accessible within the attack budget.
+        :param label: The true label of the sample.
         :param target_label: The target label.
-        :return: A list of lists of leaf nodes.
+        :return: A list of tuples of the boxes, as returned by `CompiledTrees.get_boxes`, and values of the accessible
+                 leaf nodes per tree.
         """
-        accessible_leaves = []
-
-        for tree in self._trees:
-            if (
-                self._classifier.nb_classes <= 2
-                or target_label is None
-                or tree.class_id in [self.y[i_sample], target_label]
-            ):
+        accessible_leaves_list = []
 
-                leaves = []
+        for class_id, tree_leaves in zip(self._compiled_trees.tree_class, self._tree_leaves):
+            if self._nb_classes <= 2 or target_label is None or class_id in [label, target_label]:
 
-                for leaf_node in tree.leaf_nodes:
-                    distance = self._get_distance(leaf_node.box, i_sample, norm)
-                    if leaf_node.box and distance <= eps:
-                        leaves.append(leaf_node)
+                leaves = tree_leaves[accessible_leaves[tree_leaves]]
 
-                if not leaves:  # pragma: no cover
+                if leaves.size == 0:  # pragma: no cover
                     raise ValueError("No accessible leaves found.")
 
-                accessible_leaves.append(leaves)
+                value = self._compiled_trees.leaf_value[leaves]
+                if self._nb_classes > 2 and target_label is not None:
+                    value = np.where(self._leaf_class[leaves] == target_label, -value, value)
+
+                accessible_leaves_list.append((self._compiled_trees.get_boxes(leaves), value))
 
-        return accessible_leaves
+        return accessible_leaves_list
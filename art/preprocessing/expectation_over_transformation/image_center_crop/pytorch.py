@@ -37,7 +37,7 @@ class EoTImageCenterCropPyTorch(EoTPyTorch):
     This module implements Expectation over Transformation preprocessing for image center crop in PyTorch.
     """
 
-    params = ["nb_samples", "angles", "clip_values", "label_type"]
+    params = ["nb_samples", "angles", "clip_values", "label_type", "batch_size"]
 
     label_types = ["classification", "object_detection"]
 
@@ -49,6 +49,7 @@ class EoTImageCenterCropPyTorch(EoTPyTorch):
         label_type: str = "classification",
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTImageCenterCropPyTorch.
@@ -60,9 +61,15 @@ class EoTImageCenterCropPyTorch(EoTPyTorch):
         :param label_type: String defining the type of labels. Currently supported: `classification`, `object_detection`
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.size = size
@@ -70,6 +77,10 @@ class EoTImageCenterCropPyTorch(EoTPyTorch):
         self.label_type = label_type
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return self.label_type == "classification"
+
     def _transform(
         self, x: "torch.Tensor", y: Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]], **kwargs
     ) -> Tuple["torch.Tensor", Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]]]:
@@ -83,7 +94,7 @@ class EoTImageCenterCropPyTorch(EoTPyTorch):
         import torch  # lgtm [py/repeated-import]
         import torchvision
 
-        size = np.random.randint(low=self.size_range[0], high=self.size_range[1])
+        sizes = np.random.randint(low=self.size_range[0], high=self.size_range[1], size=x.shape[0])
 
         # Ensure channels-first
         channels_first = True
@@ -91,15 +102,25 @@ class EoTImageCenterCropPyTorch(EoTPyTorch):
             x = torch.permute(x, (0, 3, 1, 2))
             channels_first = False
 
-        x_preprocess = torchvision.transforms.functional.resized_crop(
-            img=x,
-            top=size,
-            left=size,
-            height=x.shape[-2] - 2 * size,
-            width=x.shape[-1] - 2 * size,
-            size=x.shape[-2:-1],
-            interpolation=torchvision.transforms.functional.InterpolationMode.NEAREST,
-        )
+        # Crop all images sharing the same sampled crop size at once
+        x_preprocess_list = []
+        indices_list = []
+        for size in np.unique(sizes).tolist():
+            indices = np.flatnonzero(sizes == size)
+            x_preprocess_list.append(
+                torchvision.transforms.functional.resized_crop(
+                    img=x[indices],
+                    top=size,
+                    left=size,
+                    height=x.shape[-2] - 2 * size,
+                    width=x.shape[-1] - 2 * size,
+                    size=x.shape[-2:-1],
+                    interpolation=torchvision.transforms.functional.InterpolationMode.NEAREST,
+                )
+            )
+            indices_list.append(indices)
+        x_preprocess = torch.cat(x_preprocess_list)[np.argsort(np.concatenate(indices_list))]
+        size = sizes[0].item()
 
         x_preprocess = torch.clamp(
             input=x_preprocess,
@@ -37,7 +37,7 @@ class EoTImageRotationPyTorch(EoTPyTorch):
     This module implements Expectation over Transformation preprocessing for image rotation in PyTorch.
     """
 
-    params = ["nb_samples", "angles", "clip_values", "label_type"]
+    params = ["nb_samples", "angles", "clip_values", "label_type", "batch_size"]
 
     label_types = ["classification", "object_detection"]
 
@@ -49,6 +49,7 @@ class EoTImageRotationPyTorch(EoTPyTorch):
         label_type: str = "classification",
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTImageRotationPyTorch.
@@ -64,9 +65,15 @@ class EoTImageRotationPyTorch(EoTPyTorch):
         :param label_type: String defining the type of labels. Currently supported: `classification`, `object_detection`
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.angles = angles
@@ -74,6 +81,10 @@ class EoTImageRotationPyTorch(EoTPyTorch):
         self.label_type = label_type
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return self.label_type == "classification"
+
     def _transform(
         self, x: "torch.Tensor", y: Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]], **kwargs
     ) -> Tuple["torch.Tensor", Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]]]:
@@ -88,9 +99,9 @@ class EoTImageRotationPyTorch(EoTPyTorch):
         import torchvision
 
         if isinstance(self.angles, list):
-            angles = np.random.choice(self.angles).item()
+            angles = np.random.choice(self.angles, size=x.shape[0])
         else:
-            angles = np.random.uniform(low=self.angles_range[0], high=self.angles_range[1])
+            angles = np.random.uniform(low=self.angles_range[0], high=self.angles_range[1], size=x.shape[0])
 
         # Ensure channels-first
         channels_first = True
@@ -98,14 +109,16 @@ class EoTImageRotationPyTorch(EoTPyTorch):
             x = torch.permute(x, (0, 3, 1, 2))
             channels_first = False
 
-        expand = self.label_type == "object_detection"
-
-        x_preprocess = torchvision.transforms.functional.rotate(
-            img=x,
-            angle=angles,
-            interpolation=torchvision.transforms.functional.InterpolationMode.NEAREST,
-            expand=expand,
-        )
+        if self.label_type == "object_detection":
+            angles = angles[0].item()
+            x_preprocess = torchvision.transforms.functional.rotate(
+                img=x,
+                angle=angles,
+                interpolation=torchvision.transforms.functional.InterpolationMode.NEAREST,
+                expand=True,
+            )
+        else:
+            x_preprocess = self._rotate(x=x, angles=angles)
 
         x_preprocess = torch.clamp(
             input=x_preprocess,
@@ -181,6 +194,52 @@ class EoTImageRotationPyTorch(EoTPyTorch):
 
         return x_preprocess, y_preprocess
 
+    @staticmethod
+    def _rotate(x: "torch.Tensor", angles: np.ndarray) -> "torch.Tensor":
+        """
+        Rotate each image of a batch by its own angle with nearest interpolation, equivalent to
+        `torchvision.transforms.functional.rotate` without expansion applied to every image separately.
+
+        :param x: Input images in channels-first format.
+        :param angles: Rotation angles in degrees, one per image, counter-clockwise.
+        :return: Rotated images.
+        """
+        import torch  # lgtm [py/repeated-import]
+
+        height, width = x.shape[-2], x.shape[-1]
+        dtype = x.dtype if torch.is_floating_point(x) else torch.float32
+
+        # Inverse affine matrices of the rotations around the image center
+        radians = np.radians(-angles)
+        zeros = np.zeros_like(radians)
+        theta = np.stack(
+            [
+                np.stack([np.cos(radians), np.sin(radians), zeros], axis=1),
+                np.stack([-np.sin(radians), np.cos(radians), zeros], axis=1),
+            ],
+            axis=1,
+        )
+        theta = torch.tensor(theta, dtype=dtype, device=x.device)
+
+        # Sampling grid of pixel centers normalised to [-1, 1], following torchvision's affine grid
+        base_grid = torch.empty(1, height, width, 3, dtype=dtype, device=x.device)
+        base_grid[..., 0].copy_(
+            torch.linspace(-width * 0.5 + 0.5, width * 0.5 - 0.5, steps=width, dtype=dtype, device=x.device)
+        )
+        base_grid[..., 1].copy_(
+            torch.linspace(
+                -height * 0.5 + 0.5, height * 0.5 - 0.5, steps=height, dtype=dtype, device=x.device
+            ).unsqueeze_(-1)
+        )
+        base_grid[..., 2].fill_(1)
+        rescaled_theta = theta.transpose(1, 2) / torch.tensor([0.5 * width, 0.5 * height], dtype=dtype, device=x.device)
+        grid = base_grid.view(1, height * width, 3).matmul(rescaled_theta).view(-1, height, width, 2)
+
+        x_rotated = torch.nn.functional.grid_sample(
+            x.to(dtype), grid, mode="nearest", padding_mode="zeros", align_corners=False
+        )
+        return x_rotated.to(x.dtype)
+
     def _check_params(self) -> None:
 
         # pylint: disable=R0916
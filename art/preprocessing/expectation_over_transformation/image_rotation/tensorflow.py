@@ -37,7 +37,7 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
     This module implements Expectation over Transformation preprocessing for image rotation in TensorFlow.
     """
 
-    params = ["nb_samples", "angles", "clip_values", "label_type"]
+    params = ["nb_samples", "angles", "clip_values", "label_type", "batch_size"]
 
     label_types = ["classification"]
 
@@ -49,6 +49,7 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
         label_type: str = "classification",
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTImageRotationTensorFlow.
@@ -61,9 +62,15 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
         :param label_type: String defining the type of labels. Currently supported: `classification`
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.angles = angles
@@ -71,6 +78,10 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
         self.label_type = label_type
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
@@ -85,7 +96,7 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
         import tensorflow_addons as tfa
 
         # pylint: disable=E1120,E1123
-        angles = tf.random.uniform(shape=(), minval=self.angles_range[0], maxval=self.angles_range[1])
+        angles = tf.random.uniform(shape=(x.shape[0],), minval=self.angles_range[0], maxval=self.angles_range[1])
         angles = angles / 360.0 * 2.0 * np.pi
         x_preprocess = tfa.image.rotate(images=x, angles=angles, interpolation="NEAREST", name=None)
         x_preprocess = tf.clip_by_value(
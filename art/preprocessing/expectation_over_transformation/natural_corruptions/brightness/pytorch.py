@@ -43,6 +43,7 @@ class EoTBrightnessPyTorch(EoTPyTorch):
         delta: Union[float, Tuple[float, float]],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTBrightnessPyTorch.
@@ -54,15 +55,25 @@ class EoTBrightnessPyTorch(EoTPyTorch):
             [delta[0], delta[1]]. The applied delta is sampled uniformly from this range for each image.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.delta = delta
         self.delta_range = (-delta, delta) if isinstance(delta, (int, float)) else delta
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "torch.Tensor", y: Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]], **kwargs
     ) -> Tuple["torch.Tensor", Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]]]:
@@ -75,7 +86,10 @@ class EoTBrightnessPyTorch(EoTPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
-        delta_i = np.random.uniform(low=self.delta_range[0], high=self.delta_range[1])
+        delta_i = np.random.uniform(
+            low=self.delta_range[0], high=self.delta_range[1], size=(x.shape[0],) + (1,) * (len(x.shape) - 1)
+        )
+        delta_i = torch.tensor(delta_i, dtype=x.dtype, device=x.device)
         return torch.clamp(x + delta_i, min=self.clip_values[0], max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
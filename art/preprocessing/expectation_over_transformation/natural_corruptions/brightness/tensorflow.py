@@ -43,6 +43,7 @@ class EoTBrightnessTensorFlow(EoTTensorFlowV2):
         delta: Union[float, Tuple[float, float]],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTBrightnessTensorFlow.
@@ -54,15 +55,25 @@ class EoTBrightnessTensorFlow(EoTTensorFlowV2):
             [delta[0], delta[1]]. The applied delta is sampled uniformly from this range for each image.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.delta = delta
         self.delta_range = (-delta, delta) if isinstance(delta, (int, float)) else delta
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
@@ -75,7 +86,10 @@ class EoTBrightnessTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        delta_i = np.random.uniform(low=self.delta_range[0], high=self.delta_range[1])
+        delta_i = np.random.uniform(
+            low=self.delta_range[0], high=self.delta_range[1], size=(x.shape[0],) + (1,) * (len(x.shape) - 1)
+        )
+        delta_i = tf.constant(delta_i, dtype=x.dtype)
         return tf.clip_by_value(x + delta_i, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
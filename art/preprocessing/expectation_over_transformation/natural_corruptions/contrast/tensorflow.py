@@ -43,6 +43,7 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
         contrast_factor: Union[float, Tuple[float, float]],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTContrastTensorFlow.
@@ -54,9 +55,15 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
                applied delta is sampled uniformly from this range for each image.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.contrast_factor = contrast_factor
@@ -65,6 +72,10 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
         )
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
@@ -77,7 +88,12 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        contrast_factor_i = np.random.uniform(low=self.contrast_factor_range[0], high=self.contrast_factor_range[1])
+        contrast_factor_i = np.random.uniform(
+            low=self.contrast_factor_range[0],
+            high=self.contrast_factor_range[1],
+            size=(x.shape[0],) + (1,) * (len(x.shape) - 1),
+        )
+        contrast_factor_i = tf.constant(contrast_factor_i, dtype=x.dtype)
         if x.shape[3] == 3:
             red, green, blue = x[:, :, :, 0], x[:, :, :, 1], x[:, :, :, 2]
             x_gray = 0.2989 * red + 0.587 * green + 0.114 * blue
@@ -85,7 +101,7 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
             x_gray = x[:, :, :, 0]
         else:  # pragma: no cover
             raise ValueError("Number of color channels is not 1 or 3 in input `x` of format HWC.")
-        mean = tf.math.reduce_mean(x_gray, axis=None)
+        mean = tf.math.reduce_mean(x_gray, axis=(1, 2), keepdims=True)[..., tf.newaxis]
 
         return (
             tf.clip_by_value(
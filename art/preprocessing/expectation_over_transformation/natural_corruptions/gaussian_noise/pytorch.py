@@ -43,6 +43,7 @@ class EoTGaussianNoisePyTorch(EoTPyTorch):
         std: Union[float, Tuple[float, float]],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTBrightnessPyTorch.
@@ -54,15 +55,25 @@ class EoTGaussianNoisePyTorch(EoTPyTorch):
                     image.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.std = std
         self.std_range = (0.0, std) if isinstance(std, (int, float)) else std
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "torch.Tensor", y: Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]], **kwargs
     ) -> Tuple["torch.Tensor", Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]]]:
@@ -75,7 +86,10 @@ class EoTGaussianNoisePyTorch(EoTPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
-        std_i = np.random.uniform(low=self.std_range[0], high=self.std_range[1])
+        std_i = np.random.uniform(
+            low=self.std_range[0], high=self.std_range[1], size=(x.shape[0],) + (1,) * (len(x.shape) - 1)
+        )
+        std_i = torch.tensor(std_i, dtype=x.dtype, device=x.device)
         delta_i = torch.normal(mean=torch.zeros_like(x), std=torch.ones_like(x) * std_i)
         return torch.clamp(x + delta_i, min=self.clip_values[0], max=self.clip_values[1]), y
 
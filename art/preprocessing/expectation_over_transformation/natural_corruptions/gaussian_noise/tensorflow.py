@@ -43,6 +43,7 @@ class EoTGaussianNoiseTensorFlow(EoTTensorFlowV2):
         std: Union[float, Tuple[float, float]],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTGaussianNoiseTensorFlow.
@@ -54,15 +55,25 @@ class EoTGaussianNoiseTensorFlow(EoTTensorFlowV2):
                     image.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.std = std
         self.std_range = (0.0, std) if isinstance(std, (int, float)) else std
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
@@ -75,8 +86,11 @@ class EoTGaussianNoiseTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        std_i = np.random.uniform(low=self.std_range[0], high=self.std_range[1])
-        delta_i = tf.random.normal(shape=x.shape, mean=0.0, stddev=std_i, seed=None)
+        std_i = np.random.uniform(
+            low=self.std_range[0], high=self.std_range[1], size=(x.shape[0],) + (1,) * (len(x.shape) - 1)
+        )
+        std_i = tf.constant(std_i, dtype=x.dtype)
+        delta_i = tf.random.normal(shape=x.shape, mean=0.0, stddev=1.0, dtype=x.dtype, seed=None) * std_i
         return tf.clip_by_value(x + delta_i, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
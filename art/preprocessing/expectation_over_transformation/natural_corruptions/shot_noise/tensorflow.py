@@ -43,6 +43,7 @@ class EoTShotNoiseTensorFlow(EoTTensorFlowV2):
         lam: Union[float, Tuple[float, float]],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTShotNoiseTensorFlow.
@@ -54,15 +55,25 @@ class EoTShotNoiseTensorFlow(EoTTensorFlowV2):
                     [lam[0], lam[1]]. The applied delta is sampled uniformly from this range for each image.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed at once, `None` to transform all `nb_samples` samples
+                           of all inputs at once.
         """
         super().__init__(
-            apply_fit=apply_fit, apply_predict=apply_predict, nb_samples=nb_samples, clip_values=clip_values
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+            nb_samples=nb_samples,
+            clip_values=clip_values,
+            batch_size=batch_size,
         )
 
         self.lam = lam
         self.lam_range = (0.0, lam) if isinstance(lam, (int, float)) else lam
         self._check_params()
 
+    @property
+    def _batch_transform(self) -> bool:
+        return True
+
     def _transform(
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
@@ -75,9 +86,16 @@ class EoTShotNoiseTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        lam_i = np.random.uniform(low=self.lam_range[0], high=self.lam_range[1])
+        lam_i = np.random.uniform(
+            low=self.lam_range[0], high=self.lam_range[1], size=(x.shape[0],) + (1,) * (len(x.shape) - 1)
+        )
+        lam_i = tf.constant(lam_i, dtype=x.dtype)
         # pylint: disable=E1123,E1120
-        delta_i = tf.random.poisson(shape=x.shape, lam=lam_i, seed=None) / lam_i * self.clip_values[1]
+        delta_i = (
+            tf.random.poisson(shape=[], lam=tf.ones_like(x) * lam_i, dtype=x.dtype, seed=None)
+            / lam_i
+            * self.clip_values[1]
+        )
         return tf.clip_by_value(x + delta_i, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
@@ -41,6 +41,7 @@ class EoTPyTorch(PreprocessorPyTorch):
         clip_values: Tuple[float, float],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTPyTorch.
@@ -49,11 +50,14 @@ class EoTPyTorch(PreprocessorPyTorch):
         :param clip_values: Tuple of float representing minimum and maximum values of input `(min, max)`.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed in one call of `_transform` if the transformation
+                           supports batches, `None` to transform all `nb_samples` samples of all inputs at once.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
 
         self.nb_samples = nb_samples
         self.clip_values = clip_values
+        self.batch_size = batch_size
         EoTPyTorch._check_params(self)
 
     @abstractmethod
@@ -69,6 +73,14 @@ class EoTPyTorch(PreprocessorPyTorch):
         """
         raise NotImplementedError
 
+    @property
+    def _batch_transform(self) -> bool:
+        """
+        True if `_transform` samples the random transformation independently for each sample of a batch, which allows
+        transforming all samples of all inputs in a few calls. Otherwise, `_transform` is called per sample.
+        """
+        return False
+
     def forward(
         self, x: "torch.Tensor", y: Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]] = None
     ) -> Tuple["torch.Tensor", Optional[Union["torch.Tensor", List[Dict[str, "torch.Tensor"]]]]]:
@@ -81,6 +93,9 @@ class EoTPyTorch(PreprocessorPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
+        if self._batch_transform and not isinstance(y, list):
+            return self._forward_batch(x, y)
+
         x_preprocess_list = []
         y_preprocess_list_classification: List[torch.Tensor] = []
         y_preprocess_list_object_detection: List[List[Dict[str, torch.Tensor]]] = []
@@ -117,6 +132,39 @@ class EoTPyTorch(PreprocessorPyTorch):
 
         return x_preprocess, y_preprocess
 
+    def _forward_batch(
+        self, x: "torch.Tensor", y: Optional["torch.Tensor"]
+    ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
+        """
+        Apply transformations to all `nb_samples` samples of all inputs `x` and labels `y` in batches of `batch_size`.
+
+        :param x: Input samples.
+        :param y: Label of the samples `x`.
+        :return: Transformed samples and labels.
+        """
+        import torch  # lgtm [py/repeated-import]
+
+        nb_samples_total = x.shape[0] * self.nb_samples
+        batch_size = nb_samples_total if self.batch_size is None else self.batch_size
+
+        x_preprocess_list = []
+        y_preprocess_list = []
+
+        for batch_index_1 in range(0, nb_samples_total, max(batch_size, 1)):
+            batch_index_2 = min(batch_index_1 + batch_size, nb_samples_total)
+            indices = torch.div(
+                torch.arange(batch_index_1, batch_index_2, device=x.device), self.nb_samples, rounding_mode="floor"
+            )
+            x_preprocess, y_preprocess = self._transform(x[indices], None if y is None else y[indices])
+            x_preprocess_list.append(x_preprocess)
+            if y_preprocess is not None:
+                y_preprocess_list.append(y_preprocess)
+
+        x_preprocess = torch.cat(x_preprocess_list, dim=0)
+        y_preprocess = torch.cat(y_preprocess_list, dim=0) if y is not None else None
+
+        return x_preprocess, y_preprocess
+
     def _check_params(self) -> None:
 
         if not isinstance(self.nb_samples, int) or self.nb_samples < 1:
@@ -129,3 +177,6 @@ class EoTPyTorch(PreprocessorPyTorch):
             or self.clip_values[0] > self.clip_values[1]
         ):
             raise ValueError("The argument `clip_Values` has to be a float or tuple of two float values as (min, max).")
+
+        if self.batch_size is not None and (not isinstance(self.batch_size, int) or self.batch_size < 1):
+            raise ValueError("The batch size `batch_size` has to be None or an integer greater than or equal to 1.")
@@ -43,6 +43,7 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
         clip_values: Tuple[float, float],
         apply_fit: bool = False,
         apply_predict: bool = True,
+        batch_size: Optional[int] = None,
     ) -> None:
         """
         Create an instance of EoTTensorFlowV2.
@@ -51,11 +52,14 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
         :param clip_values: Tuple of float representing minimum and maximum values of input `(min, max)`.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param batch_size: Maximum number of samples transformed in one call of `_transform` if the transformation
+                           supports batches, `None` to transform all `nb_samples` samples of all inputs at once.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
 
         self.nb_samples = nb_samples
         self.clip_values = clip_values
+        self.batch_size = batch_size
         EoTTensorFlowV2._check_params(self)
 
     @abstractmethod
@@ -71,16 +75,28 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
         """
         raise NotImplementedError
 
+    @property
+    def _batch_transform(self) -> bool:
+        """
+        True if `_transform` samples the random transformation independently for each sample of a batch, which allows
+        transforming all samples of all inputs in a few calls. Otherwise, `_transform` is called per sample.
+        """
+        return False
+
     def forward(self, x: "tf.Tensor", y: Optional["tf.Tensor"] = None) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
         Apply transformations to inputs `x` and labels `y`.
 
         :param x: Input samples.
         :param y: Label of the sample `x`. This function does not modify `y`.
-        :return: Corrupted samples and labels.
+        :return: Corrupted samples and labels, with the labels of all samples of an input repeated along the first
+                 axis, e.g. of shape `(nb_inputs * nb_samples, nb_classes)` for classification labels.
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
+        if self._batch_transform and not isinstance(y, list):
+            return self._forward_batch(x, y)
+
         x_preprocess_list = []
         y_preprocess_list = []
 
@@ -106,12 +122,43 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
             y_preprocess = y
         else:
             if isinstance(y, (tf.Tensor, np.ndarray)):
-                y_preprocess = tf.stack(y_preprocess_list, axis=0)
+                y_preprocess = tf.concat(y_preprocess_list, axis=0)
             else:
                 y_preprocess = [item for sublist in y_preprocess_list for item in sublist]
 
         return x_preprocess, y_preprocess
 
+    def _forward_batch(self, x: "tf.Tensor", y: Optional["tf.Tensor"]) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
+        """
+        Apply transformations to all `nb_samples` samples of all inputs `x` and labels `y` in batches of `batch_size`.
+
+        :param x: Input samples.
+        :param y: Label of the samples `x`.
+        :return: Transformed samples and labels.
+        """
+        import tensorflow as tf  # lgtm [py/repeated-import]
+
+        nb_samples_total = x.shape[0] * self.nb_samples
+        batch_size = nb_samples_total if self.batch_size is None else self.batch_size
+
+        x_preprocess_list = []
+        y_preprocess_list = []
+
+        for batch_index_1 in range(0, nb_samples_total, max(batch_size, 1)):
+            batch_index_2 = min(batch_index_1 + batch_size, nb_samples_total)
+            indices = np.arange(batch_index_1, batch_index_2) // self.nb_samples
+            x_preprocess, y_preprocess = self._transform(
+                tf.gather(x, indices), None if y is None else tf.gather(y, indices)
+            )
+            x_preprocess_list.append(x_preprocess)
+            if y_preprocess is not None:
+                y_preprocess_list.append(y_preprocess)
+
+        x_preprocess = tf.concat(x_preprocess_list, axis=0)
+        y_preprocess = tf.concat(y_preprocess_list, axis=0) if y is not None else None
+
+        return x_preprocess, y_preprocess
+
     def _check_params(self) -> None:
 
         if not isinstance(self.nb_samples, int) or self.nb_samples < 1:
@@ -124,3 +171,6 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
             or self.clip_values[0] > self.clip_values[1]
         ):
             raise ValueError("The argument `clip_Values` has to be a float or tuple of two float values as (min, max).")
+
+        if self.batch_size is not None and (not isinstance(self.batch_size, int) or self.batch_size < 1):
+            raise ValueError("The batch size `batch_size` has to be None or an integer greater than or equal to 1.")
@@ -544,9 +544,7 @@ def random_sphere(
 
         a_tmp = np.zeros(shape=(nb_points, nb_dims + 1))
         a_tmp[:, -1] = np.sqrt(np.random.uniform(0, radius ** 2, nb_points))
-
-        for i in range(nb_points):
-            a_tmp[i, 1:-1] = np.sort(np.random.uniform(0, a_tmp[i, -1], nb_dims - 1))
+        a_tmp[:, 1:-1] = np.sort(np.random.uniform(0, a_tmp[:, -1:], (nb_points, nb_dims - 1)), axis=1)
 
         res = (a_tmp[:, 1:] - a_tmp[:, :-1]) * np.random.choice([-1, 1], (nb_points, nb_dims))
 
@@ -111,7 +111,6 @@ setup(
             "pytest-cov",
             "codecov",
             "requests",
-            "sortedcontainers",
         ],
     },
     classifiers=[
@@ -52,6 +52,22 @@ def test_tabular(art_warning, tabular_dl_estimator, framework, get_iris_dataset,
         art_warning(e)
 
 
+@pytest.mark.framework_agnostic
+@pytest.mark.parametrize("targeted", [True, False])
+def test_tabular_vectorized(art_warning, tabular_dl_estimator, framework, get_iris_dataset, targeted):
+    try:
+        classifier = tabular_dl_estimator(clipped=True)
+        attack = BoundaryAttack(
+            classifier, targeted=targeted, max_iter=10, batch_size=16, vectorized=True, verbose=False
+        )
+        if targeted:
+            backend_targeted_tabular(attack, get_iris_dataset)
+        else:
+            backend_untargeted_tabular(attack, get_iris_dataset, clipped=True)
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.framework_agnostic
 @pytest.mark.parametrize("targeted", [True, False])
 def test_images(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack, framework, targeted):
@@ -105,6 +121,9 @@ def test_check_params(art_warning, image_dl_estimator_for_attack):
         with pytest.raises(ValueError):
             _ = BoundaryAttack(classifier, min_epsilon=-1)
 
+        with pytest.raises(ValueError):
+            _ = BoundaryAttack(classifier, vectorized="true")
+
         with pytest.raises(ValueError):
             _ = BoundaryAttack(classifier, verbose="true")
 
@@ -85,6 +85,21 @@ def test_generate_2d_dct_basis(art_warning, image_dl_estimator):
         art_warning(e)
 
 
+@pytest.mark.framework_agnostic
+def test_get_2d_dct_basis(art_warning, image_dl_estimator):
+    try:
+        classifier, _ = image_dl_estimator(from_logits=True)
+        attack_1 = GeoDA(estimator=classifier, sub_dim=4, max_iter=4000, verbose=False)
+        attack_2 = GeoDA(estimator=classifier, sub_dim=4, max_iter=4000, verbose=False)
+
+        dct_1 = attack_1._get_2d_dct_basis(sub_dim=4, res=28)
+        dct_2 = attack_2._get_2d_dct_basis(sub_dim=4, res=28)
+        assert dct_1 is dct_2
+        np.testing.assert_almost_equal(dct_1, attack_1._generate_2d_dct_basis(sub_dim=4, res=28))
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.framework_agnostic
 def test_is_adversarial(art_warning, image_dl_estimator, fix_get_mnist_subset):
     try:
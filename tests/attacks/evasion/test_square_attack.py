@@ -39,12 +39,21 @@ def fix_get_mnist_subset(get_mnist_dataset):
 
 @pytest.mark.skip_framework("keras", "scikitlearn", "mxnet", "kerastf")
 @pytest.mark.parametrize("norm", [2, "inf"])
-def test_generate(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack, norm):
+@pytest.mark.parametrize("refill_batch", [False, True])
+def test_generate(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack, norm, refill_batch):
     try:
         classifier = image_dl_estimator_for_attack(SquareAttack)
 
         attack = SquareAttack(
-            estimator=classifier, norm=norm, max_iter=5, eps=0.3, p_init=0.8, nb_restarts=1, verbose=False
+            estimator=classifier,
+            norm=norm,
+            max_iter=5,
+            eps=0.3,
+            p_init=0.8,
+            nb_restarts=1,
+            batch_size=32,
+            refill_batch=refill_batch,
+            verbose=False,
         )
 
         (x_train_mnist, y_train_mnist, x_test_mnist, y_test_mnist) = fix_get_mnist_subset
@@ -97,6 +106,9 @@ def test_check_params(art_warning, image_dl_estimator_for_attack):
         with pytest.raises(ValueError):
             _ = SquareAttack(classifier, batch_size=-1)
 
+        with pytest.raises(ValueError):
+            _ = SquareAttack(classifier, refill_batch="true")
+
         with pytest.raises(ValueError):
             _ = SquareAttack(classifier, verbose="true")
 
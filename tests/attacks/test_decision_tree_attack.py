@@ -62,9 +62,34 @@ class TestDecisionTreeAttack(TestBase):
         adv = attack.generate(self.X[:25], targets)
         # all targeted crafting should succeed as well
         self.assertTrue(np.sum(clf.predict(adv) == targets) == 25.0)
+        # batching must not change the adversarial examples
+        adv_batch = DecisionTreeAttack(clf_art, batch_size=7, verbose=False).generate(self.X[:25], targets)
+        np.testing.assert_array_equal(adv_batch, adv)
         # Check that X has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_original - self.X))), 0.0, delta=0.00001)
 
+    def test_scikitlearn_unreachable_target(self):
+        clf = DecisionTreeClassifier(max_depth=2)
+        clf.fit(self.X, self.y)
+        clf_art = SklearnClassifier(clf)
+        attack = DecisionTreeAttack(clf_art, batch_size=4, verbose=False)
+
+        # The leaves of a tree of depth 2 predict at most 4 classes, the other classes cannot be reached
+        leaf_classes = np.unique(clf.predict(self.X))
+        unreachable = np.setdiff1d(np.arange(10), leaf_classes)
+        self.assertGreater(len(unreachable), 0)
+
+        x = self.X[:10]
+        predictions = clf.predict(x)
+        targets = np.where(np.arange(10) % 2 == 0, unreachable[0], leaf_classes[0])
+        targets[predictions == targets] = unreachable[0]
+        adv = attack.generate(x, targets)
+
+        # Inputs with an unreachable target come back unchanged, the other targeted crafting succeeds
+        is_unreachable = targets == unreachable[0]
+        np.testing.assert_array_equal(adv[is_unreachable], x[is_unreachable])
+        np.testing.assert_array_equal(clf.predict(adv[~is_unreachable]), targets[~is_unreachable])
+
     def test_check_params(self):
         clf = DecisionTreeClassifier()
         clf.fit(self.X, self.y)
@@ -73,6 +98,9 @@ class TestDecisionTreeAttack(TestBase):
         with self.assertRaises(ValueError):
             _ = DecisionTreeAttack(clf_art, offset=-1)
 
+        with self.assertRaises(ValueError):
+            _ = DecisionTreeAttack(clf_art, batch_size=0)
+
         with self.assertRaises(ValueError):
             _ = DecisionTreeAttack(clf_art, verbose="False")
 
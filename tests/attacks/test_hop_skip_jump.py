@@ -784,6 +784,52 @@ class TestHopSkipJump(TestBase):
             # Check that x_test has not been modified by attack and classifier
             self.assertAlmostEqual(float(np.max(np.abs(x_test_original - self.x_test_iris))), 0.0, delta=0.00001)
 
+    def test_9_scikitlearn_vectorized(self):
+        from sklearn.svm import SVC
+
+        from art.estimators.classification.scikitlearn import SklearnClassifier
+
+        x_test_original = self.x_test_iris.copy()
+
+        classifier = SklearnClassifier(model=SVC(gamma="auto"), clip_values=(0, 1))
+        classifier.fit(x=self.x_test_iris, y=self.y_test_iris)
+
+        for norm in [2, np.inf]:
+            attack = HopSkipJump(
+                classifier,
+                targeted=False,
+                max_iter=20,
+                max_eval=100,
+                init_eval=10,
+                norm=norm,
+                batch_size=16,
+                vectorized=True,
+                verbose=False,
+            )
+            x_test_adv = attack.generate(self.x_test_iris)
+            self.assertFalse((self.x_test_iris == x_test_adv).all())
+            self.assertTrue((x_test_adv <= 1).all())
+            self.assertTrue((x_test_adv >= 0).all())
+
+            preds_adv = np.argmax(classifier.predict(x_test_adv), axis=1)
+            self.assertFalse((np.argmax(self.y_test_iris, axis=1) == preds_adv).all())
+
+            # Test the masking
+            mask = np.random.binomial(n=1, p=0.5, size=np.prod(self.x_test_iris.shape[1:]))
+            x_test_adv = attack.generate(self.x_test_iris, mask=mask)
+            mask_diff = (1 - mask) * (x_test_adv - self.x_test_iris)
+            self.assertAlmostEqual(float(np.max(np.abs(mask_diff))), 0.0, delta=0.00001)
+
+            # Test targeted attack with initial adversarial examples
+            attack.set_params(targeted=True)
+            targets = random_targets(self.y_test_iris, classifier.nb_classes)
+            x_test_adv = attack.generate(self.x_test_iris, y=targets, x_adv_init=x_test_adv)
+            y_pred_adv = np.argmax(classifier.predict(x_test_adv), axis=1)
+            self.assertTrue((np.argmax(targets, axis=1) == y_pred_adv).any())
+
+        # Check that x_test has not been modified by attack and classifier
+        self.assertAlmostEqual(float(np.max(np.abs(x_test_original - self.x_test_iris))), 0.0, delta=0.00001)
+
     def test_check_params(self):
 
         ptc = get_image_classifier_pt(from_logits=True)
@@ -814,6 +860,9 @@ class TestHopSkipJump(TestBase):
         with self.assertRaises(ValueError):
             _ = HopSkipJump(ptc, init_size=-1)
 
+        with self.assertRaises(ValueError):
+            _ = HopSkipJump(ptc, vectorized="true")
+
         with self.assertRaises(ValueError):
             _ = HopSkipJump(ptc, verbose="true")
 
@@ -107,6 +107,14 @@ class TestPixelAttack(TestBase):
         classifier, sess = get_image_classifier_tf()
         self._test_attack(classifier, self.x_test_mnist, self.y_test_mnist, True)
 
+    def test_8_tensorflow_mnist_vectorized(self):
+        """
+        Test with the TensorFlowClassifier attacking all images in lockstep. (Untargeted Attack)
+        :return:
+        """
+        classifier, sess = get_image_classifier_tf()
+        self._test_attack(classifier, self.x_test_mnist, self.y_test_mnist, False, vectorized=True)
+
     # def test_5_pytorch_mnist_targeted(self):
     #     """
     #     Test with the PyTorchClassifier. (Targeted Attack)
@@ -116,7 +124,7 @@ class TestPixelAttack(TestBase):
     #     classifier = get_image_classifier_pt()
     #     self._test_attack(classifier, x_test, self.y_test_mnist, True)
 
-    def _test_attack(self, classifier, x_test, y_test, targeted):
+    def _test_attack(self, classifier, x_test, y_test, targeted, vectorized=False):
         """
         Test with the Pixel Attack
         :return:
@@ -136,7 +144,9 @@ class TestPixelAttack(TestBase):
 
         for th in [None, 128]:
             for es in [0, 1]:
-                df = PixelAttack(classifier, th=th, es=es, max_iter=20, targeted=targeted, verbose=False)
+                df = PixelAttack(
+                    classifier, th=th, es=es, max_iter=20, targeted=targeted, verbose=False, vectorized=vectorized
+                )
                 x_test_adv = df.generate(x_test_original, targets)
 
                 np.testing.assert_raises(AssertionError, np.testing.assert_array_equal, x_test, x_test_adv)
@@ -161,6 +171,12 @@ class TestPixelAttack(TestBase):
         with self.assertRaises(ValueError):
             _ = PixelAttack(ptc, verbose="true")
 
+        with self.assertRaises(ValueError):
+            _ = PixelAttack(ptc, batch_size=0)
+
+        with self.assertRaises(ValueError):
+            _ = PixelAttack(ptc, vectorized="true")
+
         with self.assertRaises(ValueError):
             ptc._clip_values = None
             _ = PixelAttack(ptc)
@@ -176,6 +176,34 @@ class TestSVMAttack(unittest.TestCase):
             # Check that x_test has not been modified by attack and classifier
             self.assertAlmostEqual(float(np.max(np.abs(x_test_original - x_test))), 0.0, delta=0.00001)
 
+    def test_SVC_kernels_gradients(self):
+        """
+        Test the kernel gradients of all support vectors used by the attack for the poly and rbf kernels.
+        """
+        (x_train, y_train), (x_test, y_test), min_, max_ = self.iris
+
+        clip_values = (min_, max_)
+        for kernel in ["poly", "rbf"]:
+            poison = SklearnClassifier(model=SVC(kernel=kernel, gamma="auto"), clip_values=clip_values)
+            poison.fit(x_train, y_train)
+            support_vectors = poison.model.support_vectors_
+            attack_point = support_vectors[0]
+
+            # Gradients of all support vectors at once, as computed by the attack, have to match each support vector
+            d_q_sc = np.fromfunction(
+                lambda i: poison._get_kernel_gradient_sv(i, attack_point),  # pylint: disable=W0640
+                (len(support_vectors),),
+                dtype=int,
+            )
+            d_q_sc_expected = np.array([poison._kernel_grad(sv, attack_point) for sv in support_vectors])
+            np.testing.assert_array_almost_equal(d_q_sc, d_q_sc_expected)
+
+            attack = PoisoningAttackSVM(poison, 0.01, 1.0, x_train, y_train, x_test, y_test, 10)
+            attack_y = np.array([1, 1]) - y_train[0]
+            attack_point, _ = attack.poison(np.array([x_train[0]]), y=np.array([attack_y]))
+            self.assertTrue(np.all(np.isfinite(attack_point)))
+            self.assertTrue(np.all(attack_point >= min_) and np.all(attack_point <= max_))
+
     def test_classifier_type_check_fail(self):
         backend_test_classifier_type_check_fail(PoisoningAttackSVM, [ScikitlearnSVC])
 
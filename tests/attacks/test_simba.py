@@ -201,6 +201,25 @@ class TestSimBA(TestBase):
         # Check that x_test has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_test_original - x_test))), 0.0, delta=0.00001)
 
+        ###############
+        # dct - batch #
+        ###############
+        df = SimBA(classifier, attack="dct", targeted=targeted, batch_size=len(x_test_original))
+
+        if targeted:
+            x_test_adv = df.generate(x_test_original, y=np.tile(y_target, (len(x_test_original), 1)))
+        else:
+            x_test_adv = df.generate(x_test_original)
+
+        self.assertFalse((x_test == x_test_adv).all())
+        self.assertFalse((0.0 == x_test_adv).all())
+
+        y_pred = get_labels_np_array(classifier.predict(x_test_adv))
+        self.assertFalse((y_test == y_pred).all())
+
+        # Check that x_test has not been modified by attack and classifier
+        self.assertAlmostEqual(float(np.max(np.abs(x_test_original - x_test))), 0.0, delta=0.00001)
+
     def test_check_params(self):
 
         ptc = get_image_classifier_pt(from_logits=True)
@@ -214,7 +233,7 @@ class TestSimBA(TestBase):
             _ = SimBA(ptc, epsilon=-1)
 
         with self.assertRaises(ValueError):
-            _ = SimBA(ptc, batch_size=2)
+            _ = SimBA(ptc, batch_size=0)
 
         with self.assertRaises(ValueError):
             _ = SimBA(ptc, stride=1.0)
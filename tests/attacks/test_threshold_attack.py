@@ -108,7 +108,15 @@ class TestThresholdAttack(TestBase):
         classifier = get_image_classifier_pt()
         self._test_attack(classifier, x_test, self.y_test_mnist, True)
 
-    def _test_attack(self, classifier, x_test, y_test, targeted):
+    def test_8_tensorflow_mnist_vectorized(self):
+        """
+        Test with the TensorFlowClassifier attacking all images in lockstep. (Untargeted Attack)
+        :return:
+        """
+        classifier, sess = get_image_classifier_tf()
+        self._test_attack(classifier, self.x_test_mnist, self.y_test_mnist, False, vectorized=True)
+
+    def _test_attack(self, classifier, x_test, y_test, targeted, vectorized=False):
         """
         Test with the Threshold Attack
         :return:
@@ -128,7 +136,9 @@ class TestThresholdAttack(TestBase):
             targets = y_test
 
         for es in [1]:  # Option 0 is not easy to reproduce reliably, we should consider it at a later time
-            df = ThresholdAttack(classifier, th=128, es=es, max_iter=10, targeted=targeted, verbose=False)
+            df = ThresholdAttack(
+                classifier, th=128, es=es, max_iter=10, targeted=targeted, verbose=False, vectorized=vectorized
+            )
             x_test_adv = df.generate(x_test_original, targets)
 
             np.testing.assert_raises(AssertionError, np.testing.assert_array_equal, x_test, x_test_adv)
@@ -112,6 +112,14 @@ class TestZooAttack(TestBase):
         logger.debug("ZOO actual: %s", y_pred_adv)
         logger.info("ZOO success rate on MNIST: %.2f", (sum(y_pred != y_pred_adv) / float(len(y_pred))))
 
+        # Untargeted attack evaluating the coordinate queries in chunks
+        zoo = ZooAttack(
+            classifier=tfc, targeted=False, max_iter=10, binary_search_steps=3, query_batch_size=50, verbose=False
+        )
+        x_test_mnist_adv = zoo.generate(self.x_test_mnist)
+        self.assertLessEqual(np.amax(x_test_mnist_adv), 1.0)
+        self.assertGreaterEqual(np.amin(x_test_mnist_adv), 0.0)
+
         # Check that x_test has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_test_original - self.x_test_mnist))), 0.0, delta=0.00001)
 
@@ -252,6 +260,11 @@ class TestZooAttack(TestBase):
         with self.assertRaises(ValueError):
             _ = ZooAttack(ptc, batch_size=-1)
 
+        with self.assertRaises(ValueError):
+            _ = ZooAttack(ptc, query_batch_size=1.0)
+        with self.assertRaises(ValueError):
+            _ = ZooAttack(ptc, query_batch_size=0)
+
         with self.assertRaises(ValueError):
             _ = ZooAttack(ptc, verbose="true")
 
@@ -28,6 +28,9 @@ import numpy as np
 
 from art.attacks.evasion.fast_gradient import FastGradientMethod
 from art.defences.detector.evasion.subsetscanning import SubsetScanningDetector
+from art.defences.detector.evasion.subsetscanning.scanner import Scanner
+from art.defences.detector.evasion.subsetscanning.scanningops import ScanningOps
+from art.defences.detector.evasion.subsetscanning.scoring_functions import ScoringFunctions
 from art.utils import load_dataset
 
 from tests.utils import master_seed, get_image_classifier_kr
@@ -39,6 +42,37 @@ NB_TRAIN = 100
 NB_TEST = 100
 
 
+def _optimize_in_single_dimension_loop(pvalues, a_max, image_to_node, score_function):
+    """
+    Reference implementation of `ScanningOps.optimize_in_single_dimension` looping over elements and thresholds.
+    """
+    alpha_thresholds = np.unique(pvalues[:, :, 1])
+    alpha_thresholds = alpha_thresholds[0 : int(np.searchsorted(alpha_thresholds, a_max))]
+    alpha_thresholds = alpha_thresholds[0 :: int(len(alpha_thresholds) / 50) + 1]
+    alpha_thresholds = np.append(alpha_thresholds, a_max)
+
+    pmaxes = pvalues[:, :, 1].T if image_to_node else pvalues[:, :, 1]
+    number_of_elements, size_of_given = pmaxes.shape
+
+    unsort_priority = np.zeros((number_of_elements, alpha_thresholds.shape[0]))
+    for elem_indx in range(number_of_elements):
+        unsort_priority[elem_indx, :] = np.searchsorted(np.sort(pmaxes[elem_indx]), alpha_thresholds, side="right")
+    arg_sort_priority = np.argsort(-unsort_priority, axis=0)
+
+    best_score_so_far, best_size, best_alpha_count = -10000, 0, 0
+    for alpha_count, alpha_threshold in enumerate(alpha_thresholds):
+        n_alpha_v = np.cumsum(unsort_priority[:, alpha_count][arg_sort_priority][:, alpha_count])
+        n_v = np.cumsum(np.ones(number_of_elements) * size_of_given)
+        vector_of_scores = score_function(n_alpha_v, n_v, np.ones(number_of_elements) * alpha_threshold)
+
+        if np.max(vector_of_scores) > best_score_so_far:
+            best_score_so_far = np.max(vector_of_scores)
+            best_size = np.argmax(vector_of_scores) + 1
+            best_alpha_count = alpha_count
+
+    return best_score_so_far, arg_sort_priority[:best_size, best_alpha_count], alpha_thresholds[best_alpha_count]
+
+
 class TestSubsetScanningDetector(unittest.TestCase):
     """
     A unittest class for testing the subset scanning detector.
@@ -81,6 +115,78 @@ class TestSubsetScanningDetector(unittest.TestCase):
         _, _, dpwr = detector.scan(clean, x_train_detector, 85, 15)
         self.assertGreater(dpwr, 0.5)
 
+    def test_calculate_pvalue_ranges_batch_size(self):
+        classifier = get_image_classifier_kr()
+        bgd = np.random.rand(40, 28, 28, 1).astype(np.float32)
+        x = np.random.rand(25, 28, 28, 1).astype(np.float32)
+
+        detector = SubsetScanningDetector(classifier, bgd, layer=1, batch_size=128)
+        detector_batch = SubsetScanningDetector(classifier, bgd, layer=1, batch_size=7)
+
+        pvalue_ranges = detector.calculate_pvalue_ranges(x)
+        pvalue_ranges_batch = detector_batch.calculate_pvalue_ranges(x)
+
+        self.assertEqual(pvalue_ranges_batch.dtype, np.float32)
+        self.assertEqual(pvalue_ranges_batch.shape[0], 25)
+        np.testing.assert_array_equal(pvalue_ranges, pvalue_ranges_batch)
+        self.assertTrue(np.all(pvalue_ranges_batch[:, :, 0] <= pvalue_ranges_batch[:, :, 1]))
+
+    def test_scan_scores(self):
+        (x_train, _), (x_test, _), _, _ = load_dataset("mnist")
+        classifier = get_image_classifier_kr()
+        bgd = x_train[:NB_TRAIN]
+        clean_x = x_test[:10]
+        adv_x = FastGradientMethod(classifier, eps=0.5).generate(clean_x)
+
+        detector = SubsetScanningDetector(classifier, bgd, layer=1, batch_size=4, verbose=False)
+
+        # Reference p-value ranges computed unit by unit
+        bgd_activations = np.sort(
+            classifier.get_activations(bgd, detector._layer_name, batch_size=128).reshape(bgd.shape[0], -1), axis=0
+        )
+        pvalue_ranges_expected = []
+        for x in [clean_x, adv_x]:
+            activations = classifier.get_activations(x, detector._layer_name, batch_size=128).reshape(x.shape[0], -1)
+            pvalue_ranges = np.empty(activations.shape + (2,))
+            for j in range(activations.shape[1]):
+                pvalue_ranges[:, j, 0] = np.searchsorted(bgd_activations[:, j], activations[:, j], side="right")
+                pvalue_ranges[:, j, 1] = np.searchsorted(bgd_activations[:, j], activations[:, j], side="left")
+            pvalue_ranges = bgd.shape[0] - pvalue_ranges
+            pvalue_ranges[:, :, 0] = pvalue_ranges[:, :, 0] / (bgd.shape[0] + 1)
+            pvalue_ranges[:, :, 1] = (pvalue_ranges[:, :, 1] + 1) / (bgd.shape[0] + 1)
+            pvalue_ranges_expected.append(pvalue_ranges)
+
+        np.testing.assert_allclose(detector.calculate_pvalue_ranges(clean_x), pvalue_ranges_expected[0], rtol=1e-6)
+
+        clean_scores, adv_scores, _ = detector.scan(clean_x, adv_x)
+        np.testing.assert_allclose(
+            clean_scores, [Scanner.fgss_individ_for_nets(p_v)[0] for p_v in pvalue_ranges_expected[0]], rtol=1e-5
+        )
+        np.testing.assert_allclose(
+            adv_scores, [Scanner.fgss_individ_for_nets(p_v)[0] for p_v in pvalue_ranges_expected[1]], rtol=1e-5
+        )
+
+        # Optimisation over one dimension of a group of p-value ranges
+        pvalue_ranges = np.concatenate(pvalue_ranges_expected).astype(np.float32)
+        for score_function in [ScoringFunctions.get_score_bj_fast, ScoringFunctions.get_score_hc_fast]:
+            for image_to_node in [True, False]:
+                best_score, subset, best_alpha = ScanningOps.optimize_in_single_dimension(
+                    pvalue_ranges, 0.5, image_to_node, score_function
+                )
+                best_score_expected, subset_expected, best_alpha_expected = _optimize_in_single_dimension_loop(
+                    pvalue_ranges, 0.5, image_to_node, score_function
+                )
+                self.assertAlmostEqual(best_score, best_score_expected)
+                self.assertEqual(best_alpha, best_alpha_expected)
+                np.testing.assert_array_equal(np.sort(subset), np.sort(subset_expected))
+
+    def test_check_params(self):
+        classifier = get_image_classifier_kr()
+        bgd = np.random.rand(10, 28, 28, 1).astype(np.float32)
+
+        with self.assertRaises(ValueError):
+            _ = SubsetScanningDetector(classifier, bgd, layer=1, batch_size=0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -100,6 +100,10 @@ class TestActivationDefence(unittest.TestCase):
     def test_wrong_parameters_4(self):
         self.defence.set_params(cluster_analysis="what")
 
+    @unittest.expectedFailure
+    def test_wrong_parameters_5(self):
+        self.defence_gen.set_params(reduce="FastICA")
+
     def test_activations(self):
         (x_train, _), (_, _), (_, _) = self.mnist
         activations = self.defence._get_activations()
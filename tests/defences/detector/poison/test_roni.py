@@ -148,6 +148,10 @@ class TestRONI(unittest.TestCase):
         )
         self.assertRaises(ValueError, self.defense_cal.set_params, x_train=-all_data, y_train=y_test)
 
+    def test_wrong_parameters_3(self):
+        self.assertRaises(ValueError, self.defence_no_cal.set_params, nb_workers=0)
+        self.assertRaises(ValueError, self.defence_no_cal.set_params, incremental=True)
+
     def test_detect_poison(self):
         _, clean_trust = self.defense_cal.detect_poison()
         _, clean_no_trust = self.defence_no_cal.detect_poison()
@@ -162,6 +166,28 @@ class TestRONI(unittest.TestCase):
         self.assertGreaterEqual(pc_tn_no_cal, 0)
         self.assertGreaterEqual(pc_tp_no_cal, 0.7)
 
+    def test_detect_poison_nb_workers(self):
+        (all_data, all_labels), (_, _), (trusted_data, trusted_labels), (_, _), (_, _) = self.mnist
+
+        clean = []
+        for nb_workers in [1, 2]:
+            # Seed before drawing the quiz set and before the permutation to compare only the number of workers
+            master_seed(seed=1234)
+            defence = RONIDefense(
+                self.classifier,
+                all_data,
+                all_labels,
+                trusted_data,
+                trusted_labels,
+                eps=0.1,
+                calibrated=False,
+                nb_workers=nb_workers,
+            )
+            master_seed(seed=1234)
+            clean.append(defence.detect_poison()[1])
+
+        self.assertListEqual(clean[1], clean[0])
+
     def test_evaluate_defense(self):
         real_clean = np.array([1 if i < NB_TRAIN else 0 for i in range(NB_TRAIN + NB_POISON)])
         self.defence_no_cal.detect_poison()
@@ -31,7 +31,16 @@ logger = logging.getLogger(__name__)
 NB_TRAIN, NB_TEST, BATCH_SIZE, EPS_MULTIPLIER, UB_PCT_POISON = 300, 10, 128, 1.5, 0.2
 
 
-@pytest.mark.parametrize("params", [dict(batch_size=-1), dict(eps_multiplier=-1.0), dict(expected_pp_poison=2.0)])
+@pytest.mark.parametrize(
+    "params",
+    [
+        dict(batch_size=-1),
+        dict(eps_multiplier=-1.0),
+        dict(expected_pp_poison=2.0),
+        dict(sketch_size=0),
+        dict(streaming="True"),
+    ],
+)
 def test_wrong_parameters(params, art_warning, get_default_mnist_subset, image_dl_estimator):
     try:
         (x_train_mnist, y_train_mnist), (_, _) = get_default_mnist_subset
@@ -66,6 +75,31 @@ def test_detect_poison(art_warning, get_default_mnist_subset, image_dl_estimator
         art_warning(e)
 
 
+@pytest.mark.skip_framework("non_dl_frameworks", "mxnet")
+def test_detect_poison_streaming(art_warning, get_default_mnist_subset, image_dl_estimator):
+    try:
+        (x_train_mnist, y_train_mnist), (_, _) = get_default_mnist_subset
+
+        classifier, _ = image_dl_estimator()
+
+        classifier.fit(x_train_mnist[:NB_TRAIN], y_train_mnist[:NB_TRAIN], nb_epochs=1)
+        defence = SpectralSignatureDefense(
+            classifier,
+            x_train_mnist[:NB_TRAIN],
+            y_train_mnist[:NB_TRAIN],
+            batch_size=BATCH_SIZE,
+            eps_multiplier=EPS_MULTIPLIER,
+            expected_pp_poison=UB_PCT_POISON,
+        )
+        _, is_clean = defence.detect_poison()
+        _, is_clean_streaming = defence.detect_poison(streaming=True, sketch_size=64)
+
+        assert len(is_clean_streaming) == NB_TRAIN
+        assert np.mean(np.array(is_clean) == np.array(is_clean_streaming)) > 0.9
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.skip_framework("non_dl_frameworks", "mxnet")
 def test_evaluate_defense(art_warning, get_default_mnist_subset, image_dl_estimator):
     try:
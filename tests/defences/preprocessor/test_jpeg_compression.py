@@ -17,6 +17,7 @@
 # SOFTWARE.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import importlib
 import logging
 
 import numpy as np
@@ -29,6 +30,8 @@ from tests.utils import ARTTestException
 
 logger = logging.getLogger(__name__)
 
+simplejpeg_found = importlib.util.find_spec("simplejpeg") is not None
+
 
 class DataGenerator:
     """
@@ -98,6 +101,49 @@ def test_jpeg_compression_video_data(art_warning, video_batch, channels_first):
         art_warning(e)
 
 
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.framework_agnostic
+def test_jpeg_compression_nb_workers(art_warning, video_batch, channels_first):
+    try:
+        test_input, _ = video_batch
+        test_input = np.random.uniform(0, 255, size=test_input.shape).astype(ART_NUMPY_DTYPE)
+        jpeg_compression = JpegCompression(clip_values=(0, 255), channels_first=channels_first)
+        jpeg_compression_workers = JpegCompression(clip_values=(0, 255), channels_first=channels_first, nb_workers=2)
+
+        assert_array_equal(jpeg_compression_workers(test_input)[0], jpeg_compression(test_input)[0])
+
+        # The pool of worker processes is reused by later calls
+        pool = jpeg_compression_workers._pool
+        assert_array_equal(jpeg_compression_workers(test_input)[0], jpeg_compression(test_input)[0])
+        assert jpeg_compression_workers._pool is pool
+
+        jpeg_compression_workers.close()
+        assert jpeg_compression_workers._pool is None
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.skipif(not simplejpeg_found, reason="The package `simplejpeg` is not installed.")
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.framework_agnostic
+def test_jpeg_compression_simplejpeg(art_warning, image_batch, channels_first):
+    try:
+        test_input, test_output = image_batch
+        jpeg_compression = JpegCompression(clip_values=(0, 255), channels_first=channels_first, backend="simplejpeg")
+
+        assert_array_equal(jpeg_compression(test_input)[0], test_output)
+
+        # The worker processes compress with the same codec
+        test_input = np.random.uniform(0, 255, size=test_input.shape).astype(ART_NUMPY_DTYPE)
+        jpeg_compression_workers = JpegCompression(
+            clip_values=(0, 255), channels_first=channels_first, nb_workers=2, backend="simplejpeg"
+        )
+
+        assert_array_equal(jpeg_compression_workers(test_input)[0], jpeg_compression(test_input)[0])
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.parametrize("channels_first", [False])
 @pytest.mark.framework_agnostic
 def test_jpeg_compress(art_warning, image_batch, channels_first):
@@ -108,11 +154,10 @@ def test_jpeg_compress(art_warning, image_batch, channels_first):
         if test_input.shape[-1] in [1, 3]:
             jpeg_compression = JpegCompression(clip_values=(0, 255))
 
-            image_mode = "RGB" if test_input.shape[-1] == 3 else "L"
             test_single_input = np.squeeze(test_input[0]).astype(np.uint8)
             test_single_output = np.squeeze(test_output[0]).astype(np.uint8)
 
-            assert_array_equal(jpeg_compression._compress(test_single_input, image_mode), test_single_output)
+            assert_array_equal(jpeg_compression._compress(test_single_input), test_single_output)
     except ARTTestException as e:
         art_warning(e)
 
@@ -145,6 +190,16 @@ def test_check_params(art_warning):
         with pytest.raises(ValueError):
             _ = JpegCompression(clip_values=(0, 1, 2))
 
+        with pytest.raises(ValueError):
+            _ = JpegCompression(clip_values=(0, 1), nb_workers=0)
+
+        with pytest.raises(ValueError):
+            _ = JpegCompression(clip_values=(0, 1), backend="opencv")
+
+        if not simplejpeg_found:
+            with pytest.raises(ValueError):
+                _ = JpegCompression(clip_values=(0, 1), backend="simplejpeg")
+
         with pytest.raises(ValueError):
             _ = JpegCompression(clip_values=(0, 1), verbose="False")
 
@@ -113,9 +113,26 @@ def test_mp3_compresssion_object(art_warning, audio_batch, channels_first):
         art_warning(e)
 
 
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
+def test_mp3_compresssion_nb_workers(art_warning, audio_batch, channels_first):
+    try:
+        test_input, _, sample_rate = audio_batch
+        test_input = np.random.uniform(-1, 1, size=test_input.shape)
+        mp3compression = Mp3Compression(sample_rate=sample_rate, channels_first=channels_first)
+        mp3compression_workers = Mp3Compression(sample_rate=sample_rate, channels_first=channels_first, nb_workers=2)
+
+        assert_array_equal(mp3compression_workers(test_input)[0], mp3compression(test_input)[0])
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
 def test_check_params(art_warning):
     try:
+        with pytest.raises(ValueError):
+            _ = Mp3Compression(sample_rate=1000, nb_workers=0)
+
         with pytest.raises(ValueError):
             _ = Mp3Compression(sample_rate=1000, verbose="False")
 
@@ -113,6 +113,9 @@ def test_mp3_compresssion(art_warning, audio_batch, channels_first):
 @pytest.mark.skip_framework("tensorflow", "keras", "scikitlearn", "mxnet", "kerastf")
 def test_check_params(art_warning):
     try:
+        with pytest.raises(ValueError):
+            _ = Mp3CompressionPyTorch(sample_rate=1000, nb_workers=0)
+
         with pytest.raises(ValueError):
             _ = Mp3CompressionPyTorch(sample_rate=1000, verbose="False")
 
@@ -65,6 +65,18 @@ def test_compress_video_call(art_warning):
         art_warning(e)
 
 
+@pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
+def test_video_compression_nb_workers(art_warning):
+    try:
+        test_input = np.random.uniform(0, 255, size=(4, 5, 8, 12, 3))
+        video_compression = VideoCompression(video_format="mkv", constant_rate_factor=28)
+        video_compression_workers = VideoCompression(video_format="mkv", constant_rate_factor=28, nb_workers=2)
+
+        assert_array_equal(video_compression_workers(test_input)[0], video_compression(test_input)[0])
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.parametrize("constant_rate_factor", [-1, 52])
 def test_constant_rate_factor_error(art_warning, constant_rate_factor):
     try:
@@ -85,3 +97,15 @@ def test_non_spatio_temporal_data_error(art_warning, image_batch_small):
             video_compression(test_input)
     except ARTTestException as e:
         art_warning(e)
+
+
+def test_check_params(art_warning):
+    try:
+        with pytest.raises(ValueError):
+            _ = VideoCompression(video_format="", nb_workers=0)
+
+        with pytest.raises(ValueError):
+            _ = VideoCompression(video_format="", verbose="False")
+
+    except ARTTestException as e:
+        art_warning(e)
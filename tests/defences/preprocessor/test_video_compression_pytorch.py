@@ -108,6 +108,9 @@ def test_non_spatio_temporal_data_error(art_warning, image_batch_small):
 @pytest.mark.skip_framework("tensorflow", "keras", "scikitlearn", "mxnet", "kerastf")
 def test_check_params(art_warning, image_batch_small):
     try:
+        with pytest.raises(ValueError):
+            _ = VideoCompressionPyTorch(video_format="", nb_workers=0)
+
         with pytest.raises(ValueError):
             _ = VideoCompressionPyTorch(video_format="", verbose="False")
 
@@ -104,6 +104,22 @@ class TestPixelDefend(unittest.TestCase):
         self.assertTrue((x_defended <= 1.0).all())
         self.assertTrue((x_defended >= 0.0).all())
 
+    def test_batch_size(self):
+        # Define the network
+        model = Model()
+        loss_fn = nn.CrossEntropyLoss()
+        optimizer = optim.Adam(model.parameters(), lr=0.01)
+        pixel_cnn = PyTorchClassifier(
+            model=model, loss=loss_fn, optimizer=optimizer, input_shape=(4,), nb_classes=2, clip_values=(0, 1)
+        )
+
+        x = np.random.rand(5, 4).astype(np.float32)
+        x_defended, _ = PixelDefend(eps=5, pixel_cnn=pixel_cnn)(x)
+        x_defended_batch, _ = PixelDefend(eps=5, pixel_cnn=pixel_cnn, batch_size=2)(x)
+
+        np.testing.assert_array_equal(x_defended, x_defended_batch)
+        self.assertTrue((np.abs(x_defended - x) <= 6 / 255.0).all())
+
     def test_check_params(self):
         model = Model()
         loss_fn = nn.CrossEntropyLoss()
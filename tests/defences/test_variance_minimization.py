@@ -57,6 +57,14 @@ class TestTotalVarMin(unittest.TestCase):
         # Check that x has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_original - x))), 0.0, delta=0.00001)
 
+    def test_nb_workers(self):
+        x = np.random.rand(4, 16, 16, 3)
+        master_seed(seed=1234)
+        x_preprocessed, _ = TotalVarMin(clip_values=(0, 1))(x)
+        master_seed(seed=1234)
+        x_preprocessed_workers, _ = TotalVarMin(clip_values=(0, 1), nb_workers=2)(x)
+        np.testing.assert_array_almost_equal(x_preprocessed_workers, x_preprocessed)
+
     def test_failure_feature_vectors(self):
         x = np.random.rand(10, 3)
         preprocess = TotalVarMin()
@@ -89,6 +97,9 @@ class TestTotalVarMin(unittest.TestCase):
         with self.assertRaises(ValueError):
             _ = TotalVarMin(verbose="False")
 
+        with self.assertRaises(ValueError):
+            _ = TotalVarMin(nb_workers=0)
+
 
 if __name__ == "__main__":
     unittest.main()
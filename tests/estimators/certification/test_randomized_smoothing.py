@@ -255,6 +255,31 @@ class TestRandomizedSmoothingVectors(unittest.TestCase):
     def setUp(self):
         master_seed(seed=1234)
 
+    def test_prediction_counts(self):
+        (_, _), (x_test, _) = self.iris
+
+        ptc = get_tabular_classifier_pt()
+        rs = PyTorchRandomizedSmoothing(
+            model=ptc.model,
+            loss=ptc._loss,
+            input_shape=ptc.input_shape,
+            nb_classes=ptc.nb_classes,
+            channels_first=ptc.channels_first,
+            clip_values=ptc.clip_values,
+            sample_size=100,
+            scale=0.01,
+            alpha=0.001,
+        )
+
+        master_seed(seed=1234)
+        counts = rs._prediction_counts(x_test[:5], sizes=(100, 250), batch_size=32)
+        self.assertEqual(counts.shape, (5, 2, ptc.nb_classes))
+        np.testing.assert_array_equal(counts.sum(axis=-1), np.tile([100, 250], (5, 1)))
+
+        master_seed(seed=1234)
+        counts_batch = rs._prediction_counts(x_test[:5], sizes=(100, 250), batch_size=1000)
+        np.testing.assert_array_equal(counts_batch, counts)
+
     def test_iris_clipped(self):
         (_, _), (x_test, y_test) = self.iris
 
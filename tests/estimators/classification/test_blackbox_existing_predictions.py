@@ -77,3 +77,20 @@ def test_blackbox_nn_existing_predictions_fuzzy(art_warning):
         assert np.array_equal(bb.predict(fuzzy_x), y)
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.parametrize("fuzzy_float_compare", [False, True])
+def test_blackbox_existing_predictions_batch(art_warning, fuzzy_float_compare):
+    try:
+        x = np.random.uniform(1, 2, size=(1000, 2, 3)).astype(np.float32)
+        y = np.eye(4)[np.random.randint(0, 4, size=1000)]
+        bb = BlackBoxClassifier((x, y), (2, 3), 4, fuzzy_float_compare=fuzzy_float_compare)
+
+        indices = np.random.permutation(1000)[:300]
+        x_query = x[indices] * (1 + 1e-7) if fuzzy_float_compare else x[indices]
+        assert np.array_equal(bb.predict(x_query, batch_size=64), y[indices])
+
+        with pytest.raises(ValueError):
+            bb.predict(x[:10] + 0.5)
+    except ARTTestException as e:
+        art_warning(e)
@@ -0,0 +1,169 @@
+# MIT License
+#
+# Copyright (C) The Adversarial Robustness Toolbox (ART) Authors 2022
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from art.estimators.classification.blackbox import BlackBoxClassifier, BlackBoxClassifierNeuralNetwork, QueryCache
+from tests.utils import ARTTestException
+
+
+class CountingPredictFn:
+    def __init__(self):
+        self.nb_queries = 0
+
+    def __call__(self, x):
+        self.nb_queries += x.shape[0]
+        labels = (np.sum(x.reshape(x.shape[0], -1), axis=1) > 0).astype(int)
+        return np.eye(2)[labels]
+
+
+@pytest.mark.framework_agnostic
+@pytest.mark.parametrize("blackbox_class", [BlackBoxClassifier, BlackBoxClassifierNeuralNetwork])
+def test_query_cache(art_warning, blackbox_class):
+    try:
+        predict_fn = CountingPredictFn()
+        x = np.random.uniform(-1, 1, size=(20, 3)).astype(np.float32)
+        x_batch = np.concatenate([x, x[:5]])
+
+        bb = blackbox_class(predict_fn, (3,), 2, query_cache=QueryCache())
+        predictions = bb.predict(x_batch, batch_size=8)
+        np.testing.assert_array_equal(predictions, CountingPredictFn()(x_batch))
+        assert predict_fn.nb_queries == 20
+        assert bb.query_cache.hits == 5
+        assert bb.query_cache.misses == 20
+
+        predict_fn.nb_queries = 0
+        np.testing.assert_array_equal(bb.predict(x[::-1]), predictions[:20][::-1])
+        assert predict_fn.nb_queries == 0
+        assert bb.query_cache.hits == 25
+
+        bb.query_cache.clear()
+        assert len(bb.query_cache) == 0
+        assert bb.query_cache.hits == 0
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_query_cache_eviction(art_warning):
+    try:
+        predict_fn = CountingPredictFn()
+        x = np.random.uniform(-1, 1, size=(10, 3)).astype(np.float32)
+
+        bb = BlackBoxClassifier(predict_fn, (3,), 2, query_cache=QueryCache(max_size=4))
+        bb.predict(x)
+        assert len(bb.query_cache) == 4
+
+        predict_fn.nb_queries = 0
+        bb.predict(x[-4:])
+        assert predict_fn.nb_queries == 0
+        bb.predict(x[:1])
+        assert predict_fn.nb_queries == 1
+
+        with pytest.raises(ValueError):
+            _ = QueryCache(max_size=-1)
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_query_cache_persistence(art_warning):
+    try:
+        path = os.path.join(tempfile.mkdtemp(), "predictions.sqlite")
+        x = np.random.uniform(-1, 1, size=(10, 3)).astype(np.float32)
+
+        predict_fn = CountingPredictFn()
+        query_cache = QueryCache(max_size=2, path=path, model_id="model")
+        predictions = BlackBoxClassifier(predict_fn, (3,), 2, query_cache=query_cache).predict(x)
+        query_cache.close()
+
+        # Predictions persisted for the same model are reused by a new prediction function object
+        predict_fn = CountingPredictFn()
+        bb = BlackBoxClassifier(predict_fn, (3,), 2, query_cache=QueryCache(path=path, model_id="model"))
+        np.testing.assert_array_equal(bb.predict(x), predictions)
+        assert predict_fn.nb_queries == 0
+        assert bb.query_cache.hits == 10
+
+        bb = BlackBoxClassifier(predict_fn, (3,), 2, query_cache=QueryCache(path=path, model_id="other_model"))
+        bb.predict(x)
+        assert predict_fn.nb_queries == 10
+
+        with pytest.raises(ValueError):
+            _ = QueryCache(model_id=1)
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_query_cache_shared(art_warning):
+    try:
+        x = np.random.uniform(-1, 1, size=(10, 3)).astype(np.float32)
+        query_cache = QueryCache()
+
+        bb = BlackBoxClassifier(CountingPredictFn(), (3,), 2, query_cache=query_cache)
+        bb_negated = BlackBoxClassifier(lambda x: CountingPredictFn()(-x), (3,), 2, query_cache=query_cache)
+
+        # Classifiers sharing a cache do not answer each other's queries
+        np.testing.assert_array_equal(bb.predict(x), CountingPredictFn()(x))
+        np.testing.assert_array_equal(bb_negated.predict(x), CountingPredictFn()(-x))
+        assert query_cache.hits == 0
+        assert len(query_cache) == 20
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_query_cache_pickle_threads(art_warning):
+    try:
+        path = os.path.join(tempfile.mkdtemp(), "predictions.sqlite")
+        x = np.random.uniform(-1, 1, size=(40, 3)).astype(np.float32)
+
+        bb = BlackBoxClassifier(CountingPredictFn(), (3,), 2, query_cache=QueryCache(path=path, model_id="model"))
+        bb.predict(x[:10])
+
+        # The connection to the database is not pickled and reopened on first use
+        bb_copy = pickle.loads(pickle.dumps(bb))
+        assert bb_copy.query_cache._connection is None
+        bb_copy.predict_fn.nb_queries = 0
+        np.testing.assert_array_equal(bb_copy.predict(x[:10]), CountingPredictFn()(x[:10]))
+        assert bb_copy.predict_fn.nb_queries == 0
+
+        predictions = [None] * 4
+
+        def predict(i):
+            predictions[i] = bb_copy.predict(x[i * 10 : (i + 1) * 10], batch_size=3)
+
+        threads = [threading.Thread(target=predict, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        np.testing.assert_array_equal(np.concatenate(predictions), CountingPredictFn()(x))
+        # The counters of the first 10 predictions are copied with the cache
+        assert bb_copy.query_cache.hits == 20
+        assert bb_copy.query_cache.misses == 40
+        bb_copy.query_cache.close()
+        bb.query_cache.close()
+    except ARTTestException as e:
+        art_warning(e)
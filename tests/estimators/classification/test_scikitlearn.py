@@ -490,6 +490,25 @@ class TestScikitlearnSVCSVC(TestBase):
             "Unrecognized type for argument `label` with type <class 'numpy.ndarray'>", str(context.exception)
         )
 
+    def test_class_gradient_chunks(self):
+        grad_predicted = self.classifier.class_gradient(self.x_test_iris[0:5], label=None)
+        grad_chunks = self.classifier._get_kernel_gradient_sum(
+            self.x_test_iris[0:5], self.classifier._get_class_dual_coef(), max_size=1
+        )
+        np.testing.assert_array_almost_equal(grad_chunks, grad_predicted, decimal=6)
+
+    def test_q_submatrix(self):
+        support_vectors = self.sklearn_model.support_vectors_
+        q_predicted = self.classifier.q_submatrix(self.x_test_iris[0:3], support_vectors)
+        self.assertEqual(q_predicted.shape, (3, support_vectors.shape[0]))
+
+        y_row = self.sklearn_model.predict(self.x_test_iris[0:3])
+        y_col = self.sklearn_model.predict(support_vectors)
+        y_row[y_row == 0] = -1
+        y_col[y_col == 0] = -1
+        q_expected = self.classifier._kernel([self.x_test_iris[1]], [support_vectors[2]])[0][0] * y_row[1] * y_col[2]
+        self.assertAlmostEqual(q_predicted[1, 2], q_expected, places=6)
+
     def test_save(self):
         self.classifier.save(filename="test.file", path=None)
         self.classifier.save(filename="test.file", path="./")
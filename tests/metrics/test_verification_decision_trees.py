@@ -18,6 +18,8 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import os
+import tempfile
 import unittest
 
 from xgboost import XGBClassifier
@@ -29,7 +31,7 @@ from art.estimators.classification.xgboost import XGBoostClassifier
 from art.estimators.classification.lightgbm import LightGBMClassifier
 from art.estimators.classification.scikitlearn import SklearnClassifier
 from art.utils import load_dataset
-from art.metrics.verification_decisions_trees import RobustnessVerificationTreeModelsCliqueMethod
+from art.metrics.verification_decisions_trees import CompiledTrees, RobustnessVerificationTreeModelsCliqueMethod
 
 from tests.utils import master_seed
 
@@ -132,6 +134,17 @@ class TestMetricsTrees(unittest.TestCase):
         self.assertEqual(average_bound, 0.016482421874999993)
         self.assertEqual(verified_error, 1.0)
 
+        rt = RobustnessVerificationTreeModelsCliqueMethod(classifier=classifier, verbose=False, nb_workers=2)
+        average_bound_workers, verified_error_workers = rt.verify(
+            x=self.x_test, y=self.y_test, eps_init=0.3, nb_search_steps=10, max_clique=2, max_level=2
+        )
+
+        self.assertEqual(average_bound_workers, average_bound)
+        self.assertEqual(verified_error_workers, verified_error)
+
+        with self.assertRaises(ValueError):
+            _ = RobustnessVerificationTreeModelsCliqueMethod(classifier=classifier, nb_workers=0)
+
     def test_ExtraTrees(self):
         model = ExtraTreesClassifier(n_estimators=4, max_depth=6)
         model.fit(self.x_train, np.argmax(self.y_train, axis=1))
@@ -146,6 +159,39 @@ class TestMetricsTrees(unittest.TestCase):
         self.assertEqual(average_bound, 0.05406445312499999)
         self.assertEqual(verified_error, 0.96)
 
+    def test_compiled_trees(self):
+        model = ExtraTreesClassifier(n_estimators=4, max_depth=6)
+        model.fit(self.x_train, np.argmax(self.y_train, axis=1))
+
+        classifier = SklearnClassifier(model=model)
+
+        compiled_trees = classifier.get_compiled_trees()
+        self.assertIs(classifier.get_compiled_trees(), compiled_trees)
+
+        expected_compiled_trees = CompiledTrees.from_trees(classifier.get_trees())
+        for name in CompiledTrees.__slots__:
+            np.testing.assert_array_equal(getattr(compiled_trees, name), getattr(expected_compiled_trees, name))
+        self.assertEqual(len(compiled_trees.tree_leaves), 4 * self.n_classes)
+
+        # The trees of all classes share the boxes of their estimator
+        nb_boxes = len(compiled_trees.box_offset) - 1
+        self.assertEqual(nb_boxes * self.n_classes, len(compiled_trees.leaf_box))
+        for i_tree, tree_leaves in enumerate(compiled_trees.tree_leaves):
+            first_tree_leaves = compiled_trees.tree_leaves[i_tree - i_tree % self.n_classes]
+            np.testing.assert_array_equal(
+                compiled_trees.leaf_box[tree_leaves], compiled_trees.leaf_box[first_tree_leaves]
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "compiled_trees.npz")
+            compiled_trees.save(filename)
+            loaded_compiled_trees = CompiledTrees.load(filename)
+        for name in CompiledTrees.__slots__:
+            np.testing.assert_array_equal(getattr(loaded_compiled_trees, name), getattr(compiled_trees, name))
+
+        classifier.fit(self.x_train, self.y_train)
+        self.assertIsNot(classifier.get_compiled_trees(), compiled_trees)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -20,7 +20,7 @@ import logging
 import numpy as np
 import pytest
 
-from tests.utils import ARTTestException
+from tests.utils import ARTTestException, master_seed
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +87,15 @@ def test_eot_brightness_pytorch(art_warning, fix_get_mnist_subset):
 
         np.testing.assert_almost_equal(x_eot.numpy()[0, 14, :, 0], x_eot_expected)
 
+        eot = EoTBrightnessPyTorch(nb_samples=nb_samples, delta=(0.2, 0.2), clip_values=(0.0, 1.0), batch_size=4)
+        x_eot_batch, y_eot_batch = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        np.testing.assert_almost_equal(x_eot_batch.numpy(), x_eot.numpy())
+        np.testing.assert_array_equal(y_eot_batch.numpy(), y_eot.numpy())
+
+        with pytest.raises(ValueError):
+            _ = EoTBrightnessPyTorch(nb_samples=nb_samples, delta=(0.2, 0.2), clip_values=(0.0, 1.0), batch_size=0)
+
     except ARTTestException as e:
         art_warning(e)
 
@@ -143,5 +152,77 @@ def test_eot_brightness_tensorflow_v2(art_warning, fix_get_mnist_subset):
 
         np.testing.assert_almost_equal(x_eot.numpy()[0, 14, :, 0], x_eot_expected)
 
+        eot = EoTBrightnessTensorFlow(nb_samples=nb_samples, delta=(0.2, 0.2), clip_values=(0.0, 1.0), batch_size=4)
+        x_eot_batch, y_eot_batch = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        np.testing.assert_almost_equal(x_eot_batch.numpy(), x_eot.numpy())
+        np.testing.assert_array_equal(y_eot_batch.numpy(), y_eot.numpy())
+
+        with pytest.raises(ValueError):
+            _ = EoTBrightnessTensorFlow(nb_samples=nb_samples, delta=(0.2, 0.2), clip_values=(0.0, 1.0), batch_size=0)
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_brightness_pytorch_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        import torch
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.brightness.pytorch import (
+            EoTBrightnessPyTorch,
+        )
+
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+        x_train_mnist = np.transpose(x_train_mnist, (0, 2, 3, 1))  # transpose to NHWC
+
+        nb_samples = 3
+
+        eot = EoTBrightnessPyTorch(nb_samples=nb_samples, delta=(-0.3, 0.3), clip_values=(0.0, 1.0), batch_size=4)
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        # The per-image loop draws the same brightness deltas from the same seed
+        mocker.patch.object(
+            EoTBrightnessPyTorch, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        np.testing.assert_almost_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("tensorflow2")
+def test_eot_brightness_tensorflow_v2_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.brightness.tensorflow import (
+            EoTBrightnessTensorFlow,
+        )
+
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+
+        nb_samples = 3
+
+        eot = EoTBrightnessTensorFlow(nb_samples=nb_samples, delta=(-0.3, 0.3), clip_values=(0.0, 1.0), batch_size=4)
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        # The per-image loop draws the same brightness deltas from the same seed
+        mocker.patch.object(
+            EoTBrightnessTensorFlow, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        np.testing.assert_almost_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+        assert y_eot_loop.shape == y_eot.shape
+
     except ARTTestException as e:
         art_warning(e)
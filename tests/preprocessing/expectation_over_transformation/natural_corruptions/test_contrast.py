@@ -20,7 +20,7 @@ import logging
 import numpy as np
 import pytest
 
-from tests.utils import ARTTestException
+from tests.utils import ARTTestException, master_seed
 
 logger = logging.getLogger(__name__)
 
@@ -163,3 +163,70 @@ def test_eot_contrast_tensorflow_v2(art_warning, fix_get_mnist_subset):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_contrast_pytorch_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        import torch
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.contrast.pytorch import (
+            EoTContrastPyTorch,
+        )
+
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+        x_train_mnist = np.transpose(x_train_mnist, (0, 2, 3, 1))  # transpose to NHWC
+
+        nb_samples = 3
+
+        eot = EoTContrastPyTorch(
+            nb_samples=nb_samples, contrast_factor=(0.2, 1.0), clip_values=(0.0, 1.0), batch_size=4
+        )
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        # The per-image loop draws the same contrast factors from the same seed
+        mocker.patch.object(
+            EoTContrastPyTorch, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        np.testing.assert_almost_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("tensorflow2")
+def test_eot_contrast_tensorflow_v2_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.contrast.tensorflow import (
+            EoTContrastTensorFlow,
+        )
+
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+
+        nb_samples = 3
+
+        eot = EoTContrastTensorFlow(
+            nb_samples=nb_samples, contrast_factor=(0.2, 1.0), clip_values=(0.0, 1.0), batch_size=4
+        )
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        # The per-image loop draws the same contrast factors from the same seed
+        mocker.patch.object(
+            EoTContrastTensorFlow, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        np.testing.assert_almost_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+        assert y_eot_loop.shape == y_eot.shape
+
+    except ARTTestException as e:
+        art_warning(e)
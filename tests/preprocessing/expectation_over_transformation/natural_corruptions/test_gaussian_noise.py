@@ -20,7 +20,7 @@ import logging
 import numpy as np
 import pytest
 
-from tests.utils import ARTTestException
+from tests.utils import ARTTestException, master_seed
 
 logger = logging.getLogger(__name__)
 
@@ -75,3 +75,76 @@ def test_eot_gaussian_noise_tensorflow_v2(art_warning, fix_get_mnist_subset):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_gaussian_noise_pytorch_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        import torch
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.gaussian_noise.pytorch import (
+            EoTGaussianNoisePyTorch,
+        )
+
+        _, y_train_mnist, _, _ = fix_get_mnist_subset
+        # Constant images in the middle of the clip values keep the noise unclipped
+        x_train_mnist = np.full((y_train_mnist.shape[0], 28, 28, 1), 0.5, dtype=np.float32)
+
+        nb_samples = 3
+
+        eot = EoTGaussianNoisePyTorch(nb_samples=nb_samples, std=(0.01, 0.1), clip_values=(0.0, 1.0))
+        master_seed(seed=1234)
+        std_expected = np.random.uniform(low=0.01, high=0.1, size=nb_samples * x_train_mnist.shape[0])
+
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        mocker.patch.object(
+            EoTGaussianNoisePyTorch, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        # Both the batch and the per-image loop sample the standard deviation per sample
+        for x_eot_i in [x_eot.numpy(), x_eot_loop.numpy()]:
+            std = np.std(x_eot_i.reshape(x_eot_i.shape[0], -1) - 0.5, axis=1)
+            np.testing.assert_allclose(std, std_expected, rtol=0.15)
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("tensorflow2")
+def test_eot_gaussian_noise_tensorflow_v2_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.gaussian_noise.tensorflow import (
+            EoTGaussianNoiseTensorFlow,
+        )
+
+        _, y_train_mnist, _, _ = fix_get_mnist_subset
+        # Constant images in the middle of the clip values keep the noise unclipped
+        x_train_mnist = np.full((y_train_mnist.shape[0], 28, 28, 1), 0.5, dtype=np.float32)
+
+        nb_samples = 3
+
+        eot = EoTGaussianNoiseTensorFlow(nb_samples=nb_samples, std=(0.01, 0.1), clip_values=(0.0, 1.0))
+        master_seed(seed=1234)
+        std_expected = np.random.uniform(low=0.01, high=0.1, size=nb_samples * x_train_mnist.shape[0])
+
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        mocker.patch.object(
+            EoTGaussianNoiseTensorFlow, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        # Both the batch and the per-image loop sample the standard deviation per sample
+        for x_eot_i in [x_eot.numpy(), x_eot_loop.numpy()]:
+            std = np.std(x_eot_i.reshape(x_eot_i.shape[0], -1) - 0.5, axis=1)
+            np.testing.assert_allclose(std, std_expected, rtol=0.15)
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
@@ -20,7 +20,7 @@ import logging
 import numpy as np
 import pytest
 
-from tests.utils import ARTTestException
+from tests.utils import ARTTestException, master_seed
 
 logger = logging.getLogger(__name__)
 
@@ -75,3 +75,76 @@ def test_eot_shot_noise_tensorflow_v2(art_warning, fix_get_mnist_subset):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_shot_noise_pytorch_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        import torch
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.shot_noise.pytorch import (
+            EoTShotNoisePyTorch,
+        )
+
+        _, y_train_mnist, _, _ = fix_get_mnist_subset
+        # Black images stay unchanged where the Poisson noise is zero, with probability exp(-lam)
+        x_train_mnist = np.zeros((y_train_mnist.shape[0], 28, 28, 1), dtype=np.float32)
+
+        nb_samples = 3
+
+        eot = EoTShotNoisePyTorch(nb_samples=nb_samples, lam=(0.5, 3.0), clip_values=(0.0, 1.0))
+        master_seed(seed=1234)
+        lam_expected = np.random.uniform(low=0.5, high=3.0, size=nb_samples * x_train_mnist.shape[0])
+
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        mocker.patch.object(
+            EoTShotNoisePyTorch, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        # Both the batch and the per-image loop sample the rate per sample
+        for x_eot_i in [x_eot.numpy(), x_eot_loop.numpy()]:
+            unchanged = np.mean(x_eot_i.reshape(x_eot_i.shape[0], -1) == 0.0, axis=1)
+            np.testing.assert_allclose(unchanged, np.exp(-lam_expected), atol=0.07)
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("tensorflow2")
+def test_eot_shot_noise_tensorflow_v2_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.shot_noise.tensorflow import (
+            EoTShotNoiseTensorFlow,
+        )
+
+        _, y_train_mnist, _, _ = fix_get_mnist_subset
+        # Black images stay unchanged where the Poisson noise is zero, with probability exp(-lam)
+        x_train_mnist = np.zeros((y_train_mnist.shape[0], 28, 28, 1), dtype=np.float32)
+
+        nb_samples = 3
+
+        eot = EoTShotNoiseTensorFlow(nb_samples=nb_samples, lam=(0.5, 3.0), clip_values=(0.0, 1.0))
+        master_seed(seed=1234)
+        lam_expected = np.random.uniform(low=0.5, high=3.0, size=nb_samples * x_train_mnist.shape[0])
+
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        mocker.patch.object(
+            EoTShotNoiseTensorFlow, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        # Both the batch and the per-image loop sample the rate per sample
+        for x_eot_i in [x_eot.numpy(), x_eot_loop.numpy()]:
+            unchanged = np.mean(x_eot_i.reshape(x_eot_i.shape[0], -1) == 0.0, axis=1)
+            np.testing.assert_allclose(unchanged, np.exp(-lam_expected), atol=0.07)
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
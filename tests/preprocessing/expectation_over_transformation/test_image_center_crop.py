@@ -0,0 +1,74 @@
+# MIT License
+#
+# Copyright (C) The Adversarial Robustness Toolbox (ART) Authors 2022
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import logging
+
+import numpy as np
+import pytest
+
+from tests.utils import ARTTestException, master_seed
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture()
+def fix_get_mnist_subset(get_mnist_dataset):
+    (x_train_mnist, y_train_mnist), (x_test_mnist, y_test_mnist) = get_mnist_dataset
+    n_train = 10
+    n_test = 10
+    yield x_train_mnist[:n_train], y_train_mnist[:n_train], x_test_mnist[:n_test], y_test_mnist[:n_test]
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_image_center_crop_classification_pytorch_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        import torch
+        from art.preprocessing.expectation_over_transformation.image_center_crop.pytorch import (
+            EoTImageCenterCropPyTorch,
+        )
+
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+
+        x_train_mnist = torch.from_numpy(x_train_mnist)
+        y_train_mnist = torch.from_numpy(y_train_mnist)
+
+        nb_samples = 3
+
+        eot = EoTImageCenterCropPyTorch(
+            nb_samples=nb_samples, size=5, clip_values=(0.0, 1.0), label_type="classification", batch_size=4
+        )
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        # The images of a batch are grouped by their sampled crop size
+        master_seed(seed=1234)
+        sizes = np.random.randint(low=0, high=5, size=4)
+        assert len(np.unique(sizes)) > 1
+
+        mocker.patch.object(
+            EoTImageCenterCropPyTorch, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        assert x_eot.shape == (nb_samples * x_train_mnist.shape[0],) + x_train_mnist.shape[1:]
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+        np.testing.assert_array_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
@@ -23,7 +23,7 @@ import torch
 
 from art.preprocessing.expectation_over_transformation.image_rotation.tensorflow import EoTImageRotationTensorFlow
 from art.preprocessing.expectation_over_transformation.image_rotation.pytorch import EoTImageRotationPyTorch
-from tests.utils import ARTTestException
+from tests.utils import ARTTestException, master_seed
 
 logger = logging.getLogger(__name__)
 
@@ -220,3 +220,95 @@ def test_eot_image_rotation_object_detection_pytorch(art_warning, fix_get_mnist_
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("tensorflow2")
+def test_eot_image_rotation_classification_tensorflow_v2_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+
+        nb_samples = 3
+
+        # Constant angles because the angles are sampled with TensorFlow in different shapes by the batch and the loop
+        eot = EoTImageRotationTensorFlow(
+            nb_samples=nb_samples,
+            angles=(30.0, 30.0),
+            clip_values=(0.0, 1.0),
+            label_type="classification",
+            batch_size=4,
+        )
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        mocker.patch.object(
+            EoTImageRotationTensorFlow, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+        np.testing.assert_almost_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_image_rotation_classification_pytorch_batch(art_warning, fix_get_mnist_subset, mocker):
+    try:
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+
+        x_train_mnist = torch.from_numpy(x_train_mnist)
+        y_train_mnist = torch.from_numpy(y_train_mnist)
+
+        nb_samples = 3
+
+        eot = EoTImageRotationPyTorch(
+            nb_samples=nb_samples,
+            angles=(-45.0, 45.0),
+            clip_values=(0.0, 1.0),
+            label_type="classification",
+            batch_size=4,
+        )
+        master_seed(seed=1234)
+        x_eot, y_eot = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        mocker.patch.object(
+            EoTImageRotationPyTorch, "_batch_transform", new_callable=mocker.PropertyMock, return_value=False
+        )
+        master_seed(seed=1234)
+        x_eot_loop, y_eot_loop = eot.forward(x=x_train_mnist, y=y_train_mnist)
+
+        assert y_eot.shape == (nb_samples * y_train_mnist.shape[0], y_train_mnist.shape[1])
+        np.testing.assert_almost_equal(x_eot.numpy(), x_eot_loop.numpy())
+        np.testing.assert_array_equal(y_eot.numpy(), y_eot_loop.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_image_rotation_rotate_pytorch(art_warning):
+    try:
+        import torchvision
+
+        master_seed(seed=1234)
+        x = torch.rand(8, 3, 20, 32)
+        angles = np.random.uniform(low=-180.0, high=180.0, size=x.shape[0])
+
+        x_rotated = EoTImageRotationPyTorch._rotate(x=x, angles=angles)
+
+        x_rotated_expected = torch.stack(
+            [
+                torchvision.transforms.functional.rotate(
+                    img=x_i,
+                    angle=float(angle),
+                    interpolation=torchvision.transforms.functional.InterpolationMode.NEAREST,
+                )
+                for x_i, angle in zip(x, angles)
+            ]
+        )
+
+        np.testing.assert_array_equal(x_rotated.numpy(), x_rotated_expected.numpy())
+
+    except ARTTestException as e:
+        art_warning(e)